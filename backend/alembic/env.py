@@ -31,6 +31,14 @@ from app.movements import movement_model
 from app.categories import category_model
 from app.organizations import organization_model
 from app.roles import role_model
+from app.idempotency import idempotency_model
+from app.rollups import rollup_model
+from app.inventory import inventory_model
+from app.reconciliation import reconciliation_model
+from app.archive import archive_model
+from app.stocktakes import stocktake_model
+from app.reports import report_cache_model, report_job_model, report_precompute_model
+from app.scheduler import scheduler_model
 
 target_metadata = Base.metadata
 
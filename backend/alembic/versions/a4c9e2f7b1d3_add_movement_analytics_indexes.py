@@ -0,0 +1,90 @@
+"""add composite movement indexes for time-window analytics
+
+Revision ID: a4c9e2f7b1d3
+Revises: 3818a7b1c460
+Create Date: 2026-10-19 09:00:00.000000
+
+Optional BRIN index on created_at (PostgreSQL only, for very large tables):
+
+    alembic -x movements_brin=true upgrade head
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f7b1d3'
+down_revision: Union[str, Sequence[str], None] = '3818a7b1c460'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _brin_requested() -> bool:
+    """Return True when the BRIN index was requested with ``-x movements_brin=true``."""
+    value = context.get_x_argument(as_dictionary=True).get("movements_brin", "")
+    return value.lower() in {"1", "true", "yes"}
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add analytics and keyset indexes on movements."""
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    if is_postgres:
+        # CONCURRENTLY avoids blocking writes on large ledgers; it cannot run
+        # inside a transaction block.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_movements_org_type_created_at",
+                "movements",
+                ["organization_id", "type", "created_at"],
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                "ix_movements_org_product_created_at",
+                "movements",
+                ["organization_id", "product_id", "created_at"],
+                postgresql_include=["quantity"],
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                "ix_movements_org_created_at_id",
+                "movements",
+                ["organization_id", "created_at", "id"],
+                postgresql_concurrently=True,
+            )
+            if _brin_requested():
+                op.create_index(
+                    "ix_movements_created_at_brin",
+                    "movements",
+                    ["created_at"],
+                    postgresql_using="brin",
+                    postgresql_concurrently=True,
+                )
+        return
+
+    op.create_index(
+        "ix_movements_org_type_created_at",
+        "movements",
+        ["organization_id", "type", "created_at"],
+    )
+    op.create_index(
+        "ix_movements_org_product_created_at",
+        "movements",
+        ["organization_id", "product_id", "created_at"],
+    )
+    op.create_index(
+        "ix_movements_org_created_at_id",
+        "movements",
+        ["organization_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop analytics and keyset indexes on movements."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_movements_created_at_brin")
+    op.drop_index("ix_movements_org_created_at_id", table_name="movements")
+    op.drop_index("ix_movements_org_product_created_at", table_name="movements")
+    op.drop_index("ix_movements_org_type_created_at", table_name="movements")
@@ -0,0 +1,89 @@
+"""add stock ledger balances and reconciliation checkpoints
+
+Revision ID: a7d3f1b9c5e2
+Revises: f1c9a3e5b7d4
+Create Date: 2026-10-19 15:00:00.000000
+
+Existing quantities are trusted as the baseline: they become each product's
+opening balance and every organization is checkpointed at its latest
+movement. Run
+``python scripts/reconcile_stock.py`` afterwards (e.g. every few minutes).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3f1b9c5e2'
+down_revision: Union[str, Sequence[str], None] = 'f1c9a3e5b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add ledger balances, checkpoints and the (org, id) movement index."""
+    op.create_table(
+        "stock_ledger_balances",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("opening_quantity", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("product_id"),
+    )
+    op.create_index(
+        op.f("ix_stock_ledger_balances_organization_id"),
+        "stock_ledger_balances",
+        ["organization_id"],
+        unique=False,
+    )
+    op.create_table(
+        "reconciliation_checkpoints",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("baseline_movement_id", sa.Integer(), nullable=False),
+        sa.Column("last_movement_id", sa.Integer(), nullable=False),
+        sa.Column("last_drift_count", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("organization_id"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO stock_ledger_balances (product_id, organization_id, opening_quantity, quantity)
+        SELECT id, organization_id, quantity, quantity
+        FROM products
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO reconciliation_checkpoints
+            (organization_id, baseline_movement_id, last_movement_id, last_drift_count, updated_at)
+        SELECT o.id, COALESCE(MAX(m.id), 0), COALESCE(MAX(m.id), 0), 0, CURRENT_TIMESTAMP
+        FROM organizations o
+        LEFT JOIN movements m ON m.organization_id = o.id
+        GROUP BY o.id
+        """
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_movements_org_id",
+                "movements",
+                ["organization_id", "id"],
+                postgresql_concurrently=True,
+            )
+        return
+    op.create_index("ix_movements_org_id", "movements", ["organization_id", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop reconciliation tables and the (org, id) movement index."""
+    op.drop_index("ix_movements_org_id", table_name="movements")
+    op.drop_table("reconciliation_checkpoints")
+    op.drop_index(op.f("ix_stock_ledger_balances_organization_id"), table_name="stock_ledger_balances")
+    op.drop_table("stock_ledger_balances")
@@ -0,0 +1,37 @@
+"""add partial index for low-stock products
+
+Revision ID: a8c2e6f0b4d9
+Revises: f2b6d8a4c0e9
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c2e6f0b4d9'
+down_revision: Union[str, Sequence[str], None] = 'f2b6d8a4c0e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOW_STOCK = sa.text("quantity <= alert_level")
+
+
+def upgrade() -> None:
+    """Upgrade schema - Index the products at or below their alert level."""
+    op.create_index(
+        "ix_products_org_low_stock",
+        "products",
+        ["organization_id", "id"],
+        unique=False,
+        sqlite_where=LOW_STOCK,
+        postgresql_where=LOW_STOCK,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop the low-stock index."""
+    op.drop_index("ix_products_org_low_stock", table_name="products")
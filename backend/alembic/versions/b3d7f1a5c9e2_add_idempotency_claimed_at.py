@@ -0,0 +1,32 @@
+"""add claimed_at to idempotency_keys
+
+Revision ID: b3d7f1a5c9e2
+Revises: a8c2e6f0b4d9
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d7f1a5c9e2'
+down_revision: Union[str, Sequence[str], None] = 'a8c2e6f0b4d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Record when each idempotency claim was (re)taken."""
+    with op.batch_alter_table("idempotency_keys") as batch_op:
+        batch_op.add_column(
+            sa.Column("claimed_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp())
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop idempotency_keys.claimed_at."""
+    with op.batch_alter_table("idempotency_keys") as batch_op:
+        batch_op.drop_column("claimed_at")
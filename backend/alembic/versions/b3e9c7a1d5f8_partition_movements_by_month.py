@@ -0,0 +1,158 @@
+"""partition movements by month and add the archive tiers
+
+Revision ID: b3e9c7a1d5f8
+Revises: a7d3f1b9c5e2
+Create Date: 2026-10-19 16:00:00.000000
+
+On PostgreSQL ``movements`` becomes a table partitioned by month on
+``created_at`` (primary key ``(id, created_at)``), with one partition per
+month that has data, the next three months and a default partition. The
+table is rewritten, so run it in a maintenance window on large ledgers.
+
+Other databases keep a plain table; the archival job moves closed months
+into ``movements_archive`` instead. Both store months older than a year as
+zstd-compressed NDJSON segments (``movement_archive_segments``)::
+
+    python scripts/archive_movements.py
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9c7a1d5f8'
+down_revision: Union[str, Sequence[str], None] = 'a7d3f1b9c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MOVEMENT_COLUMNS = (
+    "id, product_id, type, quantity, reason, note, created_at, created_by_id, organization_id, batch_id"
+)
+
+MOVEMENT_INDEXES = (
+    ("ix_movements_product_id", "(product_id)"),
+    ("ix_movements_organization_id", "(organization_id)"),
+    ("ix_movements_batch_id", "(batch_id)"),
+    ("ix_movements_org_type_created_at", "(organization_id, type, created_at)"),
+    ("ix_movements_org_product_created_at", "(organization_id, product_id, created_at) INCLUDE (quantity)"),
+    ("ix_movements_org_created_at_id", "(organization_id, created_at, id)"),
+    ("ix_movements_org_id", "(organization_id, id)"),
+)
+
+
+def _movement_table_sql(name: str, partitioned: bool) -> str:
+    primary_key = "PRIMARY KEY (id, created_at)" if partitioned else "PRIMARY KEY (id)"
+    suffix = " PARTITION BY RANGE (created_at)" if partitioned else ""
+    return f"""
+        CREATE TABLE {name} (
+            id INTEGER NOT NULL DEFAULT nextval('movements_id_seq'),
+            product_id INTEGER NOT NULL REFERENCES products (id),
+            type VARCHAR(7) NOT NULL,
+            quantity INTEGER NOT NULL,
+            reason VARCHAR(150),
+            note TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            created_by_id INTEGER REFERENCES users (id),
+            organization_id INTEGER NOT NULL REFERENCES organizations (id),
+            batch_id VARCHAR(32),
+            {primary_key}
+        ){suffix}
+    """
+
+
+def _swap_movements_table(partitioned: bool) -> None:
+    """Rebuild ``movements`` (partitioned or plain), keeping rows, sequence and index names."""
+    op.execute("ALTER SEQUENCE movements_id_seq OWNED BY NONE")
+    op.execute(_movement_table_sql("movements_rebuilt", partitioned))
+    if partitioned:
+        op.execute(
+            """
+            DO $$
+            DECLARE
+                month date;
+                last_month date := (date_trunc('month', now()) + interval '3 months')::date;
+            BEGIN
+                month := COALESCE((SELECT date_trunc('month', MIN(created_at))::date FROM movements), last_month);
+                WHILE month <= last_month LOOP
+                    EXECUTE 'CREATE TABLE ' || quote_ident('movements_p' || to_char(month, 'YYYYMM'))
+                        || ' PARTITION OF movements_rebuilt FOR VALUES FROM (' || quote_literal(month)
+                        || ') TO (' || quote_literal((month + interval '1 month')::date) || ')';
+                    month := (month + interval '1 month')::date;
+                END LOOP;
+            END $$
+            """
+        )
+        op.execute("CREATE TABLE movements_default PARTITION OF movements_rebuilt DEFAULT")
+    op.execute(
+        f"INSERT INTO movements_rebuilt ({MOVEMENT_COLUMNS}) SELECT {MOVEMENT_COLUMNS} FROM movements"
+    )
+    op.execute("DROP TABLE movements")
+    op.execute("ALTER TABLE movements_rebuilt RENAME TO movements")
+    op.execute("ALTER SEQUENCE movements_id_seq OWNED BY movements.id")
+    for name, columns in MOVEMENT_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON movements {columns}")
+
+
+def upgrade() -> None:
+    """Upgrade schema - Partition movements (PostgreSQL) and add archive tables."""
+    op.create_table(
+        "movements_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.Enum("ENTRADA", "SAIDA", name="movement_type", native_enum=False), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=150), nullable=True),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("created_by_id", sa.Integer(), nullable=True),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("batch_id", sa.String(length=32), nullable=True),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_movements_archive_org_created_at_id",
+        "movements_archive",
+        ["organization_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_table(
+        "movement_archive_segments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("min_movement_id", sa.Integer(), nullable=False),
+        sa.Column("max_movement_id", sa.Integer(), nullable=False),
+        sa.Column("byte_size", sa.BigInteger(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "month", name="uq_movement_archive_segments_org_month"),
+    )
+    op.create_index(
+        op.f("ix_movement_archive_segments_id"), "movement_archive_segments", ["id"], unique=False
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        _swap_movements_table(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Restore a plain movements table and drop archive tables.
+
+    Rows already written to segments are not restored.
+    """
+    if op.get_bind().dialect.name == "postgresql":
+        _swap_movements_table(partitioned=False)
+    op.execute(f"INSERT INTO movements ({MOVEMENT_COLUMNS}) SELECT {MOVEMENT_COLUMNS} FROM movements_archive")
+    op.drop_index(op.f("ix_movement_archive_segments_id"), table_name="movement_archive_segments")
+    op.drop_table("movement_archive_segments")
+    op.drop_index("ix_movements_archive_org_created_at_id", table_name="movements_archive")
+    op.drop_table("movements_archive")
@@ -0,0 +1,30 @@
+"""add batch_id to movements
+
+Revision ID: b7e3d5a9c2f1
+Revises: a4c9e2f7b1d3
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d5a9c2f1'
+down_revision: Union[str, Sequence[str], None] = 'a4c9e2f7b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Group movements posted together in one batch."""
+    op.add_column("movements", sa.Column("batch_id", sa.String(length=32), nullable=True))
+    op.create_index("ix_movements_batch_id", "movements", ["batch_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove movement batch grouping."""
+    op.drop_index("ix_movements_batch_id", table_name="movements")
+    op.drop_column("movements", "batch_id")
@@ -0,0 +1,46 @@
+"""add idempotency_keys table
+
+Revision ID: c2d8f4a6e1b9
+Revises: b7e3d5a9c2f1
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d8f4a6e1b9'
+down_revision: Union[str, Sequence[str], None] = 'b7e3d5a9c2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Store Idempotency-Key claims and their responses."""
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("scope", sa.String(length=100), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_body", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id", "key", name="uq_idempotency_org_key"),
+    )
+    op.create_index("ix_idempotency_keys_id", "idempotency_keys", ["id"], unique=False)
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop idempotency key storage."""
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_index("ix_idempotency_keys_id", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
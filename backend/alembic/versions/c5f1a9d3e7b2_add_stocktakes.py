@@ -0,0 +1,60 @@
+"""add stocktakes and stocktake lines
+
+Revision ID: c5f1a9d3e7b2
+Revises: b3e9c7a1d5f8
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f1a9d3e7b2'
+down_revision: Union[str, Sequence[str], None] = 'b3e9c7a1d5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add stocktakes and their count lines."""
+    op.create_table(
+        "stocktakes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("counted_at", sa.DateTime(), nullable=False),
+        sa.Column("note", sa.Text(), nullable=True),
+        sa.Column("line_count", sa.Integer(), nullable=False),
+        sa.Column("adjusted_count", sa.Integer(), nullable=False),
+        sa.Column("units_added", sa.Integer(), nullable=False),
+        sa.Column("units_removed", sa.Integer(), nullable=False),
+        sa.Column("batch_id", sa.String(length=32), nullable=True),
+        sa.Column("created_by_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_stocktakes_id"), "stocktakes", ["id"], unique=False)
+    op.create_index(op.f("ix_stocktakes_organization_id"), "stocktakes", ["organization_id"], unique=False)
+    op.create_table(
+        "stocktake_lines",
+        sa.Column("stocktake_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("counted_quantity", sa.Integer(), nullable=False),
+        sa.Column("expected_quantity", sa.Integer(), nullable=True),
+        sa.Column("variance", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.ForeignKeyConstraint(["stocktake_id"], ["stocktakes.id"]),
+        sa.PrimaryKeyConstraint("stocktake_id", "product_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop stocktakes and their count lines."""
+    op.drop_table("stocktake_lines")
+    op.drop_index(op.f("ix_stocktakes_organization_id"), table_name="stocktakes")
+    op.drop_index(op.f("ix_stocktakes_id"), table_name="stocktakes")
+    op.drop_table("stocktakes")
@@ -0,0 +1,45 @@
+"""add reverted_movement_id to movements
+
+Revision ID: c6f2a8d4e0b7
+Revises: b3d7f1a5c9e2
+Create Date: 2026-10-20 12:00:00.000000
+
+Reverse movements recorded their original only in the note ("Revert of
+movement <id>"); existing ones are backfilled from it. Rows already in cold
+segments keep just the note.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a8d4e0b7'
+down_revision: Union[str, Sequence[str], None] = 'b3d7f1a5c9e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REVERT_NOTE_PREFIX = "Revert of movement "
+TABLES = ("movements", "movements_archive")
+
+
+def upgrade() -> None:
+    """Upgrade schema - Record the original of each reverse movement."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("reverted_movement_id", sa.Integer(), nullable=True))
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET reverted_movement_id = "
+                "CAST(SUBSTR(note, :offset) AS INTEGER) "
+                "WHERE reason = 'revert' AND note LIKE :pattern"
+            ).bindparams(offset=len(REVERT_NOTE_PREFIX) + 1, pattern=f"{REVERT_NOTE_PREFIX}%")
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop reverted_movement_id."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("reverted_movement_id")
@@ -0,0 +1,32 @@
+"""add optimistic-lock version to products
+
+Revision ID: d5a1c7e3f9b2
+Revises: c2d8f4a6e1b9
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a1c7e3f9b2'
+down_revision: Union[str, Sequence[str], None] = 'c2d8f4a6e1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Version products for optimistic concurrency control."""
+    op.add_column(
+        "products",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="1"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Remove product versioning."""
+    with op.batch_alter_table("products") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,51 @@
+"""add report cache entries and organization data version
+
+Revision ID: d7b3e1f5a9c4
+Revises: c5f1a9d3e7b2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3e1f5a9c4'
+down_revision: Union[str, Sequence[str], None] = 'c5f1a9d3e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add the shared report cache and organizations.data_version."""
+    with op.batch_alter_table("organizations") as batch_op:
+        batch_op.add_column(sa.Column("data_version", sa.Integer(), server_default="0", nullable=False))
+    op.create_table(
+        "report_cache_entries",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("report", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("accessed_at", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_report_cache_entries_organization_id"), "report_cache_entries", ["organization_id"], unique=False
+    )
+    op.create_index(op.f("ix_report_cache_entries_accessed_at"), "report_cache_entries", ["accessed_at"], unique=False)
+    op.create_index(op.f("ix_report_cache_entries_expires_at"), "report_cache_entries", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop the report cache and organizations.data_version."""
+    op.drop_index(op.f("ix_report_cache_entries_expires_at"), table_name="report_cache_entries")
+    op.drop_index(op.f("ix_report_cache_entries_accessed_at"), table_name="report_cache_entries")
+    op.drop_index(op.f("ix_report_cache_entries_organization_id"), table_name="report_cache_entries")
+    op.drop_table("report_cache_entries")
+    with op.batch_alter_table("organizations") as batch_op:
+        batch_op.drop_column("data_version")
@@ -0,0 +1,69 @@
+"""add report jobs
+
+Revision ID: e4c8a2f6b0d7
+Revises: d7b3e1f5a9c4
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c8a2f6b0d7'
+down_revision: Union[str, Sequence[str], None] = 'd7b3e1f5a9c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_CONDITION = sa.text("status IN ('PENDING', 'RUNNING')")
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add the report_jobs table for asynchronous reports."""
+    op.create_table(
+        "report_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("report", sa.String(length=20), nullable=False),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "RUNNING", "DONE", "FAILED", name="report_job_status", native_enum=False),
+            nullable=False,
+        ),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("result", sa.LargeBinary(), nullable=True),
+        sa.Column("result_size", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_by_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_report_jobs_id"), "report_jobs", ["id"], unique=False)
+    op.create_index(op.f("ix_report_jobs_organization_id"), "report_jobs", ["organization_id"], unique=False)
+    op.create_index(op.f("ix_report_jobs_expires_at"), "report_jobs", ["expires_at"], unique=False)
+    op.create_index(
+        "uq_report_jobs_active_request",
+        "report_jobs",
+        ["organization_id", "request_hash"],
+        unique=True,
+        sqlite_where=ACTIVE_CONDITION,
+        postgresql_where=ACTIVE_CONDITION,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop the report_jobs table."""
+    op.drop_index("uq_report_jobs_active_request", table_name="report_jobs")
+    op.drop_index(op.f("ix_report_jobs_expires_at"), table_name="report_jobs")
+    op.drop_index(op.f("ix_report_jobs_organization_id"), table_name="report_jobs")
+    op.drop_index(op.f("ix_report_jobs_id"), table_name="report_jobs")
+    op.drop_table("report_jobs")
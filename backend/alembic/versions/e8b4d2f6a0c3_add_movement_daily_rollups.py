@@ -0,0 +1,59 @@
+"""add movement_daily_rollups table
+
+Revision ID: e8b4d2f6a0c3
+Revises: d5a1c7e3f9b2
+Create Date: 2026-10-19 13:00:00.000000
+
+The table is backfilled from the existing ledger during the upgrade. To
+recompute it later (e.g. after a manual data fix) run
+``python scripts/rebuild_rollups.py``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4d2f6a0c3'
+down_revision: Union[str, Sequence[str], None] = 'd5a1c7e3f9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Pre-aggregate movements per product, day and type."""
+    op.create_table(
+        "movement_daily_rollups",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.Enum("ENTRADA", "SAIDA", name="movement_type", native_enum=False), nullable=False),
+        sa.Column("total_qty", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("organization_id", "product_id", "day", "type"),
+    )
+    op.create_index(
+        "ix_movement_daily_rollups_org_type_day",
+        "movement_daily_rollups",
+        ["organization_id", "type", "day"],
+        unique=False,
+    )
+
+    day = "date(created_at)" if op.get_bind().dialect.name == "sqlite" else "CAST(created_at AS DATE)"
+    op.execute(
+        f"""
+        INSERT INTO movement_daily_rollups (organization_id, product_id, day, type, total_qty, count)
+        SELECT organization_id, product_id, {day}, type, SUM(quantity), COUNT(id)
+        FROM movements
+        GROUP BY organization_id, product_id, {day}, type
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop daily movement rollups."""
+    op.drop_index("ix_movement_daily_rollups_org_type_day", table_name="movement_daily_rollups")
+    op.drop_table("movement_daily_rollups")
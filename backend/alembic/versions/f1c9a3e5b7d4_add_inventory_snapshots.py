@@ -0,0 +1,42 @@
+"""add inventory_snapshots table
+
+Revision ID: f1c9a3e5b7d4
+Revises: e8b4d2f6a0c3
+Create Date: 2026-10-19 14:00:00.000000
+
+Snapshots are written by ``python scripts/take_inventory_snapshots.py``
+(daily, after UTC midnight); ``--days N`` backfills past days.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c9a3e5b7d4'
+down_revision: Union[str, Sequence[str], None] = 'e8b4d2f6a0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Store closing stock per product and day."""
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("cost_price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"]),
+        sa.PrimaryKeyConstraint("organization_id", "day", "product_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop inventory snapshots."""
+    op.drop_table("inventory_snapshots")
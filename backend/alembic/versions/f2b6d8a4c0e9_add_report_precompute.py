@@ -0,0 +1,55 @@
+"""add precomputed reports and scheduler leases
+
+Revision ID: f2b6d8a4c0e9
+Revises: e4c8a2f6b0d7
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6d8a4c0e9'
+down_revision: Union[str, Sequence[str], None] = 'e4c8a2f6b0d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - Add nightly precomputed reports and the scheduler's leases."""
+    op.create_table(
+        "scheduler_leases",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("holder", sa.String(length=100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("last_completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.create_table(
+        "precomputed_reports",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("report", sa.String(length=20), nullable=False),
+        sa.Column("period_days", sa.Integer(), nullable=False),
+        sa.Column("window_start", sa.DateTime(), nullable=False),
+        sa.Column("window_end", sa.DateTime(), nullable=False),
+        sa.Column("data_version", sa.Integer(), nullable=False),
+        sa.Column("value", sa.LargeBinary(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "organization_id", "report", "period_days", name="uq_precomputed_reports_org_report_period"
+        ),
+    )
+    op.create_index(op.f("ix_precomputed_reports_id"), "precomputed_reports", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema - Drop precomputed reports and scheduler leases."""
+    op.drop_index(op.f("ix_precomputed_reports_id"), table_name="precomputed_reports")
+    op.drop_table("precomputed_reports")
+    op.drop_table("scheduler_leases")
@@ -0,0 +1 @@
+"""Tiered storage for the movement ledger (hot partitions, archive table, cold segments)."""
@@ -0,0 +1,66 @@
+"""Models for archived stock movements."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Enum as SqlEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+
+from app.database import Base
+from app.movements.movement_model import MovementType
+
+
+class MovementArchive(Base):
+    """
+    Closed months of the ledger on databases without native partitioning.
+
+    Same columns as ``movements``; rows are moved here by the archival job so
+    that queries on the hot table only ever see recent months.
+    """
+
+    __tablename__ = "movements_archive"
+    __table_args__ = (
+        Index("ix_movements_archive_org_created_at_id", "organization_id", "created_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    type = Column(SqlEnum(MovementType, name="movement_type", native_enum=False), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    reason = Column(String(150), nullable=True)
+    note = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    batch_id = Column(String(32), nullable=True)
+    reverted_movement_id = Column(Integer, nullable=True)
+
+
+class MovementArchiveSegment(Base):
+    """A month of one organization's movements stored as a zstd-compressed NDJSON file."""
+
+    __tablename__ = "movement_archive_segments"
+    __table_args__ = (UniqueConstraint("organization_id", "month", name="uq_movement_archive_segments_org_month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    month = Column(Date, nullable=False)  # First day of the archived month
+    path = Column(String(500), nullable=False)  # Relative to MOVEMENT_ARCHIVE_DIR
+    row_count = Column(Integer, nullable=False)
+    min_movement_id = Column(Integer, nullable=False)
+    max_movement_id = Column(Integer, nullable=False)
+    byte_size = Column(BigInteger, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,281 @@
+"""Data repository for the movement ledger tiers."""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, time
+from typing import Iterator
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.movements.movement_model import Movement, MovementFilter, MovementType
+
+from . import archive_model
+from .archive_storage import SEGMENT_COLUMNS
+
+MovementArchive = archive_model.MovementArchive
+Segment = archive_model.MovementArchiveSegment
+
+PARTITION_PATTERN = re.compile(r"^movements_p(\d{4})(\d{2})$")
+DEFAULT_PARTITION = "movements_default"
+
+
+def _columns(table) -> list:
+    return [getattr(table, column) for column in SEGMENT_COLUMNS]
+
+
+def is_partitioned(db: Session) -> bool:
+    """Return True when ``movements`` is a natively partitioned PostgreSQL table."""
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.scalar(text("SELECT relkind FROM pg_class WHERE relname = 'movements'")) == "p"
+
+
+def partition_name(month: date) -> str:
+    """Return the name of the partition holding ``month``."""
+    return f"movements_p{month:%Y%m}"
+
+
+def list_partitions(db: Session) -> list[date]:
+    """Return the months that have a partition, oldest first."""
+    names = db.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = 'movements'"
+        )
+    )
+    months = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def oldest_in_default_partition(db: Session) -> datetime | None:
+    """Return the oldest timestamp that fell into the default partition."""
+    return db.scalar(text(f"SELECT MIN(created_at) FROM {DEFAULT_PARTITION}"))
+
+
+def create_partition(db: Session, month: date, next_month: date) -> None:
+    """
+    Create the partition for ``[month, next_month)``.
+
+    Rows of that range already sitting in the default partition are moved
+    into the new table before it is attached, which PostgreSQL requires.
+    """
+    name = partition_name(month)
+    bounds = {"start": datetime.combine(month, time.min), "end": datetime.combine(next_month, time.min)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE movements INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    db.execute(
+        text(
+            f"ALTER TABLE movements ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        )
+    )
+
+
+def lock_partition(db: Session, month: date) -> None:
+    """Block writes to the partition of ``month`` until the transaction ends; reads go on."""
+    db.execute(text(f"LOCK TABLE {partition_name(month)} IN EXCLUSIVE MODE"))
+
+
+def drop_partition(db: Session, month: date) -> None:
+    """Detach and drop the partition of ``month``."""
+    name = partition_name(month)
+    db.execute(text(f"ALTER TABLE movements DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+
+
+def oldest_created_at(
+    db: Session, table, before: datetime, organization_id: int | None = None
+) -> datetime | None:
+    """Return the oldest ``created_at`` in ``table`` earlier than ``before``."""
+    query = select(func.min(table.created_at)).where(table.created_at < before)
+    if organization_id is not None:
+        query = query.where(table.organization_id == organization_id)
+    return db.scalar(query)
+
+
+def organizations_in_range(
+    db: Session, table, start: datetime, end: datetime, organization_id: int | None = None
+) -> list[int]:
+    """Return the organizations with rows in ``[start, end)``, optionally only ``organization_id``."""
+    query = select(table.organization_id).where(table.created_at >= start, table.created_at < end)
+    if organization_id is not None:
+        query = query.where(table.organization_id == organization_id)
+    return list(db.scalars(query.distinct().order_by(table.organization_id)))
+
+
+def max_id_in_range(db: Session, table, organization_id: int, start: datetime, end: datetime) -> int | None:
+    """Return the highest movement id of an organization in ``[start, end)``."""
+    return db.scalar(
+        select(func.max(table.id)).where(
+            table.organization_id == organization_id,
+            table.created_at >= start,
+            table.created_at < end,
+        )
+    )
+
+
+def iter_rows(db: Session, table, organization_id: int, start: datetime, end: datetime) -> Iterator[dict]:
+    """Stream the rows of an organization in ``[start, end)`` ordered by id."""
+    result = db.execute(
+        select(*_columns(table))
+        .where(
+            table.organization_id == organization_id,
+            table.created_at >= start,
+            table.created_at < end,
+        )
+        .order_by(table.id)
+        .execution_options(yield_per=5000)
+    )
+    for row in result.mappings():
+        yield dict(row)
+
+
+def net_by_product(
+    db: Session,
+    table,
+    organization_id: int,
+    start: datetime,
+    end: datetime,
+    *,
+    after_id: int,
+) -> dict[int, int]:
+    """Return the signed quantity per product of rows in ``[start, end)`` with id above ``after_id``."""
+    signed = case((table.type == MovementType.ENTRADA, table.quantity), else_=-table.quantity)
+    return dict(
+        db.execute(
+            select(table.product_id, func.sum(signed))
+            .where(
+                table.organization_id == organization_id,
+                table.created_at >= start,
+                table.created_at < end,
+                table.id > after_id,
+            )
+            .group_by(table.product_id)
+        ).all()
+    )
+
+
+def move_to_archive_table(db: Session, start: datetime, end: datetime, organization_ids: list[int]) -> int:
+    """Move the organizations' movements in ``[start, end)`` into ``movements_archive``; return rows moved."""
+    window = and_(
+        Movement.organization_id.in_(organization_ids),
+        Movement.created_at >= start,
+        Movement.created_at < end,
+    )
+    db.execute(
+        insert(MovementArchive).from_select(list(SEGMENT_COLUMNS), select(*_columns(Movement)).where(window))
+    )
+    return db.execute(delete(Movement).where(window)).rowcount
+
+
+def delete_range(db: Session, table, start: datetime, end: datetime, organization_ids: list[int]) -> int:
+    """Delete the organizations' rows of ``table`` in ``[start, end)``; return rows deleted."""
+    return db.execute(
+        delete(table).where(
+            table.organization_id.in_(organization_ids),
+            table.created_at >= start,
+            table.created_at < end,
+        )
+    ).rowcount
+
+
+def latest_created_at(db: Session, table, organization_id: int | None = None) -> datetime | None:
+    """Return the newest ``created_at`` in ``table``."""
+    query = select(func.max(table.created_at))
+    if organization_id is not None:
+        query = query.where(table.organization_id == organization_id)
+    return db.scalar(query)
+
+
+def replace_segment(db: Session, **fields) -> archive_model.MovementArchiveSegment:
+    """Register a segment, replacing a previous registration of the same month."""
+    db.execute(
+        delete(Segment).where(
+            Segment.organization_id == fields["organization_id"],
+            Segment.month == fields["month"],
+        )
+    )
+    segment = Segment(**fields)
+    db.add(segment)
+    db.flush()
+    return segment
+
+
+def list_segments(
+    db: Session,
+    organization_id: int,
+    *,
+    first_month: date | None = None,
+    last_month: date | None = None,
+) -> list[archive_model.MovementArchiveSegment]:
+    """Return an organization's segments within a month range, newest first."""
+    query = select(Segment).where(Segment.organization_id == organization_id)
+    if first_month is not None:
+        query = query.where(Segment.month >= first_month)
+    if last_month is not None:
+        query = query.where(Segment.month <= last_month)
+    return list(db.scalars(query.order_by(Segment.month.desc())))
+
+
+def latest_segment_month(db: Session, organization_id: int | None = None) -> date | None:
+    """Return the newest archived month."""
+    query = select(func.max(Segment.month))
+    if organization_id is not None:
+        query = query.where(Segment.organization_id == organization_id)
+    return db.scalar(query)
+
+
+def filter_conditions(table, organization_id: int, filters: MovementFilter) -> list:
+    """Translate a MovementFilter into conditions on ``table``."""
+    conditions = [table.organization_id == organization_id]
+    if filters.start_date:
+        conditions.append(table.created_at >= filters.start_date)
+    if filters.end_date:
+        conditions.append(table.created_at <= filters.end_date)
+    if filters.type:
+        conditions.append(table.type == filters.type)
+    if filters.product_id:
+        conditions.append(table.product_id == filters.product_id)
+    return conditions
+
+
+def fetch_rows(
+    db: Session,
+    table,
+    organization_id: int,
+    filters: MovementFilter,
+    *,
+    before: datetime,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+) -> list[dict]:
+    """Return rows of ``table`` older than ``before``, newest first, as dicts."""
+    query = select(*_columns(table)).where(
+        *filter_conditions(table, organization_id, filters),
+        table.created_at < before,
+    )
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.where(
+            or_(
+                table.created_at < after_created_at,
+                and_(table.created_at == after_created_at, table.id < after_id),
+            )
+        )
+    query = query.order_by(table.created_at.desc(), table.id.desc()).limit(limit)
+    return [dict(row) for row in db.execute(query).mappings()]
@@ -0,0 +1,363 @@
+"""Business rules for the tiered movement ledger.
+
+Movements live in three tiers, split by calendar month (UTC):
+
+* hot: the last ``MOVEMENT_HOT_MONTHS`` months in ``movements``. Listing
+  queries are bounded to this range unless the caller asks for older data.
+* closed: older months still in SQL. On PostgreSQL they are the older
+  monthly partitions of ``movements``; elsewhere the archival job moves them
+  into ``movements_archive``.
+* cold: months older than ``MOVEMENT_ARCHIVE_AFTER_MONTHS`` are written to
+  zstd-compressed NDJSON segments (one per organization and month) and
+  removed from SQL.
+
+Daily rollups and inventory snapshots are kept for every tier, so reports
+never need archived rows. Listings that reach past the hot range continue
+into the closed and cold tiers transparently.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, time
+
+from sqlalchemy.orm import Session, joinedload, lazyload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import constants
+from app.movements.movement_model import Movement, MovementFilter
+from app.products.product_model import Product
+from app.reconciliation import reconciliation_repository, reconciliation_service
+from app.users.user_model import User
+from . import archive_repository, archive_storage
+
+logger = logging.getLogger(__name__)
+
+MovementArchive = archive_repository.MovementArchive
+
+
+def month_start(day: date) -> date:
+    """Return the first day of the month of ``day``."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Shift a first-of-month date by a number of months."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _at_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def hot_horizon(today: date | None = None) -> datetime:
+    """Return the first instant of the hot tier."""
+    today = today or datetime.utcnow().date()
+    return _at_midnight(add_months(month_start(today), -(constants.MOVEMENT_HOT_MONTHS - 1)))
+
+
+def cold_horizon(today: date | None = None) -> datetime:
+    """Return the first instant that is not archived to segments."""
+    today = today or datetime.utcnow().date()
+    return _at_midnight(add_months(month_start(today), -constants.MOVEMENT_ARCHIVE_AFTER_MONTHS))
+
+
+def ledger_start(db: Session, organization_id: int | None = None) -> date | None:
+    """
+    Return the first day whose movements are all still in ``movements``.
+
+    None means nothing was ever moved out of the table.
+    """
+    archived_until = archive_repository.latest_segment_month(db, organization_id)
+    in_table = archive_repository.latest_created_at(db, MovementArchive, organization_id)
+    if in_table is not None:
+        in_table_month = month_start(in_table.date())
+        archived_until = max(archived_until, in_table_month) if archived_until else in_table_month
+    return add_months(archived_until, 1) if archived_until else None
+
+
+def ensure_partitions(db: Session, *, months_ahead: int = constants.MOVEMENT_PARTITION_MONTHS_AHEAD) -> list[date]:
+    """
+    Create missing monthly partitions up to ``months_ahead`` months from now (commits).
+
+    Months whose rows landed in the default partition get a partition too.
+    A no-op unless ``movements`` is partitioned.
+
+    Returns:
+        Months whose partitions were created.
+    """
+    if not archive_repository.is_partitioned(db):
+        return []
+    existing = set(archive_repository.list_partitions(db))
+    first = month_start(datetime.utcnow().date())
+    stray = archive_repository.oldest_in_default_partition(db)
+    if stray is not None:
+        first = min(first, month_start(stray.date()))
+    last = add_months(month_start(datetime.utcnow().date()), months_ahead)
+
+    created = []
+    month = first
+    while month <= last:
+        if month not in existing:
+            archive_repository.create_partition(db, month, add_months(month, 1))
+            created.append(month)
+        month = add_months(month, 1)
+    db.commit()
+    return created
+
+
+def _release_from_ledger(db: Session, organization_ids: list[int], start: datetime, end: datetime) -> bool:
+    """
+    Prepare reconciliation for movements in ``[start, end)`` leaving ``movements``.
+
+    Each organization is reconciled past those movements (which commits),
+    then its ledger is locked until the caller's transaction ends: open
+    imports finish first, and imports started later wait and then see the
+    new ledger start. The movements' effect is folded into the opening
+    balances so a full rescan stays exact.
+
+    Returns:
+        False when an organization could not be reconciled past the range.
+    """
+    for organization_id in organization_ids:
+        max_id = archive_repository.max_id_in_range(db, Movement, organization_id, start, end)
+        checkpoint = reconciliation_service.get_checkpoint(db, organization_id)
+        if max_id is not None and max_id > checkpoint.last_movement_id:
+            reconciliation_service.reconcile_organization(db, organization_id)
+
+    for organization_id in organization_ids:
+        reconciliation_service.lock_ledger(db, organization_id)
+    for organization_id in organization_ids:
+        # Re-read under the lock: an import may have committed since the reconciliation.
+        max_id = archive_repository.max_id_in_range(db, Movement, organization_id, start, end)
+        checkpoint = reconciliation_service.get_checkpoint(db, organization_id)
+        if max_id is not None and max_id > checkpoint.last_movement_id:
+            logger.warning(
+                "Organização %s não reconciliada até o movimento %s; arquivamento adiado",
+                organization_id,
+                max_id,
+            )
+            return False
+
+    for organization_id in organization_ids:
+        checkpoint = reconciliation_service.get_checkpoint(db, organization_id)
+        net = archive_repository.net_by_product(
+            db, Movement, organization_id, start, end, after_id=checkpoint.baseline_movement_id
+        )
+        reconciliation_repository.add_to_opening(db, organization_id, net)
+    return True
+
+
+def rotate_closed_months(
+    db: Session, *, today: date | None = None, organization_id: int | None = None
+) -> int:
+    """
+    Move months older than the hot tier into ``movements_archive`` (commits per month).
+
+    Only used when ``movements`` is not partitioned; with partitions, closed
+    months are simply pruned away by the planner. ``organization_id``
+    restricts the job to one organization.
+
+    Returns:
+        Number of movements moved.
+    """
+    if archive_repository.is_partitioned(db):
+        return 0
+    horizon = hot_horizon(today)
+    oldest = archive_repository.oldest_created_at(db, Movement, horizon, organization_id)
+    moved = 0
+    month = month_start(oldest.date()) if oldest else None
+    while month is not None and _at_midnight(month) < horizon:
+        start, end = _at_midnight(month), _at_midnight(add_months(month, 1))
+        organization_ids = archive_repository.organizations_in_range(db, Movement, start, end, organization_id)
+        if organization_ids:
+            if not _release_from_ledger(db, organization_ids, start, end):
+                db.rollback()
+                break
+            moved += archive_repository.move_to_archive_table(db, start, end, organization_ids)
+            db.commit()
+        month = add_months(month, 1)
+    return moved
+
+
+def _write_segments(db: Session, table, month: date, organization_ids: list[int]) -> list[dict]:
+    """Write one segment per organization for ``month`` and return their registrations."""
+    start, end = _at_midnight(month), _at_midnight(add_months(month, 1))
+    registrations = []
+    for organization_id in organization_ids:
+        path = archive_storage.segment_path(organization_id, month)
+        info = archive_storage.write_segment(
+            path, archive_repository.iter_rows(db, table, organization_id, start, end)
+        )
+        if sum(1 for _ in archive_storage.read_segment(path)) != info.row_count:
+            raise RuntimeError(f"Segmento {path} ilegível após a escrita")
+        registrations.append({"organization_id": organization_id, "month": month, "path": path, **info._asdict()})
+    return registrations
+
+
+def archive_cold_months(
+    db: Session, *, today: date | None = None, organization_id: int | None = None
+) -> list[dict]:
+    """
+    Write months older than the cold horizon to segments and drop them from SQL.
+
+    Segment files are written and read back before the rows are registered
+    and deleted, so a month is always readable from exactly one place. With
+    partitions, the organizations' ledgers and then the partition are locked
+    before writing, so no import can add rows the segments would miss.
+    ``organization_id`` restricts the job to one
+    organization; its rows are then deleted from the month's partition
+    instead of dropping the partition.
+
+    Returns:
+        Registrations of the segments written.
+    """
+    horizon = cold_horizon(today)
+    partitioned = archive_repository.is_partitioned(db)
+    if partitioned:
+        months = [month for month in archive_repository.list_partitions(db) if _at_midnight(month) < horizon]
+        table = Movement
+    else:
+        oldest = archive_repository.oldest_created_at(db, MovementArchive, horizon, organization_id)
+        months = []
+        month = month_start(oldest.date()) if oldest else None
+        while month is not None and _at_midnight(month) < horizon:
+            months.append(month)
+            month = add_months(month, 1)
+        table = MovementArchive
+
+    written = []
+    for month in months:
+        start, end = _at_midnight(month), _at_midnight(add_months(month, 1))
+        organization_ids = archive_repository.organizations_in_range(db, table, start, end, organization_id)
+        if organization_id is not None and not organization_ids:
+            continue
+        if partitioned:
+            if not _release_from_ledger(db, organization_ids, start, end):
+                db.rollback()
+                break
+            if organization_id is None:
+                # Only the organizations listed hold locked ledgers; keep the others out of the month until the drop.
+                archive_repository.lock_partition(db, month)
+                if archive_repository.organizations_in_range(db, table, start, end) != organization_ids:
+                    logger.warning(
+                        "Novas movimentações em %s durante o arquivamento; arquivamento adiado", f"{month:%Y-%m}"
+                    )
+                    db.rollback()
+                    break
+        registrations = _write_segments(db, table, month, organization_ids)
+        for registration in registrations:
+            archive_repository.replace_segment(db, **registration)
+        if partitioned and organization_id is None:
+            archive_repository.drop_partition(db, month)
+        else:
+            archive_repository.delete_range(db, table, start, end, organization_ids)
+        db.commit()
+        written.extend(registrations)
+    return written
+
+
+def _hydrate(db: Session, rows: list[dict], *, expand: bool) -> list[Movement]:
+    """Turn archived rows into detached Movement instances with product and user set."""
+    product_ids = {row["product_id"] for row in rows}
+    user_ids = {row["created_by_id"] for row in rows if row["created_by_id"] is not None}
+    product_options = joinedload(Product.category) if expand else lazyload(Product.category)
+    products = {
+        product.id: product
+        for product in db.query(Product).options(product_options).filter(Product.id.in_(product_ids))
+    } if product_ids else {}
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids))} if user_ids else {}
+
+    movements = []
+    for row in rows:
+        movement = Movement(**row)
+        set_committed_value(movement, "product", products.get(row["product_id"]))
+        set_committed_value(movement, "created_by", users.get(row["created_by_id"]))
+        movements.append(movement)
+    return movements
+
+
+def _segment_rows(
+    db: Session,
+    organization_id: int,
+    filters: MovementFilter,
+    *,
+    before: datetime,
+    limit: int,
+    after: tuple[datetime, int] | None,
+) -> list[dict]:
+    """Read matching rows from cold segments, newest first, stopping at ``limit``."""
+    upper = min(before, after[0]) if after else before
+    if filters.end_date:
+        upper = min(upper, filters.end_date)
+    first_month = month_start(filters.start_date.date()) if filters.start_date else None
+    segments = archive_repository.list_segments(
+        db, organization_id, first_month=first_month, last_month=month_start(upper.date())
+    )
+
+    collected: list[dict] = []
+    for segment in segments:
+        matched = [
+            row
+            for row in archive_storage.read_segment(segment.path)
+            if row["created_at"] < before
+            and (filters.start_date is None or row["created_at"] >= filters.start_date)
+            and (filters.end_date is None or row["created_at"] <= filters.end_date)
+            and (filters.type is None or row["type"] == filters.type)
+            and (filters.product_id is None or row["product_id"] == filters.product_id)
+            and (after is None or (row["created_at"], row["id"]) < after)
+        ]
+        matched.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        collected.extend(matched)
+        if len(collected) >= limit:
+            break  # Segments are disjoint months read newest first.
+    return collected[:limit]
+
+
+def read_archived(
+    db: Session,
+    organization_id: int,
+    filters: MovementFilter,
+    *,
+    before: datetime,
+    limit: int,
+    offset: int = 0,
+    after: tuple[datetime, int] | None = None,
+    expand: bool = False,
+) -> list[Movement]:
+    """
+    Return movements older than ``before`` from the closed and cold tiers.
+
+    Rows come newest first in the same ``(created_at, id)`` order as the hot
+    listings, so callers can append them to a page of hot rows.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        filters: Filter criteria (date range, type, product).
+        before: Exclusive upper bound, normally the hot horizon.
+        limit: Maximum number of movements to return.
+        offset: Matching movements to skip first.
+        after: Keyset cursor ``(created_at, id)`` to continue after.
+        expand: If True, loads the product category as well.
+
+    Returns:
+        Detached Movement instances.
+    """
+    wanted = offset + limit
+    # Closed months still in SQL: older partitions (or rows not yet rotated)
+    # and the archive table; merge both by the listing order.
+    rows = archive_repository.fetch_rows(
+        db, Movement, organization_id, filters, before=before, limit=wanted, after=after
+    ) + archive_repository.fetch_rows(
+        db, MovementArchive, organization_id, filters, before=before, limit=wanted, after=after
+    )
+    rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    rows = rows[:wanted]
+    if len(rows) < wanted:
+        oldest_in_sql = (rows[-1]["created_at"], rows[-1]["id"]) if rows else after
+        rows += _segment_rows(
+            db, organization_id, filters, before=before, limit=wanted - len(rows), after=oldest_in_sql
+        )
+    return _hydrate(db, rows[offset:wanted], expand=expand)
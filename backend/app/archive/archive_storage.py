@@ -0,0 +1,109 @@
+"""Segment files: one month of one organization's movements as zstd-compressed NDJSON."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+import zstandard
+
+from app import constants
+from app.config import get_settings
+from app.movements.movement_model import MovementType
+
+SEGMENT_COLUMNS = (
+    "id",
+    "product_id",
+    "type",
+    "quantity",
+    "reason",
+    "note",
+    "created_at",
+    "created_by_id",
+    "organization_id",
+    "batch_id",
+    "reverted_movement_id",
+)
+
+
+class SegmentInfo(NamedTuple):
+    """Summary of a written segment file."""
+    row_count: int
+    min_movement_id: int
+    max_movement_id: int
+    byte_size: int
+    sha256: str
+
+
+def archive_dir() -> Path:
+    """Return the directory that holds segment files."""
+    return Path(get_settings().movement_archive_dir)
+
+
+def segment_path(organization_id: int, month: date) -> str:
+    """Return the path of a segment, relative to the archive directory."""
+    return f"movements/org={organization_id}/{month:%Y-%m}.ndjson.zst"
+
+
+def _encode(row: dict) -> bytes:
+    record = {column: row[column] for column in SEGMENT_COLUMNS}
+    record["type"] = MovementType(record["type"]).value
+    record["created_at"] = record["created_at"].isoformat()
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def _decode(line: str) -> dict:
+    record = json.loads(line)
+    record["type"] = MovementType(record["type"])
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    return record
+
+
+def write_segment(relative_path: str, rows: Iterable[dict]) -> SegmentInfo:
+    """
+    Write rows (ordered by id) to a segment file, replacing it atomically.
+
+    Args:
+        relative_path: Destination relative to the archive directory.
+        rows: Movement rows as dicts with the ``SEGMENT_COLUMNS`` keys.
+
+    Returns:
+        SegmentInfo describing the file written.
+    """
+    target = archive_dir() / relative_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".partial")
+
+    count = 0
+    min_id = max_id = 0
+    compressor = zstandard.ZstdCompressor(level=constants.MOVEMENT_ARCHIVE_ZSTD_LEVEL)
+    with open(partial, "wb") as raw:
+        with compressor.stream_writer(raw, closefd=False) as writer:
+            for row in rows:
+                writer.write(_encode(row))
+                min_id = row["id"] if count == 0 else min(min_id, row["id"])
+                max_id = max(max_id, row["id"])
+                count += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    digest = hashlib.sha256()
+    with open(partial, "rb") as written:
+        for block in iter(lambda: written.read(1 << 20), b""):
+            digest.update(block)
+    os.replace(partial, target)
+    return SegmentInfo(count, min_id, max_id, target.stat().st_size, digest.hexdigest())
+
+
+def read_segment(relative_path: str) -> Iterator[dict]:
+    """Yield the rows of a segment file in the order they were written."""
+    with open(archive_dir() / relative_path, "rb") as raw:
+        reader = zstandard.ZstdDecompressor().stream_reader(raw)
+        for line in io.TextIOWrapper(reader, encoding="utf-8"):
+            if line.strip():
+                yield _decode(line)
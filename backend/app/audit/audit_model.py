@@ -25,6 +25,7 @@ class EntityType(str, Enum):
     MOVEMENT = "movement"
     CATEGORY = "category"
     USER = "user"
+    STOCKTAKE = "stocktake"
 
 
 class AuditLog(Base):
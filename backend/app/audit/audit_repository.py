@@ -82,3 +82,35 @@ def list_audit_logs(
     query = query.limit(limit).offset(offset)
     
     return list(db.execute(query).scalars().all())
+
+
+def create_audit_logs(
+    db: Session,
+    logs: list[audit_model.AuditLogCreate],
+    organization_id: int | None = None,
+) -> list[audit_model.AuditLog]:
+    """
+    Create many audit log entries with a single batched INSERT.
+
+    Args:
+        db: Database session.
+        logs: Audit log creation schemas.
+        organization_id: Organization ID for isolation.
+
+    Returns:
+        The created AuditLog ORM instances.
+    """
+    db_logs = [
+        audit_model.AuditLog(
+            user_id=log.user_id,
+            action=log.action.value,
+            entity_type=log.entity_type.value,
+            entity_id=log.entity_id,
+            details=log.details,
+            organization_id=organization_id,
+        )
+        for log in logs
+    ]
+    db.add_all(db_logs)
+    db.flush()
+    return db_logs
@@ -42,6 +42,41 @@ def log_action(
     return audit_repository.create_audit_log(db, log, organization_id=organization_id)
 
 
+def log_actions(
+    db: Session,
+    user_id: int | None,
+    action: audit_model.ActionType,
+    entity_type: audit_model.EntityType,
+    entries: list[tuple[int | None, dict | None]],
+    organization_id: int | None = None,
+) -> list[audit_model.AuditLog]:
+    """
+    Log the same action for many entities at once.
+
+    Args:
+        db: Database session.
+        user_id: ID of the user performing the action.
+        action: Type of action (create/update/delete).
+        entity_type: Type of entity affected.
+        entries: (entity_id, details) pairs, one per affected entity.
+        organization_id: Organization ID for isolation.
+
+    Returns:
+        The created AuditLog instances.
+    """
+    logs = [
+        audit_model.AuditLogCreate(
+            user_id=user_id,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            details=details,
+        )
+        for entity_id, details in entries
+    ]
+    return audit_repository.create_audit_logs(db, logs, organization_id=organization_id)
+
+
 def get_audit_logs(
     db: Session,
     filters: audit_model.AuditLogFilter,
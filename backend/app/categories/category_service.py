@@ -6,6 +6,7 @@ from fastapi import HTTPException, status
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from app.reports import report_cache_service
 from . import category_model, category_repository
 
 
@@ -42,6 +43,8 @@ def update_category(db: Session, category_id: int, category_in: category_model.C
                 detail="Category name already exists",
             )
 
+    # Report product summaries embed the category.
+    report_cache_service.invalidate(db, organization_id)
     return category_repository.update_category(db, db_category=db_category, category_in=category_in)
 
 
@@ -15,6 +15,10 @@ class Settings(BaseSettings):
     database_url: str = Field(default="sqlite:///./estocka_dev.db", alias="DATABASE_URL")
     seed_on_start: bool = Field(default=True, alias="SEED_ON_START")
     frontend_url: str = Field(default="http://localhost:5173", alias="FRONTEND_URL")
+    movement_group_commit: bool = Field(default=False, alias="MOVEMENT_GROUP_COMMIT")
+    movement_archive_dir: str = Field(default="./archive", alias="MOVEMENT_ARCHIVE_DIR")
+    report_cache_backend: str = Field(default="memory", alias="REPORT_CACHE_BACKEND")  # memory, database, none
+    scheduler_enabled: bool = Field(default=False, alias="SCHEDULER_ENABLED")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -4,6 +4,14 @@
 DEFAULT_PAGE_SIZE = 50
 MAX_PAGE_SIZE = 100
 
+# Movement listings (keyset pagination)
+MOVEMENT_PAGE_SIZE = 100
+MOVEMENT_MAX_PAGE_SIZE = 500
+MOVEMENT_MAX_OFFSET = 1000  # Deeper pages must use the cursor
+MOVEMENT_BATCH_MAX_LINES = 500
+MOVEMENT_REVERT_MAX_IDS = 1000
+MOVEMENT_IMPORT_CHUNK_SIZE = 10000  # Rows per INSERT of the history import
+
 # ABC Analysis Thresholds (Percentage)
 ABC_CLASS_A_THRESHOLD = 80.0
 ABC_CLASS_B_THRESHOLD = 95.0
@@ -19,3 +27,72 @@ REPORT_DEFAULT_DAYS_ABC = 90
 REPORT_DEFAULT_WEEKS_XYZ = 12
 REPORT_DEFAULT_DAYS_TURNOVER = 30
 REPORT_DEFAULT_DAYS_FORECAST = 30
+
+# Stock overview: low/out-of-stock lists are paginated
+REPORT_OVERVIEW_PAGE_SIZE = 20
+
+# Analytics report items (ABC/XYZ/turnover/forecast ?limit=)
+REPORT_ITEMS_MAX_PAGE_SIZE = 1000
+
+# Period comparison (/reports/comparison?periods=&limit=)
+COMPARISON_MAX_PERIODS = 90
+COMPARISON_BREAKDOWN_LIMIT = 20  # Breakdown rows, by current-period quantity
+
+# Report result cache (REPORT_CACHE_BACKEND=memory|database|none)
+REPORT_CACHE_WINDOW_SECONDS = 60  # "Now"-relative window ends are moved to the end of this bucket
+REPORT_CACHE_TTL_SECONDS = 900
+REPORT_CACHE_MAX_ENTRIES = 512
+REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+REPORT_CACHE_TOUCH_SECONDS = 60  # Database backend: minimum interval between accessed_at updates
+REPORT_CACHE_EVICT_CHECK_EVERY = 32  # Database backend: writes per worker between limit checks
+REPORT_CACHE_EVICT_TARGET = 0.9  # Eviction frees space down to this share of the limits
+
+# Single-flight coalescing: a waiter computes on its own after this long
+SINGLE_FLIGHT_WAIT_SECONDS = 30
+
+# Asynchronous report jobs (POST /reports/jobs)
+REPORT_JOB_WORKERS = 2  # Background threads per process (each holds one DB connection while running)
+REPORT_JOB_MAX_ACTIVE_PER_ORGANIZATION = 5
+REPORT_JOB_TIMEOUT_MINUTES = 30  # Jobs queued, or running without a progress heartbeat, this long are abandoned
+REPORT_JOB_RESULT_TTL_HOURS = 24
+REPORT_JOB_ZSTD_LEVEL = 3
+
+# Daily inventory snapshots of the previous day (SCHEDULER_ENABLED=true)
+INVENTORY_SNAPSHOT_HOUR_UTC = 1
+
+# Nightly report precomputation (SCHEDULER_ENABLED=true)
+REPORT_PRECOMPUTE_HOUR_UTC = 3
+REPORT_PRECOMPUTE_DAYS = (30, 90)  # Windows served to period=30d / period=90d requests
+REPORT_PRECOMPUTE_REPORTS = ("abc", "xyz", "turnover", "forecast")
+
+# In-process scheduler
+SCHEDULER_POLL_SECONDS = 60
+SCHEDULER_LEASE_SECONDS = 600  # Renewed while a task runs; another worker takes over after expiry
+
+# Group commit for movement bursts (MOVEMENT_GROUP_COMMIT=true)
+MOVEMENT_GROUP_COMMIT_WINDOW_MS = 5
+MOVEMENT_GROUP_COMMIT_MAX_SIZE = 200
+MOVEMENT_GROUP_COMMIT_TIMEOUT_SECONDS = 30
+
+# Idempotency keys (Idempotency-Key header on movement writes)
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_TTL_HOURS = 24
+IDEMPOTENCY_WAIT_SECONDS = 10
+IDEMPOTENCY_POLL_INTERVAL_SECONDS = 0.1
+IDEMPOTENCY_CLAIM_MARGIN_SECONDS = 20  # A claim older than WAIT + MARGIN without a response is taken over
+IDEMPOTENCY_PURGE_HOUR_UTC = 4
+
+# Stock reconciliation (product.quantity vs the movement ledger)
+RECONCILIATION_CHUNK_SIZE = 5000
+RECONCILIATION_SAFETY_LAG_SECONDS = 60  # Movements younger than this stay pending
+
+# Movement ledger tiers (monthly partitions / archive table / cold segments)
+MOVEMENT_HOT_MONTHS = 3  # Current month plus the two closed months before it
+MOVEMENT_ARCHIVE_AFTER_MONTHS = 12  # Closed months older than this move to segments
+MOVEMENT_PARTITION_MONTHS_AHEAD = 3
+MOVEMENT_ARCHIVE_ZSTD_LEVEL = 10
+
+# Stocktakes (POST /stocktakes)
+STOCKTAKE_MAX_LINES = 50000
+STOCKTAKE_MAX_COUNT_AGE_DAYS = 7  # Oldest accepted counted_at
+STOCKTAKE_CHUNK_SIZE = 5000  # Count lines per INSERT
@@ -11,6 +11,7 @@ from app.auth.auth_service import get_current_user
 from app.database import get_db
 from app.organizations.organization_helpers import get_organization_id
 from app.users.user_model import User
+from app.utils import single_flight
 from .dashboard_service import DashboardService
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
@@ -26,16 +27,13 @@ def get_dashboard_overview(
     Get dashboard overview with main KPIs.
     
     Returns all key metrics in a single call for dashboard page.
+    Concurrent identical requests share one computation.
     """
-    inventory_value = DashboardService.get_inventory_value(db, org_id)
-    margin = DashboardService.get_average_margin(db, org_id)
-    rupture = DashboardService.get_stock_rupture_rate(db, org_id)
-    
-    return {
-        "inventory": inventory_value,
-        "profitability": margin,
-        "stock_health": rupture
-    }
+    return single_flight.coalesce(org_id, "dashboard.overview", {}, lambda: {
+        "inventory": DashboardService.get_inventory_value(db, org_id),
+        "profitability": DashboardService.get_average_margin(db, org_id),
+        "stock_health": DashboardService.get_stock_rupture_rate(db, org_id)
+    })
 
 
 @router.get("/sales-trend")
@@ -58,7 +56,10 @@ def get_sales_trend(
             "total_movements": 150
         }
     """
-    return DashboardService.get_sales_trend(db, org_id, days)
+    return single_flight.coalesce(
+        org_id, "dashboard.sales_trend", {"days": days},
+        lambda: DashboardService.get_sales_trend(db, org_id, days)
+    )
 
 
 @router.get("/top-products")
@@ -84,7 +85,10 @@ def get_top_products(
             ]
         }
     """
-    return DashboardService.get_top_products(db, org_id, limit, metric)
+    return single_flight.coalesce(
+        org_id, "dashboard.top_products", {"limit": limit, "metric": metric},
+        lambda: DashboardService.get_top_products(db, org_id, limit, metric)
+    )
 
 
 @router.get("/abc-distribution")
@@ -103,4 +107,7 @@ def get_abc_distribution(
             "C": 45
         }
     """
-    return DashboardService.get_abc_distribution(db, org_id)
+    return single_flight.coalesce(
+        org_id, "dashboard.abc_distribution", {},
+        lambda: DashboardService.get_abc_distribution(db, org_id)
+    )
@@ -8,8 +8,10 @@ from decimal import Decimal
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.movements.movement_model import Movement, MovementType
+from app.movements.movement_model import MovementType
 from app.products.product_model import Product
+from app.rollups import rollup_service
+from app.rollups.rollup_model import MovementDailyRollup
 
 
 class DashboardService:
@@ -136,20 +138,9 @@ class DashboardService:
         """
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get all outbound movements in the period
-        movements = db.execute(
-            select(Movement).where(
-                Movement.organization_id == organization_id,
-                Movement.type == MovementType.SAIDA,
-                Movement.created_at >= start_date
-            ).order_by(Movement.created_at)
-        ).scalars().all()
-        
-        # Group by date
-        daily_sales = {}
-        for mov in movements:
-            date_key = mov.created_at.strftime("%Y-%m-%d")
-            daily_sales[date_key] = daily_sales.get(date_key, 0) + mov.quantity
+        # Outbound totals per day (complete days come from the daily rollups)
+        daily_totals = rollup_service.outbound_by_day(db, organization_id, start_date)
+        daily_sales = {day.strftime("%Y-%m-%d"): quantity for day, (quantity, _) in daily_totals.items()}
         
         # Fill missing days with 0
         current_date = start_date.date()
@@ -166,7 +157,7 @@ class DashboardService:
         return {
             "labels": labels,
             "data": data,
-            "total_movements": len(movements)
+            "total_movements": sum(count for _, count in daily_totals.values())
         }
 
     @staticmethod
@@ -190,19 +181,21 @@ class DashboardService:
             # For now, return by total quantity in movements
             metric = "movements"
         
-        # Get movements grouped by product
+        # All-time outbound quantity per product, from the daily rollups
+        total_quantity = func.sum(MovementDailyRollup.total_qty)
         result = db.execute(
             select(
                 Product.name,
-                func.sum(Movement.quantity).label("total_quantity")
-            ).join(Movement, Movement.product_id == Product.id)
+                total_quantity.label("total_quantity")
+            ).join(MovementDailyRollup, MovementDailyRollup.product_id == Product.id)
             .where(
                 Product.organization_id == organization_id,
-                Movement.type == MovementType.SAIDA,  # Only outbound
+                MovementDailyRollup.organization_id == organization_id,
+                MovementDailyRollup.type == MovementType.SAIDA,  # Only outbound
                 Product.is_deleted == False
             )
             .group_by(Product.id, Product.name)
-            .order_by(func.sum(Movement.quantity).desc())
+            .order_by(total_quantity.desc())
             .limit(limit)
         ).all()
         
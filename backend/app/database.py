@@ -16,7 +16,9 @@ SQLALCHEMY_DATABASE_URL = settings.database_url
 
 engine_kwargs: dict[str, object] = {}
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
+    # SQLite serializes writers on a database lock; wait for it instead of
+    # failing fast with "database is locked" under concurrent movements.
+    engine_kwargs["connect_args"] = {"check_same_thread": False, "timeout": 30}
 else:
     # Manter conexões vivas em ambientes como Render; considerar tunar pool_size/max_overflow futuramente.
     engine_kwargs["pool_pre_ping"] = True
@@ -134,6 +134,81 @@ class NegativeStockException(EstockaException):
         )
 
 
+# ==================== Exceções de Concorrência ====================
+
+class PreconditionFailedException(EstockaException):
+    """Versão informada em If-Match não corresponde à versão atual do recurso."""
+    
+    def __init__(self, resource: str, current_version: int):
+        super().__init__(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{resource} foi modificado por outra requisição (versão atual: {current_version})",
+            error_code="PRECONDITION_FAILED",
+        )
+
+
+class ConcurrentUpdateException(EstockaException):
+    """Recurso alterado por outra requisição durante a atualização."""
+    
+    def __init__(self, resource: str, identifier: Any):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{resource} com identificador '{identifier}' foi alterado simultaneamente; recarregue e tente novamente",
+            error_code="CONCURRENT_UPDATE",
+        )
+
+
+# ==================== Exceções de Idempotência ====================
+
+class IdempotencyKeyReuseException(EstockaException):
+    """Idempotency-Key reutilizada para uma requisição diferente."""
+    
+    def __init__(self, key: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Idempotency-Key '{key}' já foi usada para outra requisição",
+            error_code="IDEMPOTENCY_KEY_REUSED",
+        )
+
+
+class IdempotencyInProgressException(EstockaException):
+    """Requisição original com a mesma Idempotency-Key ainda em processamento."""
+    
+    def __init__(self, key: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Requisição com Idempotency-Key '{key}' ainda está em processamento",
+            error_code="IDEMPOTENCY_IN_PROGRESS",
+            headers={"Retry-After": "1"},
+        )
+
+
+class MovementStillProcessingException(EstockaException):
+    """Movimentação enfileirada que ainda não foi gravada dentro do prazo de espera."""
+    
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Movimentação ainda em processamento; consulte as movimentações antes de reenviar",
+            error_code="MOVEMENT_STILL_PROCESSING",
+            headers={"Retry-After": "1"},
+        )
+
+
+# ==================== Exceções de Relatórios ====================
+
+class ReportJobLimitException(EstockaException):
+    """Organização com relatórios demais em processamento."""
+    
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Limite de {limit} relatórios em processamento atingido; aguarde a conclusão de algum deles",
+            error_code="REPORT_JOB_LIMIT",
+            headers={"Retry-After": "30"},
+        )
+
+
 # ==================== Exceções de Recursos ====================
 
 class NotFoundException(EstockaException):
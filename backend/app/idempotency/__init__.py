@@ -0,0 +1 @@
+"""Idempotency keys for retry-safe write endpoints."""
@@ -0,0 +1,36 @@
+"""Idempotency key records for retry-safe write endpoints."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A client-supplied ``Idempotency-Key`` and the response it produced.
+
+    The row is claimed (inserted without a response) before the request is
+    processed; the unique constraint makes concurrent duplicates wait on or
+    fail against the first claim. The response is written in the same
+    transaction as the request's own writes and replayed for retries until
+    ``expires_at``. A claim still without a response long after
+    ``claimed_at`` belongs to a request that died, and may be taken over.
+    """
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("organization_id", "key", name="uq_idempotency_org_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    scope = Column(String(100), nullable=False)  # e.g. "movements.create"
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL while the request is in progress
+    response_body = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Start of the current attempt
+    expires_at = Column(DateTime, nullable=False, index=True)
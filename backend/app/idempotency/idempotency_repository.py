@@ -0,0 +1,102 @@
+"""Data repository for idempotency keys."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import idempotency_model
+
+IdempotencyKey = idempotency_model.IdempotencyKey
+
+
+def get_key(db: Session, organization_id: int, key: str) -> IdempotencyKey | None:
+    """Return the record for an organization's key, if any."""
+    return db.scalar(
+        select(IdempotencyKey).where(
+            IdempotencyKey.organization_id == organization_id,
+            IdempotencyKey.key == key,
+        )
+    )
+
+
+def claim_key(
+    db: Session,
+    organization_id: int,
+    key: str,
+    *,
+    scope: str,
+    request_hash: str,
+    claimed_at: datetime,
+    expires_at: datetime,
+) -> IdempotencyKey | None:
+    """Insert and commit an in-progress record; return None if the key is already taken."""
+    record = IdempotencyKey(
+        organization_id=organization_id,
+        key=key,
+        scope=scope,
+        request_hash=request_hash,
+        created_at=claimed_at,
+        claimed_at=claimed_at,
+        expires_at=expires_at,
+    )
+    db.add(record)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return record
+
+
+def take_over_claim(db: Session, record_id: int, stale_claimed_at: datetime, claimed_at: datetime) -> bool:
+    """Move an abandoned claim to a new attempt and commit; False if another request got it first."""
+    result = db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.id == record_id,
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.claimed_at == stale_claimed_at,
+        )
+        .values(claimed_at=claimed_at)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def store_response(db: Session, record_id: int, claimed_at: datetime, status_code: int, body) -> bool:
+    """
+    Record the response of a claim in the current transaction (not committed).
+
+    Returns:
+        False if the claim no longer belongs to this attempt (it was taken over).
+    """
+    result = db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.id == record_id,
+            IdempotencyKey.status_code.is_(None),
+            IdempotencyKey.claimed_at == claimed_at,
+        )
+        .values(status_code=status_code, response_body=body)
+    )
+    return result.rowcount == 1
+
+
+def release_key(db: Session, record_id: int, claimed_at: datetime | None = None) -> None:
+    """Delete a claim (only the given attempt's, if ``claimed_at``) so the client may retry the key."""
+    statement = delete(IdempotencyKey).where(IdempotencyKey.id == record_id)
+    if claimed_at is not None:
+        statement = statement.where(IdempotencyKey.claimed_at == claimed_at)
+    db.execute(statement)
+    db.commit()
+
+
+def delete_expired(db: Session, now: datetime) -> int:
+    """Delete every expired record and return how many were removed."""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+    db.commit()
+    return result.rowcount
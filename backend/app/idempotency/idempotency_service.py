@@ -0,0 +1,165 @@
+"""Business rules for idempotent write requests."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.exceptions import (
+    IdempotencyInProgressException,
+    IdempotencyKeyReuseException,
+    ValidationException,
+)
+from app.scheduler.scheduler_service import DailyTask
+from . import idempotency_repository
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _request_hash(scope: str, payload: Any) -> str:
+    """Fingerprint a request so a key cannot be reused for a different one."""
+    raw = json.dumps({"scope": scope, "payload": payload}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _begin(db: Session) -> None:
+    """Open the transaction the handler's writes join (as savepoints) and ``run`` commits."""
+    if not db.in_transaction():
+        db.begin()
+
+
+def run(
+    db: Session,
+    *,
+    organization_id: int,
+    key: str | None,
+    scope: str,
+    payload: Any,
+    status_code: int,
+    handler: Callable[[], Any],
+) -> Any:
+    """
+    Execute ``handler`` at most once per (organization, Idempotency-Key).
+
+    The key is claimed in its own committed transaction before the handler
+    runs. The handler performs its writes without committing; they are
+    committed here together with the stored response, so a request is either
+    fully applied and replayable or not applied at all. A retry of a
+    completed request gets the stored response back; a retry that arrives
+    while the first attempt is still running waits for it (up to
+    IDEMPOTENCY_WAIT_SECONDS). A claim left without a response for longer than
+    that plus IDEMPOTENCY_CLAIM_MARGIN_SECONDS (the attempt died) is taken
+    over by the retry. If the handler fails, the claim is released so the
+    client may retry with the same key.
+
+    Args:
+        db: Database session.
+        organization_id: Organization scope of the key.
+        key: Value of the ``Idempotency-Key`` header (None disables the check).
+        scope: Logical endpoint name, e.g. ``"movements.create"``.
+        payload: JSON-serializable request payload, used to detect key reuse.
+        status_code: Status code of a successful response.
+        handler: Performs the writes (uncommitted) and returns the JSON-serializable body.
+
+    Returns:
+        The handler's body when no key is given, otherwise a JSONResponse.
+
+    Raises:
+        HTTPException(409): If the original request is still in progress.
+        HTTPException(422): If the key was already used for a different request.
+    """
+    if key is None:
+        _begin(db)
+        body = handler()
+        db.commit()
+        return body
+    if not key or len(key) > constants.IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise ValidationException(
+            f"Idempotency-Key deve ter entre 1 e {constants.IDEMPOTENCY_KEY_MAX_LENGTH} caracteres"
+        )
+
+    request_hash = _request_hash(scope, payload)
+    deadline = time.monotonic() + constants.IDEMPOTENCY_WAIT_SECONDS
+    claim_timeout = timedelta(seconds=constants.IDEMPOTENCY_WAIT_SECONDS + constants.IDEMPOTENCY_CLAIM_MARGIN_SECONDS)
+
+    while True:
+        now = datetime.utcnow()
+        record = idempotency_repository.claim_key(
+            db,
+            organization_id,
+            key,
+            scope=scope,
+            request_hash=request_hash,
+            claimed_at=now,
+            expires_at=now + timedelta(hours=constants.IDEMPOTENCY_TTL_HOURS),
+        )
+        if record is not None:
+            record_id = record.id
+            break
+
+        existing = idempotency_repository.get_key(db, organization_id, key)
+        if existing is None:
+            continue  # Released between our insert and read; try to claim again.
+        if existing.expires_at <= now:
+            idempotency_repository.release_key(db, existing.id)
+            continue
+        if existing.scope != scope or existing.request_hash != request_hash:
+            raise IdempotencyKeyReuseException(key)
+        if existing.status_code is not None:
+            return JSONResponse(
+                content=existing.response_body,
+                status_code=existing.status_code,
+                headers={REPLAYED_HEADER: "true"},
+            )
+        if existing.claimed_at <= now - claim_timeout:
+            record_id = existing.id
+            if idempotency_repository.take_over_claim(db, record_id, existing.claimed_at, now):
+                break
+            continue
+        if time.monotonic() >= deadline:
+            raise IdempotencyInProgressException(key)
+        db.rollback()  # Drop the current snapshot before polling again.
+        time.sleep(constants.IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+
+    claimed_at = now
+    try:
+        _begin(db)
+        body = handler()
+        if not idempotency_repository.store_response(db, record_id, claimed_at, status_code, body):
+            # Taken over by a retry after this attempt outlived its claim.
+            raise IdempotencyInProgressException(key)
+        db.commit()
+    except Exception:
+        db.rollback()
+        idempotency_repository.release_key(db, record_id, claimed_at)
+        raise
+    return JSONResponse(content=body, status_code=status_code)
+
+
+def purge_expired(db: Session, renew_lease: Callable[[], None] | None = None) -> int:
+    """
+    Delete idempotency records whose TTL has elapsed (daily scheduler task).
+
+    Args:
+        db: Database session.
+        renew_lease: Scheduler lease renewal (unused; the purge is one statement).
+
+    Returns:
+        Number of records removed.
+    """
+    removed = idempotency_repository.delete_expired(db, datetime.utcnow())
+    logger.info(f"Chaves de idempotência expiradas removidas: {removed}")
+    return removed
+
+
+PURGE_TASK = DailyTask("idempotency.purge", constants.IDEMPOTENCY_PURGE_HOUR_UTC, purge_expired)
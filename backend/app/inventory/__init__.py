@@ -0,0 +1 @@
+"""Daily inventory snapshots and point-in-time stock queries."""
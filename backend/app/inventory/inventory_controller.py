@@ -0,0 +1,29 @@
+"""Inventory endpoints."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.auth.auth_service import get_current_user, require_role
+from app.database import get_db
+from app.users.user_model import User
+from . import inventory_model, inventory_service
+
+router = APIRouter(
+    prefix="/inventory",
+    tags=["Inventory"],
+    dependencies=[Depends(get_current_user), Depends(require_role("admin", "user"))],
+)
+
+
+@router.get("/as-of", response_model=inventory_model.InventoryAsOf)
+def get_inventory_as_of(
+    as_of: date = Query(alias="date", description="Day (YYYY-MM-DD) whose closing stock is requested (UTC)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return the stock of every product at the end of the given day."""
+    return inventory_service.get_inventory_as_of(db, current_user.organization_id, as_of)
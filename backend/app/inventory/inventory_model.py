@@ -0,0 +1,50 @@
+"""Models and schemas for inventory snapshots."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import List, Literal
+
+from pydantic import BaseModel
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric
+
+from app.database import Base
+
+
+class InventorySnapshot(Base):
+    """
+    Stock position of one product at the end of one UTC day.
+
+    Prices are copied from the product when the snapshot is taken so that
+    historical valuations do not move when prices change later.
+    """
+
+    __tablename__ = "inventory_snapshots"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    cost_price = Column(Numeric(10, 2), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class InventoryPosition(BaseModel):
+    product_id: int
+    product_name: str
+    sku: str
+    quantity: int
+    cost_value: float
+    sale_value: float
+
+
+class InventoryAsOf(BaseModel):
+    """Stock of every product at the end of ``as_of`` (UTC)."""
+    as_of: date
+    source: Literal["snapshot", "current"]  # Anchor the movement delta was applied to
+    snapshot_day: date | None = None
+    total_quantity: int
+    total_cost_value: float
+    total_sale_value: float
+    items: List[InventoryPosition]
@@ -0,0 +1,84 @@
+"""Data repository for inventory snapshots."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import delete, distinct, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.products.product_model import Product
+
+from . import inventory_model
+
+Snapshot = inventory_model.InventorySnapshot
+
+
+def list_organization_ids(db: Session) -> list[int]:
+    """Return every organization that has products."""
+    return list(db.scalars(select(distinct(Product.organization_id)).order_by(Product.organization_id)))
+
+
+def current_positions(db: Session, organization_id: int):
+    """Return (id, name, sku, quantity, cost_price, price) for active products."""
+    return db.execute(
+        select(Product.id, Product.name, Product.sku, Product.quantity, Product.cost_price, Product.price)
+        .where(Product.organization_id == organization_id, Product.is_deleted == False)
+        .order_by(Product.id)
+    ).all()
+
+
+def latest_snapshot_day(db: Session, organization_id: int, on_or_before: date) -> date | None:
+    """Return the most recent snapshot day not after ``on_or_before``."""
+    return db.scalar(
+        select(func.max(Snapshot.day)).where(
+            Snapshot.organization_id == organization_id,
+            Snapshot.day <= on_or_before,
+        )
+    )
+
+
+def get_snapshot(db: Session, organization_id: int, day: date) -> list[inventory_model.InventorySnapshot]:
+    """Return every product row of one snapshot."""
+    return list(
+        db.scalars(select(Snapshot).where(Snapshot.organization_id == organization_id, Snapshot.day == day))
+    )
+
+
+def replace_snapshot(db: Session, organization_id: int, day: date, rows: list[dict]) -> int:
+    """Delete and re-insert the snapshot of one organization and day."""
+    db.execute(delete(Snapshot).where(Snapshot.organization_id == organization_id, Snapshot.day == day))
+    if rows:
+        db.execute(insert(Snapshot), rows)
+    return len(rows)
+
+
+def snapshot_days(db: Session, organization_id: int, first_day: date, last_day: date) -> set[date]:
+    """Return the days in ``[first_day, last_day]`` that have a snapshot."""
+    return set(
+        db.scalars(
+            select(distinct(Snapshot.day)).where(
+                Snapshot.organization_id == organization_id,
+                Snapshot.day >= first_day,
+                Snapshot.day <= last_day,
+            )
+        )
+    )
+
+
+def snapshot_totals(db: Session, organization_id: int, first_day: date, last_day: date):
+    """Sum quantity and valuations per product over the snapshots in a day range."""
+    return db.execute(
+        select(
+            Snapshot.product_id,
+            func.sum(Snapshot.quantity).label("quantity"),
+            func.sum(Snapshot.quantity * Snapshot.cost_price).label("cost_value"),
+            func.sum(Snapshot.quantity * Snapshot.price).label("sale_value"),
+        )
+        .where(
+            Snapshot.organization_id == organization_id,
+            Snapshot.day >= first_day,
+            Snapshot.day <= last_day,
+        )
+        .group_by(Snapshot.product_id)
+    ).all()
@@ -0,0 +1,238 @@
+"""Business rules for inventory snapshots and point-in-time stock.
+
+A snapshot stores each product's quantity at the end of a UTC day. The stock
+at the end of any other day is derived from the nearest anchor, which is
+either a snapshot on or before that day or the current quantities, plus the
+net movement delta between the two. Deltas come from the daily rollups, so
+no query replays the full ledger.
+
+Quantities and deltas are read by separate statements. On PostgreSQL they
+run on their own REPEATABLE READ session, so a movement committed in between
+cannot be counted on one side only; the caller's session usually has a
+READ COMMITTED transaction open already (the request's authentication).
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterator, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.rollups import rollup_service
+from app.scheduler.scheduler_service import DailyTask
+from . import inventory_model, inventory_repository
+
+
+class AverageInventory(NamedTuple):
+    """Average end-of-day position of one product over a range of days."""
+    quantity: float
+    cost_value: float
+    sale_value: float
+
+
+def _end_of(day: date) -> datetime:
+    """Return the first instant after ``day`` (UTC midnight of the next day)."""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+@contextmanager
+def _consistent_read(db: Session) -> Iterator[Session]:
+    """Yield a session whose reads share one snapshot (``db`` itself outside PostgreSQL)."""
+    if db.get_bind().dialect.name != "postgresql":
+        yield db
+        return
+    with Session(db.get_bind().execution_options(isolation_level="REPEATABLE READ")) as snapshot_db:
+        yield snapshot_db
+
+
+def _quantities_from_current(db: Session, organization_id: int, day: date, products) -> dict[int, int]:
+    """End-of-day quantities obtained by undoing every movement after ``day``."""
+    net = rollup_service.net_change_since_by_product(db, organization_id, _end_of(day))
+    return {product.id: product.quantity - net.get(product.id, 0) for product in products}
+
+
+def get_inventory_as_of(db: Session, organization_id: int, as_of: date) -> inventory_model.InventoryAsOf:
+    """
+    Return the stock of every active product at the end of a UTC day.
+
+    The nearest snapshot on or before ``as_of`` is rolled forward when it is
+    closer than today; otherwise current quantities are rolled back.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        as_of: Day whose closing stock is requested.
+
+    Returns:
+        InventoryAsOf with per-product quantity and valuation.
+    """
+    with _consistent_read(db) as read_db:
+        products = inventory_repository.current_positions(read_db, organization_id)
+        unit_prices = {product.id: (product.cost_price, product.price) for product in products}
+        today = datetime.utcnow().date()
+
+        snapshot_day = None
+        if as_of >= today:
+            quantities = {product.id: product.quantity for product in products}
+        else:
+            snapshot_day = inventory_repository.latest_snapshot_day(read_db, organization_id, as_of)
+            if snapshot_day is not None and (as_of - snapshot_day) > (today - as_of):
+                snapshot_day = None  # Current stock is the closer anchor.
+
+            if snapshot_day is None:
+                quantities = _quantities_from_current(read_db, organization_id, as_of, products)
+            else:
+                snapshot = {
+                    row.product_id: row
+                    for row in inventory_repository.get_snapshot(read_db, organization_id, snapshot_day)
+                }
+                net = rollup_service.net_change_by_product(
+                    read_db, organization_id, _end_of(snapshot_day), _end_of(as_of), end_inclusive=False
+                )
+                # Products created after the snapshot have no row; roll those back from now.
+                missing = [product for product in products if product.id not in snapshot]
+                quantities = _quantities_from_current(read_db, organization_id, as_of, missing) if missing else {}
+                for product_id, row in snapshot.items():
+                    if product_id in unit_prices:
+                        quantities[product_id] = row.quantity + net.get(product_id, 0)
+                        unit_prices[product_id] = (row.cost_price, row.price)
+
+    items = []
+    for product in products:
+        quantity = quantities[product.id]
+        cost_price, price = unit_prices[product.id]
+        items.append(inventory_model.InventoryPosition(
+            product_id=product.id,
+            product_name=product.name,
+            sku=product.sku,
+            quantity=quantity,
+            cost_value=float(quantity * cost_price),
+            sale_value=float(quantity * price),
+        ))
+
+    return inventory_model.InventoryAsOf(
+        as_of=as_of,
+        source="snapshot" if snapshot_day is not None else "current",
+        snapshot_day=snapshot_day,
+        total_quantity=sum(item.quantity for item in items),
+        total_cost_value=sum(item.cost_value for item in items),
+        total_sale_value=sum(item.sale_value for item in items),
+        items=items,
+    )
+
+
+def take_snapshots(
+    db: Session,
+    *,
+    day: date | None = None,
+    organization_id: int | None = None,
+) -> int:
+    """
+    Record the closing stock of every active product for one day and commit.
+
+    Meant to run shortly after UTC midnight for the previous day; older days
+    can be backfilled because quantities are rolled back from the current
+    stock. Re-running for the same day replaces that day's snapshot.
+
+    Args:
+        db: Database session.
+        day: Day to snapshot (default: yesterday, UTC).
+        organization_id: Restrict the job to one organization.
+
+    Returns:
+        Number of snapshot rows written.
+    """
+    if day is None:
+        day = datetime.utcnow().date() - timedelta(days=1)
+    organization_ids = (
+        [organization_id] if organization_id is not None else inventory_repository.list_organization_ids(db)
+    )
+
+    written = 0
+    for org_id in organization_ids:
+        with _consistent_read(db) as read_db:
+            products = inventory_repository.current_positions(read_db, org_id)
+            quantities = _quantities_from_current(read_db, org_id, day, products)
+        rows = [
+            {
+                "organization_id": org_id,
+                "day": day,
+                "product_id": product.id,
+                "quantity": quantities[product.id],
+                "cost_price": product.cost_price,
+                "price": product.price,
+            }
+            for product in products
+        ]
+        written += inventory_repository.replace_snapshot(db, org_id, day, rows)
+        db.commit()
+    return written
+
+
+def snapshot_yesterday(db: Session, renew_lease: Callable[[], None]) -> None:
+    """Record yesterday's closing stock of every organization (scheduled task)."""
+    day = datetime.utcnow().date() - timedelta(days=1)
+    for organization_id in inventory_repository.list_organization_ids(db):
+        take_snapshots(db, day=day, organization_id=organization_id)
+        renew_lease()
+
+
+SNAPSHOT_TASK = DailyTask("inventory.snapshots", constants.INVENTORY_SNAPSHOT_HOUR_UTC, snapshot_yesterday)
+
+
+def average_inventory(
+    db: Session,
+    organization_id: int,
+    first_day: date,
+    last_day: date,
+) -> dict[int, AverageInventory]:
+    """
+    Average end-of-day stock per active product over a range of days.
+
+    Days covered by snapshots are averaged in SQL; the remaining days (e.g.
+    today, or days before snapshots existed) are derived from the current
+    quantities and one grouped rollup query, whatever their number.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        first_day: First day of the range (inclusive).
+        last_day: Last day of the range (inclusive, capped at today).
+
+    Returns:
+        Mapping of product id to its AverageInventory.
+    """
+    last_day = min(last_day, datetime.utcnow().date())
+    if last_day < first_day:
+        first_day = last_day
+    total_days = (last_day - first_day).days + 1
+
+    with _consistent_read(db) as read_db:
+        products = inventory_repository.current_positions(read_db, organization_id)
+        sums = {product.id: [0.0, 0.0, 0.0] for product in products}
+
+        for row in inventory_repository.snapshot_totals(read_db, organization_id, first_day, last_day):
+            if row.product_id in sums:
+                sums[row.product_id][0] += float(row.quantity or 0)
+                sums[row.product_id][1] += float(row.cost_value or 0)
+                sums[row.product_id][2] += float(row.sale_value or 0)
+
+        covered = inventory_repository.snapshot_days(read_db, organization_id, first_day, last_day)
+        missing = [first_day + timedelta(days=offset) for offset in range(total_days)]
+        missing = [day for day in missing if day not in covered]
+        if missing:
+            # Sum of closings over the missing days = days x current - net change after each of them.
+            after = rollup_service.net_change_after_days_by_product(read_db, organization_id, missing)
+            for product in products:
+                quantity = len(missing) * product.quantity - after.get(product.id, 0)
+                sums[product.id][0] += quantity
+                sums[product.id][1] += float(quantity * product.cost_price)
+                sums[product.id][2] += float(quantity * product.price)
+
+    return {
+        product_id: AverageInventory(*(value / total_days for value in values))
+        for product_id, values in sums.items()
+    }
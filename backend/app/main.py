@@ -21,13 +21,18 @@ from app.config import get_settings
 from app.dashboard import dashboard_controller
 from app.database import Base, SessionLocal, engine
 from app.exceptions import EstockaException
+from app.idempotency import idempotency_service
+from app.inventory import inventory_controller, inventory_service
 from app.logging_config import setup_logging
-from app.movements import movement_controller
+from app.movements import movement_controller, movement_group_commit
 from app.organizations import organization_controller
 from app.products import product_controller
-from app.reports import report_controller
+from app.reconciliation import reconciliation_controller
+from app.reports import report_controller, report_job_service, report_precompute_service
 from app.roles import role_controller
 from app.roles.role_model import Role
+from app.scheduler import scheduler_service
+from app.stocktakes import stocktake_controller
 from app.users import user_controller, user_repository
 from app.users.user_model import User, UserCreate
 
@@ -155,6 +160,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.middleware("http")
@@ -178,7 +184,10 @@ app.include_router(category_controller.router)
 app.include_router(product_controller.router)
 app.include_router(movement_controller.router)
 app.include_router(dashboard_controller.router)
+app.include_router(inventory_controller.router)
 app.include_router(report_controller.router)
+app.include_router(reconciliation_controller.router)
+app.include_router(stocktake_controller.router)
 app.include_router(audit_controller.router)
 
 
@@ -230,8 +239,22 @@ def on_startup() -> None:
     if settings.seed_on_start:
         logger.info("Executando seed de dados iniciais")
         seed_initial_data()
+    if settings.scheduler_enabled:
+        scheduler_service.start([
+            inventory_service.SNAPSHOT_TASK,
+            report_precompute_service.NIGHTLY_TASK,
+            idempotency_service.PURGE_TASK,
+        ])
     logger.info("✅ Estocka API pronta para receber requisições")
 
 
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    """Flush pending work before the process exits."""
+    movement_group_commit.shutdown()
+    report_job_service.shutdown()
+    scheduler_service.shutdown()
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -6,16 +6,23 @@ import logging
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from app import constants
 from app.auth.auth_service import get_current_user, require_role
 from app.database import get_db
+from app.idempotency import idempotency_service
 from app.users.user_model import User
 from . import movement_model, movement_service
 
 logger = logging.getLogger(__name__)
 
+MovementList = List[movement_model.MovementSummary] | List[movement_model.MovementPublic]
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_DESCRIPTION = "Client-generated key that makes retries of this request safe"
+
 router = APIRouter(
     prefix="/movements",
     tags=["Movements"],
@@ -30,6 +37,9 @@ router = APIRouter(
 )
 def create_movement(
     movement: movement_model.MovementCreate,
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("admin", "user")),
 ):
@@ -38,16 +48,121 @@ def create_movement(
         f"Criando movimentação: Produto ID {movement.product_id}, "
         f"Tipo: {movement.type}, Qtd: {movement.quantity} - User: {current_user.email}"
     )
-    
-    result = movement_service.create_movement(
+
+    def handler():
+        result = movement_service.submit_movement(
+            db,
+            movement,
+            organization_id=current_user.organization_id,
+            created_by_user_id=current_user.id,
+            # Keyed requests commit together with their idempotency record.
+            commit=idempotency_key is None,
+        )
+        logger.info(f"✅ Movimentação criada: ID {result.id} - {result.type}")
+        return movement_model.MovementPublic.model_validate(result).model_dump(mode="json")
+
+    return idempotency_service.run(
+        db,
+        organization_id=current_user.organization_id,
+        key=idempotency_key,
+        scope="movements.create",
+        payload=movement.model_dump(mode="json"),
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=List[movement_model.MovementSummary],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_movements_batch(
+    batch: movement_model.MovementBatchCreate,
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "user")),
+):
+    """Register all lines of a stock document atomically."""
+    logger.info(f"Criando lote de movimentações: {len(batch.lines)} linhas - User: {current_user.email}")
+
+    def handler():
+        created = movement_service.create_movements_batch(
+            db,
+            batch,
+            organization_id=current_user.organization_id,
+            created_by_user_id=current_user.id,
+            commit=False,
+        )
+        movements = movement_service.get_movements(
+            db, [movement.id for movement in created], organization_id=current_user.organization_id
+        )
+        logger.info(f"✅ Lote criado: {len(movements)} movimentações - batch {movements[0].batch_id}")
+        return [
+            summary.model_dump(mode="json")
+            for summary in movement_service.serialize_movements(movements)
+        ]
+
+    return idempotency_service.run(
         db,
-        movement,
         organization_id=current_user.organization_id,
-        created_by_user_id=current_user.id,
+        key=idempotency_key,
+        scope="movements.batch",
+        payload=batch.model_dump(mode="json"),
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
+    )
+
+
+@router.post(
+    "/revert",
+    response_model=List[movement_model.MovementSummary],
+    status_code=status.HTTP_201_CREATED,
+)
+def revert_movements(
+    revert: movement_model.MovementBulkRevert,
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "user")),
+):
+    """Reverse many movements (given ids or a whole batch) atomically."""
+    target = f"lote {revert.batch_id}" if revert.batch_id else f"{len(revert.movement_ids)} IDs"
+    logger.warning(f"Revertendo movimentações em massa: {target} - User: {current_user.email}")
+
+    def handler():
+        created = movement_service.revert_movements(
+            db,
+            revert,
+            organization_id=current_user.organization_id,
+            created_by_user_id=current_user.id,
+            commit=False,
+        )
+        loaded = {
+            movement.id: movement
+            for movement in movement_service.get_movements(
+                db, [movement.id for movement in created], organization_id=current_user.organization_id
+            )
+        }
+        movements = [loaded[movement.id] for movement in created]  # In the order of the originals
+        logger.info(f"✅ Reversão em massa: {len(movements)} movimentações - batch {movements[0].batch_id}")
+        return [
+            summary.model_dump(mode="json")
+            for summary in movement_service.serialize_movements(movements)
+        ]
+
+    return idempotency_service.run(
+        db,
+        organization_id=current_user.organization_id,
+        key=idempotency_key,
+        scope="movements.revert_bulk",
+        payload=revert.model_dump(mode="json"),
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
     )
-    
-    logger.info(f"✅ Movimentação criada: ID {result.id} - {result.type}")
-    return result
 
 
 @router.post(
@@ -57,21 +172,35 @@ def create_movement(
 )
 def revert_movement(
     movement_id: int,
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("admin", "user")),
 ):
     """Generate the reverse movement for the provided identifier (admin only)."""
     logger.warning(f"Revertendo movimentação ID {movement_id} - User: {current_user.email}")
-    
-    result = movement_service.revert_movement(
+
+    def handler():
+        result = movement_service.revert_movement(
+            db,
+            movement_id,
+            organization_id=current_user.organization_id,
+            created_by_user_id=current_user.id,
+            commit=False,
+        )
+        logger.info(f"✅ Movimentação revertida:ID original {movement_id}, novo ID {result.id}")
+        return movement_model.MovementPublic.model_validate(result).model_dump(mode="json")
+
+    return idempotency_service.run(
         db,
-        movement_id,
         organization_id=current_user.organization_id,
-        created_by_user_id=current_user.id,
+        key=idempotency_key,
+        scope="movements.revert",
+        payload={"movement_id": movement_id},
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
     )
-    
-    logger.info(f"✅ Movimentação revertida:ID original {movement_id}, novo ID {result.id}")
-    return result
 
 
 @router.put("/{movement_id}")
@@ -92,41 +221,83 @@ def forbid_delete(movement_id: int) -> None:
     )
 
 
-@router.get("/", response_model=List[movement_model.MovementPublic])
+def _set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """Expose the keyset cursor for the next page, if any."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+@router.get("/", response_model=MovementList)
 def list_movements(
+    response: Response,
+    limit: int = Query(
+        default=constants.MOVEMENT_PAGE_SIZE,
+        ge=1,
+        le=constants.MOVEMENT_MAX_PAGE_SIZE,
+        description="Page size",
+    ),
+    cursor: str | None = Query(default=None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    expand: bool = Query(default=False, description="Return the full nested product and user"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List every movement."""
-    return movement_service.list_movements(db, organization_id=current_user.organization_id)
+    """List movements page by page, newest first."""
+    movements, next_cursor = movement_service.list_movements(
+        db, organization_id=current_user.organization_id, limit=limit, cursor=cursor, expand=expand
+    )
+    _set_next_cursor(response, next_cursor)
+    return movement_service.serialize_movements(movements, expand=expand)
 
 
-@router.get("/history", response_model=List[movement_model.MovementPublic])
+@router.get("/history", response_model=MovementList)
 def list_recent_movements(
-    limit: int = Query(default=100, ge=1, le=500, description="Maximum number of records"),
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=constants.MOVEMENT_MAX_PAGE_SIZE, description="Maximum number of records"),
+    cursor: str | None = Query(default=None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    expand: bool = Query(default=False, description="Return the full nested product and user"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List the most recent movements."""
-    return movement_service.list_recent_movements(db, organization_id=current_user.organization_id, limit=limit)
+    movements, next_cursor = movement_service.list_recent_movements(
+        db, organization_id=current_user.organization_id, limit=limit, cursor=cursor, expand=expand
+    )
+    _set_next_cursor(response, next_cursor)
+    return movement_service.serialize_movements(movements, expand=expand)
 
 
-@router.get("/recent", response_model=List[movement_model.MovementPublic])
+@router.get("/recent", response_model=MovementList)
 def get_recent_movements(
-    limit: int = Query(default=10, ge=1, le=500, description="Maximum number of records"),
+    response: Response,
+    limit: int = Query(default=10, ge=1, le=constants.MOVEMENT_MAX_PAGE_SIZE, description="Maximum number of records"),
+    cursor: str | None = Query(default=None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    expand: bool = Query(default=False, description="Return the full nested product and user"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get recent movements (alias for /history)."""
-    return movement_service.list_recent_movements(db, organization_id=current_user.organization_id, limit=limit)
+    movements, next_cursor = movement_service.list_recent_movements(
+        db, organization_id=current_user.organization_id, limit=limit, cursor=cursor, expand=expand
+    )
+    _set_next_cursor(response, next_cursor)
+    return movement_service.serialize_movements(movements, expand=expand)
 
 
-@router.get("/filter", response_model=List[movement_model.MovementPublic])
+@router.get("/filter", response_model=MovementList)
 def filter_movements(
+    response: Response,
     start_date: datetime | None = Query(default=None),
     end_date: datetime | None = Query(default=None),
     movement_type: movement_model.MovementType | None = Query(default=None, alias="type"),
     product_id: int | None = Query(default=None),
+    limit: int = Query(
+        default=constants.MOVEMENT_PAGE_SIZE,
+        ge=1,
+        le=constants.MOVEMENT_MAX_PAGE_SIZE,
+        description="Page size",
+    ),
+    cursor: str | None = Query(default=None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+    expand: bool = Query(default=False, description="Return the full nested product and user"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -137,4 +308,13 @@ def filter_movements(
         type=movement_type,
         product_id=product_id,
     )
-    return movement_service.filter_movements(db, organization_id=current_user.organization_id, filters=filters)
+    movements, next_cursor = movement_service.filter_movements(
+        db,
+        organization_id=current_user.organization_id,
+        filters=filters,
+        limit=limit,
+        cursor=cursor,
+        expand=expand,
+    )
+    _set_next_cursor(response, next_cursor)
+    return movement_service.serialize_movements(movements, expand=expand)
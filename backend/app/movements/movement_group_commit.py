@@ -0,0 +1,300 @@
+"""Opt-in group commit for bursts of single stock movements.
+
+When ``MOVEMENT_GROUP_COMMIT`` is enabled, ``POST /movements`` hands each
+movement to a per-process worker instead of committing it on the request
+thread. The worker drains the queue every few milliseconds and writes each
+organization's pending movements in one transaction: the affected product
+rows are locked once, every movement is validated in arrival order against
+the running balance, and only the net stock delta per product is written.
+Each waiting request then receives its own movement id or its own error, so
+one rejected saída does not fail the rest of the group.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.audit import audit_service
+from app.audit.audit_model import ActionType, EntityType
+from app.database import SessionLocal
+from app.exceptions import (
+    InsufficientStockException,
+    MovementStillProcessingException,
+    ProductNotFoundException,
+)
+from app.products import product_repository
+from app.rollups import rollup_service
+from . import movement_model, movement_repository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingMovement:
+    """A movement waiting for the next group commit."""
+
+    movement: movement_model.MovementCreate
+    organization_id: int
+    created_by_user_id: int | None
+    future: Future = field(default_factory=Future)
+
+
+class MovementGroupCommitter:
+    """
+    Coalesce concurrent movement requests into few transactions.
+
+    Args:
+        session_factory: Callable returning a new database session.
+        window_ms: How long the worker keeps collecting after the first request.
+        max_size: Maximum number of movements written in one transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        window_ms: float = constants.MOVEMENT_GROUP_COMMIT_WINDOW_MS,
+        max_size: int = constants.MOVEMENT_GROUP_COMMIT_MAX_SIZE,
+    ):
+        self._session_factory = session_factory
+        self._window = window_ms / 1000
+        self._max_size = max_size
+        self._queue: queue.Queue[_PendingMovement | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        movement: movement_model.MovementCreate,
+        organization_id: int,
+        *,
+        created_by_user_id: int | None = None,
+        timeout: float | None = constants.MOVEMENT_GROUP_COMMIT_TIMEOUT_SECONDS,
+    ) -> int:
+        """
+        Queue a movement and block until its group has been committed.
+
+        A timeout only stops the wait: the movement stays queued and is still
+        written (or rejected) by the worker afterwards, so the client must
+        check before resubmitting it without an Idempotency-Key.
+
+        Args:
+            movement: Movement creation schema.
+            organization_id: ID of the organization.
+            created_by_user_id: ID of the user creating the movement.
+            timeout: Seconds to wait for the result.
+
+        Returns:
+            The id of the committed movement.
+
+        Raises:
+            HTTPException(404): If the product is not found.
+            HTTPException(400): If insufficient stock for outbound movement.
+            HTTPException(503): If the group was not committed within ``timeout``
+                (the write is not cancelled).
+        """
+        self._ensure_started()
+        pending = _PendingMovement(movement, organization_id, created_by_user_id)
+        self._queue.put(pending)
+        try:
+            return pending.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Movimentação do produto {movement.product_id} ainda na fila após {timeout}s")
+            raise MovementStillProcessingException()
+
+    def shutdown(self) -> None:
+        """Flush queued movements and stop the worker thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="movement-group-commit", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            group = [first]
+            stopping = False
+            deadline = time.monotonic() + self._window
+            while len(group) < self._max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+
+            by_organization: dict[int, list[_PendingMovement]] = defaultdict(list)
+            for item in group:
+                by_organization[item.organization_id].append(item)
+            for organization_id, items in by_organization.items():
+                self._flush(organization_id, items)
+            if stopping:
+                return
+
+    def _flush(self, organization_id: int, items: list[_PendingMovement]) -> None:
+        """Commit one organization's group, falling back to one commit per movement."""
+        try:
+            with self._session_factory() as db:
+                results = _apply_group(db, organization_id, items)
+        except Exception:
+            logger.exception("Group commit of %d movements failed; retrying individually", len(items))
+            for item in items:
+                self._apply_single(item)
+            return
+
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+    def _apply_single(self, item: _PendingMovement) -> None:
+        from . import movement_service  # circular: the service submits to this module
+
+        try:
+            with self._session_factory() as db:
+                db_movement = movement_service.create_movement(
+                    db,
+                    item.movement,
+                    organization_id=item.organization_id,
+                    created_by_user_id=item.created_by_user_id,
+                )
+                item.future.set_result(db_movement.id)
+        except Exception as exc:
+            item.future.set_exception(exc)
+
+
+def _apply_group(
+    db: Session,
+    organization_id: int,
+    items: list[_PendingMovement],
+) -> list[int | Exception]:
+    """
+    Write a group of movements for one organization in a single transaction.
+
+    Args:
+        db: Database session (without an active transaction).
+        organization_id: ID of the organization.
+        items: Pending movements, in arrival order.
+
+    Returns:
+        One entry per item: the new movement id or the exception rejecting it.
+    """
+    results: list[int | Exception] = [None] * len(items)
+    with db.begin():
+        locked = {
+            row.id: row
+            for row in product_repository.lock_products(
+                db, [item.movement.product_id for item in items], organization_id
+            )
+        }
+        balances = {product_id: row.quantity for product_id, row in locked.items()}
+
+        accepted: dict[int | None, list[int]] = defaultdict(list)
+        for index, item in enumerate(items):
+            movement = item.movement
+            if movement.product_id not in locked:
+                results[index] = ProductNotFoundException(movement.product_id)
+                continue
+            if movement.type == movement_model.MovementType.SAIDA:
+                if balances[movement.product_id] < movement.quantity:
+                    results[index] = InsufficientStockException(
+                        product_name=locked[movement.product_id].name,
+                        available=balances[movement.product_id],
+                        requested=movement.quantity,
+                    )
+                    continue
+                balances[movement.product_id] -= movement.quantity
+            else:
+                balances[movement.product_id] += movement.quantity
+            accepted[item.created_by_user_id].append(index)
+
+        for product_id in sorted(balances):
+            delta = balances[product_id] - locked[product_id].quantity
+            if delta and product_repository.adjust_stock(db, product_id, organization_id, delta) is None:
+                # Only reachable where FOR UPDATE is not enforced (SQLite); the
+                # caller retries every movement with its own transaction.
+                raise InsufficientStockException(
+                    product_name=locked[product_id].name,
+                    available=locked[product_id].quantity,
+                    requested=-delta,
+                )
+
+        created = []
+        for user_id, indexes in accepted.items():
+            lines = [items[index].movement for index in indexes]
+            db_movements = movement_repository.create_movements_bulk(
+                db, lines, organization_id=organization_id, created_by_user_id=user_id
+            )
+            created += db_movements
+            audit_service.log_actions(
+                db=db,
+                user_id=user_id,
+                action=ActionType.CREATE,
+                entity_type=EntityType.MOVEMENT,
+                entries=[
+                    (
+                        db_movement.id,
+                        {
+                            "type": line.type.value,
+                            "product_id": line.product_id,
+                            "quantity": line.quantity,
+                            "reason": line.reason,
+                        },
+                    )
+                    for db_movement, line in zip(db_movements, lines)
+                ],
+                organization_id=organization_id,
+            )
+            for index, db_movement in zip(indexes, db_movements):
+                results[index] = db_movement.id
+        rollup_service.record_movements(db, created)
+    return results
+
+
+_committer: MovementGroupCommitter | None = None
+_committer_lock = threading.Lock()
+
+
+def get_committer() -> MovementGroupCommitter:
+    """Return the process-wide group committer, creating it on first use."""
+    global _committer
+    with _committer_lock:
+        if _committer is None:
+            _committer = MovementGroupCommitter()
+        return _committer
+
+
+def shutdown() -> None:
+    """Stop the process-wide group committer, if it was started."""
+    global _committer
+    with _committer_lock:
+        committer, _committer = _committer, None
+    if committer is not None:
+        committer.shutdown()
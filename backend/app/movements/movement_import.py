@@ -0,0 +1,244 @@
+"""Bulk import of historical movements from CSV or NDJSON files.
+
+Meant for migrating a tenant from a legacy system. Records are streamed from
+the file, validated and inserted in chunks of plain multi-row INSERTs, which
+bypass the per-movement write path (row locks, stock checks, rollups and
+audit). Once every row is in, each product's quantity is increased by the
+net of its imported movements with a single aggregate UPDATE, and the daily
+rollups and existing inventory snapshots of the imported range are rebuilt.
+
+The rows are written in one transaction, so an interrupted import leaves
+nothing behind and can simply be run again. Every imported movement shares
+one batch id.
+
+Record fields (CSV header or NDJSON keys):
+
+* ``product_id`` or ``sku``
+* ``type``: ``entrada`` or ``saida``
+* ``quantity``: positive integer
+* ``created_at``: ISO 8601 timestamp (UTC when no offset is given)
+* ``reason`` and ``note``: optional
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.archive import archive_service
+from app.audit import audit_service
+from app.audit.audit_model import ActionType, EntityType
+from app.exceptions import NegativeStockException, ValidationException
+from app.inventory import inventory_repository, inventory_service
+from app.products import product_repository
+from app.reconciliation import reconciliation_service
+from app.rollups import rollup_service
+from . import movement_model, movement_repository
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class MovementImport(NamedTuple):
+    """Outcome of a history import."""
+    batch_id: str
+    rows: int
+    products: int
+    first_day: date
+    last_day: date
+
+
+def read_csv(stream: TextIO) -> Iterator[dict]:
+    """Yield the records of a CSV file with a header row."""
+    yield from csv.DictReader(stream)
+
+
+def read_ndjson(stream: TextIO) -> Iterator[dict]:
+    """Yield the records of a newline-delimited JSON file, skipping blank lines."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_file(path: str | Path, file_format: str | None = None) -> Iterator[dict]:
+    """
+    Stream the records of an import file.
+
+    Args:
+        path: File to read.
+        file_format: ``csv`` or ``ndjson``; guessed from the extension when omitted.
+
+    Raises:
+        HTTPException(400): If the format cannot be determined.
+    """
+    path = Path(path)
+    file_format = file_format or FORMATS.get(path.suffix.lower())
+    if file_format not in ("csv", "ndjson"):
+        raise ValidationException(f"Formato de importação desconhecido para '{path.name}'; use csv ou ndjson")
+    with path.open(encoding="utf-8", newline="") as stream:
+        yield from (read_csv(stream) if file_format == "csv" else read_ndjson(stream))
+
+
+def _parse_created_at(value) -> datetime:
+    created_at = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).strip())
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at
+
+
+def _parse_record(
+    record: dict,
+    line: int,
+    skus: dict[str, int],
+    product_ids: set[int],
+    *,
+    not_before: datetime | None,
+    not_after: datetime,
+) -> dict:
+    """Validate one record and turn it into a ``movements`` row (without the shared columns)."""
+    try:
+        if record.get("product_id") not in (None, ""):
+            product_id = int(record["product_id"])
+            if product_id not in product_ids:
+                raise ValueError(f"produto {product_id} não pertence à organização")
+        else:
+            sku = str(record.get("sku") or "").strip().upper()
+            if sku not in skus:
+                raise ValueError(f"SKU '{sku}' não encontrado")
+            product_id = skus[sku]
+        movement_type = movement_model.MovementType(str(record["type"]).strip().lower())
+        quantity = int(record["quantity"])
+        if quantity <= 0:
+            raise ValueError("quantidade deve ser maior que zero")
+        created_at = _parse_created_at(record["created_at"])
+    except KeyError as exc:
+        raise ValidationException(f"Linha {line}: campo obrigatório ausente: {exc.args[0]}")
+    except ValueError as exc:
+        raise ValidationException(f"Linha {line}: {exc}")
+
+    if created_at > not_after:
+        raise ValidationException(f"Linha {line}: data no futuro ({created_at.isoformat()})")
+    if not_before is not None and created_at < not_before:
+        raise ValidationException(
+            f"Linha {line}: {created_at.date()} pertence a um mês já arquivado (histórico a partir de {not_before.date()})"
+        )
+    return {
+        "product_id": product_id,
+        "type": movement_type,
+        "quantity": quantity,
+        "reason": str(record["reason"])[:150] if record.get("reason") else None,
+        "note": record.get("note") or None,
+        "created_at": created_at,
+    }
+
+
+def _refresh_snapshots(db: Session, organization_id: int, first_day: date) -> int:
+    """Retake the existing inventory snapshots from ``first_day`` on; return rows written."""
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    if first_day > yesterday:
+        return 0
+    written = 0
+    for day in sorted(inventory_repository.snapshot_days(db, organization_id, first_day, yesterday)):
+        written += inventory_service.take_snapshots(db, day=day, organization_id=organization_id)
+    return written
+
+
+def import_movements(
+    db: Session,
+    records: Iterable[dict],
+    organization_id: int,
+    *,
+    created_by_user_id: int | None = None,
+    chunk_size: int = constants.MOVEMENT_IMPORT_CHUNK_SIZE,
+) -> MovementImport:
+    """
+    Import historical movements and recompute the affected stock.
+
+    Product quantities are increased by the net of the imported movements,
+    so products of a migrated tenant should start at quantity 0 (or at their
+    stock before the first imported movement).
+
+    Args:
+        db: Database session.
+        records: Parsed records, e.g. from ``read_file``.
+        organization_id: ID of the organization.
+        created_by_user_id: User recorded as the author of the movements.
+        chunk_size: Rows per INSERT.
+
+    Returns:
+        MovementImport with the batch id and the imported range.
+
+    Raises:
+        HTTPException(400): If a record is invalid, the file is empty or the
+            history leaves a product with negative stock. Nothing is imported.
+    """
+    batch_id = uuid.uuid4().hex
+    skus = product_repository.list_product_keys(db, organization_id)
+    product_ids = set(skus.values())
+    not_after = datetime.utcnow()
+    shared = {"organization_id": organization_id, "created_by_id": created_by_user_id, "batch_id": batch_id}
+
+    total = 0
+    first_at = last_at = None
+    transaction_ctx = db.begin_nested() if db.in_transaction() else db.begin()
+    with transaction_ctx:
+        # The rows stay invisible until commit; keep reconciliation behind them.
+        # The archival job locks the same ledger, so the archived range read
+        # below cannot move until this import ends.
+        reconciliation_service.hold_ledger(db, organization_id)
+        ledger_start = archive_service.ledger_start(db, organization_id)
+        not_before = datetime.combine(ledger_start, datetime.min.time()) if ledger_start else None
+        chunk: list[dict] = []
+        for line, record in enumerate(records, start=1):
+            row = _parse_record(record, line, skus, product_ids, not_before=not_before, not_after=not_after)
+            row.update(shared)
+            chunk.append(row)
+            first_at = min(first_at, row["created_at"]) if first_at else row["created_at"]
+            last_at = max(last_at, row["created_at"]) if last_at else row["created_at"]
+            if len(chunk) >= chunk_size:
+                movement_repository.insert_movement_rows(db, chunk)
+                total += len(chunk)
+                chunk = []
+        movement_repository.insert_movement_rows(db, chunk)
+        total += len(chunk)
+        if total == 0:
+            raise ValidationException("Arquivo de importação sem movimentações")
+
+        products = movement_repository.apply_batch_net(db, organization_id, batch_id)
+        negative = movement_repository.first_negative_in_batch(db, organization_id, batch_id)
+        if negative is not None:
+            raise NegativeStockException(negative.name)
+
+        audit_service.log_action(
+            db=db,
+            user_id=created_by_user_id,
+            action=ActionType.CREATE,
+            entity_type=EntityType.MOVEMENT,
+            details={
+                "import": True,
+                "batch_id": batch_id,
+                "rows": total,
+                "products": products,
+                "first_day": first_at.date().isoformat(),
+                "last_day": last_at.date().isoformat(),
+            },
+            organization_id=organization_id,
+        )
+    db.commit()
+
+    # Derived data is rebuilt after the commit; each step commits on its own
+    # and can be re-run with the rebuild scripts if interrupted.
+    archive_service.ensure_partitions(db)
+    rollup_service.rebuild_rollups(
+        db, organization_id=organization_id, start_day=first_at.date(), end_day=last_at.date()
+    )
+    _refresh_snapshots(db, organization_id, first_at.date())
+    return MovementImport(
+        batch_id=batch_id, rows=total, products=products, first_day=first_at.date(), last_day=last_at.date()
+    )
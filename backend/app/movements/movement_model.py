@@ -4,12 +4,13 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import Column, DateTime, Enum as SqlEnum, ForeignKey, Integer, String, Text
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import Column, DateTime, Enum as SqlEnum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
+from app import constants
 from app.database import Base
 from app.products.product_model import ProductPublic
 from app.users.user_model import UserPublic
@@ -24,6 +25,22 @@ class Movement(Base):
     """SQLAlchemy model for the movements table."""
 
     __tablename__ = "movements"
+    __table_args__ = (
+        # Time-window analytics: WHERE organization_id = ? AND type = 'saida' AND created_at BETWEEN ...
+        Index("ix_movements_org_type_created_at", "organization_id", "type", "created_at"),
+        # Per-product consumption aggregates; INCLUDE makes it covering on PostgreSQL.
+        Index(
+            "ix_movements_org_product_created_at",
+            "organization_id",
+            "product_id",
+            "created_at",
+            postgresql_include=["quantity"],
+        ),
+        # Keyset pagination on (created_at DESC, id DESC) within an organization.
+        Index("ix_movements_org_created_at_id", "organization_id", "created_at", "id"),
+        # Reconciliation scans the ledger in keyset chunks of ids per organization.
+        Index("ix_movements_org_id", "organization_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
@@ -34,6 +51,9 @@ class Movement(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    batch_id = Column(String(32), nullable=True, index=True)  # Set for lines posted via /movements/batch
+    # Set on reverse movements. No foreign key: the original may be archived out of this table.
+    reverted_movement_id = Column(Integer, nullable=True)
 
     product = relationship("Product", back_populates="movements", lazy="joined")
     created_by = relationship("User", back_populates="movements", lazy="joined")
@@ -47,6 +67,35 @@ class MovementCreate(BaseModel):
     note: Optional[str] = Field(default=None, description="Observações adicionais")
 
 
+class MovementBatchCreate(BaseModel):
+    lines: List[MovementCreate] = Field(
+        min_length=1,
+        max_length=constants.MOVEMENT_BATCH_MAX_LINES,
+        description="Linhas do documento (entradas e/ou saídas)",
+    )
+
+
+class MovementBulkRevert(BaseModel):
+    movement_ids: Optional[List[int]] = Field(
+        default=None,
+        min_length=1,
+        max_length=constants.MOVEMENT_REVERT_MAX_IDS,
+        description="IDs das movimentações a reverter",
+    )
+    batch_id: Optional[str] = Field(
+        default=None,
+        max_length=32,
+        description="Lote (documento) cujas movimentações serão revertidas",
+    )
+
+    @model_validator(mode='after')
+    def validate_target(self):
+        """Exige exatamente um alvo: a lista de IDs ou o lote."""
+        if (self.movement_ids is None) == (self.batch_id is None):
+            raise ValueError("Informe movement_ids ou batch_id (apenas um)")
+        return self
+
+
 class MovementFilter(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
@@ -64,5 +113,44 @@ class MovementPublic(BaseModel):
     reason: Optional[str] = None
     note: Optional[str] = None
     created_at: datetime
+    batch_id: Optional[str] = None
+    reverted_movement_id: Optional[int] = None
     product: ProductPublic
     created_by: Optional[UserPublic] = None
+
+
+class MovementProductRef(BaseModel):
+    """Minimal product reference embedded in compact movement rows."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    sku: str
+
+
+class MovementUserRef(BaseModel):
+    """Minimal creator reference; avatars are served by ``GET /users/{id}/avatar``."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    full_name: Optional[str] = None
+
+
+class MovementSummary(BaseModel):
+    """Compact movement representation used by list endpoints."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    product_id: int
+    type: MovementType
+    quantity: int
+    reason: Optional[str] = None
+    note: Optional[str] = None
+    created_at: datetime
+    batch_id: Optional[str] = None
+    reverted_movement_id: Optional[int] = None
+    product: MovementProductRef
+    created_by: Optional[MovementUserRef] = None
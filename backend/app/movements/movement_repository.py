@@ -2,22 +2,42 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List
 
-from sqlalchemy import and_, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, joinedload, lazyload
 
 from app.products.product_model import Product
+from app.users.user_model import User
 
 from . import movement_model
 
 
+def _load_options(expand: bool) -> list:
+    """Return loader options for the full or compact movement representation."""
+    if expand:
+        return [
+            joinedload(movement_model.Movement.product).joinedload(Product.category),
+            joinedload(movement_model.Movement.created_by),
+        ]
+    # Compact rows only need a few product/user columns; skip the category join
+    # and the user's profile image payload entirely.
+    return [
+        joinedload(movement_model.Movement.product)
+        .load_only(Product.id, Product.name, Product.sku)
+        .options(lazyload(Product.category)),
+        joinedload(movement_model.Movement.created_by).load_only(User.id, User.full_name),
+    ]
+
+
 def create_movement(
     db: Session,
     movement: movement_model.MovementCreate,
     organization_id: int,
     *,
     created_by_user_id: int | None = None,
+    reverted_movement_id: int | None = None,
 ) -> movement_model.Movement:
     """Persist a movement record."""
     db_movement = movement_model.Movement(
@@ -28,57 +48,274 @@ def create_movement(
         note=movement.note,
         created_by_id=created_by_user_id,
         organization_id=organization_id,
+        reverted_movement_id=reverted_movement_id,
     )
-    print("Creating movement:", db_movement)
     db.add(db_movement)
     db.flush()
-    db.refresh(db_movement)
     return db_movement
 
 
-def list_movements(db: Session, organization_id: int) -> List[movement_model.Movement]:
-    """Return all movements ordered by creation date for an organization."""
-    return (
-        db.query(movement_model.Movement)
-        .options(joinedload(movement_model.Movement.product).joinedload(Product.category))
-        .options(joinedload(movement_model.Movement.created_by))
-        .filter(movement_model.Movement.organization_id == organization_id)
-        .order_by(movement_model.Movement.created_at.desc())
-        .all()
+def create_movements_bulk(
+    db: Session,
+    lines: list[movement_model.MovementCreate],
+    organization_id: int,
+    *,
+    created_by_user_id: int | None = None,
+    batch_id: str | None = None,
+) -> list[movement_model.Movement]:
+    """Persist many movement records with a single batched INSERT."""
+    db_movements = [
+        movement_model.Movement(
+            product_id=line.product_id,
+            type=line.type,
+            quantity=line.quantity,
+            reason=line.reason,
+            note=line.note,
+            created_by_id=created_by_user_id,
+            organization_id=organization_id,
+            batch_id=batch_id,
+        )
+        for line in lines
+    ]
+    db.add_all(db_movements)
+    db.flush()
+    return db_movements
+
+
+def get_movements_by_ids(
+    db: Session,
+    movement_ids: list[int],
+    organization_id: int,
+    *,
+    expand: bool = False,
+) -> List[movement_model.Movement]:
+    """Return the given movements in one query, ordered by id."""
+    return db.execute(
+        select(movement_model.Movement)
+        .options(*_load_options(expand))
+        .where(
+            movement_model.Movement.id.in_(movement_ids),
+            movement_model.Movement.organization_id == organization_id,
+        )
+        .order_by(movement_model.Movement.id)
+    ).scalars().all()
+
+
+def revert_conditions(
+    organization_id: int,
+    *,
+    movement_ids: list[int] | None = None,
+    batch_id: str | None = None,
+) -> list:
+    """Select the movements of a bulk revert: explicit ids or every line of a batch."""
+    conditions = [movement_model.Movement.organization_id == organization_id]
+    if movement_ids is not None:
+        conditions.append(movement_model.Movement.id.in_(movement_ids))
+    else:
+        conditions.append(movement_model.Movement.batch_id == batch_id)
+    return conditions
+
+
+def list_movement_ids(db: Session, conditions: list, *, limit: int | None = None) -> list[int]:
+    """Return the ids of the movements matching ``conditions``, ascending."""
+    return list(
+        db.scalars(
+            select(movement_model.Movement.id)
+            .where(*conditions)
+            .order_by(movement_model.Movement.id)
+            .limit(limit)
+        )
     )
 
 
-def list_recent_movements(db: Session, organization_id: int, limit: int = 50) -> List[movement_model.Movement]:
-    """Return the latest movements limited by the provided size for an organization."""
-    return (
-        db.query(movement_model.Movement)
-        .options(joinedload(movement_model.Movement.product).joinedload(Product.category))
-        .options(joinedload(movement_model.Movement.created_by))
-        .filter(movement_model.Movement.organization_id == organization_id)
-        .order_by(movement_model.Movement.created_at.desc())
-        .limit(limit)
-        .all()
+def inverse_deltas(db: Session, conditions: list) -> dict[int, int]:
+    """Return, per product, the stock change that undoes the matching movements."""
+    movement = movement_model.Movement
+    inverse = case((movement.type == movement_model.MovementType.ENTRADA, -movement.quantity), else_=movement.quantity)
+    return dict(
+        db.execute(select(movement.product_id, func.sum(inverse)).where(*conditions).group_by(movement.product_id)).all()
     )
 
 
-def filter_movements(
+REVERT_NOTE_PREFIX = "Revert of movement "
+
+
+def insert_inverse_movements(
     db: Session,
+    conditions: list,
     organization_id: int,
-    filters: movement_model.MovementFilter,
     *,
-    limit: int | None = None,
-    offset: int | None = None,
-):
-    """Filter movements by date, type, and product for an organization."""
+    created_by_user_id: int | None,
+    batch_id: str,
+    created_at: datetime,
+) -> int:
+    """Insert the reverse of every matching movement with one ``INSERT ... SELECT``.
+
+    Each reverse movement records its original in ``reverted_movement_id``;
+    the ids assigned to the inserted rows do not follow the source order.
+
+    Returns:
+        Number of movements inserted.
+    """
+    movement = movement_model.Movement
+    movement_type = movement.type.type
+    inverse_type = case(
+        (
+            movement.type == movement_model.MovementType.ENTRADA,
+            literal(movement_model.MovementType.SAIDA, movement_type),
+        ),
+        else_=literal(movement_model.MovementType.ENTRADA, movement_type),
+    )
+    source = (
+        select(
+            movement.product_id,
+            inverse_type,
+            movement.quantity,
+            literal("revert"),
+            literal(REVERT_NOTE_PREFIX).concat(movement.id),
+            literal(created_by_user_id, movement.created_by_id.type),
+            literal(organization_id),
+            literal(batch_id),
+            literal(created_at, movement.created_at.type),
+            movement.id,
+        )
+        .where(*conditions)
+        .order_by(movement.id)
+    )
+    return db.execute(
+        insert(movement).from_select(
+            [
+                "product_id",
+                "type",
+                "quantity",
+                "reason",
+                "note",
+                "created_by_id",
+                "organization_id",
+                "batch_id",
+                "created_at",
+                "reverted_movement_id",
+            ],
+            source,
+        )
+    ).rowcount
+
+
+def list_batch_movements(db: Session, organization_id: int, batch_id: str) -> List[movement_model.Movement]:
+    """Return every movement of a batch, ordered by id, without relationships."""
+    return db.execute(
+        select(movement_model.Movement)
+        .options(lazyload("*"))
+        .where(
+            movement_model.Movement.organization_id == organization_id,
+            movement_model.Movement.batch_id == batch_id,
+        )
+        .order_by(movement_model.Movement.id)
+    ).scalars().all()
+
+
+def insert_movement_rows(db: Session, rows: list[dict]) -> None:
+    """Insert plain movement rows with one executemany (batched multi-row VALUES)."""
+    if rows:
+        db.execute(insert(movement_model.Movement), rows)
+
+
+def apply_batch_net(db: Session, organization_id: int, batch_id: str) -> int:
+    """Add the signed total of a batch's movements to each product's quantity.
+
+    A single ``UPDATE`` with a correlated aggregate, so the batch is read once
+    per product through the ``batch_id`` index.
+
+    Returns:
+        Number of products updated.
+    """
+    movement = movement_model.Movement
+    signed = case((movement.type == movement_model.MovementType.ENTRADA, movement.quantity), else_=-movement.quantity)
+    in_batch = and_(movement.organization_id == organization_id, movement.batch_id == batch_id)
+    net = (
+        select(func.sum(signed))
+        .where(in_batch, movement.product_id == Product.id)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(Product)
+        .where(Product.organization_id == organization_id, Product.id.in_(select(movement.product_id).where(in_batch)))
+        .values(quantity=Product.quantity + net)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def first_negative_in_batch(db: Session, organization_id: int, batch_id: str):
+    """Return (name, quantity) of a product of the batch left with negative stock, or None."""
+    movement = movement_model.Movement
+    return db.execute(
+        select(Product.name, Product.quantity)
+        .where(
+            Product.organization_id == organization_id,
+            Product.quantity < 0,
+            Product.id.in_(
+                select(movement.product_id).where(
+                    movement.organization_id == organization_id, movement.batch_id == batch_id
+                )
+            ),
+        )
+        .order_by(Product.id)
+        .limit(1)
+    ).first()
+
+
+def _keyset_order(query, after: tuple[datetime, int] | None):
+    """Order by (created_at DESC, id DESC) and seek past the ``after`` key."""
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.where(
+            or_(
+                movement_model.Movement.created_at < after_created_at,
+                and_(
+                    movement_model.Movement.created_at == after_created_at,
+                    movement_model.Movement.id < after_id,
+                ),
+            )
+        )
+    return query.order_by(
+        movement_model.Movement.created_at.desc(),
+        movement_model.Movement.id.desc(),
+    )
+
+
+def list_movements(
+    db: Session,
+    organization_id: int,
+    *,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+    expand: bool = False,
+) -> List[movement_model.Movement]:
+    """Return a page of movements, newest first, for an organization."""
     query = (
         select(movement_model.Movement)
-        .options(joinedload(movement_model.Movement.product).joinedload(Product.category))
-        .options(joinedload(movement_model.Movement.created_by))
-        .filter(movement_model.Movement.organization_id == organization_id)
-        .order_by(movement_model.Movement.created_at.desc())
+        .options(*_load_options(expand))
+        .where(movement_model.Movement.organization_id == organization_id)
     )
+    query = _keyset_order(query, after).limit(limit)
+    return db.execute(query).scalars().all()
 
-    conditions = []
+
+def list_recent_movements(
+    db: Session,
+    organization_id: int,
+    limit: int = 50,
+    *,
+    after: tuple[datetime, int] | None = None,
+    expand: bool = False,
+) -> List[movement_model.Movement]:
+    """Return the latest movements limited by the provided size for an organization."""
+    return list_movements(db, organization_id, limit=limit, after=after, expand=expand)
+
+
+def _filter_conditions(organization_id: int, filters: movement_model.MovementFilter) -> list:
+    """Translate a MovementFilter into WHERE conditions."""
+    conditions = [movement_model.Movement.organization_id == organization_id]
     if filters.start_date:
         conditions.append(movement_model.Movement.created_at >= filters.start_date)
     if filters.end_date:
@@ -87,14 +324,41 @@ def filter_movements(
         conditions.append(movement_model.Movement.type == filters.type)
     if filters.product_id:
         conditions.append(movement_model.Movement.product_id == filters.product_id)
+    return conditions
+
+
+def count_movements(db: Session, organization_id: int, filters: movement_model.MovementFilter) -> int:
+    """Count the movements matching a filter for an organization."""
+    return db.scalar(
+        select(func.count(movement_model.Movement.id)).where(*_filter_conditions(organization_id, filters))
+    )
+
 
-    if conditions:
-        query = query.where(and_(*conditions))
+def filter_movements(
+    db: Session,
+    organization_id: int,
+    filters: movement_model.MovementFilter,
+    *,
+    limit: int,
+    offset: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    expand: bool = False,
+):
+    """Filter movements by date, type, and product for an organization.
+
+    Pages are addressed by ``after`` (keyset); ``offset`` is only honoured when
+    no cursor is given and is expected to be bounded by the caller.
+    """
+    query = (
+        select(movement_model.Movement)
+        .options(*_load_options(expand))
+        .where(*_filter_conditions(organization_id, filters))
+    )
 
-    if offset:
+    query = _keyset_order(query, after)
+    if offset and after is None:
         query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
+    query = query.limit(limit)
 
     return db.execute(query).scalars().all()
 
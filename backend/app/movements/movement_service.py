@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import uuid
 from contextlib import nullcontext
+from datetime import datetime
 
 from sqlalchemy.orm import Session
 
 from app import constants
+from app.archive import archive_service
 from app.audit import audit_service
 from app.audit.audit_model import ActionType, EntityType
-from app.exceptions import ProductNotFoundException, InsufficientStockException, NotFoundException
+from app.config import get_settings
+from app.exceptions import (
+    InsufficientStockException,
+    NotFoundException,
+    ProductNotFoundException,
+    ValidationException,
+)
 from app.products import product_repository
-from . import movement_model, movement_repository
+from app.rollups import rollup_service
+from app.utils.pagination import decode_cursor, encode_cursor
+from . import movement_group_commit, movement_model, movement_repository
 
 
 def create_movement(
@@ -21,6 +32,8 @@ def create_movement(
     *,
     created_by_user_id: int | None = None,
     manage_transaction: bool = True,
+    commit: bool = True,
+    reverted_movement_id: int | None = None,
 ) -> movement_model.Movement:
     """
     Register a new stock movement and update product quantity.
@@ -34,6 +47,8 @@ def create_movement(
         organization_id: ID of the organization.
         created_by_user_id: ID of the user creating the movement.
         manage_transaction: If True, manages the database transaction.
+        commit: If False, the caller commits (e.g. with its idempotency record).
+        reverted_movement_id: ID of the movement this one reverses, if any.
 
     Returns:
         The created Movement ORM instance.
@@ -51,67 +66,330 @@ def create_movement(
     else:
         transaction_ctx = nullcontext()
     with transaction_ctx:
-        product = product_repository.get_product_by_id(db, product_id=movement.product_id, organization_id=organization_id)
-        if product is None:
-            raise ProductNotFoundException(movement.product_id)
-
-        # NOTE: When using PostgreSQL, consider issuing a SELECT ... FOR UPDATE here to lock the product row.
-
-        if movement.type == movement_model.MovementType.SAIDA:
-            if product.quantity < movement.quantity:
-                raise InsufficientStockException(
-                    product_name=product.name,
-                    available=product.quantity,
-                    requested=movement.quantity
-                )
-            product.quantity -= movement.quantity
-        else:
-            product.quantity += movement.quantity
+        delta = movement.quantity if movement.type == movement_model.MovementType.ENTRADA else -movement.quantity
+        # Single conditional UPDATE: the stock check and the write happen under
+        # the same row lock, so concurrent saídas cannot oversell.
+        new_quantity = product_repository.adjust_stock(
+            db, product_id=movement.product_id, organization_id=organization_id, delta=delta
+        )
+        if new_quantity is None:
+            current = product_repository.get_stock_level(
+                db, product_id=movement.product_id, organization_id=organization_id
+            )
+            if current is None:
+                raise ProductNotFoundException(movement.product_id)
+            raise InsufficientStockException(
+                product_name=current.name,
+                available=current.quantity,
+                requested=movement.quantity
+            )
 
         db_movement = movement_repository.create_movement(
             db,
             movement,
             organization_id=organization_id,
             created_by_user_id=created_by_user_id,
+            reverted_movement_id=reverted_movement_id,
         )
+        rollup_service.record_movements(db, [db_movement])
         
         # Log audit
+        details = {
+            "type": movement.type.value,
+            "product_id": movement.product_id,
+            "quantity": movement.quantity,
+            "reason": movement.reason
+        }
+        if reverted_movement_id is not None:
+            details["reverted_movement_id"] = reverted_movement_id
         audit_service.log_action(
             db=db,
             user_id=created_by_user_id,
             action=ActionType.CREATE,
             entity_type=EntityType.MOVEMENT,
             entity_id=db_movement.id,
-            details={
-                "type": movement.type.value,
-                "product_id": movement.product_id,
-                "quantity": movement.quantity,
-                "reason": movement.reason
-            },
+            details=details,
             organization_id=organization_id,
         )
 
     # Commit the transaction to persist the movement and product update
-    db.commit()
-    db.refresh(product)
+    if commit:
+        db.commit()
     return db_movement
 
 
-def list_movements(db: Session, organization_id: int) -> list[movement_model.Movement]:
+def submit_movement(
+    db: Session,
+    movement: movement_model.MovementCreate,
+    organization_id: int,
+    *,
+    created_by_user_id: int | None = None,
+    commit: bool = True,
+) -> movement_model.Movement:
     """
-    List all stock movements for an organization.
+    Register a movement, through the group committer when it is enabled.
+
+    With ``MOVEMENT_GROUP_COMMIT`` enabled, the movement is written by the
+    process-wide group committer together with other concurrent requests and
+    then loaded with ``db``; otherwise this is ``create_movement``. Without
+    ``commit`` the group committer is bypassed, since its transaction could
+    not include the caller's other writes.
 
     Args:
         db: Database session.
+        movement: Movement creation schema.
         organization_id: ID of the organization.
+        created_by_user_id: ID of the user creating the movement.
+        commit: If False, the movement is left uncommitted in ``db`` for the caller to commit.
 
     Returns:
-        List of all Movement ORM instances.
+        The created Movement ORM instance.
+
+    Raises:
+        HTTPException(404): If the product is not found.
+        HTTPException(400): If insufficient stock for outbound movement.
     """
-    return movement_repository.list_movements(db, organization_id=organization_id)
+    if not commit or not get_settings().movement_group_commit:
+        return create_movement(
+            db, movement, organization_id=organization_id, created_by_user_id=created_by_user_id, commit=commit
+        )
 
+    movement_id = movement_group_commit.get_committer().submit(
+        movement, organization_id, created_by_user_id=created_by_user_id
+    )
+    return get_movement(db, movement_id, organization_id=organization_id)
 
-def list_recent_movements(db: Session, organization_id: int, limit: int = constants.DEFAULT_PAGE_SIZE) -> list[movement_model.Movement]:
+
+def create_movements_batch(
+    db: Session,
+    batch: movement_model.MovementBatchCreate,
+    organization_id: int,
+    *,
+    created_by_user_id: int | None = None,
+    commit: bool = True,
+) -> list[movement_model.Movement]:
+    """
+    Register every line of a stock document in a single transaction.
+
+    All affected product rows are locked in ascending id order, every line is
+    validated against the running balance of its product before anything is
+    written, and then stock deltas, movements and audit entries are written in
+    bulk. The batch is all-or-nothing.
+
+    Args:
+        db: Database session.
+        batch: Lines of the document.
+        organization_id: ID of the organization.
+        created_by_user_id: ID of the user creating the movements.
+        commit: If False, the caller commits (e.g. with its idempotency record).
+
+    Returns:
+        The created Movement ORM instances, in line order.
+
+    Raises:
+        HTTPException(404): If any product is not found.
+        HTTPException(400): If any outbound line exceeds the available stock.
+    """
+    batch_id = uuid.uuid4().hex
+    product_ids = [line.product_id for line in batch.lines]
+
+    transaction_ctx = db.begin_nested() if db.in_transaction() else db.begin()
+    with transaction_ctx:
+        locked = {row.id: row for row in product_repository.lock_products(db, product_ids, organization_id)}
+        for product_id in product_ids:
+            if product_id not in locked:
+                raise ProductNotFoundException(product_id)
+
+        # Validate every line in document order against the running balance.
+        balances = {product_id: row.quantity for product_id, row in locked.items()}
+        for line in batch.lines:
+            if line.type == movement_model.MovementType.SAIDA:
+                if balances[line.product_id] < line.quantity:
+                    raise InsufficientStockException(
+                        product_name=locked[line.product_id].name,
+                        available=balances[line.product_id],
+                        requested=line.quantity,
+                    )
+                balances[line.product_id] -= line.quantity
+            else:
+                balances[line.product_id] += line.quantity
+
+        for product_id in sorted(balances):
+            delta = balances[product_id] - locked[product_id].quantity
+            if delta == 0:
+                continue
+            if product_repository.adjust_stock(db, product_id, organization_id, delta) is None:
+                # Only reachable where FOR UPDATE is not enforced (SQLite).
+                raise InsufficientStockException(
+                    product_name=locked[product_id].name,
+                    available=locked[product_id].quantity,
+                    requested=-delta,
+                )
+
+        db_movements = movement_repository.create_movements_bulk(
+            db,
+            batch.lines,
+            organization_id=organization_id,
+            created_by_user_id=created_by_user_id,
+            batch_id=batch_id,
+        )
+        rollup_service.record_movements(db, db_movements)
+
+        audit_service.log_actions(
+            db=db,
+            user_id=created_by_user_id,
+            action=ActionType.CREATE,
+            entity_type=EntityType.MOVEMENT,
+            entries=[
+                (
+                    db_movement.id,
+                    {
+                        "type": line.type.value,
+                        "product_id": line.product_id,
+                        "quantity": line.quantity,
+                        "reason": line.reason,
+                        "batch_id": batch_id,
+                    },
+                )
+                for db_movement, line in zip(db_movements, batch.lines)
+            ],
+            organization_id=organization_id,
+        )
+
+    if commit:
+        db.commit()
+    return db_movements
+
+
+def serialize_movements(
+    movements: list[movement_model.Movement],
+    *,
+    expand: bool = False,
+) -> list[movement_model.MovementSummary] | list[movement_model.MovementPublic]:
+    """
+    Convert Movement ORM instances into their public representation.
+
+    Args:
+        movements: Movements loaded with the matching ``expand`` flag.
+        expand: If True, returns the rich form with nested product and user.
+
+    Returns:
+        List of MovementPublic (expanded) or MovementSummary (compact) schemas.
+    """
+    schema = movement_model.MovementPublic if expand else movement_model.MovementSummary
+    return [schema.model_validate(movement) for movement in movements]
+
+
+def _page(
+    movements: list[movement_model.Movement],
+    limit: int,
+) -> tuple[list[movement_model.Movement], str | None]:
+    """Trim the look-ahead row fetched by the repository and build the next cursor."""
+    if len(movements) <= limit:
+        return list(movements), None
+    page = list(movements[:limit])
+    last = page[-1]
+    return page, encode_cursor(last.created_at, last.id)
+
+
+def _tiered_page(
+    db: Session,
+    organization_id: int,
+    filters: movement_model.MovementFilter,
+    *,
+    limit: int,
+    offset: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    expand: bool = False,
+) -> tuple[list[movement_model.Movement], str | None]:
+    """
+    Read a page from the hot months, continuing into archived months if needed.
+
+    The hot query is always bounded below by the hot horizon, so it only
+    touches recent partitions; older tiers are read only when the page is not
+    filled and the filter reaches back past the horizon.
+    """
+    horizon = archive_service.hot_horizon()
+    wanted = limit + 1
+    reads_hot = (filters.end_date is None or filters.end_date >= horizon) and (
+        after is None or after[0] >= horizon
+    )
+    movements = []
+    if reads_hot:
+        hot_filters = filters.model_copy(update={"start_date": max(filters.start_date or horizon, horizon)})
+        movements = movement_repository.filter_movements(
+            db,
+            organization_id=organization_id,
+            filters=hot_filters,
+            limit=wanted,
+            offset=offset,
+            after=after,
+            expand=expand,
+        )
+
+    if len(movements) < wanted and (filters.start_date is None or filters.start_date < horizon):
+        skip = 0
+        if offset and after is None and not movements:
+            # The offset ran past every hot row; skip the remainder in older tiers.
+            hot_total = movement_repository.count_movements(db, organization_id, hot_filters) if reads_hot else 0
+            skip = max(0, offset - hot_total)
+        movements = list(movements) + archive_service.read_archived(
+            db,
+            organization_id,
+            filters,
+            before=horizon,
+            limit=wanted - len(movements),
+            offset=skip,
+            after=after,
+            expand=expand,
+        )
+    return _page(movements, limit)
+
+
+def _page_size(limit: int) -> int:
+    """Clamp a requested page size to the hard cap."""
+    return max(1, min(limit, constants.MOVEMENT_MAX_PAGE_SIZE))
+
+
+def list_movements(
+    db: Session,
+    organization_id: int,
+    *,
+    limit: int = constants.MOVEMENT_PAGE_SIZE,
+    cursor: str | None = None,
+    expand: bool = False,
+) -> tuple[list[movement_model.Movement], str | None]:
+    """
+    List a page of stock movements for an organization, newest first.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        limit: Page size (capped at MOVEMENT_MAX_PAGE_SIZE).
+        cursor: Opaque cursor returned by the previous page.
+        expand: If True, eager-loads full product and user relationships.
+
+    Returns:
+        Tuple of (Movement ORM instances, cursor for the next page or None).
+
+    Raises:
+        HTTPException(400): If the cursor is malformed.
+    """
+    limit = _page_size(limit)
+    after = decode_cursor(cursor) if cursor else None
+    return _tiered_page(
+        db, organization_id, movement_model.MovementFilter(), limit=limit, after=after, expand=expand
+    )
+
+
+def list_recent_movements(
+    db: Session,
+    organization_id: int,
+    limit: int = constants.DEFAULT_PAGE_SIZE,
+    *,
+    cursor: str | None = None,
+    expand: bool = False,
+) -> tuple[list[movement_model.Movement], str | None]:
     """
     List the most recent stock movements for an organization.
 
@@ -119,11 +397,13 @@ def list_recent_movements(db: Session, organization_id: int, limit: int = consta
         db: Database session.
         organization_id: ID of the organization.
         limit: Maximum number of movements to return (default: 50).
+        cursor: Opaque cursor returned by the previous page.
+        expand: If True, eager-loads full product and user relationships.
 
     Returns:
-        List of recent Movement ORM instances.
+        Tuple of (recent Movement ORM instances, cursor for the next page or None).
     """
-    return movement_repository.list_recent_movements(db, organization_id=organization_id, limit=limit)
+    return list_movements(db, organization_id, limit=limit, cursor=cursor, expand=expand)
 
 
 def filter_movements(
@@ -131,9 +411,11 @@ def filter_movements(
     organization_id: int,
     filters: movement_model.MovementFilter,
     *,
-    limit: int | None = None,
+    limit: int = constants.MOVEMENT_PAGE_SIZE,
     offset: int | None = None,
-) -> list[movement_model.Movement]:
+    cursor: str | None = None,
+    expand: bool = False,
+) -> tuple[list[movement_model.Movement], str | None]:
     """
     Filter movements based on criteria for an organization.
 
@@ -141,13 +423,26 @@ def filter_movements(
         db: Database session.
         organization_id: ID of the organization.
         filters: Filter criteria (date range, type, product, etc.).
-        limit: Max results to return.
-        offset: Pagination offset.
+        limit: Page size (capped at MOVEMENT_MAX_PAGE_SIZE).
+        offset: Shallow pagination offset, ignored when a cursor is given.
+        cursor: Opaque cursor returned by the previous page.
+        expand: If True, eager-loads full product and user relationships.
 
     Returns:
-        List of filtered Movement ORM instances.
+        Tuple of (filtered Movement ORM instances, cursor for the next page or None).
+
+    Raises:
+        HTTPException(400): If the cursor is malformed or the offset too deep.
     """
-    return movement_repository.filter_movements(db, organization_id=organization_id, filters=filters, limit=limit, offset=offset)
+    if offset and offset > constants.MOVEMENT_MAX_OFFSET:
+        raise ValidationException(
+            f"Offset máximo é {constants.MOVEMENT_MAX_OFFSET}; use o cursor para páginas mais profundas"
+        )
+    limit = _page_size(limit)
+    after = decode_cursor(cursor) if cursor else None
+    return _tiered_page(
+        db, organization_id, filters, limit=limit, offset=offset, after=after, expand=expand
+    )
 
 
 def get_movement(db: Session, movement_id: int, organization_id: int) -> movement_model.Movement:
@@ -171,12 +466,35 @@ def get_movement(db: Session, movement_id: int, organization_id: int) -> movemen
     return db_movement
 
 
+def get_movements(
+    db: Session,
+    movement_ids: list[int],
+    organization_id: int,
+    *,
+    expand: bool = False,
+) -> list[movement_model.Movement]:
+    """
+    Retrieve several movements by ID in a single query.
+
+    Args:
+        db: Database session.
+        movement_ids: IDs of the movements.
+        organization_id: ID of the organization.
+        expand: If True, eager-loads full product and user relationships.
+
+    Returns:
+        List of Movement ORM instances ordered by ID.
+    """
+    return movement_repository.get_movements_by_ids(db, movement_ids, organization_id, expand=expand)
+
+
 def revert_movement(
     db: Session,
     movement_id: int,
     organization_id: int,
     *,
     created_by_user_id: int,
+    commit: bool = True,
 ) -> movement_model.Movement:
     """
     Create a reverse movement to undo a previous stock action.
@@ -189,6 +507,7 @@ def revert_movement(
         movement_id: ID of the movement to revert.
         organization_id: ID of the organization.
         created_by_user_id: ID of the user performing the reversion.
+        commit: If False, the caller commits (e.g. with its idempotency record).
 
     Returns:
         The newly created reverse Movement ORM instance.
@@ -210,7 +529,7 @@ def revert_movement(
         type=inverse_type,
         quantity=original.quantity,
         reason="revert",
-        note=f"Revert of movement {original.id}",
+        note=f"{movement_repository.REVERT_NOTE_PREFIX}{original.id}",
     )
 
     return create_movement(
@@ -218,4 +537,123 @@ def revert_movement(
         reverse_payload,
         organization_id=organization_id,
         created_by_user_id=created_by_user_id,
+        commit=commit,
+        reverted_movement_id=original.id,
     )
+
+
+def revert_movements(
+    db: Session,
+    revert: movement_model.MovementBulkRevert,
+    organization_id: int,
+    *,
+    created_by_user_id: int,
+    commit: bool = True,
+) -> list[movement_model.Movement]:
+    """
+    Reverse many movements at once: a list of ids or every line of a batch.
+
+    The net inverse delta per product is computed by one aggregate query,
+    every affected product is locked and checked against it in a single pass,
+    and then the stock deltas, the reverse movements (one ``INSERT ... SELECT``)
+    and their audit entries are written in one transaction. The reverse
+    movements share a new batch id, so the revert itself can be undone the
+    same way.
+
+    Args:
+        db: Database session.
+        revert: Movement ids or the batch id to revert.
+        organization_id: ID of the organization.
+        created_by_user_id: ID of the user performing the reversion.
+        commit: If False, the caller commits (e.g. with its idempotency record).
+
+    Returns:
+        The reverse Movement ORM instances, in the order of the originals.
+
+    Raises:
+        HTTPException(404): If any movement (or the batch) is not found.
+        HTTPException(400): If reverting would cause negative stock or the
+            batch has more than ``MOVEMENT_REVERT_MAX_IDS`` movements.
+    """
+    batch_id = uuid.uuid4().hex
+    conditions = movement_repository.revert_conditions(
+        organization_id, movement_ids=revert.movement_ids, batch_id=revert.batch_id
+    )
+
+    transaction_ctx = db.begin_nested() if db.in_transaction() else db.begin()
+    with transaction_ctx:
+        if revert.movement_ids is not None:
+            found = movement_repository.list_movement_ids(db, conditions)
+            missing = sorted(set(revert.movement_ids) - set(found))
+            if missing:
+                raise NotFoundException("Movement", missing[0])
+        else:
+            # A batch can be a whole history import; keep it under the same cap as explicit ids.
+            found = movement_repository.list_movement_ids(
+                db, conditions, limit=constants.MOVEMENT_REVERT_MAX_IDS + 1
+            )
+            if not found:
+                raise NotFoundException("Batch", revert.batch_id)
+            if len(found) > constants.MOVEMENT_REVERT_MAX_IDS:
+                raise ValidationException(
+                    f"O lote tem mais de {constants.MOVEMENT_REVERT_MAX_IDS} movimentações; "
+                    "reverta-o em partes, por IDs"
+                )
+
+        deltas = movement_repository.inverse_deltas(db, conditions)
+        locked = {row.id: row for row in product_repository.lock_products(db, list(deltas), organization_id)}
+        for product_id in sorted(deltas):
+            if product_id not in locked:
+                raise ProductNotFoundException(product_id)
+            if locked[product_id].quantity + deltas[product_id] < 0:
+                raise InsufficientStockException(
+                    product_name=locked[product_id].name,
+                    available=locked[product_id].quantity,
+                    requested=-deltas[product_id],
+                )
+
+        changed = {product_id: delta for product_id, delta in deltas.items() if delta}
+        if product_repository.apply_stock_deltas(db, changed, organization_id) != len(changed):
+            # Only reachable where FOR UPDATE is not enforced (SQLite).
+            raise ValidationException("Estoque alterado durante a reversão; tente novamente")
+
+        movement_repository.insert_inverse_movements(
+            db,
+            conditions,
+            organization_id,
+            created_by_user_id=created_by_user_id,
+            batch_id=batch_id,
+            created_at=datetime.utcnow(),
+        )
+        # INSERT ... SELECT does not assign ids in source order; pair by the original instead.
+        db_movements = sorted(
+            movement_repository.list_batch_movements(db, organization_id, batch_id),
+            key=lambda db_movement: db_movement.reverted_movement_id,
+        )
+        rollup_service.record_movements(db, db_movements)
+
+        audit_service.log_actions(
+            db=db,
+            user_id=created_by_user_id,
+            action=ActionType.CREATE,
+            entity_type=EntityType.MOVEMENT,
+            entries=[
+                (
+                    db_movement.id,
+                    {
+                        "type": db_movement.type.value,
+                        "product_id": db_movement.product_id,
+                        "quantity": db_movement.quantity,
+                        "reason": db_movement.reason,
+                        "batch_id": batch_id,
+                        "reverted_movement_id": db_movement.reverted_movement_id,
+                    },
+                )
+                for db_movement in db_movements
+            ],
+            organization_id=organization_id,
+        )
+
+    if commit:
+        db.commit()
+    return db_movements
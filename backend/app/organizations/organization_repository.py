@@ -28,6 +28,12 @@ class OrganizationRepository:
         stmt = select(Organization).offset(skip).limit(limit)
         return list(db.scalars(stmt).all())
 
+    @staticmethod
+    def list_active_ids(db: Session) -> list[int]:
+        """Get the IDs of active organizations, in ID order."""
+        stmt = select(Organization.id).where(Organization.active.is_(True)).order_by(Organization.id)
+        return list(db.scalars(stmt).all())
+
     @staticmethod
     def create(db: Session, organization: Organization) -> Organization:
         """Create a new organization."""
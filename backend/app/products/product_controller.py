@@ -5,12 +5,13 @@ from __future__ import annotations
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.auth.auth_service import get_current_user, require_role
 from app.database import get_db
 from app.users.user_model import User
+from app.utils.etag import format_etag, parse_if_match
 from . import product_model, product_service
 
 logger = logging.getLogger(__name__)
@@ -95,11 +96,14 @@ def search_products(
 @router.get("/{product_id}", response_model=product_model.ProductPublic)
 def get_product(
     product_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Retrieve a product by ID."""
-    return product_service.get_product(db, product_id, organization_id=current_user.organization_id)
+    """Retrieve a product by ID; its version is returned as the ETag."""
+    result = product_service.get_product(db, product_id, organization_id=current_user.organization_id)
+    response.headers["ETag"] = format_etag(result.version)
+    return result
 
 
 @router.put(
@@ -110,6 +114,12 @@ def get_product(
 def update_product(
     product_id: int,
     product_in: product_model.ProductUpdate,
+    response: Response,
+    if_match: str | None = Header(
+        default=None,
+        alias="If-Match",
+        description="ETag of the version being edited; a stale value returns 412",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -121,10 +131,12 @@ def update_product(
         product_id=product_id,
         product_in=product_in,
         organization_id=current_user.organization_id,
-        user_id=current_user.id
+        user_id=current_user.id,
+        expected_versions=parse_if_match(if_match),
     )
     
     logger.info(f"✅ Produto atualizado: ID {product_id}")
+    response.headers["ETag"] = format_etag(result.version)
     return result
 
 
@@ -7,7 +7,7 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 
 from app.categories.category_model import CategoryPublic
@@ -21,7 +21,17 @@ class Product(Base):
     """SQLAlchemy model for the products table."""
 
     __tablename__ = "products"
-    __table_args__ = (UniqueConstraint("sku", name="uq_products_sku"),)
+    __table_args__ = (
+        UniqueConstraint("sku", name="uq_products_sku"),
+        # Low/out-of-stock listings page through this small index instead of the catalog.
+        Index(
+            "ix_products_org_low_stock",
+            "organization_id",
+            "id",
+            sqlite_where=text("quantity <= alert_level"),
+            postgresql_where=text("quantity <= alert_level"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(150), nullable=False, index=True)
@@ -31,6 +41,9 @@ class Product(Base):
     quantity = Column(Integer, nullable=False, default=0)
     alert_level = Column(Integer, nullable=False, default=10)
     lead_time = Column(Integer, nullable=False, default=0)  # Days to restock
+    # Optimistic-lock counter for ORM (metadata) updates; stock changes go
+    # through product_repository.adjust_stock and intentionally leave it alone.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Soft Delete Columns
     is_deleted = Column(Boolean, default=False, nullable=False, index=True)
@@ -42,13 +55,18 @@ class Product(Base):
 
     category = relationship("Category", back_populates="products", lazy="joined")
     organization = relationship("Organization", back_populates="products")
+    # Never loaded implicitly: the ledger grows with total history, and
+    # archived months are not in the table at all (see app.archive).
     movements = relationship(
         "Movement",
         back_populates="product",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="write_only",
+        passive_deletes=True,
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
 
 class ProductBase(BaseModel):
     name: str = Field(min_length=2, max_length=150, description="Nome do produto")
@@ -137,6 +155,7 @@ class ProductPublic(BaseModel):
     quantity: int
     alert_level: int
     lead_time: int
+    version: int
     category: CategoryPublic
 
 
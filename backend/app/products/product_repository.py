@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from sqlalchemy import func
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
 
 from . import product_model
@@ -36,6 +36,111 @@ def get_product_by_sku(db: Session, sku: str, organization_id: int):
     )
 
 
+def adjust_stock(db: Session, product_id: int, organization_id: int, delta: int) -> int | None:
+    """Atomically apply ``delta`` to a product's quantity.
+
+    Issues a single conditional ``UPDATE ... SET quantity = quantity + :delta
+    WHERE ... AND quantity + :delta >= 0``, so the row lock is held only for
+    the statement and concurrent outbound movements can never oversell.
+
+    Returns:
+        The new quantity, or None when no row matched (product missing or
+        the decrement would make stock negative).
+    """
+    product = product_model.Product
+    stmt = (
+        update(product)
+        .where(
+            product.id == product_id,
+            product.organization_id == organization_id,
+            product.is_deleted == False,
+        )
+        .values(quantity=product.quantity + delta)
+    )
+    if delta < 0:
+        stmt = stmt.where(product.quantity >= -delta)
+
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(product.quantity)).scalar_one_or_none()
+
+    # SQLite < 3.35 has no RETURNING; the write lock taken by the UPDATE keeps
+    # the follow-up read consistent within the transaction.
+    if db.execute(stmt).rowcount == 0:
+        return None
+    return db.scalar(select(product.quantity).where(product.id == product_id))
+
+
+def get_stock_level(db: Session, product_id: int, organization_id: int):
+    """Return (name, quantity) for an active product, or None."""
+    return db.execute(
+        select(product_model.Product.name, product_model.Product.quantity).where(
+            product_model.Product.id == product_id,
+            product_model.Product.organization_id == organization_id,
+            product_model.Product.is_deleted == False,
+        )
+    ).first()
+
+
+def lock_products(db: Session, product_ids: list[int], organization_id: int):
+    """Lock the given active products and return (id, name, quantity) rows.
+
+    Rows are locked in ascending id order so concurrent batches touching
+    overlapping products always acquire locks in the same order and cannot
+    deadlock. ``FOR UPDATE`` is a no-op on SQLite, whose database-level write
+    lock already serializes writers.
+    """
+    return db.execute(
+        select(
+            product_model.Product.id,
+            product_model.Product.name,
+            product_model.Product.quantity,
+        )
+        .where(
+            product_model.Product.id.in_(sorted(set(product_ids))),
+            product_model.Product.organization_id == organization_id,
+            product_model.Product.is_deleted == False,
+        )
+        .order_by(product_model.Product.id)
+        .with_for_update()
+    ).all()
+
+
+def apply_stock_deltas(db: Session, deltas: dict[int, int], organization_id: int) -> int:
+    """Apply per-product quantity deltas with a single ``UPDATE ... CASE`` statement.
+
+    Rows that would go negative are left untouched, so callers compare the
+    returned row count with ``len(deltas)`` to detect a concurrent change.
+
+    Returns:
+        Number of products updated.
+    """
+    if not deltas:
+        return 0
+    product = product_model.Product
+    delta = case(deltas, value=product.id, else_=0)
+    return db.execute(
+        update(product)
+        .where(
+            product.id.in_(sorted(deltas)),
+            product.organization_id == organization_id,
+            product.is_deleted == False,
+            product.quantity + delta >= 0,
+        )
+        .values(quantity=product.quantity + delta)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def list_product_keys(db: Session, organization_id: int, *, active_only: bool = False) -> dict[str, int]:
+    """Return ``{sku: id}`` for the products of an organization (deleted ones unless ``active_only``)."""
+    query = select(product_model.Product.sku, product_model.Product.id).where(
+        product_model.Product.organization_id == organization_id
+    )
+    if active_only:
+        query = query.where(product_model.Product.is_deleted == False)
+    return dict(db.execute(query).all())
+
+
 def list_products(db: Session, organization_id: int) -> List[product_model.Product]:
     """List all products for an organization."""
     return (
@@ -48,6 +153,80 @@ def list_products(db: Session, organization_id: int) -> List[product_model.Produ
     )
 
 
+def list_product_columns(db: Session, organization_id: int):
+    """
+    Return the analytics columns of the active products, ordered by ID.
+
+    Returns:
+        Rows of (id, name, price, cost_price, quantity, lead_time);
+        no ORM instances are built.
+    """
+    product = product_model.Product
+    return db.execute(
+        select(
+            product.id,
+            product.name,
+            product.price,
+            product.cost_price,
+            product.quantity,
+            product.lead_time,
+        )
+        .where(product.organization_id == organization_id, product.is_deleted == False)
+        .order_by(product.id)
+    ).all()
+
+
+def get_stock_totals(db: Session, organization_id: int):
+    """
+    Return the stock totals of the active products with one aggregate query.
+
+    Returns:
+        Row of (total_products, total_value, low_stock, out_of_stock), where
+        total_value is the sum of quantity * price.
+    """
+    product = product_model.Product
+    return db.execute(
+        select(
+            func.count().label("total_products"),
+            func.coalesce(func.sum(product.quantity * product.price), 0).label("total_value"),
+            func.coalesce(func.sum(case((product.quantity <= product.alert_level, 1), else_=0)), 0).label("low_stock"),
+            func.coalesce(func.sum(case((product.quantity == 0, 1), else_=0)), 0).label("out_of_stock"),
+        ).where(product.organization_id == organization_id, product.is_deleted == False)
+    ).one()
+
+
+def list_stock_alerts(
+    db: Session,
+    organization_id: int,
+    *,
+    out_of_stock: bool = False,
+    limit: int,
+    after_id: int | None = None,
+) -> List[product_model.Product]:
+    """
+    Return a page of active products at or below their alert level, ordered by ID.
+
+    Served by the partial index ``ix_products_org_low_stock``; out-of-stock
+    products are a subset (alert levels are never negative).
+
+    Args:
+        out_of_stock: Only products with zero stock.
+        limit: Page size.
+        after_id: Return products after this ID (keyset cursor).
+    """
+    product = product_model.Product
+    conditions = [
+        product.organization_id == organization_id,
+        product.quantity <= product.alert_level,
+        product.is_deleted == False,
+    ]
+    if out_of_stock:
+        conditions.append(product.quantity == 0)
+    if after_id is not None:
+        conditions.append(product.id > after_id)
+    return list(db.scalars(select(product).where(*conditions).order_by(product.id).limit(limit)))
+
+
 def search_products(
     db: Session,
     organization_id: int,
@@ -77,7 +256,7 @@ def search_products(
 
 
 def create_product(db: Session, product: product_model.ProductCreate, organization_id: int):
-    """Persist a new product."""
+    """Persist a new product; the caller commits."""
     db_product = product_model.Product(
         name=product.name,
         sku=product.sku,
@@ -90,8 +269,7 @@ def create_product(db: Session, product: product_model.ProductCreate, organizati
         organization_id=organization_id,
     )
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    db.flush()
     return db_product
 
 
@@ -3,16 +3,21 @@
 from __future__ import annotations
 
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.audit import audit_service
 from app.audit.audit_model import ActionType, EntityType
 from app.categories import category_repository
 from app.exceptions import (
+    ConcurrentUpdateException,
     DuplicateSKUException,
+    PreconditionFailedException,
     ProductNotFoundException,
     CategoryNotFoundException,
     ValidationException,
 )
+from app.reconciliation import reconciliation_service
+from app.reports import report_cache_service
 from . import product_model, product_repository
 
 
@@ -58,7 +63,11 @@ def create_product(
         details={"name": created_product.name, "sku": created_product.sku},
         organization_id=organization_id,
     )
-    
+    reconciliation_service.register_opening_balance(db, created_product)
+    report_cache_service.invalidate(db, organization_id)
+    db.commit()
+    db.refresh(created_product)
+
     return created_product
 
 
@@ -139,13 +148,16 @@ def update_product(
     product_id: int,
     product_in: product_model.ProductUpdate,
     organization_id: int,
-    user_id: int | None = None
+    user_id: int | None = None,
+    expected_versions: list[int] | None = None,
 ) -> product_model.Product:
     """
     Update an existing product.
 
     Validates that stock changes are not attempted directly (must use movements),
-    SKU uniqueness is maintained, and category exists if changed.
+    SKU uniqueness is maintained, and category exists if changed. The write is
+    optimistically locked on ``Product.version``: no row lock is taken, and a
+    concurrent metadata update makes this one fail instead of overwriting it.
 
     Args:
         db: Database session.
@@ -153,6 +165,8 @@ def update_product(
         product_in: Schema with fields to update.
         organization_id: ID of the organization.
         user_id: ID of the user updating the product (for audit).
+        expected_versions: Versions accepted by the client's If-Match header
+            (None skips the precondition).
 
     Returns:
         The updated Product ORM instance.
@@ -160,9 +174,14 @@ def update_product(
     Raises:
         HTTPException(400): If direct stock change attempted or SKU conflict.
         HTTPException(404): If product or new category not found.
+        HTTPException(409): If the product changed while being updated.
+        HTTPException(412): If the product's version is not an expected one.
     """
     db_product = get_product(db, product_id, organization_id=organization_id)
 
+    if expected_versions is not None and db_product.version not in expected_versions:
+        raise PreconditionFailedException("Produto", db_product.version)
+
     if product_in.quantity is not None and product_in.quantity != db_product.quantity:
         raise ValidationException("Stock changes must be performed via movements")
 
@@ -175,7 +194,12 @@ def update_product(
         if category_repository.get_category_by_id(db, category_id=product_in.category_id, organization_id=organization_id) is None:
             raise CategoryNotFoundException(product_in.category_id)
 
-    updated_product = product_repository.update_product(db, db_product=db_product, product_in=product_in)
+    report_cache_service.invalidate(db, organization_id)
+    try:
+        updated_product = product_repository.update_product(db, db_product=db_product, product_in=product_in)
+    except StaleDataError:
+        db.rollback()
+        raise ConcurrentUpdateException("Produto", product_id)
     
     # Log audit
     audit_service.log_action(
@@ -225,6 +249,7 @@ def delete_product(
         organization_id=organization_id,
     )
     
+    report_cache_service.invalidate(db, organization_id)
     return product_repository.delete_product(db, db_product=db_product, user_id=user_id)
 
 
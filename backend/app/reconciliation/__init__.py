@@ -0,0 +1 @@
+"""Incremental reconciliation of product stock against the movement ledger."""
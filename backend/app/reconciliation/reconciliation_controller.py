@@ -0,0 +1,43 @@
+"""Stock reconciliation endpoints."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.auth.auth_service import get_current_user, require_role
+from app.database import get_db
+from app.users.user_model import User
+from . import reconciliation_model, reconciliation_service
+
+router = APIRouter(
+    prefix="/reconciliation",
+    tags=["Reconciliation"],
+    dependencies=[Depends(get_current_user), Depends(require_role("admin"))],
+)
+
+
+@router.get("/checkpoint", response_model=reconciliation_model.ReconciliationCheckpointPublic)
+def get_checkpoint(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return how far the movement ledger has been reconciled."""
+    return reconciliation_service.get_checkpoint(db, current_user.organization_id)
+
+
+@router.post("/run", response_model=reconciliation_model.ReconciliationReport)
+def run_reconciliation(
+    repair: bool = Query(default=False, description="Corrigir o estoque dos produtos divergentes"),
+    full: bool = Query(default=False, description="Reprocessar o histórico desde a linha de base"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Reconcile product stock with the movement ledger since the last checkpoint."""
+    return reconciliation_service.reconcile_organization(
+        db,
+        current_user.organization_id,
+        repair=repair,
+        full=full,
+        user_id=current_user.id,
+    )
@@ -0,0 +1,72 @@
+"""Models and schemas for stock reconciliation."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+
+from app.database import Base
+
+
+class StockLedgerBalance(Base):
+    """
+    Stock of one product according to the movement ledger.
+
+    ``quantity`` is ``opening_quantity`` plus every movement of the product
+    after its organization's ``baseline_movement_id`` and up to its
+    ``last_movement_id``. ``opening_quantity`` is the trusted stock at the
+    baseline, or the stock the product was created with, which the ledger
+    itself does not record.
+    """
+
+    __tablename__ = "stock_ledger_balances"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    opening_quantity = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+
+
+class ReconciliationCheckpoint(Base):
+    """Progress of the incremental reconciliation of one organization."""
+
+    __tablename__ = "reconciliation_checkpoints"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    baseline_movement_id = Column(Integer, nullable=False, default=0)  # Full rescans restart here
+    last_movement_id = Column(Integer, nullable=False, default=0)
+    last_drift_count = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ReconciliationCheckpointPublic(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    organization_id: int
+    baseline_movement_id: int
+    last_movement_id: int
+    last_drift_count: int | None = None
+    updated_at: datetime
+
+
+class StockDrift(BaseModel):
+    product_id: int
+    product_name: str
+    sku: str
+    recorded_quantity: int  # Product.quantity
+    expected_quantity: int  # According to the ledger
+    difference: int  # recorded - expected
+    repaired: bool = False
+
+
+class ReconciliationReport(BaseModel):
+    organization_id: int
+    from_movement_id: int
+    to_movement_id: int
+    movements_scanned: int
+    chunks: int
+    products_checked: int
+    drift: List[StockDrift]
@@ -0,0 +1,300 @@
+"""Data repository for stock reconciliation."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.movements.movement_model import Movement, MovementType
+from app.products.product_model import Product
+
+from . import reconciliation_model
+
+Balance = reconciliation_model.StockLedgerBalance
+Checkpoint = reconciliation_model.ReconciliationCheckpoint
+
+
+def signed_quantity():
+    """Return the movement quantity signed by its direction (+entrada, -saida)."""
+    return case((Movement.type == MovementType.ENTRADA, Movement.quantity), else_=-Movement.quantity)
+
+
+def list_organization_ids(db: Session) -> list[int]:
+    """Return every organization that has products."""
+    return list(db.scalars(select(Product.organization_id).distinct().order_by(Product.organization_id)))
+
+
+def get_checkpoint(db: Session, organization_id: int) -> reconciliation_model.ReconciliationCheckpoint | None:
+    """Return the reconciliation checkpoint of an organization."""
+    return db.get(Checkpoint, organization_id, populate_existing=True)
+
+
+def get_or_create_checkpoint(db: Session, organization_id: int) -> reconciliation_model.ReconciliationCheckpoint:
+    """Return the checkpoint of an organization, creating an empty one (commits)."""
+    checkpoint = get_checkpoint(db, organization_id)
+    if checkpoint is not None:
+        return checkpoint
+    try:
+        db.add(Checkpoint(organization_id=organization_id, baseline_movement_id=0, last_movement_id=0))
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # Created concurrently by another run.
+    return get_checkpoint(db, organization_id)
+
+
+def insert_checkpoint_if_missing(db: Session, organization_id: int) -> None:
+    """Create the empty checkpoint of an organization inside the current transaction."""
+    row = {"organization_id": organization_id, "baseline_movement_id": 0, "last_movement_id": 0}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.execute(dialect_insert(Checkpoint).values(**row).on_conflict_do_nothing(index_elements=["organization_id"]))
+    elif get_checkpoint(db, organization_id) is None:
+        db.execute(insert(Checkpoint).values(**row))
+
+
+def lock_checkpoint(db: Session, organization_id: int, *, shared: bool = False, skip_locked: bool = False) -> bool:
+    """
+    Lock the checkpoint row of an organization until the transaction ends.
+
+    ``shared`` takes FOR KEY SHARE, which only conflicts with FOR UPDATE (not
+    with checkpoint updates); otherwise FOR UPDATE, optionally giving up
+    instead of waiting. Dialects without row locks (SQLite) lock nothing.
+
+    Returns:
+        False when ``skip_locked`` is set and the row is locked elsewhere.
+    """
+    query = (
+        select(Checkpoint.organization_id)
+        .where(Checkpoint.organization_id == organization_id)
+        .with_for_update(read=shared, key_share=shared, skip_locked=skip_locked)
+    )
+    return db.scalar(query) is not None
+
+
+def touch_checkpoint(db: Session, organization_id: int) -> None:
+    """Rewrite the checkpoint row, which takes the database write lock on SQLite."""
+    db.execute(
+        update(Checkpoint)
+        .where(Checkpoint.organization_id == organization_id)
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+def advance_checkpoint(db: Session, organization_id: int, *, expected_last_id: int, new_last_id: int) -> bool:
+    """
+    Move the checkpoint from ``expected_last_id`` to ``new_last_id``.
+
+    The compare-and-set makes concurrent runs safe without row locks: a run
+    whose chunk was already applied by another one updates no row and must
+    roll back.
+
+    Returns:
+        True when the checkpoint was moved.
+    """
+    result = db.execute(
+        update(Checkpoint)
+        .where(Checkpoint.organization_id == organization_id, Checkpoint.last_movement_id == expected_last_id)
+        .values(last_movement_id=new_last_id, updated_at=datetime.utcnow())
+    )
+    return result.rowcount == 1
+
+
+def set_baseline(db: Session, organization_id: int, movement_id: int) -> None:
+    """Point both the baseline and the checkpoint of an organization at ``movement_id``."""
+    db.execute(
+        update(Checkpoint)
+        .where(Checkpoint.organization_id == organization_id)
+        .values(baseline_movement_id=movement_id, last_movement_id=movement_id, updated_at=datetime.utcnow())
+    )
+
+
+def record_drift_count(db: Session, organization_id: int, drift_count: int) -> None:
+    """Store how many products drifted in the last comparison."""
+    db.execute(
+        update(Checkpoint)
+        .where(Checkpoint.organization_id == organization_id)
+        .values(last_drift_count=drift_count, updated_at=datetime.utcnow())
+    )
+
+
+def recent_movement_floor(db: Session, organization_id: int, created_after: datetime, created_until: datetime) -> int | None:
+    """Return the smallest id among movements created in ``(created_after, created_until]``."""
+    return db.scalar(
+        select(func.min(Movement.id)).where(
+            Movement.organization_id == organization_id,
+            Movement.created_at > created_after,
+            Movement.created_at <= created_until,
+        )
+    )
+
+
+def max_movement_id(db: Session, organization_id: int) -> int:
+    """Return the highest movement id of an organization (0 when it has none)."""
+    return db.scalar(select(func.max(Movement.id)).where(Movement.organization_id == organization_id)) or 0
+
+
+def chunk_bounds(db: Session, organization_id: int, *, after_id: int, upto_id: int, size: int) -> tuple[int, int]:
+    """
+    Return (last id, row count) of the next keyset chunk of movements.
+
+    The chunk holds at most ``size`` movements with ``after_id < id <= upto_id``.
+    """
+    ids = (
+        select(Movement.id)
+        .where(
+            Movement.organization_id == organization_id,
+            Movement.id > after_id,
+            Movement.id <= upto_id,
+        )
+        .order_by(Movement.id)
+        .limit(size)
+        .subquery()
+    )
+    last_id, count = db.execute(select(func.max(ids.c.id), func.count(ids.c.id))).one()
+    return last_id or after_id, count
+
+
+def net_by_product(db: Session, organization_id: int, *, after_id: int, upto_id: int | None = None) -> dict[int, int]:
+    """Return the signed movement total per product for ids in ``(after_id, upto_id]``."""
+    query = select(Movement.product_id, func.sum(signed_quantity())).where(
+        Movement.organization_id == organization_id,
+        Movement.id > after_id,
+    )
+    if upto_id is not None:
+        query = query.where(Movement.id <= upto_id)
+    return dict(db.execute(query.group_by(Movement.product_id)).all())
+
+
+def _upsert_balances(db: Session, rows: list[dict], *, add_opening: bool) -> None:
+    """Add ``quantity`` (and optionally ``opening_quantity``) to ledger balances."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(Balance).values(rows)
+        set_ = {"quantity": Balance.quantity + stmt.excluded.quantity}
+        if add_opening:
+            set_["opening_quantity"] = Balance.opening_quantity + stmt.excluded.opening_quantity
+        db.execute(stmt.on_conflict_do_update(index_elements=["product_id"], set_=set_))
+        return
+
+    for row in rows:
+        values = {"quantity": Balance.quantity + row["quantity"]}
+        if add_opening:
+            values["opening_quantity"] = Balance.opening_quantity + row["opening_quantity"]
+        result = db.execute(update(Balance).where(Balance.product_id == row["product_id"]).values(**values))
+        if result.rowcount == 0:
+            db.execute(insert(Balance).values(**row))
+
+
+def apply_deltas(db: Session, organization_id: int, deltas: dict[int, int]) -> None:
+    """Add per-product movement totals to the ledger balances, sorted by product."""
+    rows = [
+        {"product_id": product_id, "organization_id": organization_id, "opening_quantity": 0, "quantity": delta}
+        for product_id, delta in sorted(deltas.items())
+    ]
+    _upsert_balances(db, rows, add_opening=False)
+
+
+def add_opening_balance(db: Session, organization_id: int, product_id: int, quantity: int) -> None:
+    """Register stock that entered a product outside the movement ledger."""
+    _upsert_balances(
+        db,
+        [{"product_id": product_id, "organization_id": organization_id, "opening_quantity": quantity, "quantity": quantity}],
+        add_opening=True,
+    )
+
+
+def add_to_opening(db: Session, organization_id: int, deltas: dict[int, int]) -> None:
+    """Fold movements that are leaving the ledger table into the opening balances."""
+    for product_id, delta in sorted(deltas.items()):
+        if delta:
+            db.execute(
+                update(Balance)
+                .where(Balance.product_id == product_id, Balance.organization_id == organization_id)
+                .values(opening_quantity=Balance.opening_quantity + delta)
+            )
+
+
+def reset_balances(db: Session, organization_id: int) -> None:
+    """Rewind every ledger balance of an organization to its opening quantity."""
+    db.execute(
+        update(Balance)
+        .where(Balance.organization_id == organization_id)
+        .values(quantity=Balance.opening_quantity)
+    )
+
+
+def replace_with_current(db: Session, organization_id: int) -> int:
+    """
+    Trust current product quantities as the ledger balances of an organization.
+
+    The quantities become the opening balances too, so a full rescan from the
+    new baseline starts from them.
+
+    Returns:
+        Number of balances written.
+    """
+    db.execute(delete(Balance).where(Balance.organization_id == organization_id))
+    rows = [
+        {"product_id": product_id, "organization_id": organization_id, "opening_quantity": quantity, "quantity": quantity}
+        for product_id, quantity in db.execute(
+            select(Product.id, Product.quantity)
+            .where(Product.organization_id == organization_id)
+            .order_by(Product.id)
+        ).all()
+    ]
+    if rows:
+        db.execute(insert(Balance), rows)
+    return len(rows)
+
+
+def count_products(db: Session, organization_id: int) -> int:
+    """Return how many active products an organization has."""
+    return db.scalar(
+        select(func.count(Product.id)).where(Product.organization_id == organization_id, Product.is_deleted == False)
+    )
+
+
+def find_drift(db: Session, organization_id: int):
+    """
+    Return active products whose quantity differs from the ledger.
+
+    Expected stock is the ledger balance plus every movement after the
+    checkpoint. Quantities, balances, checkpoint and pending movements are all
+    read by one statement, so they come from the same snapshot.
+
+    Returns:
+        Rows of (id, name, sku, quantity, expected).
+    """
+    checkpoint_id = (
+        select(Checkpoint.last_movement_id)
+        .where(Checkpoint.organization_id == organization_id)
+        .scalar_subquery()
+    )
+    pending = (
+        select(Movement.product_id, func.sum(signed_quantity()).label("net"))
+        .where(Movement.organization_id == organization_id, Movement.id > func.coalesce(checkpoint_id, 0))
+        .group_by(Movement.product_id)
+        .subquery()
+    )
+    expected = (func.coalesce(Balance.quantity, literal(0)) + func.coalesce(pending.c.net, literal(0))).label(
+        "expected"
+    )
+    return db.execute(
+        select(Product.id, Product.name, Product.sku, Product.quantity, expected)
+        .outerjoin(Balance, Balance.product_id == Product.id)
+        .outerjoin(pending, pending.c.product_id == Product.id)
+        .where(
+            Product.organization_id == organization_id,
+            Product.is_deleted == False,
+            Product.quantity != expected,
+        )
+        .order_by(Product.id)
+    ).all()
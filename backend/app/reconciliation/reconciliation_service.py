@@ -0,0 +1,256 @@
+"""Business rules for reconciling product stock with the movement ledger.
+
+Each organization keeps a ledger balance per product (its opening quantity
+plus every movement up to a checkpoint id). A run folds the movements after
+the checkpoint into the balances in keyset chunks of ids, one short
+transaction per chunk, then compares ``Product.quantity`` against the
+balances plus the few movements still past the checkpoint. Runs resume from
+the checkpoint, so the routine cost is proportional to new movements only.
+
+Bulk writers (history import, stocktake) keep their movements invisible for
+longer than any safety lag, so they hold the organization's ledger (a shared
+lock on the checkpoint row) for their whole transaction. A run only picks its
+scan bound while no such transaction is open, and the archival job takes the
+lock exclusively while it moves months out of ``movements``.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.audit import audit_service
+from app.audit.audit_model import ActionType, EntityType
+from app.products import product_repository
+from app.products.product_model import Product
+from app.reports import report_cache_service
+from . import reconciliation_model, reconciliation_repository
+
+logger = logging.getLogger(__name__)
+
+
+def register_opening_balance(db: Session, product: Product) -> None:
+    """
+    Record the stock a product was created with, which no movement explains.
+
+    Must run in the transaction that creates the product.
+    """
+    if product.quantity:
+        reconciliation_repository.add_opening_balance(db, product.organization_id, product.id, product.quantity)
+
+
+def get_checkpoint(db: Session, organization_id: int) -> reconciliation_model.ReconciliationCheckpoint:
+    """Return the reconciliation checkpoint of an organization, creating it if needed."""
+    return reconciliation_repository.get_or_create_checkpoint(db, organization_id)
+
+
+def hold_ledger(db: Session, organization_id: int) -> None:
+    """
+    Keep reconciliation from moving past this transaction's movements until it ends.
+
+    Bulk writers call it first in their transaction, before drawing any
+    movement id. On PostgreSQL it takes FOR KEY SHARE on the checkpoint row,
+    so bulk writers do not block each other nor checkpoint updates. SQLite
+    has a single writer, so the write lock is simply taken early.
+    """
+    reconciliation_repository.insert_checkpoint_if_missing(db, organization_id)
+    if db.get_bind().dialect.name == "postgresql":
+        reconciliation_repository.lock_checkpoint(db, organization_id, shared=True)
+    else:
+        reconciliation_repository.touch_checkpoint(db, organization_id)
+
+
+def lock_ledger(db: Session, organization_id: int, *, wait: bool = True) -> bool:
+    """
+    Exclusive counterpart of :func:`hold_ledger`, held until the transaction ends.
+
+    With ``wait=False`` it gives up when a bulk write is open. On SQLite ids
+    are drawn in commit order, so an open bulk write can never sit below a
+    visible id and the non-waiting form succeeds without locking.
+
+    Returns:
+        False when ``wait`` is False and the ledger is held elsewhere.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return reconciliation_repository.lock_checkpoint(db, organization_id, skip_locked=not wait)
+    if wait:
+        reconciliation_repository.touch_checkpoint(db, organization_id)
+    return True
+
+
+def _scan_upper_bound(db: Session, organization_id: int, safety_lag: float) -> int:
+    """
+    Return the highest movement id a run may fold into the balances.
+
+    Movements created within ``safety_lag`` seconds are left pending: a
+    transaction that drew a lower id may not have committed yet, and the
+    checkpoint must never move past a movement that is still invisible.
+    Rows dated in the future (imports, clock skew) do not hold the scan back.
+    Long bulk transactions are excluded by :func:`lock_ledger` instead, so
+    the caller must hold it while the bound is computed.
+    """
+    now = datetime.utcnow()
+    floor = reconciliation_repository.recent_movement_floor(
+        db, organization_id, now - timedelta(seconds=safety_lag), now
+    )
+    if floor is not None:
+        return floor - 1
+    return reconciliation_repository.max_movement_id(db, organization_id)
+
+
+def _repair(db: Session, organization_id: int, drift: list[reconciliation_model.StockDrift], user_id: int | None) -> None:
+    """Move drifted quantities to the ledger value and audit each change (commits)."""
+    entries = []
+    for item in drift:
+        # A relative update stays correct if movements land after the comparison.
+        new_quantity = product_repository.adjust_stock(
+            db, item.product_id, organization_id, item.expected_quantity - item.recorded_quantity
+        )
+        if new_quantity is None:
+            continue  # Product deleted meanwhile, or stock already below the correction.
+        item.repaired = True
+        entries.append(
+            (
+                item.product_id,
+                {
+                    "reason": "reconciliation",
+                    "from": item.recorded_quantity,
+                    "to": item.expected_quantity,
+                },
+            )
+        )
+    if entries:
+        report_cache_service.invalidate(db, organization_id)
+        audit_service.log_actions(
+            db,
+            user_id=user_id,
+            action=ActionType.UPDATE,
+            entity_type=EntityType.PRODUCT,
+            entries=entries,
+            organization_id=organization_id,
+        )
+    db.commit()
+
+
+def reconcile_organization(
+    db: Session,
+    organization_id: int,
+    *,
+    repair: bool = False,
+    full: bool = False,
+    chunk_size: int = constants.RECONCILIATION_CHUNK_SIZE,
+    safety_lag: float = constants.RECONCILIATION_SAFETY_LAG_SECONDS,
+    user_id: int | None = None,
+) -> reconciliation_model.ReconciliationReport:
+    """
+    Bring the ledger balances of an organization up to date and report drift.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        repair: Set drifted product quantities to the ledger value.
+        full: Rescan the ledger from the baseline instead of the checkpoint.
+        chunk_size: Movements folded per transaction.
+        safety_lag: Seconds a movement must age before it is checkpointed.
+        user_id: ID of the user running the reconciliation (for audit).
+
+    Returns:
+        ReconciliationReport with scan statistics and drifted products.
+    """
+    checkpoint = reconciliation_repository.get_or_create_checkpoint(db, organization_id)
+    if full:
+        reconciliation_repository.reset_balances(db, organization_id)
+        reconciliation_repository.set_baseline(db, organization_id, checkpoint.baseline_movement_id)
+        db.commit()
+        checkpoint = reconciliation_repository.get_checkpoint(db, organization_id)
+
+    start_id = last_id = checkpoint.last_movement_id
+    if lock_ledger(db, organization_id, wait=False):
+        upto_id = _scan_upper_bound(db, organization_id, safety_lag)
+    else:
+        # A bulk write may hold ids below visible ones; its movements stay pending.
+        logger.info("Organização %s com escrita em massa em andamento; checkpoint mantido", organization_id)
+        upto_id = last_id
+    # Releases the lock: bulk writers that start now draw ids above upto_id.
+    db.commit()
+    scanned = chunks = 0
+    while last_id < upto_id:
+        boundary, count = reconciliation_repository.chunk_bounds(
+            db, organization_id, after_id=last_id, upto_id=upto_id, size=chunk_size
+        )
+        if count == 0:
+            break
+        deltas = reconciliation_repository.net_by_product(db, organization_id, after_id=last_id, upto_id=boundary)
+        reconciliation_repository.apply_deltas(db, organization_id, deltas)
+        if not reconciliation_repository.advance_checkpoint(
+            db, organization_id, expected_last_id=last_id, new_last_id=boundary
+        ):
+            # Another run folded this chunk first; continue from where it stopped.
+            db.rollback()
+            last_id = reconciliation_repository.get_checkpoint(db, organization_id).last_movement_id
+            continue
+        db.commit()
+        scanned += count
+        chunks += 1
+        last_id = boundary
+
+    drift = [
+        reconciliation_model.StockDrift(
+            product_id=row.id,
+            product_name=row.name,
+            sku=row.sku,
+            recorded_quantity=row.quantity,
+            expected_quantity=row.expected,
+            difference=row.quantity - row.expected,
+        )
+        for row in reconciliation_repository.find_drift(db, organization_id)
+    ]
+    products_checked = reconciliation_repository.count_products(db, organization_id)
+    reconciliation_repository.record_drift_count(db, organization_id, len(drift))
+    if repair and drift:
+        _repair(db, organization_id, drift, user_id)
+    else:
+        db.commit()
+
+    return reconciliation_model.ReconciliationReport(
+        organization_id=organization_id,
+        from_movement_id=start_id,
+        to_movement_id=last_id,
+        movements_scanned=scanned,
+        chunks=chunks,
+        products_checked=products_checked,
+        drift=drift,
+    )
+
+
+def establish_baseline(db: Session, organization_id: int) -> int:
+    """
+    Trust the current product quantities as correct and checkpoint the ledger.
+
+    Used once for data that predates the ledger balances (or after a manual
+    correction). On PostgreSQL, movement and product writes are blocked for
+    the duration so quantities and the checkpoint match exactly; elsewhere run
+    it while the organization is idle.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+
+    Returns:
+        Number of product balances written.
+    """
+    reconciliation_repository.get_or_create_checkpoint(db, organization_id)
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        db.execute(text("LOCK TABLE movements, products IN SHARE MODE"))
+
+    upto_id = reconciliation_repository.max_movement_id(db, organization_id)
+    written = reconciliation_repository.replace_with_current(db, organization_id)
+    reconciliation_repository.set_baseline(db, organization_id, upto_id)
+    reconciliation_repository.record_drift_count(db, organization_id, 0)
+    db.commit()
+    return written
@@ -2,14 +2,84 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from typing import Literal
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.movements.movement_model import Movement, MovementType
+from app import constants
+from app.categories.category_model import Category
 from app.products.product_model import Product
+from app.rollups import rollup_service
+
+ComparisonGranularity = Literal["rolling", "day", "week", "month"]
+ComparisonBreakdown = Literal["product", "category"]
+
+
+def _period_starts(
+    granularity: ComparisonGranularity, periods: int, days: int, today: date
+) -> tuple[list[date], date]:
+    """Return the first day of each period (ascending) and the day after the last one."""
+    if granularity == "month":
+        first = today.replace(day=1)
+        starts = [first]
+        for _ in range(periods - 1):
+            first = (first - timedelta(days=1)).replace(day=1)
+            starts.append(first)
+        return starts[::-1], today + timedelta(days=1)
+
+    if granularity == "week":
+        length, first = 7, today - timedelta(days=today.weekday())
+    elif granularity == "day":
+        length, first = 1, today
+    else:
+        length, first = days, today - timedelta(days=days - 1)
+    starts = [first - timedelta(days=length * offset) for offset in range(periods - 1, -1, -1)]
+    return starts, today + timedelta(days=1)
+
+
+def _change_percent(current: int, previous: int) -> float:
+    if previous > 0:
+        return round(((current - previous) / previous) * 100, 2)
+    return 100.0 if current > 0 else 0.0
+
+
+def _trend(change_percent: float) -> str:
+    if abs(change_percent) < 5:
+        return "stable"
+    return "up" if change_percent > 0 else "down"
+
+
+def _breakdown(
+    db: Session, organization_id: int, starts: list[date], end: date, breakdown: ComparisonBreakdown, limit: int
+) -> list[dict]:
+    """Per-product or per-category quantities of each period, for the top ``limit`` by current quantity."""
+    totals = rollup_service.outbound_by_period(db, organization_id, starts, end, breakdown=breakdown, limit=limit)
+    quantities: dict[int, list[int]] = {}
+    for (period, key), (quantity, _) in totals.items():
+        quantities.setdefault(key, [0] * len(starts))[period] = quantity
+
+    model = Product if breakdown == "product" else Category
+    names = dict(
+        db.execute(
+            select(model.id, model.name).where(model.organization_id == organization_id, model.id.in_(quantities))
+        ).all()
+    ) if quantities else {}
+
+    rows = []
+    for key, values in quantities.items():
+        change = _change_percent(values[-1], values[-2])
+        rows.append({
+            "id": key,
+            "name": names.get(key),
+            "quantities": values,
+            "change_percent": change,
+            "trend": _trend(change),
+        })
+    rows.sort(key=lambda row: (-row["quantities"][-1], row["id"]))
+    return rows
 
 
 class InsightsService:
@@ -65,76 +135,85 @@ class InsightsService:
         return {"products": report}
 
     @staticmethod
-    def compare_periods(db: Session, organization_id: int, days: int = 30) -> dict:
+    def compare_periods(
+        db: Session,
+        organization_id: int,
+        *,
+        granularity: ComparisonGranularity = "rolling",
+        periods: int = 2,
+        days: int = 30,
+        breakdown: ComparisonBreakdown | None = None,
+        limit: int = constants.COMPARISON_BREAKDOWN_LIMIT,
+        today: date | None = None,
+    ) -> dict:
         """
-        Compare current period with previous period.
-        
+        Compare outbound movements over consecutive periods.
+
+        The last period contains today (UTC), so for day/week/month it is
+        still in progress. Totals are bucketed in a single query over the daily
+        rollups; nothing proportional to the number of movements is loaded.
+
         Args:
-            days: Period length in days
-        
+            granularity: "day", "week" (from Monday), "month" or "rolling"
+                (blocks of ``days`` days ending today).
+            periods: Number of periods, oldest first in the result.
+            days: Period length in days (rolling only).
+            breakdown: Also compare per "product" or "category".
+            limit: Breakdown rows to return: those with the largest current
+                quantity, picked in SQL.
+            today: Reference day (defaults to the current UTC date).
+
         Returns:
             {
+                "granularity": "month",
+                "periods": [
+                    {"start": "2026-09-01", "end": "2026-09-30", "movements": 130,
+                     "quantity": 420, "change_percent": None, "trend": None},
+                    {"start": "2026-10-01", "end": "2026-10-19", "movements": 150,
+                     "quantity": 500, "change_percent": 19.05, "trend": "up"}
+                ],
                 "current": {"movements": 150, "quantity": 500},
                 "previous": {"movements": 130, "quantity": 420},
-                "change_percent": 15.38,
-                "trend": "up"  # "up", "down", or "stable"
+                "change_percent": 19.05,
+                "trend": "up",  # "up", "down", or "stable"
+                "breakdown": [  # Only with breakdown: top ``limit`` by current quantity
+                    {"id": 3, "name": "Bebidas", "quantities": [120, 180],
+                     "change_percent": 50.0, "trend": "up"},
+                    ...
+                ]
             }
         """
-        now = datetime.utcnow()
-        current_start = now - timedelta(days=days)
-        previous_start = current_start - timedelta(days=days)
-        
-        # Current period
-        current_movements = db.scalars(
-            select(Movement).where(
-                Movement.organization_id == organization_id,
-                Movement.type == MovementType.SAIDA,
-                Movement.created_at >= current_start
-            )
-        ).all()
-        
-        # Previous period  
-        previous_movements = db.scalars(
-            select(Movement).where(
-                Movement.organization_id == organization_id,
-                Movement.type == MovementType.SAIDA,
-                Movement.created_at >= previous_start,
-                Movement.created_at < current_start
-            )
-        ).all()
-        
-        current_count = len(current_movements)
-        current_qty = sum(m.quantity for m in current_movements)
-        
-        previous_count = len(previous_movements)
-        previous_qty = sum(m.quantity for m in previous_movements)
-        
-        # Calculate change percentage
-        if previous_qty > 0:
-            change_percent = ((current_qty - previous_qty) / previous_qty) * 100
-        else:
-            change_percent = 100.0 if current_qty > 0 else 0.0
-        
-        # Determine trend
-        if abs(change_percent) < 5:
-            trend = "stable"
-        elif change_percent > 0:
-            trend = "up"
-        else:
-            trend = "down"
-        
-        return {
-            "current": {
-                "movements": current_count,
-                "quantity": current_qty
-            },
-            "previous": {
-                "movements": previous_count,
-                "quantity": previous_qty
-            },
-            "change_percent": round(change_percent, 2),
-            "trend": trend
+        starts, end = _period_starts(granularity, periods, days, today or datetime.utcnow().date())
+        totals = rollup_service.outbound_by_period(db, organization_id, starts, end)
+
+        result_periods = []
+        previous_qty = None
+        for index, period_start in enumerate(starts):
+            period_end = starts[index + 1] if index + 1 < len(starts) else end
+            quantity, count = totals.get((index,), (0, 0))
+            change = _change_percent(quantity, previous_qty) if previous_qty is not None else None
+            result_periods.append({
+                "start": period_start.isoformat(),
+                "end": (period_end - timedelta(days=1)).isoformat(),
+                "movements": count,
+                "quantity": quantity,
+                "change_percent": change,
+                "trend": _trend(change) if change is not None else None,
+            })
+            previous_qty = quantity
+
+        current, previous = result_periods[-1], result_periods[-2]
+        result = {
+            "granularity": granularity,
+            "periods": result_periods,
+            "current": {"movements": current["movements"], "quantity": current["quantity"]},
+            "previous": {"movements": previous["movements"], "quantity": previous["quantity"]},
+            "change_percent": current["change_percent"],
+            "trend": current["trend"],
         }
+        if breakdown is not None:
+            result["breakdown"] = _breakdown(db, organization_id, starts, end, breakdown, limit)
+        return result
 
     @staticmethod
     def get_recommendations(db: Session, organization_id: int) -> dict:
@@ -0,0 +1,50 @@
+"""Models and schemas for the report result cache."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict
+
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+
+from app.database import Base
+
+
+class ReportCacheEntry(Base):
+    """
+    A serialized report shared by every worker (``REPORT_CACHE_BACKEND=database``).
+
+    ``key`` hashes the organization, report, normalized window, parameters
+    and the organization's data version, so entries never need to be
+    rewritten: a data change makes new requests look up new keys, and old
+    entries age out by ``expires_at`` or least-recent ``accessed_at``.
+    """
+
+    __tablename__ = "report_cache_entries"
+
+    key = Column(String(64), primary_key=True)
+    organization_id = Column(Integer, nullable=False, index=True)
+    report = Column(String(50), nullable=False)
+    value = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    accessed_at = Column(DateTime, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ReportCacheCounters(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    errors: int = 0
+    lookup_ms: float = 0.0  # Total time spent reading the cache
+    compute_ms: float = 0.0  # Total time spent building reports on misses
+
+
+class ReportCacheMetrics(BaseModel):
+    backend: str
+    entries: int
+    bytes: int
+    evictions: int
+    total: ReportCacheCounters
+    reports: Dict[str, ReportCacheCounters]
@@ -0,0 +1,103 @@
+"""Data repository for the report cache and organization data versions."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.organizations.organization_model import Organization
+
+from .report_cache_model import ReportCacheEntry
+
+
+def get_data_version(db: Session, organization_id: int) -> int:
+    """Return the data version of an organization (0 if it does not exist)."""
+    return db.scalar(select(Organization.data_version).where(Organization.id == organization_id)) or 0
+
+
+def bump_data_versions(conn: Connection, organization_ids: list[int] | None) -> None:
+    """Increment the data version of the given organizations (None means all)."""
+    statement = update(Organization).values(data_version=Organization.data_version + 1)
+    if organization_ids is not None:
+        statement = statement.where(Organization.id.in_(sorted(organization_ids)))
+    conn.execute(statement)
+
+
+def get_entry(db: Session, key: str, now: datetime, *, touch_after: timedelta) -> bytes | None:
+    """
+    Return a live entry's value and mark it as recently used (committed).
+
+    ``accessed_at`` is only rewritten once it is older than ``touch_after``,
+    so most hits are a single read.
+    """
+    row = db.execute(
+        select(ReportCacheEntry.value, ReportCacheEntry.accessed_at).where(
+            ReportCacheEntry.key == key, ReportCacheEntry.expires_at > now
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    if row.accessed_at <= now - touch_after:
+        db.execute(update(ReportCacheEntry).where(ReportCacheEntry.key == key).values(accessed_at=now))
+        db.commit()
+    return row.value
+
+
+def put_entry(db: Session, **fields) -> None:
+    """Insert or replace an entry (an upsert, so concurrent writers of a key do not conflict)."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(ReportCacheEntry).values(**fields)
+        statement = statement.on_conflict_do_update(
+            index_elements=["key"],
+            set_={name: statement.excluded[name] for name in fields if name != "key"},
+        )
+        db.execute(statement)
+        return
+
+    db.execute(delete(ReportCacheEntry).where(ReportCacheEntry.key == fields["key"]))
+    db.execute(insert(ReportCacheEntry).values(**fields))
+
+
+def usage(db: Session) -> tuple[int, int]:
+    """Return (entries, bytes) currently stored."""
+    entries, size = db.execute(select(func.count(), func.coalesce(func.sum(ReportCacheEntry.size), 0))).one()
+    return entries, size
+
+
+def evict(db: Session, now: datetime, *, max_entries: int, max_bytes: int, target: float) -> int:
+    """
+    Delete expired entries and, if still over a limit, the least recently used ones.
+
+    The overflow is removed with one bounded ``DELETE ... WHERE key IN
+    (SELECT ... ORDER BY accessed_at LIMIT n)``, down to ``target`` times the
+    limits (estimated from the average entry size), so the next writes do
+    not immediately go over again.
+
+    Returns:
+        Number of entries deleted.
+    """
+    evicted = db.execute(delete(ReportCacheEntry).where(ReportCacheEntry.expires_at <= now)).rowcount
+    entries, size = usage(db)
+    if entries <= max_entries and size <= max_bytes:
+        return evicted
+
+    excess = max(0, entries - int(max_entries * target))
+    if size > max_bytes * target:
+        excess = max(excess, math.ceil((size - max_bytes * target) / (size / entries)))
+    oldest = select(ReportCacheEntry.key).order_by(ReportCacheEntry.accessed_at).limit(excess)
+    evicted += db.execute(
+        delete(ReportCacheEntry).where(ReportCacheEntry.key.in_(oldest.scalar_subquery()))
+    ).rowcount
+    return evicted
+
+
+def clear(db: Session) -> None:
+    """Delete every entry."""
+    db.execute(delete(ReportCacheEntry))
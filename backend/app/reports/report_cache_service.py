@@ -0,0 +1,385 @@
+"""Cache of computed reports.
+
+Entries are keyed by (organization, report, window, parameters, data
+version). Windows relative to "now" are normalized first (start to the day,
+end to the end of the minute), so repeated requests within a minute share a key, and
+every organization carries a ``data_version`` that write paths bump whenever
+report inputs change (products, movements, stock corrections).
+
+Writers call :func:`invalidate` inside their transaction; the version is
+incremented right after the commit, in its own short transaction, so hot
+movement writes never contend on the organization row. Readers take the
+version *before* computing: a report that raced a commit is stored under the
+old version, which no later request looks up. Entries also expire after
+``REPORT_CACHE_TTL_SECONDS``, which bounds staleness if a process dies
+between a commit and its bump.
+
+Backends (``REPORT_CACHE_BACKEND``):
+
+- ``memory``: per process, LRU bounded by entry count and bytes.
+- ``database``: the ``report_cache_entries`` table, shared by every worker.
+- ``none``: caching disabled.
+
+Any object with the :class:`ReportCacheBackend` methods can be installed
+with :func:`set_backend`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Protocol, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.config import get_settings
+from app.database import SessionLocal
+from . import report_cache_model, report_cache_repository
+
+logger = logging.getLogger(__name__)
+
+ReportT = TypeVar("ReportT", bound=BaseModel)
+
+_CHANGED_ORGANIZATIONS = "report_cache.changed_organizations"
+_COMMITTED_ORGANIZATIONS = "report_cache.committed_organizations"
+
+
+def invalidate(db: Session, organization_id: int) -> None:
+    """
+    Mark the organization's report inputs as changed by the current transaction.
+
+    The data version is bumped after the session commits; nothing happens if
+    it never does (a spurious bump would only cost a cache miss).
+    """
+    db.info.setdefault(_CHANGED_ORGANIZATIONS, set()).add(organization_id)
+
+
+def invalidate_all(db: Session) -> None:
+    """Mark the report inputs of every organization as changed (e.g. a full rollup rebuild)."""
+    db.info.setdefault(_CHANGED_ORGANIZATIONS, set()).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _collect_committed(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_ORGANIZATIONS, None)
+    if changed:
+        session.info.setdefault(_COMMITTED_ORGANIZATIONS, set()).update(changed)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _bump_data_versions(session: Session, transaction) -> None:
+    # Runs once the committed transaction has returned its connection to the pool.
+    if transaction.parent is not None:
+        return
+    organizations = session.info.pop(_COMMITTED_ORGANIZATIONS, None)
+    if not organizations:
+        return
+    try:
+        with session.get_bind().begin() as conn:
+            report_cache_repository.bump_data_versions(
+                conn, None if None in organizations else list(organizations)
+            )
+    except Exception:
+        logger.exception("Falha ao invalidar o cache de relatórios")
+
+
+def normalize_window(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+    """
+    Snap a window relative to "now" to cacheable boundaries.
+
+    The start is moved back to midnight, which also lets the rollups answer
+    it without reading raw movements, and the end is moved forward to the
+    last instant of its ``REPORT_CACHE_WINDOW_SECONDS`` bucket, so movements
+    posted up to now are always inside the window.
+    """
+    bucket = constants.REPORT_CACHE_WINDOW_SECONDS
+    seconds_into_day = end.hour * 3600 + end.minute * 60 + end.second
+    bucket_start = end.replace(microsecond=0) - timedelta(seconds=seconds_into_day % bucket)
+    return (
+        datetime.combine(start.date(), datetime.min.time()),
+        bucket_start + timedelta(seconds=bucket, microseconds=-1),
+    )
+
+
+def cache_key(organization_id: int, report: str, params: dict, data_version: int) -> str:
+    """Fingerprint a report request for one version of the organization's data."""
+    raw = json.dumps([organization_id, report, params, data_version], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ReportCacheBackend(Protocol):
+    """Storage interface of the report cache."""
+
+    name: str
+    evictions: int
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, *, organization_id: int, report: str) -> None: ...
+
+    def usage(self) -> tuple[int, int]: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """Per-process LRU cache bounded by entry count and total bytes."""
+
+    name = "memory"
+
+    def __init__(self, *, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, *, organization_id: int, report: str) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def usage(self) -> tuple[int, int]:
+        with self._lock:
+            return len(self._entries), self._bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class DatabaseBackend:
+    """
+    Cache shared by every worker, stored in ``report_cache_entries``.
+
+    Hits refresh ``accessed_at`` at most every ``touch_seconds``; the limits
+    are checked every ``evict_check_every`` writes of this worker, and only
+    an overflow triggers a bounded eviction.
+    """
+
+    name = "database"
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+        touch_seconds: float = constants.REPORT_CACHE_TOUCH_SECONDS,
+        evict_check_every: int = constants.REPORT_CACHE_EVICT_CHECK_EVERY,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._session_factory = session_factory
+        self._touch_after = timedelta(seconds=touch_seconds)
+        self._evict_check_every = evict_check_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        # Own session: cache bookkeeping never joins the request's transaction.
+        with self._session_factory() as db:
+            return report_cache_repository.get_entry(db, key, datetime.utcnow(), touch_after=self._touch_after)
+
+    def set(self, key: str, value: bytes, *, organization_id: int, report: str) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._writes_lock:
+            self._writes += 1
+            check_limits = self._writes % self._evict_check_every == 0
+        now = datetime.utcnow()
+        with self._session_factory() as db:
+            report_cache_repository.put_entry(
+                db,
+                key=key,
+                organization_id=organization_id,
+                report=report,
+                value=value,
+                size=len(value),
+                created_at=now,
+                accessed_at=now,
+                expires_at=now + timedelta(seconds=self.ttl_seconds),
+            )
+            db.commit()
+            if check_limits:
+                self.evictions += report_cache_repository.evict(
+                    db,
+                    now,
+                    max_entries=self.max_entries,
+                    max_bytes=self.max_bytes,
+                    target=constants.REPORT_CACHE_EVICT_TARGET,
+                )
+                db.commit()
+
+    def usage(self) -> tuple[int, int]:
+        with self._session_factory() as db:
+            return report_cache_repository.usage(db)
+
+    def clear(self) -> None:
+        with self._session_factory() as db:
+            report_cache_repository.clear(db)
+            db.commit()
+
+
+BACKENDS = {"memory": MemoryBackend, "database": DatabaseBackend}
+
+_backend: ReportCacheBackend | None = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> ReportCacheBackend | None:
+    """Return the configured backend (None when caching is disabled)."""
+    global _backend, _backend_loaded
+    if not _backend_loaded:
+        with _backend_lock:
+            if not _backend_loaded:
+                backend_cls = BACKENDS.get(get_settings().report_cache_backend.lower())
+                _backend = backend_cls(
+                    max_entries=constants.REPORT_CACHE_MAX_ENTRIES,
+                    max_bytes=constants.REPORT_CACHE_MAX_BYTES,
+                    ttl_seconds=constants.REPORT_CACHE_TTL_SECONDS,
+                ) if backend_cls else None
+                _backend_loaded = True
+    return _backend
+
+
+def set_backend(backend: ReportCacheBackend | None) -> None:
+    """Install a backend (None disables the cache) and reset the metrics."""
+    global _backend, _backend_loaded
+    with _backend_lock:
+        _backend, _backend_loaded = backend, True
+    _metrics.reset()
+
+
+class _Metrics:
+    """Hit/miss counters and latency totals, per report and overall."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self._reports: dict[str, report_cache_model.ReportCacheCounters] = {}
+
+    def record(self, report: str, *, hit: bool, lookup_ms: float, compute_ms: float = 0.0, error: bool = False):
+        with self._lock:
+            counters = self._reports.setdefault(report, report_cache_model.ReportCacheCounters())
+            counters.hits += hit
+            counters.misses += not hit
+            counters.errors += error
+            counters.lookup_ms += lookup_ms
+            counters.compute_ms += compute_ms
+
+    def snapshot(self) -> dict[str, report_cache_model.ReportCacheCounters]:
+        with self._lock:
+            return {report: counters.model_copy() for report, counters in self._reports.items()}
+
+
+_metrics = _Metrics()
+
+
+def get_metrics() -> report_cache_model.ReportCacheMetrics:
+    """Return the cache usage and the hit/miss/latency counters of this process."""
+    backend = get_backend()
+    reports = _metrics.snapshot()
+    total = report_cache_model.ReportCacheCounters()
+    for counters in reports.values():
+        for field in ("hits", "misses", "errors", "lookup_ms", "compute_ms"):
+            setattr(total, field, getattr(total, field) + getattr(counters, field))
+    entries, size = backend.usage() if backend else (0, 0)
+    return report_cache_model.ReportCacheMetrics(
+        backend=backend.name if backend else "none",
+        entries=entries,
+        bytes=size,
+        evictions=backend.evictions if backend else 0,
+        total=total,
+        reports=reports,
+    )
+
+
+def cached(
+    db: Session,
+    organization_id: int,
+    report: str,
+    params: dict,
+    model: type[ReportT],
+    compute: Callable[[], ReportT],
+) -> ReportT:
+    """
+    Return a cached report, computing and storing it on a miss.
+
+    Backend failures are logged and treated as misses; the report is always
+    served.
+
+    Args:
+        db: Database session (used to read the data version).
+        organization_id: ID of the organization.
+        report: Report name, e.g. ``"abc"``.
+        params: Normalized window and parameters (JSON-serializable).
+        model: Pydantic model of the report, used to decode cached entries.
+        compute: Builds the report on a miss.
+    """
+    backend = get_backend()
+    if backend is None:
+        return compute()
+
+    started = time.perf_counter()
+    key = cache_key(organization_id, report, params, report_cache_repository.get_data_version(db, organization_id))
+    error = False
+    try:
+        raw = backend.get(key)
+    except Exception:
+        logger.exception(f"Falha ao ler o cache de relatórios ({report})")
+        raw, error = None, True
+    lookup_ms = (time.perf_counter() - started) * 1000
+    if raw is not None:
+        _metrics.record(report, hit=True, lookup_ms=lookup_ms)
+        return model.model_validate_json(raw)
+
+    started = time.perf_counter()
+    result = compute()
+    compute_ms = (time.perf_counter() - started) * 1000
+    try:
+        backend.set(key, result.model_dump_json().encode(), organization_id=organization_id, report=report)
+    except Exception:
+        logger.exception(f"Falha ao gravar o cache de relatórios ({report})")
+        error = True
+    _metrics.record(report, hit=False, lookup_ms=lookup_ms, compute_ms=compute_ms, error=error)
+    return result
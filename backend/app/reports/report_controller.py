@@ -3,15 +3,25 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.orm import Session
 
+from app import constants
 from app.auth.auth_service import get_current_user, require_role
 from app.database import get_db
 from app.users.user_model import User
-from . import report_model, report_service
+from app.utils import single_flight
+from . import (
+    report_cache_model,
+    report_cache_service,
+    report_job_model,
+    report_job_service,
+    report_model,
+    report_precompute_service,
+    report_service,
+)
 
 router = APIRouter(
     prefix="/reports",
@@ -20,6 +30,8 @@ router = APIRouter(
 )
 
 
+PERIOD_DAYS = {'7d': 7, '30d': 30, '90d': 90, '365d': 365}
+
 
 def get_date_range(
     period: Optional[str] = None,
@@ -30,14 +42,15 @@ def get_date_range(
     Return date range based on period or custom dates.
     period: '7d', '30d', '90d', '365d' (days)
     start_date/end_date: 'YYYY-MM-DD'
+
+    Windows relative to now are normalized (see report_cache_service.normalize_window)
+    so that repeated requests share cache entries.
     """
     now = datetime.now()
     
     if period:
-        days_map = {'7d': 7, '30d': 30, '90d': 90, '365d': 365}
-        days = days_map.get(period, 30)
-        start = now - timedelta(days=days)
-        end = now
+        days = PERIOD_DAYS.get(period, 30)
+        start, end = report_cache_service.normalize_window(now - timedelta(days=days), now)
     elif start_date and end_date:
         try:
             start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
@@ -47,22 +60,80 @@ def get_date_range(
                 end = end.replace(hour=23, minute=59, second=59)
         except ValueError:
             # Fallback to default if parsing fails
-            start = now - timedelta(days=30)
-            end = now
+            start, end = report_cache_service.normalize_window(now - timedelta(days=30), now)
     else:
         # Default: last 30 days
-        start = now - timedelta(days=30)
-        end = now
+        start, end = report_cache_service.normalize_window(now - timedelta(days=30), now)
     
     return start, end
 
+
+def _serve(
+    db: Session,
+    organization_id: int,
+    report: str,
+    params: dict,
+    model,
+    compute,
+    *,
+    period: str | None = None,
+    fresh: bool = False,
+):
+    """
+    Serve a report, from the nightly precomputation or the cache when possible.
+
+    A ``period`` request is answered with the precomputed result of the same
+    window, if any (unless ``fresh``). Otherwise the cache is used, and
+    concurrent identical misses are coalesced so only one of them runs
+    ``compute`` (see app.utils.single_flight); this also holds with the cache
+    disabled.
+    """
+    if period in PERIOD_DAYS and not fresh:
+        precomputed = report_precompute_service.get_precomputed_report(
+            db, organization_id, report, PERIOD_DAYS[period], params["start"], model
+        )
+        if precomputed is not None:
+            return precomputed
+    return report_cache_service.cached(
+        db,
+        organization_id,
+        report,
+        params,
+        model,
+        lambda: single_flight.coalesce(organization_id, f"reports.{report}", params, compute),
+    )
+
+
 @router.get("/overview", response_model=report_model.StockOverview)
 def get_overview_report(
+    limit: int = Query(
+        default=constants.REPORT_OVERVIEW_PAGE_SIZE,
+        ge=1,
+        le=constants.MAX_PAGE_SIZE,
+        description="Products per page in the low/out-of-stock lists",
+    ),
+    low_stock_cursor: int | None = Query(default=None, description="low_stock_next_cursor of the previous page"),
+    out_of_stock_cursor: int | None = Query(
+        default=None, description="out_of_stock_next_cursor of the previous page"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Return the stock overview report."""
-    return report_service.get_stock_overview(db, organization_id=current_user.organization_id)
+    """Return stock totals and paginated low/out-of-stock product lists."""
+    return _serve(
+        db,
+        current_user.organization_id,
+        "overview",
+        {"limit": limit, "low_stock_cursor": low_stock_cursor, "out_of_stock_cursor": out_of_stock_cursor},
+        report_model.StockOverview,
+        lambda: report_service.get_stock_overview(
+            db,
+            organization_id=current_user.organization_id,
+            limit=limit,
+            low_stock_cursor=low_stock_cursor,
+            out_of_stock_cursor=out_of_stock_cursor,
+        ),
+    )
 
 
 @router.get("/categories", response_model=List[report_model.CategoryReportItem])
@@ -88,8 +159,14 @@ def get_movement_report(
     period: str | None = Query(default=None),
     start_date: datetime | None = Query(default=None),
     end_date: datetime | None = Query(default=None),
-    limit: int = Query(default=100, ge=1, le=500, description="Number of records to return"),
-    offset: int = Query(default=0, ge=0, description="Number of records to skip"),
+    limit: int = Query(
+        default=100, ge=1, le=constants.MOVEMENT_MAX_PAGE_SIZE, description="Number of records to return"
+    ),
+    offset: int = Query(
+        default=0, ge=0, le=constants.MOVEMENT_MAX_OFFSET, description="Number of records to skip (prefer cursor)"
+    ),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    expand: bool = Query(default=False, description="Return the full nested product and user"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -102,9 +179,86 @@ def get_movement_report(
         organization_id=current_user.organization_id,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        expand=expand,
     )
 
 
+@router.get("/bundle", response_model=report_model.ReportBundle)
+def get_report_bundle(
+    sections: str | None = Query(
+        default=None,
+        description="Seções separadas por vírgula: overview, abc, xyz, turnover, financial, forecast (padrão: todas)",
+    ),
+    period: str | None = Query(default=None),
+    start_date: str | None = Query(default=None),
+    end_date: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return several reports over the same window, computed from one product load."""
+    requested = report_service.parse_bundle_sections(sections)
+    start, end = get_date_range(period, start_date, end_date)
+    return _serve(
+        db,
+        current_user.organization_id,
+        "bundle",
+        {"start": start, "end": end, "sections": requested},
+        report_model.ReportBundle,
+        lambda: report_service.get_report_bundle(
+            db,
+            organization_id=current_user.organization_id,
+            sections=requested,
+            start_date=start,
+            end_date=end,
+        ),
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=report_job_model.ReportJobPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_report_job(
+    job: report_job_model.ReportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Queue a report to be built in the background; poll GET /reports/jobs/{id} for the result."""
+    sections = None
+    if job.report == "bundle":
+        sections = report_service.parse_bundle_sections(",".join(job.sections or []))
+    start, end = get_date_range(job.period, job.start_date, job.end_date)
+    created = report_job_service.submit_job(
+        db,
+        current_user.organization_id,
+        job.report,
+        start,
+        end,
+        sections=sections,
+        created_by_user_id=current_user.id,
+    )
+    return report_job_service.to_public(created)
+
+
+@router.get("/jobs/{job_id}", response_model=report_job_model.ReportJobPublic)
+def get_report_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return a report job's status and progress, and its result once done."""
+    job = report_job_service.get_job(db, job_id, current_user.organization_id)
+    return report_job_service.to_public(job)
+
+
+@router.get("/cache/metrics", response_model=report_cache_model.ReportCacheMetrics)
+def get_report_cache_metrics(current_user: User = Depends(require_role("admin"))):
+    """Return report cache usage and hit/miss/latency counters of this worker."""
+    return report_cache_service.get_metrics()
+
+
 # New Insights Endpoints
 @router.get("/profitability")
 def get_profitability_report(
@@ -120,11 +274,28 @@ def get_profitability_report(
 def get_period_comparison(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
-    days: int = Query(30, ge=7, le=365, description="Period length in days")
+    days: int = Query(30, ge=7, le=365, description="Period length in days (granularity=rolling)"),
+    granularity: Literal["rolling", "day", "week", "month"] = Query("rolling", description="Period type"),
+    periods: int = Query(2, ge=2, le=constants.COMPARISON_MAX_PERIODS, description="Number of periods"),
+    breakdown: Literal["product", "category"] | None = Query(None, description="Also compare per product or category"),
+    limit: int = Query(
+        default=constants.COMPARISON_BREAKDOWN_LIMIT,
+        ge=1,
+        le=constants.MAX_PAGE_SIZE,
+        description="Breakdown rows, those with the largest current-period quantity",
+    ),
 ):
-    """Compare current period vs previous period."""
+    """Compare outbound movements over consecutive periods (the last one is the current)."""
     from .insights_service import InsightsService
-    return InsightsService.compare_periods(db, current_user.organization_id, days)
+    return InsightsService.compare_periods(
+        db,
+        current_user.organization_id,
+        granularity=granularity,
+        periods=periods,
+        days=days,
+        breakdown=breakdown,
+        limit=limit,
+    )
 
 
 @router.get("/recommendations")
@@ -142,12 +313,31 @@ def get_abc_report(
     period: str | None = Query(default=None),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
+    fresh: bool = Query(default=False, description="Ignora o resultado pré-calculado e calcula agora"),
+    classification: str | None = Query(default=None, description="Classes separadas por vírgula (A,B,C)"),
+    sort: str | None = Query(default=None, description="Campo de ordenação; prefixo '-' para decrescente"),
+    limit: int | None = Query(default=None, ge=1, le=constants.REPORT_ITEMS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Return ABC analysis (Pareto principle) for products."""
     start, end = get_date_range(period, start_date, end_date)
-    return report_service.get_abc_analysis(db, organization_id=current_user.organization_id, start_date=start, end_date=end)
+    result = _serve(
+        db,
+        current_user.organization_id,
+        "abc",
+        {"start": start, "end": end},
+        report_model.ABCReport,
+        lambda: report_service.get_abc_analysis(
+            db, organization_id=current_user.organization_id, start_date=start, end_date=end
+        ),
+        period=period,
+        fresh=fresh,
+    )
+    return report_service.select_report_items(
+        "abc", result, sort=sort, filter_values=classification, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/xyz", response_model=report_model.XYZReport)
@@ -155,12 +345,31 @@ def get_xyz_report(
     period: str | None = Query(default=None),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
+    fresh: bool = Query(default=False, description="Ignora o resultado pré-calculado e calcula agora"),
+    classification: str | None = Query(default=None, description="Classes separadas por vírgula (X,Y,Z)"),
+    sort: str | None = Query(default=None, description="Campo de ordenação; prefixo '-' para decrescente"),
+    limit: int | None = Query(default=None, ge=1, le=constants.REPORT_ITEMS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Return XYZ analysis (demand variability) for products."""
     start, end = get_date_range(period, start_date, end_date)
-    return report_service.get_xyz_analysis(db, organization_id=current_user.organization_id, start_date=start, end_date=end)
+    result = _serve(
+        db,
+        current_user.organization_id,
+        "xyz",
+        {"start": start, "end": end},
+        report_model.XYZReport,
+        lambda: report_service.get_xyz_analysis(
+            db, organization_id=current_user.organization_id, start_date=start, end_date=end
+        ),
+        period=period,
+        fresh=fresh,
+    )
+    return report_service.select_report_items(
+        "xyz", result, sort=sort, filter_values=classification, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/turnover", response_model=report_model.TurnoverReport)
@@ -168,12 +377,30 @@ def get_turnover_report(
     period: str | None = Query(default=None),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
+    fresh: bool = Query(default=False, description="Ignora o resultado pré-calculado e calcula agora"),
+    sort: str | None = Query(default=None, description="Campo de ordenação; prefixo '-' para decrescente"),
+    limit: int | None = Query(default=None, ge=1, le=constants.REPORT_ITEMS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Return stock turnover rates."""
     start, end = get_date_range(period, start_date, end_date)
-    return report_service.get_stock_turnover(db, organization_id=current_user.organization_id, start_date=start, end_date=end)
+    result = _serve(
+        db,
+        current_user.organization_id,
+        "turnover",
+        {"start": start, "end": end},
+        report_model.TurnoverReport,
+        lambda: report_service.get_stock_turnover(
+            db, organization_id=current_user.organization_id, start_date=start, end_date=end
+        ),
+        period=period,
+        fresh=fresh,
+    )
+    return report_service.select_report_items(
+        "turnover", result, sort=sort, filter_values=None, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/financial", response_model=report_model.FinancialReport)
@@ -186,7 +413,16 @@ def get_financial_report(
 ):
     """Return financial metrics (holding cost, margins)."""
     start, end = get_date_range(period, start_date, end_date)
-    return report_service.get_financial_report(db, organization_id=current_user.organization_id, start_date=start, end_date=end)
+    return _serve(
+        db,
+        current_user.organization_id,
+        "financial",
+        {"start": start, "end": end},
+        report_model.FinancialReport,
+        lambda: report_service.get_financial_report(
+            db, organization_id=current_user.organization_id, start_date=start, end_date=end
+        ),
+    )
 
 
 @router.get("/forecast", response_model=report_model.ForecastReport)
@@ -194,9 +430,28 @@ def get_forecast_report(
     period: str | None = Query(default=None),
     start_date: str | None = Query(default=None),
     end_date: str | None = Query(default=None),
+    fresh: bool = Query(default=False, description="Ignora o resultado pré-calculado e calcula agora"),
+    status: str | None = Query(default=None, description="Situações separadas por vírgula (OK,WARNING,CRITICAL)"),
+    sort: str | None = Query(default=None, description="Campo de ordenação; prefixo '-' para decrescente"),
+    limit: int | None = Query(default=None, ge=1, le=constants.REPORT_ITEMS_MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, description="next_cursor da página anterior"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Return stock forecast (reorder points, stockout risk)."""
     start, end = get_date_range(period, start_date, end_date)
-    return report_service.get_forecast_report(db, organization_id=current_user.organization_id, start_date=start, end_date=end)
+    result = _serve(
+        db,
+        current_user.organization_id,
+        "forecast",
+        {"start": start, "end": end},
+        report_model.ForecastReport,
+        lambda: report_service.get_forecast_report(
+            db, organization_id=current_user.organization_id, start_date=start, end_date=end
+        ),
+        period=period,
+        fresh=fresh,
+    )
+    return report_service.select_report_items(
+        "forecast", result, sort=sort, filter_values=status, limit=limit, cursor=cursor
+    )
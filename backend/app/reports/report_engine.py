@@ -0,0 +1,168 @@
+"""Array-based analytics engine behind the ABC, XYZ, turnover and forecast reports.
+
+The active products of an organization are loaded once into a
+:class:`ProductFrame` (one column per attribute, aligned by position), and
+consumption totals are aligned to the same positions. Every column is a
+NumPy ``ndarray`` and classification runs as vectorized whole-column
+operations instead of per-product Python loops. Results are returned as
+lists, ready to be zipped into report items.
+"""
+
+from __future__ import annotations
+
+from typing import Mapping, NamedTuple, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.products import product_repository
+
+NO_STOCKOUT_DAYS = 999.0  # Reported when a product has no consumption
+SAFETY_STOCK_FACTOR = 0.5  # Safety stock as a share of lead-time demand
+
+
+class ProductFrame(NamedTuple):
+    """Columns of the active products of an organization, ordered by ID."""
+
+    ids: list[int]
+    names: list[str]
+    positions: dict[int, int]
+    price: np.ndarray
+    cost: np.ndarray
+    quantity: np.ndarray
+    lead_time: np.ndarray
+
+
+class ABCColumns(NamedTuple):
+    """ABC results, in descending order of consumption value."""
+
+    order: list[int]
+    value: list[float]
+    percentage: list[float]
+    cumulative_percentage: list[float]
+    classification: list[str]
+
+
+class XYZColumns(NamedTuple):
+    cv: list[float]
+    classification: list[str]
+
+
+class ForecastColumns(NamedTuple):
+    daily_usage: list[float]
+    days_until_stockout: list[float]
+    reorder_point: list[int]
+    status: list[str]
+
+
+def _column(values, dtype) -> np.ndarray:
+    return np.array(values, dtype=dtype)
+
+
+def load_products(db: Session, organization_id: int) -> ProductFrame:
+    """Load the analytics columns of an organization's active products with one query."""
+    rows = product_repository.list_product_columns(db, organization_id)
+    ids, names, price, cost, quantity, lead_time = (
+        (list(column) for column in zip(*rows)) if rows else ([],) * 6
+    )
+    return ProductFrame(
+        ids=ids,
+        names=names,
+        positions={product_id: position for position, product_id in enumerate(ids)},
+        price=_column(price, float),
+        cost=_column(cost, float),
+        quantity=_column(quantity, int),
+        lead_time=_column(lead_time, int),
+    )
+
+
+def align(frame: ProductFrame, values: Mapping[int, float], default: Sequence[float] | None = None) -> np.ndarray:
+    """
+    Return ``values`` (keyed by product ID) as a float column aligned with the frame.
+
+    Products missing from ``values`` take ``default`` at their position, or 0.
+    Keys of products outside the frame (deleted products) are ignored.
+    """
+    positions = frame.positions
+    column = np.zeros(len(frame.ids)) if default is None else np.array(default, dtype=float)
+    matched = [(positions[key], value) for key, value in values.items() if key in positions]
+    if matched:
+        index, data = zip(*matched)
+        column[list(index)] = data
+    return column
+
+
+def stock_values(frame: ProductFrame) -> tuple[float, float]:
+    """Return the current stock value at sale price and at cost price."""
+    return float(frame.quantity @ frame.price), float(frame.quantity @ frame.cost)
+
+
+def abc(frame: ProductFrame, consumed) -> ABCColumns:
+    """
+    Classify products by consumption value (``consumed * price``) with cumulative shares.
+
+    Products are ranked by value, highest first; ties keep ID order.
+    """
+    a_limit, b_limit = constants.ABC_CLASS_A_THRESHOLD, constants.ABC_CLASS_B_THRESHOLD
+    value = consumed * frame.price
+    order = np.argsort(-value, kind="stable")
+    ranked = value[order]
+    total = value.sum()
+    scale = 100 / total if total > 0 else 0.0
+    percentage = ranked * scale
+    cumulative = np.cumsum(ranked) * scale
+    classification = np.where(cumulative <= a_limit, "A", np.where(cumulative <= b_limit, "B", "C"))
+    return ABCColumns(
+        order.tolist(), ranked.tolist(), percentage.tolist(), cumulative.tolist(), classification.tolist()
+    )
+
+
+def xyz(frame: ProductFrame, demand: Mapping[int, Mapping[int, int]], periods: int) -> XYZColumns:
+    """
+    Classify products by the coefficient of variation of their demand per period.
+
+    Args:
+        frame: Product columns.
+        demand: ``{product_id: {period: quantity}}`` with only non-empty periods.
+        periods: Number of periods analyzed; missing periods count as zero.
+
+    The sample CV is computed from each product's total and sum of squares,
+    so sparse demand needs no zero-filled matrix. Products without demand
+    are class Z with CV 0.
+    """
+    x_limit, y_limit = constants.XYZ_CLASS_X_THRESHOLD, constants.XYZ_CLASS_Y_THRESHOLD
+    totals = align(frame, {key: sum(weeks.values()) for key, weeks in demand.items()})
+    squares = align(frame, {key: sum(q * q for q in weeks.values()) for key, weeks in demand.items()})
+    cv = np.zeros(len(frame.ids))
+    if periods > 1:
+        mean = totals / periods
+        variance = np.maximum(0.0, (squares - totals * mean) / (periods - 1))
+        np.divide(np.sqrt(variance), mean, out=cv, where=mean > 0)
+    classification = np.where(
+        totals <= 0, "Z", np.where(cv <= x_limit, "X", np.where(cv <= y_limit, "Y", "Z"))
+    )
+    return XYZColumns(cv.tolist(), classification.tolist())
+
+
+def turnover(sold, average_inventory) -> list[float]:
+    """Return ``sold / average_inventory`` per product (0 where there is no inventory)."""
+    rate = np.zeros(len(sold))
+    np.divide(sold, average_inventory, out=rate, where=average_inventory > 0)
+    return rate.tolist()
+
+
+def forecast(frame: ProductFrame, used, days: int) -> ForecastColumns:
+    """
+    Return daily usage, days until stockout, reorder point and status per product.
+
+    Reorder point = lead-time demand + safety stock, with safety stock at
+    ``SAFETY_STOCK_FACTOR`` of lead-time demand, truncated to whole units.
+    """
+    daily = used / days
+    lead_demand = daily * frame.lead_time
+    reorder = (lead_demand + lead_demand * SAFETY_STOCK_FACTOR).astype(np.int64)
+    stockout = np.full(len(frame.ids), NO_STOCKOUT_DAYS)
+    np.divide(frame.quantity, daily, out=stockout, where=daily > 0)
+    status = np.where(frame.quantity == 0, "CRITICAL", np.where(frame.quantity <= reorder, "WARNING", "OK"))
+    return ForecastColumns(daily.tolist(), stockout.tolist(), reorder.tolist(), status.tolist())
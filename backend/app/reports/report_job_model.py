@@ -0,0 +1,107 @@
+"""Models and schemas for asynchronous report jobs."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Enum as SqlEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    text,
+)
+
+from app.database import Base
+
+ReportJobType = Literal["overview", "abc", "xyz", "turnover", "financial", "forecast", "bundle"]
+
+
+class ReportJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+ACTIVE_STATUSES = (ReportJobStatus.PENDING, ReportJobStatus.RUNNING)
+
+# Statuses are stored by name (non-native enum)
+_ACTIVE_CONDITION = text("status IN ('PENDING', 'RUNNING')")
+
+
+class ReportJob(Base):
+    """
+    A report computed in the background and its compressed result.
+
+    ``request_hash`` fingerprints the report type and its normalized
+    parameters; the partial unique index allows a single active job per
+    identical request, so duplicates attach to it instead of queuing again.
+    ``expires_at`` is the deadline of an active job (after which it is
+    considered abandoned) and, once finished, the end of the result's life.
+    """
+
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index(
+            "uq_report_jobs_active_request",
+            "organization_id",
+            "request_hash",
+            unique=True,
+            sqlite_where=_ACTIVE_CONDITION,
+            postgresql_where=_ACTIVE_CONDITION,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    report = Column(String(20), nullable=False)
+    params = Column(JSON, nullable=False)  # Normalized window (and sections for bundles)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(
+        SqlEnum(ReportJobStatus, name="report_job_status", native_enum=False),
+        nullable=False,
+        default=ReportJobStatus.PENDING,
+    )
+    progress = Column(Integer, nullable=False, default=0)  # 0-100
+    result = Column(LargeBinary, nullable=True)  # zstd-compressed JSON
+    result_size = Column(Integer, nullable=True)  # Uncompressed bytes
+    error = Column(Text, nullable=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ReportJobCreate(BaseModel):
+    report: ReportJobType = Field(description="Relatório a gerar")
+    period: Optional[str] = Field(default=None, description="7d, 30d, 90d ou 365d")
+    start_date: Optional[str] = Field(default=None, description="Início da janela (YYYY-MM-DD)")
+    end_date: Optional[str] = Field(default=None, description="Fim da janela (YYYY-MM-DD)")
+    sections: Optional[List[str]] = Field(
+        default=None, description="Seções do pacote (apenas para report=bundle; padrão: todas)"
+    )
+
+
+class ReportJobPublic(BaseModel):
+    id: int
+    report: str
+    params: dict
+    status: ReportJobStatus
+    progress: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: datetime
+    result: Optional[Any] = None  # Same shape as the synchronous endpoint, once done
@@ -0,0 +1,110 @@
+"""Data repository for asynchronous report jobs."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .report_job_model import ACTIVE_STATUSES, ReportJob, ReportJobStatus
+
+
+def get_job(db: Session, job_id: int, organization_id: int) -> ReportJob | None:
+    """Return an organization's job by ID."""
+    return db.scalar(select(ReportJob).where(ReportJob.id == job_id, ReportJob.organization_id == organization_id))
+
+
+def get_active_job(db: Session, organization_id: int, request_hash: str) -> ReportJob | None:
+    """Return the pending or running job for an identical request, if any."""
+    return db.scalar(
+        select(ReportJob).where(
+            ReportJob.organization_id == organization_id,
+            ReportJob.request_hash == request_hash,
+            ReportJob.status.in_(ACTIVE_STATUSES),
+        )
+    )
+
+
+def count_active_jobs(db: Session, organization_id: int) -> int:
+    """Return how many jobs of an organization are pending or running."""
+    return db.scalar(
+        select(func.count()).where(
+            ReportJob.organization_id == organization_id, ReportJob.status.in_(ACTIVE_STATUSES)
+        )
+    )
+
+
+def create_job(db: Session, job: ReportJob) -> ReportJob | None:
+    """Insert and commit a pending job; return None if an identical job is already active."""
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return job
+
+
+def fail_abandoned_jobs(
+    db: Session, now: datetime, keep_until: datetime, organization_id: int | None = None
+) -> int:
+    """Mark active jobs past their deadline as failed (kept until ``keep_until``) and return how many."""
+    statement = (
+        update(ReportJob)
+        .where(ReportJob.status.in_(ACTIVE_STATUSES), ReportJob.expires_at <= now)
+        .values(
+            status=ReportJobStatus.FAILED,
+            error="Tempo limite de processamento excedido",
+            finished_at=now,
+            expires_at=keep_until,
+        )
+    )
+    if organization_id is not None:
+        statement = statement.where(ReportJob.organization_id == organization_id)
+    result = db.execute(statement)
+    db.commit()
+    return result.rowcount
+
+
+def start_job(db: Session, job_id: int, now: datetime, expires_at: datetime) -> ReportJob | None:
+    """Move a pending job to running with a new deadline; return None if it is no longer pending."""
+    result = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.PENDING)
+        .values(status=ReportJobStatus.RUNNING, started_at=now, expires_at=expires_at)
+    )
+    db.commit()
+    return db.get(ReportJob, job_id) if result.rowcount else None
+
+
+def set_progress(db: Session, job_id: int, progress: int, expires_at: datetime) -> bool:
+    """Record the progress of a running job and push back its deadline (heartbeat); False if it is no longer running."""
+    result = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING)
+        .values(progress=progress, expires_at=expires_at)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def finish_job(db: Session, job_id: int, **fields) -> bool:
+    """Store the outcome (status, result or error, timestamps) of a running job; False if it is no longer running."""
+    result = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == ReportJobStatus.RUNNING)
+        .values(**fields)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def delete_expired(db: Session, now: datetime) -> int:
+    """Delete finished jobs whose result has expired and return how many were removed."""
+    result = db.execute(
+        delete(ReportJob).where(ReportJob.status.not_in(ACTIVE_STATUSES), ReportJob.expires_at <= now)
+    )
+    db.commit()
+    return result.rowcount
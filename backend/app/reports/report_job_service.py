@@ -0,0 +1,233 @@
+"""Asynchronous report jobs.
+
+``POST /reports/jobs`` records a pending job and returns immediately; a
+bounded pool of background threads (``REPORT_JOB_WORKERS`` per process)
+builds the report with its own database session, so long windows neither
+hit the proxy timeout nor hold a request thread. Progress is written to the
+job row as each section completes, and the result is stored zstd-compressed
+until ``REPORT_JOB_RESULT_TTL_HOURS`` after it finished.
+
+An identical request (same report and normalized parameters) made while a
+job is pending or running returns that job instead of queuing a new one.
+Each progress update is also a heartbeat that pushes the job's deadline
+``REPORT_JOB_TIMEOUT_MINUTES`` ahead; a job that misses it (e.g. the process
+stopped) is marked failed, which frees its slot. Only a running job can be
+finished, so a late run never overwrites that outcome.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable
+
+import zstandard
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.database import SessionLocal
+from app.exceptions import EstockaException, NotFoundException, ReportJobLimitException
+from . import report_job_model, report_job_repository, report_model, report_service
+
+logger = logging.getLogger(__name__)
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _request_hash(report: str, params: dict) -> str:
+    raw = json.dumps([report, params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _result_expiry(now: datetime) -> datetime:
+    return now + timedelta(hours=constants.REPORT_JOB_RESULT_TTL_HOURS)
+
+
+def _deadline(now: datetime) -> datetime:
+    return now + timedelta(minutes=constants.REPORT_JOB_TIMEOUT_MINUTES)
+
+
+class _JobAbandoned(Exception):
+    """The job was marked failed (missed heartbeat) while it was still running."""
+
+
+def _dispatch(job_id: int) -> None:
+    """Hand a committed job to the background pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=constants.REPORT_JOB_WORKERS, thread_name_prefix="report-job"
+            )
+        _executor.submit(run_job, job_id)
+
+
+def shutdown() -> None:
+    """Stop the pool: running jobs finish, queued ones stay pending until they time out."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def submit_job(
+    db: Session,
+    organization_id: int,
+    report: str,
+    start_date: datetime,
+    end_date: datetime | None,
+    sections: list[str] | None = None,
+    created_by_user_id: int | None = None,
+) -> report_job_model.ReportJob:
+    """
+    Queue a report job, or return the identical job that is already active.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        report: Report type (see ``report_job_model.ReportJobType``).
+        start_date: Start of the (normalized) analysis window.
+        end_date: End of the analysis window.
+        sections: Sections of a ``bundle`` job.
+        created_by_user_id: ID of the requesting user.
+
+    Raises:
+        HTTPException(429): If the organization already has the maximum of active jobs.
+    """
+    now = datetime.utcnow()
+    report_job_repository.fail_abandoned_jobs(db, now, _result_expiry(now), organization_id)
+    report_job_repository.delete_expired(db, now)
+
+    params = {"start": start_date.isoformat(), "end": end_date.isoformat() if end_date else None}
+    if report == "bundle":
+        params["sections"] = sections or list(report_model.BUNDLE_SECTIONS)
+    request_hash = _request_hash(report, params)
+
+    existing = report_job_repository.get_active_job(db, organization_id, request_hash)
+    if existing is not None:
+        return existing
+    if report_job_repository.count_active_jobs(db, organization_id) >= constants.REPORT_JOB_MAX_ACTIVE_PER_ORGANIZATION:
+        raise ReportJobLimitException(constants.REPORT_JOB_MAX_ACTIVE_PER_ORGANIZATION)
+
+    job = report_job_repository.create_job(
+        db,
+        report_job_model.ReportJob(
+            organization_id=organization_id,
+            report=report,
+            params=params,
+            request_hash=request_hash,
+            status=report_job_model.ReportJobStatus.PENDING,
+            progress=0,
+            created_by_id=created_by_user_id,
+            created_at=now,
+            expires_at=_deadline(now),
+        ),
+    )
+    if job is None:
+        # Lost the race against an identical request
+        return report_job_repository.get_active_job(db, organization_id, request_hash)
+
+    logger.info(f"Relatório {report} enfileirado (job {job.id}, organização {organization_id})")
+    _dispatch(job.id)
+    return job
+
+
+def run_job(job_id: int, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    """Build a pending job's report and store its result or error (runs in the pool)."""
+    with session_factory() as db:
+        now = datetime.utcnow()
+        job = report_job_repository.start_job(db, job_id, now, _deadline(now))
+        if job is None:
+            return
+        report, params, organization_id = job.report, job.params, job.organization_id
+
+        def heartbeat(done: int, total: int) -> None:
+            progress = min(99, done * 100 // total)
+            if not report_job_repository.set_progress(db, job_id, progress, _deadline(datetime.utcnow())):
+                raise _JobAbandoned()
+
+        try:
+            start = datetime.fromisoformat(params["start"])
+            end = datetime.fromisoformat(params["end"]) if params["end"] else None
+            sections = params["sections"] if report == "bundle" else [report]
+            bundle = report_service.get_report_bundle(db, organization_id, sections, start, end, progress=heartbeat)
+            result = bundle if report == "bundle" else getattr(bundle, report)
+            payload = result.model_dump_json().encode()
+        except _JobAbandoned:
+            db.rollback()
+            logger.warning(f"Relatório {report} (job {job_id}) interrompido: job marcado como abandonado")
+            return
+        except Exception as exc:
+            db.rollback()
+            if isinstance(exc, EstockaException):
+                error = exc.detail
+            else:
+                logger.exception(f"Falha ao gerar o relatório {report} (job {job_id})")
+                error = "Erro interno ao gerar o relatório"
+            now = datetime.utcnow()
+            report_job_repository.finish_job(
+                db,
+                job_id,
+                status=report_job_model.ReportJobStatus.FAILED,
+                error=error,
+                finished_at=now,
+                expires_at=_result_expiry(now),
+            )
+            return
+
+        now = datetime.utcnow()
+        finished = report_job_repository.finish_job(
+            db,
+            job_id,
+            status=report_job_model.ReportJobStatus.DONE,
+            progress=100,
+            result=zstandard.ZstdCompressor(level=constants.REPORT_JOB_ZSTD_LEVEL).compress(payload),
+            result_size=len(payload),
+            finished_at=now,
+            expires_at=_result_expiry(now),
+        )
+        if finished:
+            logger.info(f"✅ Relatório {report} concluído (job {job_id}, {len(payload)} bytes)")
+        else:
+            logger.warning(f"Resultado do relatório {report} descartado: job {job_id} já havia sido encerrado")
+
+
+def get_job(db: Session, job_id: int, organization_id: int) -> report_job_model.ReportJob:
+    """
+    Return an organization's job.
+
+    Raises:
+        HTTPException(404): If the job does not exist or its result has expired.
+    """
+    now = datetime.utcnow()
+    report_job_repository.fail_abandoned_jobs(db, now, _result_expiry(now), organization_id)
+    job = report_job_repository.get_job(db, job_id, organization_id)
+    if job is None or (job.status not in report_job_model.ACTIVE_STATUSES and job.expires_at <= now):
+        raise NotFoundException("Relatório", job_id)
+    return job
+
+
+def to_public(job: report_job_model.ReportJob) -> report_job_model.ReportJobPublic:
+    """Convert a job to its response schema, decompressing the result when done."""
+    result = None
+    if job.status == report_job_model.ReportJobStatus.DONE and job.result is not None:
+        result = json.loads(zstandard.ZstdDecompressor().decompress(job.result, max_output_size=job.result_size))
+    return report_job_model.ReportJobPublic(
+        id=job.id,
+        report=job.report,
+        params=job.params,
+        status=job.status,
+        progress=job.progress,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        result=result,
+    )
@@ -8,7 +8,7 @@ from typing import List
 from pydantic import BaseModel, ConfigDict
 
 from app.categories.category_model import CategoryPublic
-from app.movements.movement_model import MovementPublic
+from app.movements.movement_model import MovementPublic, MovementSummary
 
 
 class ProductSummary(BaseModel):
@@ -25,8 +25,12 @@ class ProductSummary(BaseModel):
 class StockOverview(BaseModel):
     total_products: int
     total_stock_value: float
-    low_stock_products: List[ProductSummary]
+    low_stock_count: int = 0
+    out_of_stock_count: int = 0
+    low_stock_products: List[ProductSummary]  # One page, ordered by product ID
     out_of_stock_products: List[ProductSummary]
+    low_stock_next_cursor: int | None = None  # Pass as low_stock_cursor for the next page
+    out_of_stock_next_cursor: int | None = None
 
 
 class CategoryReportItem(BaseModel):
@@ -46,7 +50,17 @@ class MovementReportFilters(BaseModel):
 
 class MovementReport(BaseModel):
     filters: MovementReportFilters
-    movements: List[MovementPublic]
+    movements: List[MovementSummary] | List[MovementPublic]
+    next_cursor: str | None = None
+
+
+class ReportFreshness(BaseModel):
+    """Origin of a report served from the nightly precomputation."""
+
+    precomputed: bool = True
+    computed_at: datetime
+    data_through: datetime  # End of the window that was analyzed
+    stale: bool  # Stock data changed after the report was computed
 
 
 class ABCItem(BaseModel):
@@ -60,6 +74,9 @@ class ABCItem(BaseModel):
 
 class ABCReport(BaseModel):
     items: List[ABCItem]
+    freshness: ReportFreshness | None = None  # Set when served from the nightly precomputation
+    total_items: int | None = None  # Items matching the filters, when filtered or paginated
+    next_cursor: str | None = None  # Pass as cursor for the next page
 
 
 class XYZItem(BaseModel):
@@ -71,6 +88,9 @@ class XYZItem(BaseModel):
 
 class XYZReport(BaseModel):
     items: List[XYZItem]
+    freshness: ReportFreshness | None = None  # Set when served from the nightly precomputation
+    total_items: int | None = None  # Items matching the filters, when filtered or paginated
+    next_cursor: str | None = None  # Pass as cursor for the next page
 
 
 class TurnoverItem(BaseModel):
@@ -83,6 +103,9 @@ class TurnoverItem(BaseModel):
 
 class TurnoverReport(BaseModel):
     items: List[TurnoverItem]
+    freshness: ReportFreshness | None = None  # Set when served from the nightly precomputation
+    total_items: int | None = None  # Items matching the filters, when filtered or paginated
+    next_cursor: str | None = None  # Pass as cursor for the next page
 
 
 class FinancialReport(BaseModel):
@@ -90,6 +113,8 @@ class FinancialReport(BaseModel):
     total_cost_value: float
     potential_profit: float
     average_margin: float
+    average_inventory_value: float = 0.0  # Mean end-of-day stock at sale price over the period
+    average_inventory_cost: float = 0.0  # Same, at cost price (basis for holding cost)
 
 
 class ForecastItem(BaseModel):
@@ -103,3 +128,22 @@ class ForecastItem(BaseModel):
 
 class ForecastReport(BaseModel):
     items: List[ForecastItem]
+    freshness: ReportFreshness | None = None  # Set when served from the nightly precomputation
+    total_items: int | None = None  # Items matching the filters, when filtered or paginated
+    next_cursor: str | None = None  # Pass as cursor for the next page
+
+
+BUNDLE_SECTIONS = ("overview", "abc", "xyz", "turnover", "financial", "forecast")
+
+
+class ReportBundle(BaseModel):
+    """Several reports over the same window; sections not requested are null."""
+
+    start_date: datetime
+    end_date: datetime | None = None
+    overview: StockOverview | None = None
+    abc: ABCReport | None = None
+    xyz: XYZReport | None = None
+    turnover: TurnoverReport | None = None
+    financial: FinancialReport | None = None
+    forecast: ForecastReport | None = None
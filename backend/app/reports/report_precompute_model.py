@@ -0,0 +1,35 @@
+"""Models for reports precomputed by the nightly scheduler."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+
+from app.database import Base
+
+
+class PrecomputedReport(Base):
+    """
+    The latest nightly result of a report over a ``period_days`` window.
+
+    ``window_start`` is the midnight a ``period=<N>d`` request starts at on
+    the day it was computed, so the row only serves requests of that day;
+    ``data_version`` is the organization's version when it was computed and
+    tells whether stock data changed since.
+    """
+
+    __tablename__ = "precomputed_reports"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "report", "period_days", name="uq_precomputed_reports_org_report_period"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    report = Column(String(20), nullable=False)
+    period_days = Column(Integer, nullable=False)
+    window_start = Column(DateTime, nullable=False)
+    window_end = Column(DateTime, nullable=False)
+    data_version = Column(Integer, nullable=False)
+    value = Column(LargeBinary, nullable=False)  # zstd-compressed JSON of the report
+    computed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
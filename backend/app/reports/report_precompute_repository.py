@@ -0,0 +1,31 @@
+"""Data repository for precomputed reports."""
+
+from __future__ import annotations
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from .report_precompute_model import PrecomputedReport
+
+
+def get_precomputed(db: Session, organization_id: int, report: str, period_days: int) -> PrecomputedReport | None:
+    """Return the latest precomputed result of a report and window length."""
+    return db.scalar(
+        select(PrecomputedReport).where(
+            PrecomputedReport.organization_id == organization_id,
+            PrecomputedReport.report == report,
+            PrecomputedReport.period_days == period_days,
+        )
+    )
+
+
+def replace_precomputed(db: Session, **fields) -> None:
+    """Store a result, replacing the previous one for the same report and window length."""
+    db.execute(
+        delete(PrecomputedReport).where(
+            PrecomputedReport.organization_id == fields["organization_id"],
+            PrecomputedReport.report == fields["report"],
+            PrecomputedReport.period_days == fields["period_days"],
+        )
+    )
+    db.add(PrecomputedReport(**fields))
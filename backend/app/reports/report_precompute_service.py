@@ -0,0 +1,130 @@
+"""Nightly precomputation of the heavy reports.
+
+Once a day (``REPORT_PRECOMPUTE_HOUR_UTC``, run by the in-process
+scheduler on a single elected worker) the ABC, XYZ, turnover and forecast
+reports of every active organization are built over the
+``REPORT_PRECOMPUTE_DAYS`` windows, from one bundle pass per window, and
+stored with their window and the organization's data version.
+
+A ``period=<N>d`` request made later that day has the same window start, so
+the endpoint serves the stored result instead of computing it, as long as
+the organization's stock data has not changed since; once it has, the
+request is computed live. The result's ``freshness`` says when it was
+computed and up to when it covers; ``fresh=true`` bypasses it.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Callable
+
+import zstandard
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.organizations.organization_repository import OrganizationRepository
+from app.scheduler.scheduler_service import DailyTask
+from . import report_cache_repository, report_cache_service, report_model, report_precompute_repository, report_service
+
+logger = logging.getLogger(__name__)
+
+
+def precompute_organization(
+    db: Session,
+    organization_id: int,
+    now: datetime | None = None,
+    renew_lease: Callable[[], None] | None = None,
+) -> int:
+    """
+    Build and store an organization's precomputed reports.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        now: Reference instant (default: now, in the same clock as the report endpoints).
+        renew_lease: Called after each step of every bundle, so a large
+            organization does not outlive the scheduler lease.
+
+    Returns:
+        Number of reports stored.
+    """
+    now = now or datetime.now()
+    data_version = report_cache_repository.get_data_version(db, organization_id)
+    compressor = zstandard.ZstdCompressor(level=constants.REPORT_JOB_ZSTD_LEVEL)
+    progress = (lambda done, total: renew_lease()) if renew_lease else None
+    stored = 0
+    for days in constants.REPORT_PRECOMPUTE_DAYS:
+        start, end = report_cache_service.normalize_window(now - timedelta(days=days), now)
+        bundle = report_service.get_report_bundle(
+            db, organization_id, constants.REPORT_PRECOMPUTE_REPORTS, start, end, progress=progress
+        )
+        for report in constants.REPORT_PRECOMPUTE_REPORTS:
+            report_precompute_repository.replace_precomputed(
+                db,
+                organization_id=organization_id,
+                report=report,
+                period_days=days,
+                window_start=start,
+                window_end=end,
+                data_version=data_version,
+                value=compressor.compress(getattr(bundle, report).model_dump_json().encode()),
+                computed_at=now,
+            )
+            stored += 1
+    db.commit()
+    return stored
+
+
+def precompute_all(db: Session, renew_lease: Callable[[], None]) -> None:
+    """Precompute the reports of every active organization (scheduled task)."""
+    for organization_id in OrganizationRepository.list_active_ids(db):
+        try:
+            stored = precompute_organization(db, organization_id, renew_lease=renew_lease)
+            logger.info(f"{stored} relatórios pré-calculados (organização {organization_id})")
+        except Exception:
+            db.rollback()
+            logger.exception(f"Falha ao pré-calcular relatórios da organização {organization_id}")
+        renew_lease()
+
+
+NIGHTLY_TASK = DailyTask("reports.precompute", constants.REPORT_PRECOMPUTE_HOUR_UTC, precompute_all)
+
+
+def get_precomputed_report(
+    db: Session,
+    organization_id: int,
+    report: str,
+    period_days: int,
+    start_date: datetime,
+    model: type[BaseModel],
+):
+    """
+    Return the stored result for a request's window, with its freshness, or None.
+
+    None is also returned when the organization's data changed after the
+    result was computed, so the request is answered live.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        report: Report name, e.g. ``"abc"``.
+        period_days: Length of the requested ``period``.
+        start_date: Normalized start of the requested window.
+        model: Pydantic model of the report.
+    """
+    if report not in constants.REPORT_PRECOMPUTE_REPORTS or period_days not in constants.REPORT_PRECOMPUTE_DAYS:
+        return None
+    row = report_precompute_repository.get_precomputed(db, organization_id, report, period_days)
+    if row is None or row.window_start != start_date:
+        return None
+    if report_cache_repository.get_data_version(db, organization_id) != row.data_version:
+        return None
+    result = model.model_validate_json(zstandard.ZstdDecompressor().decompress(row.value))
+    result.freshness = report_model.ReportFreshness(
+        computed_at=row.computed_at,
+        data_through=row.window_end,
+        stale=False,
+    )
+    return result
@@ -2,21 +2,22 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from decimal import Decimal
-from typing import Iterable, List
-import statistics
+import heapq
+from datetime import datetime, time, timedelta
+from typing import Callable, Iterable, List, NamedTuple, TypeVar
 
-from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.categories import category_service
+from app.inventory import inventory_service
 from app.movements import movement_model, movement_service
 from app.products import product_repository, product_service
 from app.products.product_model import Product
-from app.movements.movement_model import Movement, MovementType
+from app.rollups import rollup_service
 from app import constants
-from . import report_model
+from app.exceptions import ValidationException
+from app.utils import pagination
+from . import report_engine, report_model
 
 
 def _to_product_summary(products: Iterable[Product]) -> List[report_model.ProductSummary]:
@@ -32,33 +33,59 @@ def _to_product_summary(products: Iterable[Product]) -> List[report_model.Produc
     return [report_model.ProductSummary.model_validate(product) for product in products]
 
 
-def get_stock_overview(db: Session, organization_id: int) -> report_model.StockOverview:
+def get_stock_overview(
+    db: Session,
+    organization_id: int,
+    *,
+    limit: int = constants.REPORT_OVERVIEW_PAGE_SIZE,
+    low_stock_cursor: int | None = None,
+    out_of_stock_cursor: int | None = None,
+) -> report_model.StockOverview:
     """
     Return consolidated stock metrics including total value and alert counts.
 
+    Totals come from one aggregate query and the low/out-of-stock lists from
+    index-backed pages, so the response size does not grow with the catalog.
+
     Args:
         db: Database session.
         organization_id: Organization scope.
+        limit: Page size of each product list.
+        low_stock_cursor: ``low_stock_next_cursor`` of the previous page.
+        out_of_stock_cursor: ``out_of_stock_next_cursor`` of the previous page.
 
     Returns:
-        StockOverview: Object containing total products, total value, and lists of
-        low stock and out-of-stock products.
+        StockOverview: Object containing total products, total value, alert
+        counts and one page of low stock and out-of-stock products.
     """
-    products = product_service.list_products(db, organization_id=organization_id)
-    total_products = len(products)
-    total_value = sum(
-        (product.quantity or 0) * Decimal(product.price or 0) for product in products
+    totals = product_repository.get_stock_totals(db, organization_id)
+    low_stock, low_stock_next = _stock_alert_page(
+        db, organization_id, out_of_stock=False, limit=limit, cursor=low_stock_cursor
+    )
+    out_of_stock, out_of_stock_next = _stock_alert_page(
+        db, organization_id, out_of_stock=True, limit=limit, cursor=out_of_stock_cursor
+    )
+    return report_model.StockOverview(
+        total_products=totals.total_products,
+        total_stock_value=float(totals.total_value),
+        low_stock_count=totals.low_stock,
+        out_of_stock_count=totals.out_of_stock,
+        low_stock_products=low_stock,
+        out_of_stock_products=out_of_stock,
+        low_stock_next_cursor=low_stock_next,
+        out_of_stock_next_cursor=out_of_stock_next,
     )
 
-    low_stock = [product for product in products if product.quantity <= product.alert_level]
-    out_of_stock = [product for product in products if product.quantity == 0]
 
-    return report_model.StockOverview(
-        total_products=total_products,
-        total_stock_value=float(total_value),
-        low_stock_products=_to_product_summary(low_stock),
-        out_of_stock_products=_to_product_summary(out_of_stock),
+def _stock_alert_page(
+    db: Session, organization_id: int, *, out_of_stock: bool, limit: int, cursor: int | None
+) -> tuple[List[report_model.ProductSummary], int | None]:
+    """Return one page of flagged products and the cursor of the next page (None on the last)."""
+    products = product_repository.list_stock_alerts(
+        db, organization_id, out_of_stock=out_of_stock, limit=limit + 1, after_id=cursor
     )
+    next_cursor = products[limit - 1].id if len(products) > limit else None
+    return _to_product_summary(products[:limit]), next_cursor
 
 
 def get_category_breakdown(db: Session, organization_id: int) -> List[report_model.CategoryReportItem]:
@@ -100,19 +127,24 @@ def get_movement_history(
     *,
     limit: int = 100,
     offset: int = 0,
+    cursor: str | None = None,
+    expand: bool = False,
 ) -> report_model.MovementReport:
-    """Return movement history constrained by the requested time window."""
+    """Return a page of movement history constrained by the requested time window."""
     filters = movement_model.MovementFilter(start_date=start_date, end_date=end_date)
-    movements = movement_service.filter_movements(
+    movements, next_cursor = movement_service.filter_movements(
         db,
         organization_id=organization_id,
         filters=filters,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        expand=expand,
     )
     return report_model.MovementReport(
         filters=report_model.MovementReportFilters(start_date=start_date, end_date=end_date),
-        movements=[movement_model.MovementPublic.model_validate(movement) for movement in movements],
+        movements=movement_service.serialize_movements(movements, expand=expand),
+        next_cursor=next_cursor,
     )
 
 
@@ -141,66 +173,35 @@ def get_abc_analysis(
     # Default to last 90 days if not provided
     if not start_date:
         start_date = datetime.utcnow() - timedelta(days=constants.REPORT_DEFAULT_DAYS_ABC)
-    
-    query = select(
-        Movement.product_id,
-        func.sum(Movement.quantity).label("total_qty")
-    ).where(
-        Movement.type == MovementType.SAIDA,
-        Movement.organization_id == organization_id,
-        Movement.created_at >= start_date
-    )
 
-    if end_date:
-        query = query.where(Movement.created_at <= end_date)
-
-    results = db.execute(
-        query.group_by(Movement.product_id)
-    ).all()
-
-    product_consumption = {r.product_id: r.total_qty for r in results}
-    products = product_service.list_products(db, organization_id=organization_id)
-    
-    abc_items = []
-    total_value_all = 0.0
-
-    for product in products:
-        qty = product_consumption.get(product.id, 0)
-        value = float(qty * product.price)
-        total_value_all += value
-        abc_items.append({
-            "product": product,
-            "value": value
-        })
-
-    # Sort by value descending
-    abc_items.sort(key=lambda x: x["value"], reverse=True)
-
-    accumulated_value = 0.0
-    report_items = []
-
-    for item in abc_items:
-        value = item["value"]
-        accumulated_value += value
-        percentage = (value / total_value_all * 100) if total_value_all > 0 else 0
-        cumulative_percentage = (accumulated_value / total_value_all * 100) if total_value_all > 0 else 0
-
-        if cumulative_percentage <= constants.ABC_CLASS_A_THRESHOLD:
-            classification = "A"
-        elif cumulative_percentage <= constants.ABC_CLASS_B_THRESHOLD:
-            classification = "B"
-        else:
-            classification = "C"
-
-        report_items.append(report_model.ABCItem(
-            product_id=item["product"].id,
-            product_name=item["product"].name,
-            value=value,
-            percentage=percentage,
-            cumulative_percentage=cumulative_percentage,
-            classification=classification
-        ))
+    frame = report_engine.load_products(db, organization_id)
+    return _build_abc(frame, _consumption(db, frame, organization_id, start_date, end_date))
 
+
+def _consumption(
+    db: Session,
+    frame: report_engine.ProductFrame,
+    organization_id: int,
+    start_date: datetime,
+    end_date: datetime | None,
+):
+    """Outbound quantity per product over the window, aligned with the frame."""
+    return report_engine.align(frame, rollup_service.outbound_by_product(db, organization_id, start_date, end_date))
+
+
+def _build_abc(frame: report_engine.ProductFrame, consumed) -> report_model.ABCReport:
+    result = report_engine.abc(frame, consumed)
+    report_items = [
+        {
+            "product_id": frame.ids[position],
+            "product_name": frame.names[position],
+            "value": value,
+            "percentage": percentage,
+            "cumulative_percentage": cumulative_percentage,
+            "classification": classification,
+        }
+        for position, value, percentage, cumulative_percentage, classification in zip(*result)
+    ]
     return report_model.ABCReport(items=report_items)
 
 
@@ -229,64 +230,36 @@ def get_xyz_analysis(
     # Default to last 12 weeks if not provided
     if not start_date:
         start_date = datetime.utcnow() - timedelta(weeks=constants.REPORT_DEFAULT_WEEKS_XYZ)
-    
-    query = select(Movement).where(
-        Movement.type == MovementType.SAIDA,
-        Movement.organization_id == organization_id,
-        Movement.created_at >= start_date
-    )
 
-    if end_date:
-        query = query.where(Movement.created_at <= end_date)
+    frame = report_engine.load_products(db, organization_id)
+    return _build_xyz(db, frame, organization_id, start_date, end_date)
 
-    movements = db.execute(query).scalars().all()
 
-    # Group by product and week
-    product_weekly_demand = {}
-    for m in movements:
-        week_key = m.created_at.strftime("%Y-%U")
-        if m.product_id not in product_weekly_demand:
-            product_weekly_demand[m.product_id] = {}
-        product_weekly_demand[m.product_id][week_key] = product_weekly_demand[m.product_id].get(week_key, 0) + m.quantity
-
-    # Calculate number of weeks in the period
-    if end_date:
-        duration_days = (end_date - start_date).days
-    else:
-        duration_days = (datetime.utcnow() - start_date).days
-    
-    weeks_to_analyze = max(1, duration_days // 7)
-
-    products = product_service.list_products(db, organization_id=organization_id)
-    report_items = []
-
-    for product in products:
-        demands = list(product_weekly_demand.get(product.id, {}).values())
-        # Fill missing weeks with 0
-        demands += [0] * max(0, weeks_to_analyze - len(demands))
-        
-        if not demands or sum(demands) == 0:
-            cv = 0.0
-            classification = "Z" # No demand is considered volatile/unpredictable or dead stock
-        else:
-            mean = statistics.mean(demands)
-            stdev = statistics.stdev(demands) if len(demands) > 1 else 0
-            cv = stdev / mean if mean > 0 else 0
-            
-            if cv <= constants.XYZ_CLASS_X_THRESHOLD:
-                classification = "X"
-            elif cv <= constants.XYZ_CLASS_Y_THRESHOLD:
-                classification = "Y"
-            else:
-                classification = "Z"
-
-        report_items.append(report_model.XYZItem(
-            product_id=product.id,
-            product_name=product.name,
-            cv=cv,
-            classification=classification
-        ))
+def _build_xyz(
+    db: Session,
+    frame: report_engine.ProductFrame,
+    organization_id: int,
+    start_date: datetime,
+    end_date: datetime | None,
+) -> report_model.XYZReport:
+    # Weeks are the 7-day windows ending on the last day of the period,
+    # summed per product by the database.
+    period_end = end_date or datetime.utcnow()
+    weeks_to_analyze = max(1, (period_end - start_date).days // 7)
+    anchor = period_end.date()
+    window_start = max(
+        start_date,
+        datetime.combine(anchor - timedelta(days=7 * weeks_to_analyze - 1), time.min),
+    )
+    weekly_demand = rollup_service.outbound_by_product_week(
+        db, organization_id, window_start, end_date, anchor=anchor
+    )
+    result = report_engine.xyz(frame, weekly_demand, weeks_to_analyze)
 
+    report_items = [
+        {"product_id": product_id, "product_name": name, "cv": cv, "classification": classification}
+        for product_id, name, cv, classification in zip(frame.ids, frame.names, *result)
+    ]
     return report_model.XYZReport(items=report_items)
 
 
@@ -298,50 +271,51 @@ def get_stock_turnover(
 ) -> report_model.TurnoverReport:
     """
     Calculate Stock Turnover Rate.
-    Turnover = Cost of Goods Sold / Average Inventory
+    Turnover = Units Sold / Average Inventory
+
+    Average inventory is the mean end-of-day stock over the period, read from
+    the daily inventory snapshots (days without one are reconstructed from
+    the movement rollups).
     """
     # Default to last 30 days
     if not start_date:
         start_date = datetime.utcnow() - timedelta(days=constants.REPORT_DEFAULT_DAYS_TURNOVER)
-    
-    query = select(
-        Movement.product_id,
-        func.sum(Movement.quantity).label("total_sold")
-    ).where(
-        Movement.type == MovementType.SAIDA,
-        Movement.organization_id == organization_id,
-        Movement.created_at >= start_date
+
+    frame = report_engine.load_products(db, organization_id)
+    return _build_turnover(
+        frame,
+        _consumption(db, frame, organization_id, start_date, end_date),
+        _average_inventory(db, organization_id, start_date, end_date),
     )
 
-    if end_date:
-        query = query.where(Movement.created_at <= end_date)
-
-    sales_results = db.execute(
-        query.group_by(Movement.product_id)
-    ).all()
-    sales_map = {r.product_id: r.total_sold for r in sales_results}
-
-    products = product_service.list_products(db, organization_id=organization_id)
-    report_items = []
-
-    for product in products:
-        total_sold = sales_map.get(product.id, 0)
-        # Simplified average inventory: current quantity (ideal would be average over time)
-        avg_inventory = float(product.quantity) 
-        
-        if avg_inventory > 0:
-            turnover_rate = total_sold / avg_inventory
-        else:
-            turnover_rate = 0.0 # Avoid division by zero
-
-        report_items.append(report_model.TurnoverItem(
-            product_id=product.id,
-            product_name=product.name,
-            turnover_rate=turnover_rate,
-            avg_inventory=avg_inventory,
-            total_sales=total_sold
-        ))
 
+def _average_inventory(db: Session, organization_id: int, start_date: datetime, end_date: datetime | None):
+    return inventory_service.average_inventory(
+        db, organization_id, start_date.date(), (end_date or datetime.utcnow()).date()
+    )
+
+
+def _build_turnover(frame: report_engine.ProductFrame, sold, averages) -> report_model.TurnoverReport:
+    # Products without snapshots in the period fall back to today's stock.
+    avg_inventory = report_engine.align(
+        frame,
+        {product_id: average.quantity for product_id, average in averages.items()},
+        default=frame.quantity,
+    )
+    rates = report_engine.turnover(sold, avg_inventory)
+
+    report_items = [
+        {
+            "product_id": product_id,
+            "product_name": name,
+            "turnover_rate": rate,
+            "avg_inventory": average,
+            "total_sales": int(total_sold),
+        }
+        for product_id, name, rate, average, total_sold in zip(
+            frame.ids, frame.names, rates, avg_inventory, sold
+        )
+    ]
     return report_model.TurnoverReport(items=report_items)
 
 
@@ -351,28 +325,34 @@ def get_financial_report(
     start_date: datetime | None = None,
     end_date: datetime | None = None
 ) -> report_model.FinancialReport:
-    """Calculate financial metrics: Holding Cost, Potential Profit, Margins."""
-    products = product_service.list_products(db, organization_id=organization_id)
-    
-    total_inventory_value = 0.0
-    total_cost_value = 0.0
-    
-    for product in products:
-        qty = product.quantity
-        price = float(product.price)
-        cost = float(product.cost_price)
-        
-        total_inventory_value += qty * price
-        total_cost_value += qty * cost
+    """
+    Calculate financial metrics: Holding Cost, Potential Profit, Margins.
+
+    Current values use today's stock; the period averages use the mean
+    end-of-day stock over ``[start_date, end_date]`` from inventory snapshots.
+    """
+    averages = _average_inventory(db, organization_id, start_date, end_date) if start_date else None
+    return _build_financial(report_engine.load_products(db, organization_id), averages)
 
+
+def _build_financial(frame: report_engine.ProductFrame, averages) -> report_model.FinancialReport:
+    total_inventory_value, total_cost_value = report_engine.stock_values(frame)
     potential_profit = total_inventory_value - total_cost_value
     average_margin = (potential_profit / total_inventory_value * 100) if total_inventory_value > 0 else 0
 
+    average_inventory_value = total_inventory_value
+    average_inventory_cost = total_cost_value
+    if averages is not None:
+        average_inventory_value = sum(average.sale_value for average in averages.values())
+        average_inventory_cost = sum(average.cost_value for average in averages.values())
+
     return report_model.FinancialReport(
         total_inventory_value=total_inventory_value,
         total_cost_value=total_cost_value,
         potential_profit=potential_profit,
-        average_margin=average_margin
+        average_margin=average_margin,
+        average_inventory_value=average_inventory_value,
+        average_inventory_cost=average_inventory_cost,
     )
 
 
@@ -389,65 +369,223 @@ def get_forecast_report(
     # Default to last 30 days
     if not start_date:
         start_date = datetime.utcnow() - timedelta(days=constants.REPORT_DEFAULT_DAYS_FORECAST)
-    
-    # Calculate duration in days for daily usage
-    if end_date:
-        duration_days = (end_date - start_date).days
-    else:
-        duration_days = (datetime.utcnow() - start_date).days
-    
-    if duration_days < 1:
-        duration_days = 1
-
-    query = select(
-        Movement.product_id,
-        func.sum(Movement.quantity).label("total_used")
-    ).where(
-        Movement.type == MovementType.SAIDA,
-        Movement.organization_id == organization_id,
-        Movement.created_at >= start_date
+
+    frame = report_engine.load_products(db, organization_id)
+    return _build_forecast(
+        frame, _consumption(db, frame, organization_id, start_date, end_date), start_date, end_date
     )
 
-    if end_date:
-        query = query.where(Movement.created_at <= end_date)
-
-    usage_results = db.execute(
-        query.group_by(Movement.product_id)
-    ).all()
-    usage_map = {r.product_id: r.total_used for r in usage_results}
-
-    products = product_service.list_products(db, organization_id=organization_id)
-    report_items = []
-
-    for product in products:
-        total_used = usage_map.get(product.id, 0)
-        daily_usage = total_used / duration_days
-        
-        lead_time = product.lead_time
-        # Safety stock simplified: 50% of lead time demand
-        safety_stock = (daily_usage * lead_time) * 0.5
-        
-        reorder_point = int((daily_usage * lead_time) + safety_stock)
-        
-        if daily_usage > 0:
-            days_until_stockout = product.quantity / daily_usage
-        else:
-            days_until_stockout = 999.0 # Infinite
-
-        if product.quantity == 0:
-            status = "CRITICAL"
-        elif product.quantity <= reorder_point:
-            status = "WARNING"
-        else:
-            status = "OK"
-
-        report_items.append(report_model.ForecastItem(
-            product_id=product.id,
-            product_name=product.name,
-            daily_usage=daily_usage,
-            days_until_stockout=days_until_stockout,
-            reorder_point=reorder_point,
-            status=status
-        ))
 
+def _build_forecast(
+    frame: report_engine.ProductFrame, used, start_date: datetime, end_date: datetime | None
+) -> report_model.ForecastReport:
+    # Daily usage is averaged over the whole days of the window (at least one).
+    duration_days = max(1, ((end_date or datetime.utcnow()) - start_date).days)
+    result = report_engine.forecast(frame, used, duration_days)
+
+    report_items = [
+        {
+            "product_id": product_id,
+            "product_name": name,
+            "daily_usage": daily_usage,
+            "days_until_stockout": days_until_stockout,
+            "reorder_point": reorder_point,
+            "status": status,
+        }
+        for product_id, name, daily_usage, days_until_stockout, reorder_point, status in zip(
+            frame.ids, frame.names, *result
+        )
+    ]
     return report_model.ForecastReport(items=report_items)
+
+
+class ItemSelection(NamedTuple):
+    """Sortable fields, default order and filter of a report's items."""
+
+    sort_fields: tuple[str, ...]
+    default_sort: str
+    filter_field: str | None = None
+    filter_values: tuple[str, ...] = ()
+
+
+ITEM_SELECTIONS = {
+    "abc": ItemSelection(
+        ("value", "percentage", "cumulative_percentage", "product_id", "product_name"),
+        "-value",
+        "classification",
+        ("A", "B", "C"),
+    ),
+    "xyz": ItemSelection(("cv", "product_id", "product_name"), "product_id", "classification", ("X", "Y", "Z")),
+    "turnover": ItemSelection(
+        ("turnover_rate", "avg_inventory", "total_sales", "product_id", "product_name"), "product_id"
+    ),
+    "forecast": ItemSelection(
+        ("daily_usage", "days_until_stockout", "reorder_point", "product_id", "product_name"),
+        "product_id",
+        "status",
+        ("OK", "WARNING", "CRITICAL"),
+    ),
+}
+
+ReportT = TypeVar("ReportT")
+
+
+def select_report_items(
+    report: str,
+    result: ReportT,
+    *,
+    sort: str | None = None,
+    filter_values: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> ReportT:
+    """
+    Filter, sort and paginate the items of an ABC, XYZ, turnover or forecast report.
+
+    Without any parameter the report is returned unchanged. Items are
+    ordered by ``sort`` (``-`` prefix for descending), ties by product ID.
+    A page is picked with a bounded heap, O(n log limit), so top-N requests
+    never sort the whole catalog; only a request without ``limit`` does.
+
+    Args:
+        report: Report name (see ``ITEM_SELECTIONS``).
+        result: Full report, as computed, cached or precomputed.
+        sort: Sort field, e.g. ``"-value"`` (default: the report's natural order).
+        filter_values: Comma-separated classifications (ABC/XYZ) or statuses (forecast).
+        limit: Page size (default: every matching item).
+        cursor: ``next_cursor`` of the previous page, for the same sort.
+
+    Raises:
+        HTTPException(400): If the sort, filter or cursor is invalid.
+    """
+    if sort is None and filter_values is None and limit is None and cursor is None:
+        return result
+
+    selection = ITEM_SELECTIONS[report]
+    sort = sort or selection.default_sort
+    field, descending = sort.removeprefix("-"), sort.startswith("-")
+    if field not in selection.sort_fields:
+        raise ValidationException(
+            f"Ordenação inválida: {sort}. Use: {', '.join(selection.sort_fields)} (prefixo '-' para decrescente)"
+        )
+
+    items = result.items
+    if filter_values is not None:
+        wanted = {value.strip().upper() for value in filter_values.split(",") if value.strip()}
+        unknown = wanted - set(selection.filter_values)
+        if selection.filter_field is None or unknown:
+            raise ValidationException(
+                f"Filtro inválido: {', '.join(sorted(unknown)) or filter_values}. "
+                f"Use: {', '.join(selection.filter_values) or 'nenhum filtro disponível'}"
+            )
+        items = [item for item in items if getattr(item, selection.filter_field) in wanted]
+    total_items = len(items)
+
+    def key(item):
+        return getattr(item, field), -item.product_id if descending else item.product_id
+
+    if cursor is not None:
+        value, product_id = pagination.decode_sort_cursor(cursor, sort)
+        boundary = (value, -product_id if descending else product_id)
+        try:
+            items = [item for item in items if (key(item) < boundary if descending else key(item) > boundary)]
+        except TypeError:
+            raise ValidationException("Cursor de paginação inválido para esta ordenação")
+
+    next_cursor = None
+    if limit is None:
+        page = sorted(items, key=key, reverse=descending)
+    else:
+        page = (heapq.nlargest if descending else heapq.nsmallest)(limit + 1, items, key=key)
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = pagination.encode_sort_cursor(sort, getattr(page[-1], field), page[-1].product_id)
+    return result.model_copy(update={"items": page, "total_items": total_items, "next_cursor": next_cursor})
+
+
+def parse_bundle_sections(sections: str | None) -> list[str]:
+    """
+    Parse a comma-separated list of bundle sections (empty means all).
+
+    Raises:
+        HTTPException(400): If a section is unknown.
+    """
+    if not sections or not sections.strip():
+        return list(report_model.BUNDLE_SECTIONS)
+    requested = [section.strip().lower() for section in sections.split(",") if section.strip()]
+    unknown = [section for section in requested if section not in report_model.BUNDLE_SECTIONS]
+    if unknown:
+        raise ValidationException(
+            f"Seções de relatório inválidas: {', '.join(unknown)}. "
+            f"Use: {', '.join(report_model.BUNDLE_SECTIONS)}"
+        )
+    return [section for section in report_model.BUNDLE_SECTIONS if section in requested]
+
+
+def get_report_bundle(
+    db: Session,
+    organization_id: int,
+    sections: Iterable[str],
+    start_date: datetime,
+    end_date: datetime | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> report_model.ReportBundle:
+    """
+    Build several reports over the same window in a single pass.
+
+    The product columns are loaded once, and the outbound aggregate and the
+    average inventory are read at most once, then shared by every requested
+    section. Each section has the same shape as its standalone endpoint.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        sections: Sections to build (see ``report_model.BUNDLE_SECTIONS``).
+        start_date: Start of the analysis window.
+        end_date: End of the analysis window (default: now).
+        progress: Called as ``progress(done, total)`` after each step: loading
+            the product columns, the outbound totals and the average inventory
+            (when needed), and building each section.
+
+    Returns:
+        ReportBundle with the requested sections filled in.
+    """
+    sections = set(sections)
+    requested = [section for section in report_model.BUNDLE_SECTIONS if section in sections]
+    # The overview is aggregated in SQL; the other sections share the product columns.
+    needs_frame = bool(sections - {"overview"})
+    needs_consumed = bool(sections & {"abc", "turnover", "forecast"})
+    needs_averages = bool(sections & {"turnover", "financial"})
+    total = len(requested) + needs_frame + needs_consumed + needs_averages
+    done = 0
+
+    def step() -> None:
+        nonlocal done
+        done += 1
+        if progress:
+            progress(done, total)
+
+    frame = consumed = averages = None
+    if needs_frame:
+        frame = report_engine.load_products(db, organization_id)
+        step()
+    if needs_consumed:
+        consumed = _consumption(db, frame, organization_id, start_date, end_date)
+        step()
+    if needs_averages:
+        averages = _average_inventory(db, organization_id, start_date, end_date)
+        step()
+
+    builders = {
+        "overview": lambda: get_stock_overview(db, organization_id),
+        "abc": lambda: _build_abc(frame, consumed),
+        "xyz": lambda: _build_xyz(db, frame, organization_id, start_date, end_date),
+        "turnover": lambda: _build_turnover(frame, consumed, averages),
+        "financial": lambda: _build_financial(frame, averages),
+        "forecast": lambda: _build_forecast(frame, consumed, start_date, end_date),
+    }
+    bundle = report_model.ReportBundle(start_date=start_date, end_date=end_date)
+    for section in requested:
+        setattr(bundle, section, builders[section]())
+        step()
+    return bundle
@@ -0,0 +1 @@
+"""Pre-aggregated daily movement totals for reports and dashboards."""
@@ -0,0 +1,31 @@
+"""Daily movement rollups maintained alongside the movement ledger."""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, Date, Enum as SqlEnum, ForeignKey, Index, Integer
+
+from app.database import Base
+from app.movements.movement_model import MovementType
+
+
+class MovementDailyRollup(Base):
+    """
+    Total quantity and number of movements per product, day and type.
+
+    Rows are upserted in the same transaction as the movements they count, so
+    reports can aggregate O(products x days) rows instead of the raw ledger.
+    ``day`` is the UTC date of ``Movement.created_at``.
+    """
+
+    __tablename__ = "movement_daily_rollups"
+    __table_args__ = (
+        # Window aggregates: WHERE organization_id = ? AND type = 'saida' AND day BETWEEN ...
+        Index("ix_movement_daily_rollups_org_type_day", "organization_id", "type", "day"),
+    )
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(SqlEnum(MovementType, name="movement_type", native_enum=False), primary_key=True)
+    total_qty = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
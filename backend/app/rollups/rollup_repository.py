@@ -0,0 +1,295 @@
+"""Data repository for daily movement rollups."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Date, Integer, case, cast, delete, func, insert, literal, select, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.movements.movement_model import Movement, MovementType
+from app.products.product_model import Product
+
+from . import rollup_model
+
+Rollup = rollup_model.MovementDailyRollup
+KEY_COLUMNS = ("organization_id", "product_id", "day", "type")
+
+
+def day_expression(db: Session, column):
+    """Return the SQL date of a timestamp column for the bound dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        # CAST(... AS DATE) has numeric affinity on SQLite; date() keeps ISO text.
+        return func.date(column, type_=Date)
+    return cast(column, Date)
+
+
+def week_expression(db: Session, day, anchor: date):
+    """
+    Return the week bucket of a SQL date for the bound dialect.
+
+    Buckets count back from ``anchor``: 0 is the 7 days ending on ``anchor``,
+    1 the 7 days before them, and so on; days after ``anchor`` fall in
+    negative weeks.
+    """
+    # Rendered inline so SELECT and GROUP BY carry the same expression text.
+    anchor_day = literal(anchor, Date, literal_execute=True)
+    week_days = literal(7, Integer, literal_execute=True)
+    if db.get_bind().dialect.name == "sqlite":
+        days = cast(func.julianday(anchor_day) - func.julianday(day), Integer)
+    else:
+        days = type_coerce(anchor_day - day, Integer)
+    # Integer division truncates toward zero; subtract the floored remainder first.
+    return (days - (days % week_days + week_days) % week_days) // week_days
+
+
+def period_expression(day, starts: list[date]):
+    """
+    Return the index of the period a SQL date falls in.
+
+    ``starts`` are the ascending first days of consecutive periods; a date
+    maps to the last period starting on or before it (NULL before the first).
+    """
+    # Rendered inline so SELECT and GROUP BY carry the same expression text.
+    return case(
+        *(
+            (day >= literal(start, Date, literal_execute=True), literal(index, Integer, literal_execute=True))
+            for index, start in reversed(list(enumerate(starts)))
+        )
+    )
+
+
+def days_after_expression(db: Session, day, origin: date):
+    """Return the number of days from ``origin`` to a SQL date for the bound dialect."""
+    origin_day = literal(origin, Date)
+    if db.get_bind().dialect.name == "sqlite":
+        return cast(func.julianday(day) - func.julianday(origin_day), Integer)
+    return type_coerce(day - origin_day, Integer)
+
+
+def weighted_net_change(db: Session, organization_id: int, runs: list[tuple[date, date, int]]):
+    """
+    Sum net change per product, each rollup day weighted by the days it follows.
+
+    ``runs`` are ascending ``(first_day, last_day, days_before)`` ranges of
+    consecutive days, ``days_before`` being how many days the earlier runs
+    hold. A rollup day counts once for every run day strictly before it.
+    """
+    weight = case(
+        *(
+            condition
+            for first_day, last_day, days_before in reversed(runs)
+            for condition in (
+                (Rollup.day > last_day, days_before + (last_day - first_day).days + 1),
+                (Rollup.day > first_day, days_before + days_after_expression(db, Rollup.day, first_day)),
+            )
+        ),
+        else_=0,
+    )
+    signed_qty = case((Rollup.type == MovementType.ENTRADA, Rollup.total_qty), else_=-Rollup.total_qty)
+    return db.execute(
+        select(Rollup.product_id, func.sum(signed_qty * weight).label("total_qty"))
+        .where(Rollup.organization_id == organization_id, Rollup.day > runs[0][0])
+        .group_by(Rollup.product_id)
+    ).all()
+
+
+def increment(db: Session, rows: list[dict]) -> None:
+    """
+    Add totals to rollup rows, creating them when missing.
+
+    ``rows`` must have unique keys; callers pass them sorted by key so
+    concurrent writers touch rollup rows in the same order.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = dialect_insert(Rollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS),
+            set_={
+                "total_qty": Rollup.total_qty + stmt.excluded.total_qty,
+                "count": Rollup.count + stmt.excluded.count,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(Rollup)
+            .where(*(getattr(Rollup, key) == row[key] for key in KEY_COLUMNS))
+            .values(total_qty=Rollup.total_qty + row["total_qty"], count=Rollup.count + row["count"])
+        )
+        if result.rowcount == 0:
+            db.execute(insert(Rollup).values(**row))
+
+
+def rebuild(
+    db: Session,
+    *,
+    organization_id: int | None = None,
+    start_day: date | None = None,
+    end_day: date | None = None,
+) -> int:
+    """Recompute rollups from the ledger for the given scope; return rows written."""
+    rollup_filters = []
+    movement_filters = []
+    if organization_id is not None:
+        rollup_filters.append(Rollup.organization_id == organization_id)
+        movement_filters.append(Movement.organization_id == organization_id)
+    if start_day is not None:
+        rollup_filters.append(Rollup.day >= start_day)
+        movement_filters.append(Movement.created_at >= datetime.combine(start_day, time.min))
+    if end_day is not None:
+        rollup_filters.append(Rollup.day <= end_day)
+        movement_filters.append(Movement.created_at < datetime.combine(end_day + timedelta(days=1), time.min))
+
+    db.execute(delete(Rollup).where(*rollup_filters))
+
+    day = day_expression(db, Movement.created_at)
+    aggregated = (
+        select(
+            Movement.organization_id,
+            Movement.product_id,
+            day,
+            Movement.type,
+            func.sum(Movement.quantity),
+            func.count(Movement.id),
+        )
+        .where(*movement_filters)
+        .group_by(Movement.organization_id, Movement.product_id, day, Movement.type)
+    )
+    result = db.execute(
+        insert(Rollup).from_select(
+            ["organization_id", "product_id", "day", "type", "total_qty", "count"], aggregated
+        )
+    )
+    return result.rowcount
+
+
+def aggregate(
+    db: Session,
+    organization_id: int,
+    movement_type,
+    *,
+    first_day: date,
+    last_day: date | None,
+    by_product: bool,
+    by_day: bool,
+    week_anchor: date | None = None,
+):
+    """Sum rollups over ``[first_day, last_day)`` grouped by product and/or day (or week)."""
+    keys = []
+    if by_product:
+        keys.append(Rollup.product_id)
+    if by_day:
+        keys.append(Rollup.day)
+    elif week_anchor is not None:
+        keys.append(week_expression(db, Rollup.day, week_anchor).label("week"))
+    query = select(
+        *keys,
+        func.sum(Rollup.total_qty).label("total_qty"),
+        func.sum(Rollup.count).label("count"),
+    ).where(
+        Rollup.organization_id == organization_id,
+        Rollup.type == movement_type,
+        Rollup.day >= first_day,
+    )
+    if last_day is not None:
+        query = query.where(Rollup.day < last_day)
+    if keys:
+        query = query.group_by(*keys)
+    return db.execute(query).all()
+
+
+def aggregate_movements(
+    db: Session,
+    organization_id: int,
+    movement_type,
+    *,
+    start: datetime,
+    end: datetime | None,
+    end_inclusive: bool,
+    by_product: bool,
+    by_day: bool,
+    week_anchor: date | None = None,
+):
+    """Sum raw movements over a time window grouped by product and/or day (or week)."""
+    keys = []
+    if by_product:
+        keys.append(Movement.product_id)
+    if by_day:
+        keys.append(day_expression(db, Movement.created_at).label("day"))
+    elif week_anchor is not None:
+        keys.append(week_expression(db, day_expression(db, Movement.created_at), week_anchor).label("week"))
+    query = select(
+        *keys,
+        func.sum(Movement.quantity).label("total_qty"),
+        func.count(Movement.id).label("count"),
+    ).where(
+        Movement.organization_id == organization_id,
+        Movement.type == movement_type,
+        Movement.created_at >= start,
+    )
+    if end is not None:
+        query = query.where(Movement.created_at <= end if end_inclusive else Movement.created_at < end)
+    if keys:
+        query = query.group_by(*keys)
+    return db.execute(query).all()
+
+
+def aggregate_periods(
+    db: Session,
+    organization_id: int,
+    movement_type,
+    *,
+    starts: list[date],
+    end_day: date,
+    group_by: str | None = None,
+    limit: int | None = None,
+):
+    """
+    Sum rollups over ``[starts[0], end_day)`` per period, optionally per product or category.
+
+    A single grouped query; the result has one row per period (and group)
+    that had movements. With ``group_by`` and ``limit`` only the ``limit``
+    groups with the largest quantity in the last period (ties by id) are
+    summed; they are picked in the same statement.
+    """
+    period = period_expression(Rollup.day, starts).label("period")
+    keys = [period]
+    query = select()
+    if group_by == "product":
+        key = Rollup.product_id
+    elif group_by == "category":
+        key = Product.category_id
+        query = query.join_from(Rollup, Product, Product.id == Rollup.product_id)
+    if group_by is not None:
+        keys.append(key.label("key"))
+    window = (
+        Rollup.organization_id == organization_id,
+        Rollup.type == movement_type,
+        Rollup.day >= starts[0],
+        Rollup.day < end_day,
+    )
+    if group_by is not None and limit is not None:
+        current = func.sum(case((Rollup.day >= starts[-1], Rollup.total_qty), else_=0))
+        top = select(key)
+        if group_by == "category":
+            top = top.join_from(Rollup, Product, Product.id == Rollup.product_id)
+        top = top.where(*window).group_by(key).order_by(current.desc(), key).limit(limit)
+        query = query.where(key.in_(top.scalar_subquery()))
+    query = (
+        query.add_columns(
+            *keys,
+            func.sum(Rollup.total_qty).label("total_qty"),
+            func.sum(Rollup.count).label("count"),
+        )
+        .where(*window)
+        .group_by(*keys)
+    )
+    return db.execute(query).all()
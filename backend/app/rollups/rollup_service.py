@@ -0,0 +1,464 @@
+"""Business rules for daily movement rollups.
+
+Writers call :func:`record_movements` in the transaction that creates the
+movements. Readers ask for outbound totals over a time window; the complete
+UTC days inside the window are read from the rollups and only the partial
+days at its edges are aggregated from the raw ledger, so a day-aligned
+window never touches ``movements`` at all.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.archive import archive_service
+from app.movements.movement_model import Movement, MovementType
+from app.reports import report_cache_service
+from . import rollup_repository
+
+# An inclusive window end at or after this time covers the whole day.
+END_OF_DAY = time(23, 59, 59)
+
+
+def record_movements(db: Session, movements: Iterable[Movement]) -> None:
+    """
+    Add newly created movements to their daily rollups.
+
+    Must run inside the transaction that inserted the movements (after flush,
+    so ``created_at`` is set).
+
+    Args:
+        db: Database session.
+        movements: Movements just added to the ledger.
+    """
+    totals: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    for movement in movements:
+        key = (movement.organization_id, movement.product_id, movement.created_at.date(), movement.type)
+        totals[key][0] += movement.quantity
+        totals[key][1] += 1
+
+    for organization_id in {key[0] for key in totals}:
+        report_cache_service.invalidate(db, organization_id)
+
+    rows = [
+        {
+            "organization_id": organization_id,
+            "product_id": product_id,
+            "day": day,
+            "type": movement_type,
+            "total_qty": total_qty,
+            "count": count,
+        }
+        for (organization_id, product_id, day, movement_type), (total_qty, count) in sorted(
+            totals.items(), key=lambda item: (item[0][0], item[0][1], item[0][2], item[0][3].value)
+        )
+    ]
+    rollup_repository.increment(db, rows)
+
+
+def rebuild_rollups(
+    db: Session,
+    *,
+    organization_id: int | None = None,
+    start_day: date | None = None,
+    end_day: date | None = None,
+) -> int:
+    """
+    Recompute rollups from the movement ledger and commit.
+
+    Used for backfills and after bulk changes that bypass the write path.
+    Days whose movements were archived out of the ledger table are kept as
+    they are; the rebuild starts after them.
+
+    Args:
+        db: Database session.
+        organization_id: Restrict the rebuild to one organization.
+        start_day: First day to rebuild (inclusive).
+        end_day: Last day to rebuild (inclusive).
+
+    Returns:
+        Number of rollup rows written.
+    """
+    ledger_start = archive_service.ledger_start(db, organization_id)
+    if ledger_start is not None and (start_day is None or start_day < ledger_start):
+        start_day = ledger_start
+    written = rollup_repository.rebuild(
+        db, organization_id=organization_id, start_day=start_day, end_day=end_day
+    )
+    if organization_id is not None:
+        report_cache_service.invalidate(db, organization_id)
+    else:
+        report_cache_service.invalidate_all(db)
+    db.commit()
+    return written
+
+
+def _split_window(
+    start: datetime,
+    end: datetime | None,
+    end_inclusive: bool,
+) -> tuple[date | None, date | None, list[tuple[datetime, datetime | None, bool]]]:
+    """
+    Split a window into complete days and partial-day edges.
+
+    Returns:
+        ``(first_day, last_day, edges)`` where rollups cover ``[first_day,
+        last_day)`` (``last_day`` None means unbounded, ``first_day`` None means
+        no complete day) and each edge is ``(start, end, end_inclusive)``.
+    """
+    first_day = start.date() if start.time() == time.min else start.date() + timedelta(days=1)
+    if end is None:
+        last_day = None
+    elif end_inclusive and end.time() >= END_OF_DAY:
+        last_day = end.date() + timedelta(days=1)
+    else:
+        last_day = end.date()
+
+    if last_day is not None and first_day >= last_day:
+        return None, None, [(start, end, end_inclusive)]
+
+    edges = []
+    first_midnight = datetime.combine(first_day, time.min)
+    if start < first_midnight:
+        edges.append((start, first_midnight, False))
+    if last_day is not None:
+        last_midnight = datetime.combine(last_day, time.min)
+        if last_midnight < end or (last_midnight == end and end_inclusive):
+            edges.append((last_midnight, end, end_inclusive))
+    return first_day, last_day, edges
+
+
+def _aggregate(
+    db: Session,
+    organization_id: int,
+    movement_type: MovementType,
+    start: datetime,
+    end: datetime | None,
+    *,
+    end_inclusive: bool,
+    by_product: bool,
+    by_day: bool,
+    week_anchor: date | None = None,
+    open_ended: bool = False,
+) -> dict[tuple, list[int]]:
+    """
+    Return ``{(product_id?, day? or week?): [total_qty, count]}`` for one type in the window.
+
+    ``end`` None means up to now, or no end at all when ``open_ended``.
+    """
+    if end is None and not open_ended:
+        # Imports and seeds may date movements ahead; "up to now" must not count them.
+        end, end_inclusive = datetime.utcnow(), True
+    first_day, last_day, edges = _split_window(start, end, end_inclusive)
+    rows = []
+    if first_day is not None:
+        rows += rollup_repository.aggregate(
+            db,
+            organization_id,
+            movement_type,
+            first_day=first_day,
+            last_day=last_day,
+            by_product=by_product,
+            by_day=by_day,
+            week_anchor=week_anchor,
+        )
+    for edge_start, edge_end, edge_inclusive in edges:
+        rows += rollup_repository.aggregate_movements(
+            db,
+            organization_id,
+            movement_type,
+            start=edge_start,
+            end=edge_end,
+            end_inclusive=edge_inclusive,
+            by_product=by_product,
+            by_day=by_day,
+            week_anchor=week_anchor,
+        )
+
+    totals: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key = tuple(date.fromisoformat(value) if isinstance(value, str) else value for value in row[:-2])
+        totals[key][0] += int(row.total_qty or 0)
+        totals[key][1] += int(row.count or 0)
+    return totals
+
+
+def _outbound(db: Session, organization_id: int, start: datetime, end: datetime | None, **kwargs):
+    return _aggregate(db, organization_id, MovementType.SAIDA, start, end, **kwargs)
+
+
+def _net_change(db: Session, organization_id: int, start: datetime, end: datetime | None, **kwargs):
+    """Return ``{key: entradas - saídas}`` for the window."""
+    net: dict[tuple, int] = defaultdict(int)
+    for key, (total_qty, _) in _aggregate(db, organization_id, MovementType.ENTRADA, start, end, **kwargs).items():
+        net[key] += total_qty
+    for key, (total_qty, _) in _aggregate(db, organization_id, MovementType.SAIDA, start, end, **kwargs).items():
+        net[key] -= total_qty
+    return net
+
+
+def outbound_by_product(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    end_inclusive: bool = True,
+) -> dict[int, int]:
+    """
+    Total outbound quantity per product over a time window.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        Mapping of product id to quantity; products without saídas are omitted.
+    """
+    totals = _outbound(
+        db, organization_id, start, end, end_inclusive=end_inclusive, by_product=True, by_day=False
+    )
+    return {product_id: total_qty for (product_id,), (total_qty, _) in totals.items()}
+
+
+def outbound_by_product_day(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    end_inclusive: bool = True,
+) -> dict[int, dict[date, int]]:
+    """
+    Outbound quantity per product and UTC day over a time window.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        ``{product_id: {day: quantity}}`` with only non-empty days.
+    """
+    totals = _outbound(
+        db, organization_id, start, end, end_inclusive=end_inclusive, by_product=True, by_day=True
+    )
+    by_product: dict[int, dict[date, int]] = defaultdict(dict)
+    for (product_id, day), (total_qty, _) in totals.items():
+        by_product[product_id][day] = total_qty
+    return dict(by_product)
+
+
+def outbound_by_product_week(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    anchor: date,
+    end_inclusive: bool = True,
+) -> dict[int, dict[int, int]]:
+    """
+    Outbound quantity per product and week over a time window, bucketed in SQL.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        anchor: Last day of week 0; week ``n`` is the 7 days ending ``7 * n`` days earlier.
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        ``{product_id: {week: quantity}}`` with only non-empty weeks.
+    """
+    totals = _outbound(
+        db,
+        organization_id,
+        start,
+        end,
+        end_inclusive=end_inclusive,
+        by_product=True,
+        by_day=False,
+        week_anchor=anchor,
+    )
+    by_product: dict[int, dict[int, int]] = defaultdict(dict)
+    for (product_id, week), (total_qty, _) in totals.items():
+        by_product[product_id][week] = total_qty
+    return dict(by_product)
+
+
+def outbound_by_day(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    end_inclusive: bool = True,
+) -> dict[date, tuple[int, int]]:
+    """
+    Outbound quantity and number of movements per UTC day over a time window.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        ``{day: (quantity, movement_count)}`` with only non-empty days.
+    """
+    totals = _outbound(
+        db, organization_id, start, end, end_inclusive=end_inclusive, by_product=False, by_day=True
+    )
+    by_day: dict[date, tuple[int, int]] = {}
+    for (day,), (total_qty, count) in totals.items():
+        by_day[day] = (total_qty, count)
+    return by_day
+
+
+def outbound_totals(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    end_inclusive: bool = True,
+) -> tuple[int, int]:
+    """
+    Total outbound quantity and number of movements over a time window.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        ``(quantity, movement_count)``.
+    """
+    totals = _outbound(
+        db, organization_id, start, end, end_inclusive=end_inclusive, by_product=False, by_day=False
+    )
+    quantity = sum(total_qty for total_qty, _ in totals.values())
+    count = sum(count for _, count in totals.values())
+    return quantity, count
+
+
+def outbound_by_period(
+    db: Session,
+    organization_id: int,
+    starts: list[date],
+    end: date,
+    *,
+    breakdown: str | None = None,
+    limit: int | None = None,
+) -> dict[tuple, tuple[int, int]]:
+    """
+    Outbound quantity and number of movements per period, bucketed in SQL.
+
+    Periods are whole UTC days, so only the rollups are read (one grouped
+    query) and memory is bounded by periods x groups, not by movements.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        starts: First day of each consecutive period, ascending.
+        end: Day after the last period (exclusive).
+        breakdown: ``"product"`` or ``"category"`` to also group by it.
+        limit: With a breakdown, keep only the groups with the largest
+            quantity in the last period (ties by id).
+
+    Returns:
+        ``{(period,): (quantity, movement_count)}``, or
+        ``{(period, product_or_category_id): ...}`` with a breakdown; empty
+        periods are omitted.
+    """
+    rows = rollup_repository.aggregate_periods(
+        db, organization_id, MovementType.SAIDA, starts=starts, end_day=end, group_by=breakdown, limit=limit
+    )
+    return {tuple(row[:-2]): (int(row.total_qty or 0), int(row.count or 0)) for row in rows}
+
+
+def net_change_by_product(
+    db: Session,
+    organization_id: int,
+    start: datetime,
+    end: datetime | None = None,
+    *,
+    end_inclusive: bool = True,
+) -> dict[int, int]:
+    """
+    Net stock change (entradas minus saídas) per product over a time window.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+        end: Window end (None means up to now).
+        end_inclusive: Whether movements at exactly ``end`` are counted.
+
+    Returns:
+        Mapping of product id to net change; products without movements are omitted.
+    """
+    net = _net_change(db, organization_id, start, end, end_inclusive=end_inclusive, by_product=True, by_day=False)
+    return {product_id: change for (product_id,), change in net.items()}
+
+
+def net_change_since_by_product(db: Session, organization_id: int, start: datetime) -> dict[int, int]:
+    """
+    Net stock change per product of every movement from ``start`` on.
+
+    Unlike :func:`net_change_by_product` without an end, movements dated
+    ahead of now are included, as they are in the current quantities.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        start: Window start (inclusive).
+
+    Returns:
+        Mapping of product id to net change; products without movements are omitted.
+    """
+    net = _net_change(
+        db, organization_id, start, None, end_inclusive=True, by_product=True, by_day=False, open_ended=True
+    )
+    return {product_id: change for (product_id,), change in net.items()}
+
+
+def net_change_after_days_by_product(db: Session, organization_id: int, days: list[date]) -> dict[int, int]:
+    """
+    Per product, the sum over ``days`` of the net change after the end of each day.
+
+    That is the sum of ``current quantity - closing quantity`` over the days,
+    so closing stock summed over many days costs one grouped query.
+
+    Args:
+        db: Database session.
+        organization_id: ID of the organization.
+        days: Ascending UTC days.
+
+    Returns:
+        Mapping of product id to the summed net change; products without movements are omitted.
+    """
+    if not days:
+        return {}
+    runs: list[tuple[date, date, int]] = []
+    for index, day in enumerate(days):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day, runs[-1][2])
+        else:
+            runs.append((day, day, index))
+    rows = rollup_repository.weighted_net_change(db, organization_id, runs)
+    return {row.product_id: int(row.total_qty or 0) for row in rows}
@@ -0,0 +1 @@
+"""In-process scheduling of daily maintenance tasks with DB-lease leader election."""
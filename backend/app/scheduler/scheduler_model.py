@@ -0,0 +1,25 @@
+"""Leases used to elect the worker that runs each scheduled task."""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, String
+
+from app.database import Base
+
+
+class SchedulerLease(Base):
+    """
+    Ownership of a scheduled task.
+
+    A worker runs a task only while it holds the task's lease: it takes the
+    row when the lease is free or expired and renews it while working, so
+    one worker runs the task even when several processes start the
+    scheduler. ``last_completed_at`` records the last successful run.
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)  # e.g. "reports.precompute"
+    holder = Column(String(100), nullable=True)  # host:pid:token of the current owner
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_completed_at = Column(DateTime, nullable=True)
@@ -0,0 +1,68 @@
+"""Data repository for scheduler leases."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .scheduler_model import SchedulerLease
+
+
+def acquire_lease(db: Session, name: str, holder: str, now: datetime, until: datetime) -> SchedulerLease | None:
+    """
+    Take a free or expired lease and commit; return None if it is currently held.
+
+    The conditional UPDATE (or the primary key, for the first run) decides
+    between concurrent workers, so this works on every supported database.
+    """
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(
+                SchedulerLease.holder.is_(None),
+                SchedulerLease.lease_expires_at <= now,
+            ),
+        )
+        .values(holder=holder, lease_expires_at=until)
+    )
+    if result.rowcount == 0:
+        if db.get(SchedulerLease, name) is not None:
+            db.rollback()
+            return None
+        db.add(SchedulerLease(name=name, holder=holder, lease_expires_at=until))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+    else:
+        db.commit()
+    lease = db.get(SchedulerLease, name)
+    db.refresh(lease)
+    return lease
+
+
+def renew_lease(db: Session, name: str, holder: str, until: datetime) -> bool:
+    """Extend a lease held by ``holder`` and commit; return False if it was lost."""
+    result = db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(lease_expires_at=until)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_lease(db: Session, name: str, holder: str, completed_at: datetime | None = None) -> None:
+    """Give up a lease held by ``holder``, recording a successful run when ``completed_at`` is set."""
+    values = {"holder": None, "lease_expires_at": None}
+    if completed_at is not None:
+        values["last_completed_at"] = completed_at
+    db.execute(
+        update(SchedulerLease).where(SchedulerLease.name == name, SchedulerLease.holder == holder).values(**values)
+    )
+    db.commit()
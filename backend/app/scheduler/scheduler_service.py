@@ -0,0 +1,152 @@
+"""In-process scheduler for daily tasks.
+
+Every worker that enables the scheduler (``SCHEDULER_ENABLED``) wakes up
+every ``SCHEDULER_POLL_SECONDS`` and, once a task's hour (UTC) has passed,
+tries to take the task's lease in ``scheduler_leases``. Only the worker that
+gets it runs the task; it renews the lease while working and records the
+completion, so the other workers skip the task until the next day. If the
+owner dies, its lease expires after ``SCHEDULER_LEASE_SECONDS`` and another
+worker takes over; a failed run is retried once its lease has expired.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Sequence
+
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.database import SessionLocal
+from . import scheduler_repository
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(RuntimeError):
+    """The task's lease was taken by another worker while the task was running."""
+
+
+class DailyTask(NamedTuple):
+    """A task run once a day, after ``hour_utc``."""
+
+    name: str
+    hour_utc: int
+    run: Callable[[Session, Callable[[], None]], None]  # run(db, renew_lease)
+
+
+class Scheduler:
+    """
+    Run daily tasks on a background thread, coordinated through DB leases.
+
+    Args:
+        tasks: Tasks to run.
+        session_factory: Callable returning a new database session.
+        poll_seconds: Interval between checks.
+        lease_seconds: Lease duration; renewals extend it by the same amount.
+        holder: Identity of this worker (default: host, pid and a random token).
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[DailyTask],
+        session_factory: Callable[[], Session] = SessionLocal,
+        *,
+        poll_seconds: float = constants.SCHEDULER_POLL_SECONDS,
+        lease_seconds: float = constants.SCHEDULER_LEASE_SECONDS,
+        holder: str | None = None,
+    ):
+        self.tasks = list(tasks)
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._session_factory = session_factory
+        self._poll = poll_seconds
+        self._lease = timedelta(seconds=lease_seconds)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the polling thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+            self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop polling and wait for a running task to finish."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self._poll)
+
+    def run_pending(self, now: datetime | None = None) -> list[str]:
+        """
+        Run every task that is due and not yet done today (by any worker).
+
+        Returns:
+            Names of the tasks this worker completed.
+        """
+        now = now or datetime.utcnow()
+        completed = []
+        for task in self.tasks:
+            if now.hour < task.hour_utc:
+                continue
+            try:
+                if self._run_task(task, now):
+                    completed.append(task.name)
+            except Exception:
+                logger.exception(f"Falha na tarefa agendada {task.name}")
+        return completed
+
+    def _run_task(self, task: DailyTask, now: datetime) -> bool:
+        with self._session_factory() as db:
+            lease = scheduler_repository.acquire_lease(db, task.name, self.holder, now, now + self._lease)
+            if lease is None:
+                return False
+            if lease.last_completed_at is not None and lease.last_completed_at.date() >= now.date():
+                scheduler_repository.release_lease(db, task.name, self.holder)
+                return False
+
+            def renew_lease() -> None:
+                if not scheduler_repository.renew_lease(db, task.name, self.holder, datetime.utcnow() + self._lease):
+                    raise LeaseLostError(task.name)
+
+            logger.info(f"Executando tarefa agendada {task.name} ({self.holder})")
+            try:
+                task.run(db, renew_lease)
+            except Exception:
+                # The lease is kept until it expires, which delays the retry (on every worker)
+                db.rollback()
+                raise
+            scheduler_repository.release_lease(db, task.name, self.holder, completed_at=now)
+            logger.info(f"✅ Tarefa agendada {task.name} concluída")
+            return True
+
+
+_scheduler: Scheduler | None = None
+
+
+def start(tasks: Sequence[DailyTask]) -> Scheduler:
+    """Start the process-wide scheduler with the given tasks."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler(tasks)
+        _scheduler.start()
+    return _scheduler
+
+
+def shutdown() -> None:
+    """Stop the process-wide scheduler, if it was started."""
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.shutdown()
@@ -0,0 +1 @@
+"""Stocktakes (cycle counts) and the adjustments they generate."""
@@ -0,0 +1,140 @@
+"""Stocktake endpoints."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, File, Header, Query, UploadFile, status
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.auth.auth_service import get_current_user, require_role
+from app.database import get_db
+from app.idempotency import idempotency_service
+from app.users.user_model import User
+from . import stocktake_model, stocktake_service
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_DESCRIPTION = "Client-generated key that makes retries of this request safe"
+
+router = APIRouter(
+    prefix="/stocktakes",
+    tags=["Stocktakes"],
+    dependencies=[Depends(get_current_user)],
+)
+
+
+@router.post(
+    "/",
+    response_model=stocktake_model.StocktakeReport,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_stocktake(
+    stocktake: stocktake_model.StocktakeCreate,
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "user")),
+):
+    """Post counted quantities and adjust every product whose stock differs."""
+    logger.info(f"Registrando inventário: {len(stocktake.lines)} linhas - User: {current_user.email}")
+
+    def handler():
+        result = stocktake_service.create_stocktake(
+            db,
+            stocktake.lines,
+            organization_id=current_user.organization_id,
+            counted_at=stocktake.counted_at,
+            note=stocktake.note,
+            created_by_user_id=current_user.id,
+            commit=False,
+        )
+        logger.info(f"✅ Inventário {result.id}: {result.adjusted_count} de {result.line_count} produtos ajustados")
+        return stocktake_service.build_report(db, result).model_dump(mode="json")
+
+    return idempotency_service.run(
+        db,
+        organization_id=current_user.organization_id,
+        key=idempotency_key,
+        scope="stocktakes.create",
+        payload=stocktake.model_dump(mode="json"),
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
+    )
+
+
+@router.post(
+    "/csv",
+    response_model=stocktake_model.StocktakeReport,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_stocktake_from_csv(
+    file: UploadFile = File(description="CSV com as colunas product_id ou sku e counted_quantity"),
+    counted_at: datetime | None = Query(default=None, description="Momento da contagem (padrão: agora)"),
+    note: str | None = Query(default=None, description="Observações do inventário"),
+    idempotency_key: str | None = Header(
+        default=None, alias=IDEMPOTENCY_KEY_HEADER, description=IDEMPOTENCY_KEY_DESCRIPTION
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "user")),
+):
+    """Post a stocktake from a CSV upload, read as a stream."""
+    logger.info(f"Registrando inventário por CSV: {file.filename} - User: {current_user.email}")
+
+    def handler():
+        result = stocktake_service.create_stocktake(
+            db,
+            stocktake_service.read_csv_counts(file.file),
+            organization_id=current_user.organization_id,
+            counted_at=counted_at,
+            note=note,
+            created_by_user_id=current_user.id,
+            commit=False,
+        )
+        logger.info(f"✅ Inventário {result.id}: {result.adjusted_count} de {result.line_count} produtos ajustados")
+        return stocktake_service.build_report(db, result).model_dump(mode="json")
+
+    payload = None
+    if idempotency_key is not None:
+        # A retry is recognized by the uploaded content, not by its file name.
+        payload = {
+            "content_sha256": stocktake_service.upload_digest(file.file),
+            "counted_at": counted_at.isoformat() if counted_at is not None else None,
+            "note": note,
+        }
+    return idempotency_service.run(
+        db,
+        organization_id=current_user.organization_id,
+        key=idempotency_key,
+        scope="stocktakes.create_csv",
+        payload=payload,
+        status_code=status.HTTP_201_CREATED,
+        handler=handler,
+    )
+
+
+@router.get("/", response_model=List[stocktake_model.StocktakePublic])
+def list_stocktakes(
+    limit: int = Query(default=constants.DEFAULT_PAGE_SIZE, ge=1, le=constants.MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """List stocktakes, newest first."""
+    return stocktake_service.list_stocktakes(db, current_user.organization_id, limit=limit, offset=offset)
+
+
+@router.get("/{stocktake_id}", response_model=stocktake_model.StocktakeReport)
+def get_stocktake(
+    stocktake_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return a stocktake and the products it adjusted."""
+    stocktake = stocktake_service.get_stocktake(db, stocktake_id, current_user.organization_id)
+    return stocktake_service.build_report(db, stocktake)
@@ -0,0 +1,94 @@
+"""Models and schemas for stocktakes."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app import constants
+from app.database import Base
+
+
+class Stocktake(Base):
+    """A bulk count of products and the adjustment it produced."""
+
+    __tablename__ = "stocktakes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    counted_at = Column(DateTime, nullable=False)  # Movements after this instant are not in the counts
+    note = Column(Text, nullable=True)
+    line_count = Column(Integer, nullable=False, default=0)
+    adjusted_count = Column(Integer, nullable=False, default=0)
+    units_added = Column(Integer, nullable=False, default=0)
+    units_removed = Column(Integer, nullable=False, default=0)
+    batch_id = Column(String(32), nullable=True)  # Batch of the adjustment movements
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class StocktakeLine(Base):
+    """Counted quantity of one product in a stocktake."""
+
+    __tablename__ = "stocktake_lines"
+
+    stocktake_id = Column(Integer, ForeignKey("stocktakes.id"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    counted_quantity = Column(Integer, nullable=False)
+    expected_quantity = Column(Integer, nullable=True)  # Stock at counted_at, set when applied
+    variance = Column(Integer, nullable=True)  # counted - expected
+
+
+class StocktakeCount(BaseModel):
+    product_id: Optional[int] = None
+    sku: Optional[str] = Field(default=None, max_length=50)
+    counted_quantity: int = Field(ge=0, description="Quantidade contada")
+
+    @model_validator(mode='after')
+    def validate_product(self):
+        """Exige exatamente uma identificação do produto: ID ou SKU."""
+        if (self.product_id is None) == (self.sku is None):
+            raise ValueError("Informe product_id ou sku (apenas um)")
+        return self
+
+
+class StocktakeCreate(BaseModel):
+    counted_at: Optional[datetime] = Field(
+        default=None, description="Momento da contagem (padrão: agora); movimentações posteriores são descontadas"
+    )
+    note: Optional[str] = Field(default=None, description="Observações do inventário")
+    lines: List[StocktakeCount] = Field(
+        min_length=1,
+        max_length=constants.STOCKTAKE_MAX_LINES,
+        description="Quantidades contadas; o mesmo produto em várias linhas é somado",
+    )
+
+
+class StocktakeVariance(BaseModel):
+    product_id: int
+    product_name: str
+    sku: str
+    counted_quantity: int
+    expected_quantity: int
+    variance: int
+
+
+class StocktakePublic(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    counted_at: datetime
+    note: Optional[str] = None
+    line_count: int
+    adjusted_count: int
+    units_added: int
+    units_removed: int
+    batch_id: Optional[str] = None
+    created_at: datetime
+
+
+class StocktakeReport(StocktakePublic):
+    variances: List[StocktakeVariance]
@@ -0,0 +1,210 @@
+"""Data repository for stocktakes."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.movements.movement_model import Movement, MovementType
+from app.products.product_model import Product
+
+from . import stocktake_model
+
+Stocktake = stocktake_model.Stocktake
+Line = stocktake_model.StocktakeLine
+
+
+def create_stocktake(db: Session, **fields) -> stocktake_model.Stocktake:
+    """Persist a stocktake header."""
+    stocktake = Stocktake(**fields)
+    db.add(stocktake)
+    db.flush()
+    return stocktake
+
+
+def insert_lines(db: Session, rows: list[dict]) -> None:
+    """Insert count lines with one executemany."""
+    if rows:
+        db.execute(insert(Line), rows)
+
+
+def compute_variances(db: Session, stocktake_id: int, organization_id: int, counted_at: datetime):
+    """
+    Return the variance of every line of a stocktake in one joined query.
+
+    The stock at ``counted_at`` is the current quantity minus the net of the
+    product's movements after that instant, so movements posted while
+    counting do not show up as variance.
+
+    Returns:
+        Rows of (product_id, name, sku, quantity, counted_quantity, expected_quantity, variance).
+    """
+    signed = case((Movement.type == MovementType.ENTRADA, Movement.quantity), else_=-Movement.quantity)
+    counted_products = select(Line.product_id).where(Line.stocktake_id == stocktake_id)
+    since_count = (
+        select(Movement.product_id, func.sum(signed).label("net"))
+        .where(
+            Movement.organization_id == organization_id,
+            Movement.created_at > counted_at,
+            Movement.product_id.in_(counted_products),
+        )
+        .group_by(Movement.product_id)
+        .subquery()
+    )
+    expected = Product.quantity - func.coalesce(since_count.c.net, 0)
+    return db.execute(
+        select(
+            Line.product_id,
+            Product.name,
+            Product.sku,
+            Product.quantity,
+            Line.counted_quantity,
+            expected.label("expected_quantity"),
+            (Line.counted_quantity - expected).label("variance"),
+        )
+        .join(Product, Product.id == Line.product_id)
+        .outerjoin(since_count, since_count.c.product_id == Line.product_id)
+        .where(Line.stocktake_id == stocktake_id, Product.organization_id == organization_id)
+        .order_by(Line.product_id)
+    ).all()
+
+
+def store_variances(db: Session, stocktake_id: int, rows) -> None:
+    """Write expected quantity and variance back to the lines (bulk UPDATE by primary key)."""
+    if rows:
+        db.execute(
+            update(Line),
+            [
+                {
+                    "stocktake_id": stocktake_id,
+                    "product_id": row.product_id,
+                    "expected_quantity": row.expected_quantity,
+                    "variance": row.variance,
+                }
+                for row in rows
+            ],
+        )
+
+
+def _adjusted_lines(stocktake_id: int):
+    return select(Line.product_id).where(Line.stocktake_id == stocktake_id, Line.variance != 0)
+
+
+def apply_variances(db: Session, stocktake_id: int, organization_id: int) -> int:
+    """
+    Add each line's variance to its product's quantity with one correlated UPDATE.
+
+    Products that would go negative are left untouched; callers compare the
+    row count with the number of adjusted lines.
+
+    Returns:
+        Number of products updated.
+    """
+    variance = (
+        select(Line.variance)
+        .where(Line.stocktake_id == stocktake_id, Line.product_id == Product.id)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(Product)
+        .where(
+            Product.organization_id == organization_id,
+            Product.id.in_(_adjusted_lines(stocktake_id)),
+            Product.quantity + variance >= 0,
+        )
+        .values(quantity=Product.quantity + variance)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def insert_adjustments(
+    db: Session,
+    stocktake_id: int,
+    organization_id: int,
+    *,
+    created_by_user_id: int | None,
+    batch_id: str,
+    created_at: datetime,
+) -> int:
+    """Insert one entrada/saída per adjusted line with one ``INSERT ... SELECT``; return rows."""
+    movement_type = Movement.type.type
+    source = (
+        select(
+            Line.product_id,
+            case(
+                (Line.variance > 0, literal(MovementType.ENTRADA, movement_type)),
+                else_=literal(MovementType.SAIDA, movement_type),
+            ),
+            func.abs(Line.variance),
+            literal("stocktake"),
+            literal(f"Stocktake {stocktake_id}"),
+            literal(created_by_user_id, Movement.created_by_id.type),
+            literal(organization_id),
+            literal(batch_id),
+            literal(created_at, Movement.created_at.type),
+        )
+        .where(Line.stocktake_id == stocktake_id, Line.variance != 0)
+        .order_by(Line.product_id)
+    )
+    return db.execute(
+        insert(Movement).from_select(
+            [
+                "product_id",
+                "type",
+                "quantity",
+                "reason",
+                "note",
+                "created_by_id",
+                "organization_id",
+                "batch_id",
+                "created_at",
+            ],
+            source,
+        )
+    ).rowcount
+
+
+def get_stocktake(db: Session, stocktake_id: int, organization_id: int) -> stocktake_model.Stocktake | None:
+    """Return a stocktake by its identifier and organization."""
+    return db.scalar(
+        select(Stocktake).where(Stocktake.id == stocktake_id, Stocktake.organization_id == organization_id)
+    )
+
+
+def list_stocktakes(
+    db: Session,
+    organization_id: int,
+    *,
+    limit: int,
+    offset: int = 0,
+) -> List[stocktake_model.Stocktake]:
+    """Return the stocktakes of an organization, newest first."""
+    return list(
+        db.scalars(
+            select(Stocktake)
+            .where(Stocktake.organization_id == organization_id)
+            .order_by(Stocktake.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    )
+
+
+def list_variances(db: Session, stocktake_id: int):
+    """Return the lines of a stocktake that were adjusted, joined with their products."""
+    return db.execute(
+        select(
+            Line.product_id,
+            Product.name.label("product_name"),
+            Product.sku,
+            Line.counted_quantity,
+            Line.expected_quantity,
+            Line.variance,
+        )
+        .join(Product, Product.id == Line.product_id)
+        .where(Line.stocktake_id == stocktake_id, Line.variance != 0)
+        .order_by(Line.product_id)
+    ).all()
@@ -0,0 +1,249 @@
+"""Business rules for stocktakes (bulk cycle counts).
+
+A stocktake records counted quantities and posts one adjustment movement
+(entrada or saída) per product whose count differs from its stock.
+
+Lock window: counting does not freeze stock. Each stocktake carries the
+instant the count was taken (``counted_at``), and the variance of a product
+is ``counted - (quantity - net of its movements after counted_at)``. A
+movement posted meanwhile changes the quantity and that net by the same
+amount, so the variance does not depend on it and no lock is needed while
+counts are uploaded, staged and compared. Product rows are locked only at
+the end of the transaction, in id order and only for the products that are
+actually adjusted, while the set-based UPDATE and INSERT run.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import constants
+from app.audit import audit_service
+from app.audit.audit_model import ActionType, EntityType
+from app.exceptions import NegativeStockException, NotFoundException, ValidationException
+from app.movements import movement_repository
+from app.products import product_repository
+from app.reconciliation import reconciliation_service
+from app.rollups import rollup_service
+from . import stocktake_model, stocktake_repository
+
+
+def upload_digest(stream: BinaryIO) -> str:
+    """Return the SHA-256 of an upload read in blocks, leaving the stream rewound."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(1 << 20), b""):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def read_csv_counts(stream: BinaryIO) -> Iterator[stocktake_model.StocktakeCount]:
+    """
+    Stream the counts of a CSV upload (``product_id`` or ``sku``, ``counted_quantity``).
+
+    Raises:
+        HTTPException(400): If a line is invalid or the file has too many lines.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    for line, record in enumerate(reader, start=2):
+        if line - 1 > constants.STOCKTAKE_MAX_LINES:
+            raise ValidationException(f"O inventário aceita no máximo {constants.STOCKTAKE_MAX_LINES} linhas")
+        try:
+            yield stocktake_model.StocktakeCount(
+                product_id=record.get("product_id") or None,
+                sku=record.get("sku") or None,
+                counted_quantity=record.get("counted_quantity"),
+            )
+        except ValidationError as exc:
+            raise ValidationException(f"Linha {line}: {exc.errors()[0]['msg']}")
+
+
+def _resolve_counts(
+    db: Session,
+    counts: Iterable[stocktake_model.StocktakeCount],
+    organization_id: int,
+) -> dict[int, int]:
+    """Map each count to an active product of the organization and sum repeated products."""
+    skus = product_repository.list_product_keys(db, organization_id, active_only=True)
+    product_ids = set(skus.values())
+    totals: dict[int, int] = {}
+    for count in counts:
+        if count.product_id is not None:
+            if count.product_id not in product_ids:
+                raise NotFoundException("Product", count.product_id)
+            product_id = count.product_id
+        else:
+            product_id = skus.get(count.sku.strip().upper())
+            if product_id is None:
+                raise NotFoundException("Product", count.sku)
+        totals[product_id] = totals.get(product_id, 0) + count.counted_quantity
+    if not totals:
+        raise ValidationException("Inventário sem linhas de contagem")
+    return totals
+
+
+def _validate_counted_at(counted_at: datetime | None) -> datetime:
+    now = datetime.utcnow()
+    if counted_at is None:
+        return now
+    if counted_at.tzinfo is not None:
+        counted_at = counted_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if counted_at > now:
+        raise ValidationException("A data da contagem não pode estar no futuro")
+    if counted_at < now - timedelta(days=constants.STOCKTAKE_MAX_COUNT_AGE_DAYS):
+        raise ValidationException(
+            f"A contagem deve ter no máximo {constants.STOCKTAKE_MAX_COUNT_AGE_DAYS} dias"
+        )
+    return counted_at
+
+
+def create_stocktake(
+    db: Session,
+    counts: Iterable[stocktake_model.StocktakeCount],
+    organization_id: int,
+    *,
+    counted_at: datetime | None = None,
+    note: str | None = None,
+    created_by_user_id: int | None = None,
+    commit: bool = True,
+) -> stocktake_model.Stocktake:
+    """
+    Record a stocktake and post its adjustment movements in one transaction.
+
+    Counts are staged in ``stocktake_lines``; one joined query then computes
+    every variance against the stock at ``counted_at``, and the quantities,
+    the adjustment movements (one ``INSERT ... SELECT``), their rollups and a
+    single audit entry summarizing the stocktake are written set-based.
+
+    Args:
+        db: Database session.
+        counts: Counted quantities; repeated products are summed.
+        organization_id: ID of the organization.
+        counted_at: When the count was taken (default: now, UTC).
+        note: Free-text note.
+        created_by_user_id: ID of the user posting the stocktake.
+        commit: If False, the caller commits (e.g. with its idempotency record).
+
+    Returns:
+        The applied Stocktake ORM instance.
+
+    Raises:
+        HTTPException(404): If a product is not found.
+        HTTPException(400): If the count is invalid or an adjustment would
+            leave a product with negative stock.
+    """
+    counted_at = _validate_counted_at(counted_at)
+    totals = _resolve_counts(db, counts, organization_id)
+    batch_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+
+    transaction_ctx = db.begin_nested() if db.in_transaction() else db.begin()
+    with transaction_ctx:
+        # Staging can outlast the reconciliation safety lag; keep reconciliation behind the adjustments.
+        reconciliation_service.hold_ledger(db, organization_id)
+        stocktake = stocktake_repository.create_stocktake(
+            db,
+            organization_id=organization_id,
+            counted_at=counted_at,
+            note=note,
+            line_count=len(totals),
+            created_by_id=created_by_user_id,
+            created_at=now,
+        )
+        rows = [
+            {"stocktake_id": stocktake.id, "product_id": product_id, "counted_quantity": quantity}
+            for product_id, quantity in sorted(totals.items())
+        ]
+        for start in range(0, len(rows), constants.STOCKTAKE_CHUNK_SIZE):
+            stocktake_repository.insert_lines(db, rows[start:start + constants.STOCKTAKE_CHUNK_SIZE])
+
+        variances = stocktake_repository.compute_variances(db, stocktake.id, organization_id, counted_at)
+        for row in variances:
+            if row.quantity + row.variance < 0:
+                raise NegativeStockException(row.name)
+        stocktake_repository.store_variances(db, stocktake.id, variances)
+        adjusted = [row for row in variances if row.variance]
+
+        # Lock window: only the adjusted products, in id order, until commit.
+        product_repository.lock_products(db, [row.product_id for row in adjusted], organization_id)
+        if stocktake_repository.apply_variances(db, stocktake.id, organization_id) != len(adjusted):
+            raise ValidationException("Estoque alterado durante o inventário; tente novamente")
+
+        stocktake_repository.insert_adjustments(
+            db,
+            stocktake.id,
+            organization_id,
+            created_by_user_id=created_by_user_id,
+            batch_id=batch_id,
+            created_at=now,
+        )
+        rollup_service.record_movements(db, movement_repository.list_batch_movements(db, organization_id, batch_id))
+
+        stocktake.adjusted_count = len(adjusted)
+        stocktake.units_added = sum(row.variance for row in adjusted if row.variance > 0)
+        stocktake.units_removed = -sum(row.variance for row in adjusted if row.variance < 0)
+        stocktake.batch_id = batch_id if adjusted else None
+
+        audit_service.log_action(
+            db=db,
+            user_id=created_by_user_id,
+            action=ActionType.CREATE,
+            entity_type=EntityType.STOCKTAKE,
+            entity_id=stocktake.id,
+            details={
+                "counted_at": counted_at.isoformat(),
+                "lines": stocktake.line_count,
+                "adjusted": stocktake.adjusted_count,
+                "units_added": stocktake.units_added,
+                "units_removed": stocktake.units_removed,
+                "batch_id": stocktake.batch_id,
+            },
+            organization_id=organization_id,
+        )
+
+    if commit:
+        db.commit()
+    return stocktake
+
+
+def get_stocktake(db: Session, stocktake_id: int, organization_id: int) -> stocktake_model.Stocktake:
+    """
+    Retrieve a stocktake by ID.
+
+    Raises:
+        HTTPException(404): If the stocktake is not found.
+    """
+    stocktake = stocktake_repository.get_stocktake(db, stocktake_id, organization_id)
+    if stocktake is None:
+        raise NotFoundException("Stocktake", stocktake_id)
+    return stocktake
+
+
+def build_report(db: Session, stocktake: stocktake_model.Stocktake) -> stocktake_model.StocktakeReport:
+    """Return a stocktake with the list of adjusted products."""
+    return stocktake_model.StocktakeReport(
+        **stocktake_model.StocktakePublic.model_validate(stocktake).model_dump(),
+        variances=[
+            stocktake_model.StocktakeVariance.model_validate(row._asdict())
+            for row in stocktake_repository.list_variances(db, stocktake.id)
+        ],
+    )
+
+
+def list_stocktakes(
+    db: Session,
+    organization_id: int,
+    *,
+    limit: int = constants.DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+) -> list[stocktake_model.Stocktake]:
+    """List the stocktakes of an organization, newest first."""
+    return stocktake_repository.list_stocktakes(db, organization_id, limit=limit, offset=offset)
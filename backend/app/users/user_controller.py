@@ -5,11 +5,13 @@ from __future__ import annotations
 import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 
 from app.auth.auth_service import get_current_user, require_role
 from app.database import get_db
+from app.utils.image_processor import parse_data_url
 from . import user_model, user_service
 
 logger = logging.getLogger(__name__)
@@ -81,6 +83,32 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     return user_service.get_user_by_id(db, user_id=user_id)
 
 
+@router.get("/{user_id}/avatar")
+def read_user_avatar(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """Serve a user's profile image so listings don't need to embed it."""
+    db_user = user_service.get_user_by_id(db, user_id=user_id)
+    if db_user.organization_id != current_user.organization_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+
+    if db_user.profile_image_base64:
+        try:
+            mime_type, image_bytes = parse_data_url(db_user.profile_image_base64)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Imagem não encontrada")
+        return Response(
+            content=image_bytes,
+            media_type=mime_type,
+            headers={"Cache-Control": "private, max-age=3600"},
+        )
+    if db_user.profile_image_url:
+        return RedirectResponse(db_user.profile_image_url)
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Imagem não encontrada")
+
+
 @router.put(
     "/{user_id}",
     response_model=user_model.UserPublic,
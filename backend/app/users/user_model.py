@@ -31,7 +31,7 @@ class User(Base):
 
     role = relationship("Role", back_populates="users")
     organization = relationship("Organization", back_populates="users")
-    movements = relationship("Movement", back_populates="created_by", lazy="selectin")
+    movements = relationship("Movement", back_populates="created_by", lazy="select")
 
 
 class UserCreate(BaseModel):
@@ -0,0 +1,43 @@
+"""ETag / If-Match helpers for optimistically locked resources."""
+
+from __future__ import annotations
+
+
+def format_etag(version: int) -> str:
+    """
+    Format a row version as a strong entity tag.
+
+    Args:
+        version: Current value of the resource's version column.
+
+    Returns:
+        Quoted entity tag, e.g. ``"3"``.
+    """
+    return f'"{version}"'
+
+
+def parse_if_match(header: str | None) -> list[int] | None:
+    """
+    Parse an ``If-Match`` header into the versions it accepts.
+
+    Weak tags (``W/"3"``) are accepted as their version. Tags that are not
+    versions produced by :func:`format_etag` can never match, so they are
+    dropped and an empty list is returned if none remain.
+
+    Args:
+        header: Raw header value.
+
+    Returns:
+        Accepted versions, or None when the header is absent or ``*``.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag.isdigit():
+            versions.append(int(tag))
+    return versions
@@ -0,0 +1,74 @@
+"""Opaque keyset cursors for ``(created_at DESC, id DESC)`` listings and sorted report items."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+from app.exceptions import ValidationException
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        created_at: Timestamp of the last row returned.
+        row_id: Primary key of the last row returned (tie-breaker).
+
+    Returns:
+        URL-safe cursor string.
+    """
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Raises:
+        ValidationException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationException("Cursor de paginação inválido")
+
+
+def encode_sort_cursor(sort: str, value: Any, row_id: int) -> str:
+    """
+    Encode the position of the last item of a page sorted by ``sort``.
+
+    Args:
+        sort: Sort specification the page was produced with, e.g. ``"-value"``.
+        value: Sort value of the last item returned (JSON-serializable).
+        row_id: ID of the last item returned (tie-breaker).
+
+    Returns:
+        URL-safe cursor string.
+    """
+    raw = json.dumps([sort, value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sort_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """
+    Decode a cursor produced by :func:`encode_sort_cursor` for the same sort.
+
+    Raises:
+        ValidationException: If the cursor is malformed or was produced with another sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValidationException("Cursor de paginação inválido")
+    if cursor_sort != sort or not isinstance(row_id, int):
+        raise ValidationException("Cursor de paginação inválido para esta ordenação")
+    return value, row_id
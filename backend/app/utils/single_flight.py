@@ -0,0 +1,136 @@
+"""Single-flight coalescing of identical concurrent computations.
+
+When several requests ask for the same expensive result at the same time
+(e.g. every wall display refreshing the dashboard at once), only the first
+one runs the computation; the others wait for it and receive the same
+result, or a copy of its exception. A waiter gives up after
+``SINGLE_FLIGHT_WAIT_SECONDS`` and computes the result itself, so a stuck
+computation does not hold every identical request. Nothing is kept once the
+call finishes, so this is independent of any result cache: a request
+arriving after the computation ended starts a new one.
+
+Coalescing is per process; endpoints run in FastAPI's thread pool, so
+waiting uses threading primitives.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Callable, Hashable, TypeVar
+
+from app import constants
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Return a new exception with the type and attributes of ``error``, caused by it."""
+    clone = type(error).__new__(type(error))
+    clone.__dict__.update(error.__dict__)
+    clone.args = error.args
+    clone.__cause__ = error
+    return clone
+
+
+class SingleFlight:
+    """Group of in-flight calls, keyed by any hashable value."""
+
+    def __init__(self, wait_timeout: float | None = constants.SINGLE_FLIGHT_WAIT_SECONDS):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._wait_timeout = wait_timeout
+        self.executed = 0
+        self.shared = 0
+        self.timed_out = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` unless an identical call is in flight, in which case wait for it.
+
+        A waiter that is not answered within the group's ``wait_timeout`` runs
+        ``fn`` itself, without registering a new call.
+
+        Args:
+            key: Identity of the computation.
+            fn: Computes the result; only the first concurrent caller runs it.
+
+        Returns:
+            The result of the in-flight call (shared, not copied).
+
+        Raises:
+            Whatever ``fn`` raised: the exception itself in the caller, and a
+            copy of it (caused by the original) in every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not call.done.wait(self._wait_timeout):
+                with self._lock:
+                    self.timed_out += 1
+                logger.warning(f"Cálculo compartilhado demorou mais de {self._wait_timeout}s; calculando em paralelo")
+                return fn()
+            if call.error is not None:
+                raise _copy_error(call.error)
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of computations currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+_flights = SingleFlight()
+
+
+def flight_key(organization_id: int, endpoint: str, params: dict) -> tuple[int, str, str]:
+    """Build the coalescing key of an endpoint call from its normalized parameters."""
+    return organization_id, endpoint, json.dumps(params, sort_keys=True, default=str)
+
+
+def coalesce(organization_id: int, endpoint: str, params: dict, fn: Callable[[], T]) -> T:
+    """
+    Share ``fn`` among concurrent identical calls of an organization's endpoint.
+
+    Args:
+        organization_id: ID of the organization.
+        endpoint: Name of the endpoint, e.g. ``"reports.abc"``.
+        params: Normalized parameters (JSON-serializable).
+        fn: Computes the result.
+    """
+    return _flights.do(flight_key(organization_id, endpoint, params), fn)
+
+
+def get_flights() -> SingleFlight:
+    """Return the process-wide flight group used by :func:`coalesce`."""
+    return _flights
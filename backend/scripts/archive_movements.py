@@ -0,0 +1,55 @@
+"""Manutenção do histórico de movimentações por mês.
+
+Cria as partições mensais futuras (PostgreSQL), move os meses fechados para
+``movements_archive`` (bancos sem particionamento) e grava os meses mais
+antigos que ``MOVEMENT_ARCHIVE_AFTER_MONTHS`` em segmentos NDJSON
+comprimidos com zstd em ``MOVEMENT_ARCHIVE_DIR``, removendo-os do banco.
+Agende para rodar diariamente.
+
+Uso:
+    python scripts/archive_movements.py
+    python scripts/archive_movements.py --partitions-only
+    python scripts/archive_movements.py --organization-id 3
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+
+from app.archive import archive_service
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.database import SessionLocal
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partitions-only", action="store_true", help="Apenas cria as partições futuras")
+    parser.add_argument("--organization-id", type=int, help="Arquiva apenas esta organização")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        created = archive_service.ensure_partitions(db)
+        for month in created:
+            print(f"🗂️  Partição criada: {month:%Y-%m}")
+        if not args.partitions_only:
+            moved = archive_service.rotate_closed_months(db, organization_id=args.organization_id)
+            if moved:
+                print(f"📦 {moved} movimentações movidas para movements_archive")
+            for segment in archive_service.archive_cold_months(db, organization_id=args.organization_id):
+                print(
+                    f"🧊 Organização {segment['organization_id']} {segment['month']:%Y-%m}: "
+                    f"{segment['row_count']} movimentações, {segment['byte_size']} bytes → {segment['path']}"
+                )
+    print(f"✅ Concluído em {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
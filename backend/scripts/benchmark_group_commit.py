@@ -0,0 +1,124 @@
+"""Benchmark de saídas concorrentes em um único SKU: commit por requisição x group commit.
+
+Cria um produto temporário na organização do admin e dispara N saídas de
+quantidade 1 a partir de W threads, primeiro com ``create_movement`` (um
+commit por movimentação) e depois com ``MovementGroupCommitter``. Imprime a
+vazão (movimentações/s) e a latência p50/p95 de cada modo.
+
+Uso:
+    python scripts/benchmark_group_commit.py --movements 2000 --workers 32
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from sqlalchemy import select
+
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.categories.category_model import Category
+from app.database import SessionLocal
+from app.exceptions import InsufficientStockException
+from app.movements import movement_service
+from app.movements.movement_group_commit import MovementGroupCommitter
+from app.movements.movement_model import MovementCreate, MovementType
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+from app.products.product_model import Product
+from app.users.user_model import User
+
+
+def create_hot_product(quantity: int) -> tuple[int, int, int]:
+    """Cria o produto do teste e devolve (product_id, organization_id, user_id)."""
+    with SessionLocal() as db:
+        admin = db.scalar(select(User).where(User.email == "admin@estoque.com"))
+        if admin is None:
+            raise SystemExit("Banco sem usuário admin. Rode scripts/seed_database.py antes.")
+        category_id = db.scalar(select(Category.id).where(Category.organization_id == admin.organization_id))
+        product = Product(
+            name="Benchmark Group Commit",
+            sku=f"BENCH-{uuid.uuid4().hex[:8].upper()}",
+            price=10,
+            cost_price=5,
+            quantity=quantity,
+            alert_level=0,
+            category_id=category_id,
+            organization_id=admin.organization_id,
+        )
+        db.add(product)
+        db.commit()
+        return product.id, admin.organization_id, admin.id
+
+
+def run(label: str, submit: Callable[[], None], movements: int, workers: int) -> None:
+    """Dispara as saídas e imprime vazão e latências."""
+    latencies: list[float] = []
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            submit()
+        except InsufficientStockException:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(one, range(movements)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<22} {movements / elapsed:>9.0f} mov/s   "
+        f"p50 {statistics.median(latencies):>7.1f} ms   p95 {p95:>7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movements", type=int, default=2000, help="Saídas por modo")
+    parser.add_argument("--workers", type=int, default=32, help="Threads concorrentes")
+    args = parser.parse_args()
+
+    payload_for = lambda product_id: MovementCreate(  # noqa: E731
+        product_id=product_id, type=MovementType.SAIDA, quantity=1, reason="Benchmark"
+    )
+
+    product_id, organization_id, user_id = create_hot_product(args.movements)
+    payload = payload_for(product_id)
+
+    def per_request() -> None:
+        with SessionLocal() as db:
+            movement_service.create_movement(
+                db, payload, organization_id=organization_id, created_by_user_id=user_id
+            )
+
+    print(f"{args.movements} saídas, {args.workers} threads, banco {SessionLocal.kw['bind'].url}")
+    run("commit por requisição", per_request, args.movements, args.workers)
+
+    product_id, organization_id, user_id = create_hot_product(args.movements)
+    payload = payload_for(product_id)
+    committer = MovementGroupCommitter(SessionLocal)
+    try:
+        run(
+            "group commit",
+            lambda: committer.submit(payload, organization_id, created_by_user_id=user_id),
+            args.movements,
+            args.workers,
+        )
+    finally:
+        committer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Importa o histórico de movimentações de um sistema legado (CSV ou NDJSON).
+
+As linhas são lidas em streaming e inseridas em blocos numa única transação;
+ao final, a quantidade de cada produto é acrescida do saldo líquido importado
+e os rollups diários e os snapshots de estoque do período são recalculados.
+Se a importação falhar, nada é gravado e o arquivo pode ser reimportado.
+
+Colunas: product_id ou sku, type (entrada/saida), quantity, created_at
+(ISO 8601), reason e note opcionais.
+
+Uso:
+    python scripts/import_movements.py --organization-id 1 historico.csv
+    python scripts/import_movements.py --organization-id 1 --user-id 3 historico.ndjson
+    python scripts/import_movements.py --organization-id 1 --format ndjson --chunk-size 50000 dump.txt
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+
+from app import constants
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.database import SessionLocal
+from app.exceptions import EstockaException
+from app.movements import movement_import
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Arquivo CSV ou NDJSON")
+    parser.add_argument("--organization-id", type=int, required=True, help="Organização de destino")
+    parser.add_argument("--user-id", type=int, default=None, help="Usuário registrado como autor")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None, help="Padrão: pela extensão")
+    parser.add_argument("--chunk-size", type=int, default=constants.MOVEMENT_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        try:
+            result = movement_import.import_movements(
+                db,
+                movement_import.read_file(args.path, args.format),
+                args.organization_id,
+                created_by_user_id=args.user_id,
+                chunk_size=args.chunk_size,
+            )
+        except EstockaException as exc:
+            print(f"❌ Importação cancelada: {exc.detail}")
+            sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ {result.rows} movimentações importadas ({result.first_day} a {result.last_day}) "
+        f"para {result.products} produtos em {elapsed:.2f}s - lote {result.batch_id}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Recalcula a tabela movement_daily_rollups a partir do histórico de movimentações.
+
+Use após backfills, importações ou correções manuais que alterem a tabela
+``movements`` sem passar pelo serviço de movimentações.
+
+Uso:
+    python scripts/rebuild_rollups.py                       # todas as organizações
+    python scripts/rebuild_rollups.py --organization-id 1 --start 2025-01-01 --end 2025-03-31
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from datetime import date
+
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.database import SessionLocal
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+from app.rollups import rollup_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organization-id", type=int, default=None, help="Apenas esta organização")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="Primeiro dia (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=None, help="Último dia (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        written = rollup_service.rebuild_rollups(
+            db, organization_id=args.organization_id, start_day=args.start, end_day=args.end
+        )
+    print(f"✅ {written} linhas de rollup recalculadas em {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Reconcilia o estoque dos produtos com o histórico de movimentações.
+
+Processa as movimentações novas desde o último checkpoint de cada
+organização, em blocos por id (uma transação curta por bloco), e lista os
+produtos cuja quantidade diverge do histórico. Pode ser agendado com
+frequência: execuções seguintes retomam do checkpoint.
+
+Uso:
+    python scripts/reconcile_stock.py
+    python scripts/reconcile_stock.py --organization-id 1 --repair
+    python scripts/reconcile_stock.py --workers 4 --chunk-size 10000
+    python scripts/reconcile_stock.py --full            # reprocessa desde a linha de base
+    python scripts/reconcile_stock.py --baseline        # confia nas quantidades atuais
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import constants
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.database import SessionLocal
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+from app.reconciliation import reconciliation_repository, reconciliation_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--organization-id", type=int, default=None, help="Apenas esta organização")
+    parser.add_argument("--repair", action="store_true", help="Corrige as quantidades divergentes")
+    parser.add_argument("--full", action="store_true", help="Reprocessa o histórico desde a linha de base")
+    parser.add_argument(
+        "--baseline",
+        action="store_true",
+        help="Aceita as quantidades atuais como corretas e move o checkpoint para a última movimentação",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Organizações processadas em paralelo")
+    parser.add_argument("--chunk-size", type=int, default=constants.RECONCILIATION_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.organization_id is not None:
+        organization_ids = [args.organization_id]
+    else:
+        with SessionLocal() as db:
+            organization_ids = reconciliation_repository.list_organization_ids(db)
+
+    def run(organization_id: int):
+        with SessionLocal() as db:
+            if args.baseline:
+                return organization_id, reconciliation_service.establish_baseline(db, organization_id)
+            return organization_id, reconciliation_service.reconcile_organization(
+                db,
+                organization_id,
+                repair=args.repair,
+                full=args.full,
+                chunk_size=args.chunk_size,
+            )
+
+    started = time.perf_counter()
+    drifted = 0
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+        for organization_id, result in pool.map(run, organization_ids):
+            if args.baseline:
+                print(f"📌 Organização {organization_id}: linha de base com {result} produtos")
+                continue
+            print(
+                f"🔎 Organização {organization_id}: {result.movements_scanned} movimentações "
+                f"(ids {result.from_movement_id}→{result.to_movement_id}, {result.chunks} blocos), "
+                f"{len(result.drift)} divergências"
+            )
+            for item in result.drift:
+                status = "corrigido" if item.repaired else "divergente"
+                print(
+                    f"   {item.sku}: registrado {item.recorded_quantity}, "
+                    f"esperado {item.expected_quantity} ({status})"
+                )
+            drifted += sum(1 for item in result.drift if not item.repaired)
+    print(f"✅ Concluído em {time.perf_counter() - started:.2f}s")
+    sys.exit(1 if drifted else 0)
+
+
+if __name__ == "__main__":
+    main()
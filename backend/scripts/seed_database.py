@@ -24,6 +24,18 @@ from app.movements.movement_model import Movement, MovementType
 from app.users.user_model import User
 from app.roles.role_model import Role
 from app.audit.audit_model import AuditLog  # ensure mapper is loaded
+from app.idempotency.idempotency_model import IdempotencyKey  # ensure table is created
+from app.rollups import rollup_service
+from app.rollups.rollup_model import MovementDailyRollup
+from app.inventory.inventory_model import InventorySnapshot
+from app.reconciliation import reconciliation_service
+from app.reconciliation.reconciliation_model import ReconciliationCheckpoint, StockLedgerBalance
+from app.archive.archive_model import MovementArchive, MovementArchiveSegment
+from app.stocktakes.stocktake_model import Stocktake, StocktakeLine
+from app.reports.report_cache_model import ReportCacheEntry
+from app.reports.report_job_model import ReportJob
+from app.reports.report_precompute_model import PrecomputedReport
+from app.scheduler.scheduler_model import SchedulerLease
 from app.security import get_password_hash
 
 # Configuration
@@ -176,6 +188,18 @@ PRODUCT_TEMPLATES = {
 def clean_database(session):
     """Remove all data from database"""
     print("🧹 Limpando banco de dados...")
+    session.query(ReportCacheEntry).delete()
+    session.query(ReportJob).delete()
+    session.query(PrecomputedReport).delete()
+    session.query(SchedulerLease).delete()
+    session.query(StocktakeLine).delete()
+    session.query(Stocktake).delete()
+    session.query(InventorySnapshot).delete()
+    session.query(StockLedgerBalance).delete()
+    session.query(ReconciliationCheckpoint).delete()
+    session.query(MovementDailyRollup).delete()
+    session.query(MovementArchiveSegment).delete()
+    session.query(MovementArchive).delete()
     session.query(Movement).delete()
     session.query(Product).delete()
     session.query(Category).delete()
@@ -474,6 +498,11 @@ def seed_database(level='medium', clean=False):
         # Create movement history
         create_movements(session, products, admin_user, level_config, org_id)
         
+        # Movements above bypass the service layer; derive their daily rollups
+        rollup_service.rebuild_rollups(session, organization_id=org_id)
+        # Seeded quantities are not derived from the seeded history; trust them
+        reconciliation_service.establish_baseline(session, org_id)
+        
         print("\n✨ Seed concluído com sucesso!")
         print(f"   📁 Categorias: {len(categories)}")
         print(f"   📦 Produtos: {len(products)}")
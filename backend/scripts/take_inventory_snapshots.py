@@ -0,0 +1,50 @@
+"""Registra o estoque de fechamento diário (inventory_snapshots).
+
+Agende para rodar logo após a meia-noite UTC; sem argumentos, registra o
+fechamento de ontem para todas as organizações. ``--days N`` preenche os
+N dias anteriores (backfill), reconstruindo as quantidades a partir dos
+rollups de movimentações.
+
+Uso:
+    python scripts/take_inventory_snapshots.py
+    python scripts/take_inventory_snapshots.py --day 2025-03-31 --organization-id 1
+    python scripts/take_inventory_snapshots.py --days 90
+"""
+
+from __future__ import annotations
+
+import sys
+import os
+# Adiciona o diretório pai (backend) ao sys.path para encontrar o módulo 'app'
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from app.audit.audit_model import AuditLog  # noqa: F401 ensure mapper is loaded
+from app.database import SessionLocal
+from app.inventory import inventory_service
+from app.organizations.organization_model import Organization  # noqa: F401 ensure mapper is loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="Dia do fechamento (YYYY-MM-DD)")
+    parser.add_argument("--days", type=int, default=1, help="Quantidade de dias até --day (backfill)")
+    parser.add_argument("--organization-id", type=int, default=None, help="Apenas esta organização")
+    args = parser.parse_args()
+
+    last_day = args.day or datetime.utcnow().date() - timedelta(days=1)
+    started = time.perf_counter()
+    written = 0
+    with SessionLocal() as db:
+        for offset in range(args.days):
+            written += inventory_service.take_snapshots(
+                db, day=last_day - timedelta(days=offset), organization_id=args.organization_id
+            )
+    print(f"✅ {written} posições de estoque registradas em {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
 """
 Fixtures globais para os testes.
 """
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.categories.category_model import Category
+from app.database import SessionLocal
 from app.main import app
+from app.products.product_model import Product
+from app.users.user_model import User
 
 
 @pytest.fixture(scope="session")
@@ -44,3 +52,68 @@ def sample_product_data():
         "alert_level": 5,
         "category_id": 1
     }
+
+
+@pytest.fixture
+def db():
+    """Sessão direta com o banco, fechada ao final do teste."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin(db):
+    """Usuário admin semeado (o teste é pulado se o banco não foi semeado)."""
+    user = db.scalar(select(User).where(User.email == "admin@estoque.com"))
+    if user is None:
+        pytest.skip("Banco sem usuário admin semeado")
+    return user
+
+
+@pytest.fixture
+def organization_id(admin):
+    """Organização do admin semeado."""
+    return admin.organization_id
+
+
+@pytest.fixture
+def make_product(db, admin):
+    """
+    Fábrica de produtos na organização do admin, em uma categoria semeada.
+
+    Os campos passados substituem os padrões. O produto recebe flush, e o
+    commit fica a cargo do teste; no final, os produtos criados são
+    desativados para não aparecerem nos testes seguintes.
+    """
+    category_id = db.scalar(select(Category.id).where(Category.organization_id == admin.organization_id))
+    if category_id is None:
+        pytest.skip("Organização sem categorias")
+
+    def make(*, sku_prefix="PRD", **fields):
+        product = Product(**{
+            "name": "Produto Teste",
+            "sku": f"{sku_prefix}-{uuid.uuid4().hex[:8].upper()}",
+            "price": 10,
+            "cost_price": 5,
+            "quantity": 0,
+            "alert_level": 0,
+            "category_id": category_id,
+            "organization_id": admin.organization_id,
+            **fields,
+        })
+        db.add(product)
+        db.flush()
+        created.append(product.id)
+        return product
+
+    created = []
+    yield make
+
+    # Movements keep referencing the products, so they are soft-deleted rather than removed.
+    db.rollback()
+    if created:
+        db.execute(update(Product).where(Product.id.in_(created)).values(is_deleted=True))
+        db.commit()
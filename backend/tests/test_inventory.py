@@ -0,0 +1,194 @@
+"""
+Testes de snapshots de estoque e da consulta de estoque em uma data (as-of).
+
+O histórico vem de produtos próprios, importados pelo importador; os
+snapshots tirados pelos testes são apagados no final.
+"""
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.database import SessionLocal
+from app.inventory import inventory_repository, inventory_service
+from app.inventory.inventory_model import InventorySnapshot
+from app.movements import movement_import, movement_service
+from app.movements.movement_model import MovementCreate, MovementType
+from app.rollups import rollup_service
+
+
+@pytest.fixture
+def stock_history(db, admin, make_product):
+    """
+    Dois produtos com movimentações ao meio-dia dos últimos seis dias.
+
+    Devolve a função que calcula o fechamento de cada produto em um dia a
+    partir dos próprios registros importados.
+    """
+    first, second = make_product(sku_prefix="INV"), make_product(sku_prefix="INV")
+    db.commit()
+    today = datetime.utcnow().date()
+    plan = [
+        (first.id, 6, "entrada", 20),
+        (second.id, 5, "entrada", 7),
+        (first.id, 4, "saida", 5),
+        (second.id, 3, "saida", 2),
+        (first.id, 2, "saida", 3),
+        (first.id, 1, "entrada", 4),
+    ]
+    records = [
+        {
+            "product_id": product_id,
+            "type": movement_type,
+            "quantity": quantity,
+            "created_at": datetime.combine(today - timedelta(days=days_ago), time(12)),
+        }
+        for product_id, days_ago, movement_type, quantity in plan
+    ]
+    movement_import.import_movements(db, records, admin.organization_id, created_by_user_id=admin.id)
+    db.commit()
+
+    def closing(day):
+        stock = {first.id: 0, second.id: 0}
+        for record in records:
+            if record["created_at"].date() <= day:
+                sign = 1 if record["type"] == "entrada" else -1
+                stock[record["product_id"]] += sign * record["quantity"]
+        return stock
+
+    return closing
+
+
+@pytest.fixture
+def snapshot(db, organization_id):
+    """Tira o snapshot de um dia da organização do admin, apagando-o ao final do teste."""
+    days = []
+
+    def take(day):
+        days.append(day)
+        return inventory_service.take_snapshots(db, day=day, organization_id=organization_id)
+
+    yield take
+
+    db.rollback()
+    if days:
+        db.execute(
+            delete(InventorySnapshot).where(
+                InventorySnapshot.organization_id == organization_id, InventorySnapshot.day.in_(days)
+            )
+        )
+        db.commit()
+
+
+def own_items(body, closing):
+    """Quantidades da resposta restritas aos produtos do teste."""
+    own = closing(datetime.utcnow().date()).keys()
+    return {item["product_id"]: item["quantity"] for item in body["items"] if item["product_id"] in own}
+
+
+class TestInventoryAsOf:
+    """Testes do endpoint /inventory/as-of."""
+
+    def test_as_of_today_matches_current_stock(self, client, auth_headers, stock_history):
+        """O fechamento de hoje deve ser o estoque atual."""
+        today = datetime.utcnow().date()
+        response = client.get(f"/inventory/as-of?date={today.isoformat()}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert own_items(response.json(), stock_history) == stock_history(today)
+
+    def test_as_of_past_day_matches_ledger(self, client, auth_headers, stock_history):
+        """Sem snapshot, o fechamento passado deve bater com o histórico desfeito."""
+        day = datetime.utcnow().date() - timedelta(days=3)
+        response = client.get(f"/inventory/as-of?date={day.isoformat()}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert own_items(response.json(), stock_history) == stock_history(day)
+
+    def test_as_of_rolls_snapshot_forward(self, client, auth_headers, stock_history, snapshot):
+        """Com snapshot próximo, o resultado deve partir dele e continuar correto."""
+        day = datetime.utcnow().date() - timedelta(days=3)
+        snapshot(day - timedelta(days=1))
+
+        response = client.get(f"/inventory/as-of?date={day.isoformat()}", headers=auth_headers)
+
+        body = response.json()
+        assert body["source"] == "snapshot"
+        assert body["snapshot_day"] == (day - timedelta(days=1)).isoformat()
+        assert own_items(body, stock_history) == stock_history(day)
+
+    def test_movement_committed_mid_read_is_not_half_counted(
+        self, client, auth_headers, db, admin, stock_history, monkeypatch
+    ):
+        """Uma movimentação confirmada entre a leitura do estoque e a das variações não entra só de um lado."""
+        if db.get_bind().dialect.name != "postgresql":
+            pytest.skip("Leitura em snapshot único apenas no PostgreSQL")
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        product_id = next(iter(stock_history(yesterday)))
+        net_change_since = rollup_service.net_change_since_by_product
+
+        def commit_movement_first(*args, **kwargs):
+            with SessionLocal() as other:
+                movement_service.create_movement(
+                    other,
+                    MovementCreate(product_id=product_id, type=MovementType.ENTRADA, quantity=5),
+                    admin.organization_id,
+                )
+            return net_change_since(*args, **kwargs)
+
+        monkeypatch.setattr(rollup_service, "net_change_since_by_product", commit_movement_first)
+        response = client.get(f"/inventory/as-of?date={yesterday.isoformat()}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert own_items(response.json(), stock_history) == stock_history(yesterday)
+
+
+class TestSnapshotTask:
+    """A tarefa diária registra o fechamento de ontem."""
+
+    def test_task_snapshots_yesterday(self, db, organization_id, stock_history, snapshot, monkeypatch):
+        """A tarefa agendada grava o fechamento de ontem de cada organização e renova a concessão."""
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        monkeypatch.setattr(inventory_repository, "list_organization_ids", lambda db: [organization_id])
+        renewals = []
+
+        snapshot(yesterday)  # Registers the day for cleanup; the task replaces it.
+        inventory_service.SNAPSHOT_TASK.run(db, lambda: renewals.append(True))
+
+        rows = {
+            row.product_id: row.quantity
+            for row in inventory_repository.get_snapshot(db, organization_id, yesterday)
+        }
+        assert {product_id: rows[product_id] for product_id in stock_history(yesterday)} == stock_history(yesterday)
+        assert renewals == [True]
+
+
+class TestAverageInventory:
+    """Estoque médio deve ser a média dos fechamentos diários do período."""
+
+    def test_average_matches_daily_closings(self, db, organization_id, stock_history, snapshot):
+        """Média com dias cobertos e não cobertos por snapshot deve bater com os fechamentos."""
+        today = datetime.utcnow().date()
+        days = [today - timedelta(days=offset) for offset in range(4)]
+        snapshot(days[2])
+
+        averages = inventory_service.average_inventory(db, organization_id, days[-1], today)
+
+        closings = [stock_history(day) for day in days]
+        for product_id in closings[0]:
+            expected = sum(closing[product_id] for closing in closings) / len(days)
+            assert averages[product_id].quantity == pytest.approx(expected)
+
+    def test_average_with_several_gaps_matches_daily_closings(self, db, organization_id, stock_history, snapshot):
+        """Com vários intervalos sem snapshot, a média reconstruída pelas rollups deve bater com os fechamentos."""
+        today = datetime.utcnow().date()
+        days = [today - timedelta(days=offset) for offset in range(7)]
+        snapshot(days[3])
+        snapshot(days[5])
+
+        averages = inventory_service.average_inventory(db, organization_id, days[-1], today)
+
+        closings = [stock_history(day) for day in days]
+        for product_id in closings[0]:
+            expected = sum(closing[product_id] for closing in closings) / len(days)
+            assert averages[product_id].quantity == pytest.approx(expected)
@@ -0,0 +1,270 @@
+"""
+Testes do arquivamento do histórico de movimentações (tabela de arquivo e segmentos zstd).
+
+Cada teste arquiva apenas uma organização descartável, criada pelo signup, e
+monta o histórico pelo importador, de modo que estoque, rollups e
+reconciliação fiquem consistentes e o histórico semeado não seja tocado.
+"""
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.archive import archive_repository, archive_service, archive_storage
+from app.archive.archive_model import MovementArchive, MovementArchiveSegment
+from app.auth import auth_service
+from app.categories.category_model import Category
+from app.config import get_settings
+from app.database import SessionLocal
+from app.exceptions import ValidationException
+from app.movements import movement_import, movement_service
+from app.movements.movement_model import Movement, MovementFilter, MovementType
+from app.organizations.organization_model import Organization
+from app.products.product_model import Product
+from app.reconciliation import reconciliation_repository, reconciliation_service
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "movement_archive_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def scratch_user(db):
+    """Admin de uma organização descartável, com o token de acesso."""
+    suffix = uuid.uuid4().hex[:8]
+    user, organization, token = auth_service.signup_new_organization(
+        db, f"Arquivo {suffix}", "Admin Arquivo", f"arquivo-{suffix}@estoque.com", "senha-arquivo"
+    )
+    yield user, token
+
+    # The segment files live in a temporary directory, so their registrations go too.
+    db.rollback()
+    db.execute(delete(MovementArchiveSegment).where(MovementArchiveSegment.organization_id == organization.id))
+    db.execute(update(Organization).where(Organization.id == organization.id).values(active=False))
+    db.commit()
+
+
+@pytest.fixture
+def old_history(db, archive_dir, scratch_user):
+    """Produto com movimentações de 14 meses (frio), 5 meses (fechado) e 3 dias atrás (quente)."""
+    user, _ = scratch_user
+    category_id = db.scalar(select(Category.id).where(Category.organization_id == user.organization_id))
+    product = Product(
+        name="Produto Arquivo",
+        sku=f"ARQ-{uuid.uuid4().hex[:8].upper()}",
+        price=10,
+        cost_price=5,
+        quantity=0,
+        alert_level=0,
+        category_id=category_id,
+        organization_id=user.organization_id,
+    )
+    db.add(product)
+    db.commit()
+    product_id, organization_id = product.id, user.organization_id
+
+    this_month = archive_service.month_start(datetime.utcnow().date())
+    cold = datetime.combine(archive_service.add_months(this_month, -14), datetime.min.time()) + timedelta(days=3)
+    closed = datetime.combine(archive_service.add_months(this_month, -5), datetime.min.time()) + timedelta(days=9)
+    hot = datetime.utcnow().replace(microsecond=0) - timedelta(days=3)
+    records = [
+        {
+            "product_id": product_id,
+            "type": movement_type.value,
+            "quantity": quantity,
+            "created_at": base + timedelta(hours=hour),
+        }
+        for base in (cold, closed, hot)
+        for hour, (movement_type, quantity) in enumerate(
+            [(MovementType.ENTRADA, 10), (MovementType.SAIDA, 4), (MovementType.SAIDA, 1)]
+        )
+    ]
+    movement_import.import_movements(db, records, organization_id, created_by_user_id=user.id)
+    db.commit()
+    # The archival job refuses to move movements the reconciliation has not covered yet.
+    reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+
+    created_at = sorted((record["created_at"] for record in records), reverse=True)
+    return product_id, organization_id, created_at, cold
+
+
+def _listing(db, organization_id, filters, *, limit):
+    """Percorre a listagem filtrada inteira pelo cursor."""
+    seen, cursor = [], None
+    while True:
+        page, cursor = movement_service.filter_movements(db, organization_id, filters, limit=limit, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            return seen
+
+
+class TestMovementArchive:
+    """Testes das camadas quente, fechada e fria do histórico (sem particionamento)."""
+
+    @pytest.fixture(autouse=True)
+    def _fallback_only(self, db):
+        if archive_repository.is_partitioned(db):
+            pytest.skip("Teste do fallback sem particionamento")
+
+    def test_archival_moves_months_out_of_hot_table(self, db, old_history):
+        """Meses fechados vão para movements_archive e os antigos para segmentos zstd."""
+        product_id, organization_id, _, cold = old_history
+
+        assert archive_service.rotate_closed_months(db, organization_id=organization_id) == 6
+        in_table = db.scalars(select(Movement.created_at).where(Movement.product_id == product_id)).all()
+        assert len(in_table) == 3
+        assert all(created_at >= archive_service.hot_horizon() for created_at in in_table)
+
+        [segment] = archive_service.archive_cold_months(db, organization_id=organization_id)
+        assert segment["organization_id"] == organization_id
+        assert segment["month"] == archive_service.month_start(cold.date())
+        assert segment["row_count"] == 3
+        rows = list(archive_storage.read_segment(segment["path"]))
+        assert [row["quantity"] for row in rows] == [10, 4, 1]
+
+        remaining = db.scalars(select(MovementArchive.created_at).where(MovementArchive.product_id == product_id)).all()
+        assert len(remaining) == 3
+        assert all(created_at >= archive_service.cold_horizon() for created_at in remaining)
+        assert archive_service.ledger_start(db, organization_id) > cold.date()
+
+    def test_archival_is_scoped_to_the_organization(self, db, old_history, organization_id):
+        """Arquivar uma organização não move o histórico das demais."""
+        _, scratch_organization_id, _, _ = old_history
+        before = archive_service.ledger_start(db, organization_id)
+
+        archive_service.rotate_closed_months(db, organization_id=scratch_organization_id)
+        archive_service.archive_cold_months(db, organization_id=scratch_organization_id)
+
+        assert archive_service.ledger_start(db, organization_id) == before
+
+    def test_filter_reads_archived_ranges_transparently(self, db, old_history):
+        """A listagem filtrada pagina pelas três camadas na mesma ordem e com cursor."""
+        product_id, organization_id, created_at, cold = old_history
+        archive_service.rotate_closed_months(db, organization_id=organization_id)
+        archive_service.archive_cold_months(db, organization_id=organization_id)
+
+        filters = MovementFilter(product_id=product_id, start_date=cold - timedelta(days=1))
+        seen = _listing(db, organization_id, filters, limit=2)
+
+        assert [movement.created_at for movement in seen] == created_at
+        assert all(movement.product.id == product_id for movement in seen)
+        summaries = movement_service.serialize_movements(seen)
+        assert summaries[-1].product.sku.startswith("ARQ-")
+
+        offset_page, _ = movement_service.filter_movements(db, organization_id, filters, limit=2, offset=4)
+        assert [movement.created_at for movement in offset_page] == created_at[4:6]
+
+    def test_hot_queries_skip_archived_tiers(self, db, old_history, monkeypatch):
+        """Consultas dentro dos meses recentes nunca leem as camadas arquivadas."""
+        _, organization_id, created_at, _ = old_history
+        archive_service.rotate_closed_months(db, organization_id=organization_id)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("camada arquivada consultada")
+
+        monkeypatch.setattr(archive_service, "read_archived", fail)
+        recent = MovementFilter(start_date=archive_service.hot_horizon())
+        page, _ = movement_service.filter_movements(db, organization_id, recent, limit=5)
+        assert [movement.created_at for movement in page] == created_at[:3]
+
+    def test_api_filter_includes_archived_rows(self, client, db, old_history, scratch_user):
+        """O endpoint /movements/filter devolve movimentações arquivadas sem mudança de contrato."""
+        product_id, organization_id, created_at, cold = old_history
+        _, token = scratch_user
+        archive_service.rotate_closed_months(db, organization_id=organization_id)
+        archive_service.archive_cold_months(db, organization_id=organization_id)
+
+        response = client.get(
+            "/movements/filter",
+            headers={"Authorization": f"Bearer {token}"},
+            params={"product_id": product_id, "start_date": (cold - timedelta(days=1)).isoformat(), "expand": True},
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body) == len(created_at)
+        assert body[-1]["product"]["id"] == product_id
+        assert body[-1]["product"]["category"]
+
+
+class TestPartitionedArchive:
+    """Testes do arquivamento com movements particionada por mês (PostgreSQL)."""
+
+    @pytest.fixture(autouse=True)
+    def _partitioned_only(self, db):
+        if not archive_repository.is_partitioned(db):
+            pytest.skip("Requer a tabela movements particionada (PostgreSQL)")
+
+    def test_cold_month_leaves_its_partition(self, db, old_history):
+        """O mês frio da organização vai para um segmento e sai da partição, que segue com as demais."""
+        product_id, organization_id, created_at, cold = old_history
+        month = archive_service.month_start(cold.date())
+        start = datetime.combine(month, datetime.min.time())
+        end = datetime.combine(archive_service.add_months(month, 1), datetime.min.time())
+
+        assert archive_service.rotate_closed_months(db, organization_id=organization_id) == 0
+        assert month in archive_repository.list_partitions(db)
+        [segment] = archive_service.archive_cold_months(db, organization_id=organization_id)
+
+        assert segment["month"] == month
+        assert segment["row_count"] == 3
+        assert archive_repository.max_id_in_range(db, Movement, organization_id, start, end) is None
+        assert month in archive_repository.list_partitions(db)
+        assert archive_service.ledger_start(db, organization_id) > cold.date()
+
+        filters = MovementFilter(product_id=product_id, start_date=cold - timedelta(days=1))
+        seen = _listing(db, organization_id, filters, limit=2)
+        assert [movement.created_at for movement in seen] == created_at
+
+
+class TestArchiveConcurrency:
+    """Importação e arquivamento da mesma organização não se sobrepõem."""
+
+    def test_import_waits_for_archival_and_refuses_its_months(self, db, old_history, monkeypatch):
+        """Uma importação aberta durante o arquivamento espera por ele e recusa o mês arquivado."""
+        product_id, organization_id, _, cold = old_history
+        # Both jobs start with the cold month, which is the one paused below.
+        if archive_repository.is_partitioned(db):
+            archive = archive_service.archive_cold_months
+        else:
+            archive = archive_service.rotate_closed_months
+
+        locked, resume = threading.Event(), threading.Event()
+        add_to_opening = reconciliation_repository.add_to_opening
+
+        def pause_while_locked(*args, **kwargs):
+            add_to_opening(*args, **kwargs)
+            locked.set()
+            resume.wait(10)
+
+        monkeypatch.setattr(reconciliation_repository, "add_to_opening", pause_while_locked)
+        errors = []
+
+        def run_archive():
+            with SessionLocal() as session:
+                archive(session, organization_id=organization_id)
+
+        def run_import():
+            record = {"product_id": product_id, "type": "entrada", "quantity": 5, "created_at": cold}
+            with SessionLocal() as session:
+                try:
+                    movement_import.import_movements(session, [record], organization_id)
+                except ValidationException as exc:
+                    errors.append(exc.detail)
+
+        archiver = threading.Thread(target=run_archive)
+        archiver.start()
+        assert locked.wait(10)
+        importer = threading.Thread(target=run_import)
+        importer.start()
+        importer.join(0.5)
+        assert importer.is_alive(), "a importação não esperou o arquivamento"
+
+        resume.set()
+        archiver.join(10)
+        importer.join(10)
+        assert len(errors) == 1
+        assert "mês já arquivado" in errors[0]
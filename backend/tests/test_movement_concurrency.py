@@ -0,0 +1,114 @@
+"""
+Testes de concorrência: saídas simultâneas no mesmo SKU não podem gerar estoque negativo.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.exceptions import InsufficientStockException, MovementStillProcessingException
+from app.movements import movement_service
+from app.movements.movement_model import Movement, MovementCreate, MovementType
+from app.movements.movement_group_commit import MovementGroupCommitter
+from app.products.product_model import Product
+
+INITIAL_STOCK = 1500
+ATTEMPTS = 2000
+WORKERS = 16
+MIN_THROUGHPUT = 50  # movimentações/s, limite conservador para CI
+
+
+@pytest.fixture
+def hot_product(db, admin, make_product):
+    """Produto com estoque conhecido na organização do admin."""
+    product = make_product(name="Produto Concorrência", sku_prefix="HOT", quantity=INITIAL_STOCK)
+    db.commit()
+    return product.id, admin.organization_id, admin.id
+
+
+def test_concurrent_saidas_never_oversell(hot_product):
+    """Milhares de saídas concorrentes devem debitar exatamente o estoque disponível."""
+    product_id, organization_id, user_id = hot_product
+    payload = MovementCreate(product_id=product_id, type=MovementType.SAIDA, quantity=1, reason="Venda")
+
+    def sell(_):
+        with SessionLocal() as db:
+            try:
+                movement_service.create_movement(
+                    db, payload, organization_id=organization_id, created_by_user_id=user_id
+                )
+                return True
+            except InsufficientStockException:
+                return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(sell, range(ATTEMPTS)))
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        final_quantity = db.scalar(select(Product.quantity).where(Product.id == product_id))
+        movement_count = db.scalar(select(func.count(Movement.id)).where(Movement.product_id == product_id))
+
+    assert sum(results) == INITIAL_STOCK
+    assert results.count(False) == ATTEMPTS - INITIAL_STOCK
+    assert final_quantity == 0
+    assert movement_count == INITIAL_STOCK
+    assert ATTEMPTS / elapsed >= MIN_THROUGHPUT, f"{ATTEMPTS / elapsed:.0f} mov/s"
+
+
+def test_group_commit_never_oversells(hot_product):
+    """No modo group commit, cada requisição recebe seu próprio resultado sem vender além do estoque."""
+    product_id, organization_id, user_id = hot_product
+    payload = MovementCreate(product_id=product_id, type=MovementType.SAIDA, quantity=1, reason="Venda")
+    committer = MovementGroupCommitter(SessionLocal)
+
+    def sell(_):
+        try:
+            committer.submit(payload, organization_id, created_by_user_id=user_id)
+            return True
+        except InsufficientStockException:
+            return False
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS * 4) as pool:
+            results = list(pool.map(sell, range(ATTEMPTS)))
+    finally:
+        committer.shutdown()
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        final_quantity = db.scalar(select(Product.quantity).where(Product.id == product_id))
+        movement_count = db.scalar(select(func.count(Movement.id)).where(Movement.product_id == product_id))
+
+    assert sum(results) == INITIAL_STOCK
+    assert final_quantity == 0
+    assert movement_count == INITIAL_STOCK
+    assert ATTEMPTS / elapsed >= MIN_THROUGHPUT, f"{ATTEMPTS / elapsed:.0f} mov/s"
+
+
+def test_group_commit_timeout_does_not_cancel_the_write(hot_product):
+    """Esgotado o prazo de espera, a requisição recebe 503 e a movimentação ainda é gravada."""
+    product_id, organization_id, user_id = hot_product
+    payload = MovementCreate(product_id=product_id, type=MovementType.SAIDA, quantity=1, reason="Venda")
+    release = threading.Event()
+
+    def slow_session():
+        release.wait()
+        return SessionLocal()
+
+    committer = MovementGroupCommitter(slow_session)
+    try:
+        with pytest.raises(MovementStillProcessingException) as error:
+            committer.submit(payload, organization_id, created_by_user_id=user_id, timeout=0.05)
+        assert error.value.status_code == 503
+    finally:
+        release.set()
+        committer.shutdown()
+
+    with SessionLocal() as db:
+        assert db.scalar(select(Product.quantity).where(Product.id == product_id)) == INITIAL_STOCK - 1
@@ -0,0 +1,86 @@
+"""
+Testes da importação em massa do histórico de movimentações.
+"""
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.movements import movement_import
+from app.movements.movement_model import Movement
+from app.reconciliation import reconciliation_service
+from app.rollups.rollup_model import MovementDailyRollup
+
+
+@pytest.fixture
+def empty_product(db, admin, make_product):
+    """Produto novo, sem estoque nem histórico, de uma organização semeada."""
+    product = make_product(name="Produto Importado", sku_prefix="IMP")
+    db.commit()
+    return product, admin
+
+
+class TestMovementImport:
+    """Testes do pipeline de importação (CSV/NDJSON)."""
+
+    def test_csv_import_recomputes_stock_and_rollups(self, db, empty_product):
+        """Importar um CSV insere em blocos, soma o líquido ao estoque e recalcula os rollups."""
+        product, admin = empty_product
+        day = datetime.utcnow().replace(microsecond=0) - timedelta(days=20)
+        lines = ["sku,type,quantity,created_at,reason"]
+        for offset in range(5):
+            lines.append(f"{product.sku},entrada,10,{(day + timedelta(days=offset)).isoformat()},Compra")
+            lines.append(f"{product.sku},saida,3,{(day + timedelta(days=offset, hours=2)).isoformat()},")
+
+        result = movement_import.import_movements(
+            db,
+            movement_import.read_csv(io.StringIO("\n".join(lines))),
+            admin.organization_id,
+            created_by_user_id=admin.id,
+            chunk_size=3,
+        )
+
+        assert result.rows == 10
+        assert result.products == 1
+        assert result.first_day == day.date()
+        db.refresh(product)
+        assert product.quantity == 35
+        rollup_total = db.scalar(
+            select(func.sum(MovementDailyRollup.total_qty)).where(MovementDailyRollup.product_id == product.id)
+        )
+        assert rollup_total == 65
+        report = reconciliation_service.reconcile_organization(db, admin.organization_id, safety_lag=0)
+        assert product.id not in {drift.product_id for drift in report.drift}
+
+    def test_ndjson_import_is_all_or_nothing(self, db, empty_product):
+        """Uma linha inválida cancela a importação inteira."""
+        product, admin = empty_product
+        created_at = (datetime.utcnow() - timedelta(days=3)).isoformat()
+        records = [
+            {"product_id": product.id, "type": "entrada", "quantity": 5, "created_at": created_at},
+            {"product_id": product.id, "type": "devolucao", "quantity": 1, "created_at": created_at},
+        ]
+        stream = io.StringIO("\n".join(json.dumps(record) for record in records))
+
+        with pytest.raises(HTTPException) as exc:
+            movement_import.import_movements(db, movement_import.read_ndjson(stream), admin.organization_id)
+
+        assert "Linha 2" in exc.value.detail
+        db.rollback()
+        assert db.scalar(select(func.count(Movement.id)).where(Movement.product_id == product.id)) == 0
+
+    def test_history_cannot_end_negative(self, db, empty_product):
+        """Um histórico que termina com estoque negativo é rejeitado."""
+        product, admin = empty_product
+        created_at = (datetime.utcnow() - timedelta(days=1)).isoformat()
+        records = [{"sku": product.sku, "type": "saida", "quantity": 2, "created_at": created_at}]
+
+        with pytest.raises(HTTPException):
+            movement_import.import_movements(db, records, admin.organization_id)
+
+        db.rollback()
+        db.refresh(product)
+        assert product.quantity == 0
@@ -0,0 +1,82 @@
+"""
+Testes de plano de execução: consultas analíticas devem usar os índices compostos de movimentações.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from app.dashboard.dashboard_service import DashboardService
+from app.database import engine
+from app.reports import report_service
+
+ANALYTICS_INDEXES = (
+    "ix_movements_org_type_created_at",
+    "ix_movements_org_product_created_at",
+)
+
+
+@contextmanager
+def capture_movement_queries():
+    """Capture every time-window SELECT on movements executed inside the block."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if (
+            statement.lstrip().upper().startswith("SELECT")
+            and "FROM movements" in statement
+            and "movements.created_at >=" in statement
+        ):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(statement, parameters) -> str:
+    """Return the textual plan of a captured statement for the current dialect."""
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+        cursor = raw.cursor()
+        try:
+            if engine.dialect.name == "postgresql":
+                cursor.execute("SET enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {statement}", parameters)
+            else:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            return "\n".join(str(row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+            if engine.dialect.name == "postgresql":
+                raw.rollback()
+
+
+@pytest.mark.parametrize(
+    "run",
+    [
+        pytest.param(lambda db, org: report_service.get_abc_analysis(db, org), id="abc"),
+        # Weekly XYZ windows are day-aligned; a mid-day end forces a partial-day edge query.
+        pytest.param(
+            lambda db, org: report_service.get_xyz_analysis(db, org, end_date=datetime.utcnow()), id="xyz"
+        ),
+        pytest.param(lambda db, org: report_service.get_stock_turnover(db, org), id="turnover"),
+        pytest.param(lambda db, org: report_service.get_forecast_report(db, org), id="forecast"),
+        pytest.param(lambda db, org: DashboardService.get_sales_trend(db, org, 30), id="sales-trend"),
+    ],
+)
+def test_analytics_queries_use_composite_indexes(db, organization_id, run):
+    """Cada consulta de janela temporal sobre movimentações deve usar um índice composto."""
+    if organization_id is None:
+        pytest.skip("Banco sem usuário admin semeado")
+
+    with capture_movement_queries() as captured:
+        run(db, organization_id)
+
+    assert captured, "Nenhuma consulta sobre movimentações foi executada"
+    for statement, parameters in captured:
+        plan = explain(statement, parameters)
+        assert any(index in plan for index in ANALYTICS_INDEXES), plan
@@ -1,7 +1,18 @@
 """
 Testes de movimentações de estoque.
 """
+import uuid
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import select, update
+
+from app import constants
+from app.audit.audit_model import AuditLog
+from app.database import SessionLocal
+from app.idempotency import idempotency_repository, idempotency_service
+from app.idempotency.idempotency_model import IdempotencyKey
+from app.movements.movement_model import MovementCreate
 
 
 class TestMovementCreate:
@@ -100,3 +111,293 @@ class TestMovementList:
         movements = response.json()
         assert isinstance(movements, list)
         assert len(movements) <= 5
+
+    def test_list_movements_compact_by_default(self, client, auth_headers):
+        """Listagem padrão deve retornar referências compactas de produto e usuário."""
+        response = client.get("/movements/recent?limit=5", headers=auth_headers)
+
+        assert response.status_code == 200
+        for movement in response.json():
+            assert set(movement["product"]) == {"id", "name", "sku"}
+            if movement["created_by"] is not None:
+                assert set(movement["created_by"]) == {"id", "full_name"}
+
+    def test_list_movements_expanded(self, client, auth_headers):
+        """Com expand=true a listagem deve manter o formato completo."""
+        response = client.get("/movements/recent?limit=5&expand=true", headers=auth_headers)
+
+        assert response.status_code == 200
+        for movement in response.json():
+            assert "category" in movement["product"]
+            if movement["created_by"] is not None:
+                assert "role" in movement["created_by"]
+
+
+class TestMovementPagination:
+    """Testes de paginação por cursor das movimentações."""
+
+    def test_keyset_pages_do_not_overlap(self, client, auth_headers):
+        """Seguir o cursor deve percorrer as páginas sem repetir registros."""
+        seen = []
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/movements/", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(m["id"] for m in page)
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen))
+
+    def test_filter_respects_limit(self, client, auth_headers):
+        """Filtro deve respeitar o limite de página."""
+        response = client.get("/movements/filter?limit=3", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) <= 3
+
+    def test_invalid_cursor(self, client, auth_headers):
+        """Cursor malformado deve retornar erro de validação."""
+        response = client.get("/movements/?cursor=invalido", headers=auth_headers)
+
+        assert response.status_code == 400
+
+
+class TestMovementBatch:
+    """Testes do lançamento de movimentações em lote."""
+
+    def test_batch_applies_all_lines(self, client, auth_headers):
+        """Lote válido deve criar todas as linhas e ajustar o estoque líquido."""
+        products = client.get("/products/", headers=auth_headers).json()
+        product_a, product_b = products[0], products[1]
+
+        response = client.post("/movements/batch", headers=auth_headers, json={"lines": [
+            {"product_id": product_a["id"], "type": "entrada", "quantity": 7},
+            {"product_id": product_b["id"], "type": "entrada", "quantity": 3},
+            {"product_id": product_a["id"], "type": "saida", "quantity": 2},
+        ]})
+
+        assert response.status_code == 201
+        movements = response.json()
+        assert len(movements) == 3
+        assert len({m["batch_id"] for m in movements}) == 1
+
+        updated_a = client.get(f"/products/{product_a['id']}", headers=auth_headers).json()
+        updated_b = client.get(f"/products/{product_b['id']}", headers=auth_headers).json()
+        assert updated_a["quantity"] == product_a["quantity"] + 5
+        assert updated_b["quantity"] == product_b["quantity"] + 3
+
+    def test_batch_is_all_or_nothing(self, client, auth_headers):
+        """Uma linha sem estoque deve rejeitar o lote inteiro."""
+        products = client.get("/products/", headers=auth_headers).json()
+        product_a, product_b = products[0], products[1]
+
+        response = client.post("/movements/batch", headers=auth_headers, json={"lines": [
+            {"product_id": product_a["id"], "type": "entrada", "quantity": 5},
+            {"product_id": product_b["id"], "type": "saida", "quantity": 999999},
+        ]})
+
+        assert response.status_code == 400
+        updated_a = client.get(f"/products/{product_a['id']}", headers=auth_headers).json()
+        assert updated_a["quantity"] == product_a["quantity"]
+
+
+class TestMovementBulkRevert:
+    """Testes da reversão em massa de movimentações."""
+
+    def test_revert_batch_restores_stock(self, client, auth_headers):
+        """Reverter um lote inteiro deve desfazer o estoque líquido de cada produto."""
+        products = client.get("/products/", headers=auth_headers).json()
+        product_a, product_b = products[0], products[1]
+        batch = client.post("/movements/batch", headers=auth_headers, json={"lines": [
+            {"product_id": product_a["id"], "type": "entrada", "quantity": 6},
+            {"product_id": product_b["id"], "type": "entrada", "quantity": 2},
+            {"product_id": product_a["id"], "type": "saida", "quantity": 1},
+        ]}).json()
+
+        response = client.post("/movements/revert", headers=auth_headers, json={"batch_id": batch[0]["batch_id"]})
+
+        assert response.status_code == 201
+        reverted = response.json()
+        assert [m["type"] for m in reverted] == ["saida", "saida", "entrada"]
+        assert [m["quantity"] for m in reverted] == [6, 2, 1]
+        assert len({m["batch_id"] for m in reverted}) == 1
+        assert reverted[0]["batch_id"] != batch[0]["batch_id"]
+        assert reverted[0]["note"] == f"Revert of movement {batch[0]['id']}"
+        assert [m["reverted_movement_id"] for m in reverted] == [m["id"] for m in batch]
+        with SessionLocal() as db:
+            audited = {
+                log.entity_id: log.details["reverted_movement_id"]
+                for log in db.scalars(
+                    select(AuditLog).where(AuditLog.entity_id.in_([m["id"] for m in reverted]))
+                )
+                if log.entity_type == "movement"
+            }
+        assert [audited[m["id"]] for m in reverted] == [m["id"] for m in batch]
+        updated_a = client.get(f"/products/{product_a['id']}", headers=auth_headers).json()
+        updated_b = client.get(f"/products/{product_b['id']}", headers=auth_headers).json()
+        assert updated_a["quantity"] == product_a["quantity"]
+        assert updated_b["quantity"] == product_b["quantity"]
+
+    def test_revert_single_movement_records_original(self, client, auth_headers):
+        """A reversão individual grava a movimentação original em reverted_movement_id."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        entrada = client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "entrada", "quantity": 3,
+        }).json()
+
+        response = client.post(f"/movements/revert/{entrada['id']}", headers=auth_headers)
+
+        assert response.status_code == 201
+        assert response.json()["reverted_movement_id"] == entrada["id"]
+
+    def test_revert_batch_over_the_cap_is_rejected(self, client, auth_headers, monkeypatch):
+        """Um lote maior que o limite de IDs não é revertido de uma vez."""
+        monkeypatch.setattr(constants, "MOVEMENT_REVERT_MAX_IDS", 2)
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        batch = client.post("/movements/batch", headers=auth_headers, json={"lines": [
+            {"product_id": product["id"], "type": "entrada", "quantity": 1} for _ in range(3)
+        ]}).json()
+
+        response = client.post("/movements/revert", headers=auth_headers, json={"batch_id": batch[0]["batch_id"]})
+
+        assert response.status_code == 400
+        updated = client.get(f"/products/{product['id']}", headers=auth_headers).json()
+        assert updated["quantity"] == product["quantity"] + 3
+
+    def test_revert_ids_is_all_or_nothing(self, client, auth_headers):
+        """Se uma reversão deixaria estoque negativo, nenhuma é aplicada."""
+        product = client.get("/products/", headers=auth_headers).json()[2]
+        entrada = client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "entrada", "quantity": 5,
+        }).json()
+        client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "saida", "quantity": product["quantity"] + 5,
+        })
+
+        response = client.post("/movements/revert", headers=auth_headers, json={"movement_ids": [entrada["id"]]})
+
+        assert response.status_code == 400
+        updated = client.get(f"/products/{product['id']}", headers=auth_headers).json()
+        assert updated["quantity"] == 0
+
+    def test_revert_unknown_id_returns_404(self, client, auth_headers):
+        """IDs inexistentes fazem a reversão inteira falhar com 404."""
+        response = client.post("/movements/revert", headers=auth_headers, json={"movement_ids": [999999999]})
+        assert response.status_code == 404
+
+    def test_revert_requires_exactly_one_target(self, client, auth_headers):
+        """Informar IDs e lote ao mesmo tempo (ou nenhum) é inválido."""
+        both = client.post("/movements/revert", headers=auth_headers, json={"movement_ids": [1], "batch_id": "x"})
+        neither = client.post("/movements/revert", headers=auth_headers, json={})
+        assert both.status_code == neither.status_code == 422
+
+
+class TestMovementIdempotency:
+    """Testes do cabeçalho Idempotency-Key."""
+
+    def test_retry_with_same_key_replays_response(self, client, auth_headers):
+        """Repetir a mesma requisição com a mesma chave não deve duplicar a movimentação."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        headers = {**auth_headers, "Idempotency-Key": f"retry-{uuid.uuid4()}"}
+        payload = {"product_id": product["id"], "type": "entrada", "quantity": 4, "reason": "Compra"}
+
+        first = client.post("/movements/", headers=headers, json=payload)
+        second = client.post("/movements/", headers=headers, json=payload)
+
+        assert first.status_code == second.status_code == 201
+        assert second.json()["id"] == first.json()["id"]
+        assert second.headers.get("Idempotent-Replayed") == "true"
+        updated = client.get(f"/products/{product['id']}", headers=auth_headers).json()
+        assert updated["quantity"] == product["quantity"] + 4
+
+    def test_same_key_with_different_payload_is_rejected(self, client, auth_headers):
+        """Reutilizar a chave para outra requisição deve retornar 422."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        headers = {**auth_headers, "Idempotency-Key": f"reuse-{uuid.uuid4()}"}
+
+        first = client.post("/movements/", headers=headers, json={
+            "product_id": product["id"], "type": "entrada", "quantity": 1,
+        })
+        second = client.post("/movements/", headers=headers, json={
+            "product_id": product["id"], "type": "entrada", "quantity": 2,
+        })
+
+        assert first.status_code == 201
+        assert second.status_code == 422
+
+    def test_failed_request_releases_key(self, client, auth_headers):
+        """Uma falha de negócio não deve consumir a chave."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        headers = {**auth_headers, "Idempotency-Key": f"fail-{uuid.uuid4()}"}
+        payload = {"product_id": product["id"], "type": "saida", "quantity": 999999}
+
+        first = client.post("/movements/", headers=headers, json=payload)
+        second = client.post("/movements/", headers=headers, json=payload)
+
+        assert first.status_code == second.status_code == 400
+        assert "Idempotent-Replayed" not in second.headers
+
+    def test_response_is_stored_with_the_movement(self, client, auth_headers):
+        """A resposta é gravada na mesma transação da movimentação."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        key = f"atomic-{uuid.uuid4()}"
+        payload = {"product_id": product["id"], "type": "entrada", "quantity": 2}
+
+        created = client.post("/movements/", headers={**auth_headers, "Idempotency-Key": key}, json=payload).json()
+
+        with SessionLocal() as db:
+            record = db.scalar(select(IdempotencyKey).where(IdempotencyKey.key == key))
+            assert record.status_code == 201
+            assert record.response_body["id"] == created["id"]
+
+    def test_abandoned_claim_is_taken_over(self, client, auth_headers, organization_id):
+        """Uma reivindicação sem resposta além do prazo é assumida pela nova tentativa."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        key = f"stale-{uuid.uuid4()}"
+        payload = {"product_id": product["id"], "type": "entrada", "quantity": 3}
+        stale = datetime.utcnow() - timedelta(
+            seconds=constants.IDEMPOTENCY_WAIT_SECONDS + constants.IDEMPOTENCY_CLAIM_MARGIN_SECONDS + 1
+        )
+        with SessionLocal() as db:
+            idempotency_repository.claim_key(
+                db,
+                organization_id,
+                key,
+                scope="movements.create",
+                request_hash=idempotency_service._request_hash(
+                    "movements.create", MovementCreate(**payload).model_dump(mode="json")
+                ),
+                claimed_at=stale,
+                expires_at=datetime.utcnow() + timedelta(hours=1),
+            )
+
+        response = client.post("/movements/", headers={**auth_headers, "Idempotency-Key": key}, json=payload)
+
+        assert response.status_code == 201
+        updated = client.get(f"/products/{product['id']}", headers=auth_headers).json()
+        assert updated["quantity"] == product["quantity"] + 3
+
+    def test_purge_removes_only_expired_keys(self, client, auth_headers):
+        """A tarefa diária remove as chaves expiradas."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        key = f"purge-{uuid.uuid4()}"
+        client.post(
+            "/movements/",
+            headers={**auth_headers, "Idempotency-Key": key},
+            json={"product_id": product["id"], "type": "entrada", "quantity": 1},
+        )
+
+        with SessionLocal() as db:
+            idempotency_service.purge_expired(db)
+            assert db.scalar(select(IdempotencyKey).where(IdempotencyKey.key == key)) is not None
+            db.execute(update(IdempotencyKey).where(IdempotencyKey.key == key).values(expires_at=datetime.utcnow()))
+            db.commit()
+            idempotency_service.purge_expired(db)
+            assert db.scalar(select(IdempotencyKey).where(IdempotencyKey.key == key)) is None
@@ -69,6 +69,57 @@ class TestProductUpdate:
         assert response.json()["price"] == 150.00
 
 
+class TestProductOptimisticLock:
+    """Testes de controle de concorrência otimista (ETag / If-Match)."""
+
+    def _create(self, client, auth_headers, sample_product_data):
+        response = client.post("/products/", headers=auth_headers, json=sample_product_data)
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    def test_put_with_current_etag_bumps_version(self, client, auth_headers, sample_product_data):
+        """PUT com If-Match atual deve atualizar e devolver novo ETag."""
+        product_id = self._create(client, auth_headers, sample_product_data)
+        etag = client.get(f"/products/{product_id}", headers=auth_headers).headers["ETag"]
+
+        response = client.put(
+            f"/products/{product_id}",
+            headers={**auth_headers, "If-Match": etag},
+            json={"name": "Produto Versionado"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["version"] == int(etag.strip('"')) + 1
+
+    def test_put_with_stale_etag_returns_412(self, client, auth_headers, sample_product_data):
+        """PUT com versão desatualizada não deve sobrescrever a edição concorrente."""
+        product_id = self._create(client, auth_headers, sample_product_data)
+        etag = client.get(f"/products/{product_id}", headers=auth_headers).headers["ETag"]
+
+        first = client.put(
+            f"/products/{product_id}", headers={**auth_headers, "If-Match": etag}, json={"name": "Edição A"}
+        )
+        second = client.put(
+            f"/products/{product_id}", headers={**auth_headers, "If-Match": etag}, json={"name": "Edição B"}
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 412
+        assert client.get(f"/products/{product_id}", headers=auth_headers).json()["name"] == "Edição A"
+
+    def test_stock_movement_does_not_change_version(self, client, auth_headers, sample_product_data):
+        """Movimentações de estoque não devem invalidar o ETag de metadados."""
+        product_id = self._create(client, auth_headers, sample_product_data)
+        etag = client.get(f"/products/{product_id}", headers=auth_headers).headers["ETag"]
+
+        client.post("/movements/", headers=auth_headers, json={
+            "product_id": product_id, "type": "entrada", "quantity": 3,
+        })
+
+        assert client.get(f"/products/{product_id}", headers=auth_headers).headers["ETag"] == etag
+
+
 class TestProductDelete:
     """Testes de exclusão (soft delete) de produtos."""
     
@@ -0,0 +1,142 @@
+"""
+Testes da reconciliação incremental do estoque com o histórico de movimentações.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.movements import movement_import, movement_service
+from app.movements.movement_model import MovementCreate, MovementType
+from app.products.product_model import Product
+from app.reconciliation import reconciliation_service
+
+
+@pytest.fixture
+def product_id(client, auth_headers, sample_product_data):
+    """Produto criado pela API com 10 unidades e algumas movimentações."""
+    sample_product_data["sku"] = f"REC-{uuid.uuid4().hex[:8].upper()}"
+    response = client.post("/products/", headers=auth_headers, json=sample_product_data)
+    assert response.status_code == 201
+    product_id = response.json()["id"]
+    for movement_type, quantity in (("entrada", 5), ("saida", 3), ("saida", 2), ("entrada", 4)):
+        response = client.post(
+            "/movements/",
+            headers=auth_headers,
+            json={"product_id": product_id, "type": movement_type, "quantity": quantity},
+        )
+        assert response.status_code == 201
+    return product_id
+
+
+def drift_for(report, product_id):
+    return next((item for item in report.drift if item.product_id == product_id), None)
+
+
+class TestReconciliation:
+    """Testes do serviço e do endpoint de reconciliação."""
+
+    def test_api_movements_do_not_drift(self, db, organization_id, product_id):
+        """Estoque inicial e movimentações feitas pela API devem bater com o histórico."""
+        report = reconciliation_service.reconcile_organization(db, organization_id, chunk_size=2, safety_lag=0)
+
+        assert drift_for(report, product_id) is None
+        assert report.to_movement_id >= report.from_movement_id
+
+    def test_second_run_resumes_from_checkpoint(self, db, organization_id, product_id):
+        """Uma segunda execução sem movimentações novas não deve reprocessar nada."""
+        reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        report = reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+
+        assert report.movements_scanned == 0
+        assert report.from_movement_id == report.to_movement_id
+
+    def test_detects_and_repairs_drift(self, db, organization_id, product_id):
+        """Uma alteração direta na quantidade deve ser detectada e corrigida com --repair."""
+        db.execute(update(Product).where(Product.id == product_id).values(quantity=Product.quantity + 7))
+        db.commit()
+
+        report = reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        drift = drift_for(report, product_id)
+        assert drift is not None
+        assert drift.expected_quantity == 14
+        assert drift.difference == 7
+        assert not drift.repaired
+
+        report = reconciliation_service.reconcile_organization(db, organization_id, repair=True, safety_lag=0)
+        assert drift_for(report, product_id).repaired
+        db.expire_all()
+        assert db.scalar(select(Product.quantity).where(Product.id == product_id)) == 14
+
+        report = reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        assert drift_for(report, product_id) is None
+
+    def test_full_rescan_matches_incremental(self, db, organization_id, product_id):
+        """Reprocessar desde a linha de base deve chegar ao mesmo resultado."""
+        incremental = reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        full = reconciliation_service.reconcile_organization(db, organization_id, full=True, chunk_size=50, safety_lag=0)
+
+        assert full.movements_scanned >= 4
+        assert full.to_movement_id == incremental.to_movement_id
+        assert {item.product_id for item in full.drift} == {item.product_id for item in incremental.drift}
+
+    def test_endpoint_requires_admin_and_reports(self, client, auth_headers, product_id):
+        """O endpoint deve retornar o relatório e o checkpoint da organização."""
+        response = client.post("/reconciliation/run", headers=auth_headers)
+        assert response.status_code == 200
+        assert all(item["product_id"] != product_id for item in response.json()["drift"])
+
+        checkpoint = client.get("/reconciliation/checkpoint", headers=auth_headers)
+        assert checkpoint.status_code == 200
+        assert checkpoint.json()["last_movement_id"] == response.json()["to_movement_id"]
+
+        assert client.post("/reconciliation/run").status_code == 401
+
+    def test_open_import_is_not_skipped(self, db, admin, make_product):
+        """Uma importação ainda aberta não pode ficar para trás do checkpoint de uma execução concorrente."""
+        imported = make_product(sku_prefix="RIMP")
+        other = make_product(sku_prefix="ROTH")
+        db.commit()
+        organization_id = admin.organization_id
+        reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        started, go = threading.Event(), threading.Event()
+        created_at = (datetime.utcnow() - timedelta(days=1)).isoformat()
+
+        def records():
+            yield {"product_id": imported.id, "type": "entrada", "quantity": 6, "created_at": created_at}
+            started.set()
+            go.wait(10)
+            yield {"product_id": imported.id, "type": "entrada", "quantity": 4, "created_at": created_at}
+
+        def run_import():
+            with SessionLocal() as session:
+                movement_import.import_movements(session, records(), organization_id, chunk_size=1)
+
+        def move_and_reconcile():
+            # A newer movement commits while the import is open, then a run starts.
+            with SessionLocal() as session:
+                movement_service.create_movement(
+                    session,
+                    MovementCreate(product_id=other.id, type=MovementType.ENTRADA, quantity=5),
+                    organization_id=organization_id,
+                    created_by_user_id=admin.id,
+                )
+                return reconciliation_service.reconcile_organization(session, organization_id, safety_lag=0)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            importing = pool.submit(run_import)
+            assert started.wait(10)
+            reconciling = pool.submit(move_and_reconcile)
+            time.sleep(0.5)
+            go.set()
+            importing.result()
+            reconciling.result()
+
+        report = reconciliation_service.reconcile_organization(db, organization_id, safety_lag=0)
+        assert drift_for(report, imported.id) is None
+        assert drift_for(report, other.id) is None
@@ -0,0 +1,138 @@
+"""
+Testes do cache de relatórios (janelas normalizadas, versão de dados, LRU e backends).
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app import constants
+from app.reports import report_cache_service
+
+
+def memory_backend(**limits):
+    options = {"max_entries": 10, "max_bytes": 1024, "ttl_seconds": 60, **limits}
+    return report_cache_service.MemoryBackend(**options)
+
+
+@pytest.fixture
+def fresh_cache():
+    """Um cache em memória vazio durante o teste; o backend configurado volta no final."""
+    previous = report_cache_service.get_backend()
+    report_cache_service.set_backend(memory_backend(max_bytes=constants.REPORT_CACHE_MAX_BYTES))
+    yield
+    report_cache_service.set_backend(previous)
+
+
+class TestReportCacheBackends:
+    """Limites de LRU e janelas normalizadas."""
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        """Ao passar do limite de entradas, sai a menos usada recentemente."""
+        backend = memory_backend(max_entries=2)
+        backend.set("a", b"1", organization_id=1, report="abc")
+        backend.set("b", b"2", organization_id=1, report="abc")
+        backend.get("a")
+        backend.set("c", b"3", organization_id=1, report="abc")
+
+        assert backend.get("b") is None
+        assert backend.get("a") == b"1"
+        assert backend.evictions == 1
+
+    def test_memory_backend_respects_byte_limit(self):
+        """O total de bytes nunca passa do limite e valores maiores que ele não entram."""
+        backend = memory_backend(max_bytes=10)
+        backend.set("a", b"x" * 6, organization_id=1, report="abc")
+        backend.set("b", b"y" * 6, organization_id=1, report="abc")
+        backend.set("c", b"z" * 11, organization_id=1, report="abc")
+
+        assert backend.usage() == (1, 6)
+        assert backend.get("b") == b"y" * 6
+        assert backend.get("c") is None
+
+    def test_database_backend_round_trip(self):
+        """O backend compartilhado grava, lê e despeja as menos usadas ao passar do limite."""
+        backend = report_cache_service.DatabaseBackend(
+            max_entries=2, max_bytes=1024, ttl_seconds=60, evict_check_every=1
+        )
+        keys = [uuid.uuid4().hex for _ in range(3)]
+        try:
+            for key in keys:
+                backend.set(key, key.encode(), organization_id=1, report="abc")
+
+            assert backend.get(keys[2]) == keys[2].encode()
+            assert backend.usage()[0] <= 2
+            assert backend.get(keys[0]) is None
+        finally:
+            backend.clear()
+
+    def test_database_backend_overwrites_existing_key(self):
+        """Gravar de novo a mesma chave substitui o valor sem erro de unicidade."""
+        backend = report_cache_service.DatabaseBackend(max_entries=10, max_bytes=1024, ttl_seconds=60)
+        key = uuid.uuid4().hex
+        try:
+            backend.set(key, b"old", organization_id=1, report="abc")
+            backend.set(key, b"new", organization_id=1, report="abc")
+
+            assert backend.get(key) == b"new"
+            assert backend.usage() == (1, 3)
+        finally:
+            backend.clear()
+
+    def test_database_backend_checks_limits_periodically(self):
+        """Os limites só são verificados a cada N gravações, não em toda gravação."""
+        backend = report_cache_service.DatabaseBackend(
+            max_entries=1, max_bytes=1024, ttl_seconds=60, evict_check_every=3
+        )
+        try:
+            for _ in range(2):
+                backend.set(uuid.uuid4().hex, b"x", organization_id=1, report="abc")
+            assert backend.usage()[0] == 2
+
+            backend.set(uuid.uuid4().hex, b"x", organization_id=1, report="abc")
+            assert backend.usage()[0] == 0
+            assert backend.evictions == 3
+        finally:
+            backend.clear()
+
+    def test_normalized_window(self):
+        """Início vai para a meia-noite e fim para o último instante do minuto."""
+        start, end = report_cache_service.normalize_window(
+            datetime(2026, 3, 1, 15, 42, 31, 999), datetime(2026, 3, 31, 15, 42, 31, 999)
+        )
+
+        assert start == datetime(2026, 3, 1)
+        assert end == datetime(2026, 3, 31, 15, 42, 59, 999999)
+
+
+class TestReportCacheEndpoints:
+    """O cache deve servir repetições e ser invalidado por escritas."""
+
+    def test_repeated_report_is_served_from_cache(self, client, auth_headers, fresh_cache):
+        """A segunda chamada idêntica é um acerto de cache com o mesmo conteúdo."""
+        first = client.get("/reports/abc", headers=auth_headers, params={"period": "30d"})
+        second = client.get("/reports/abc", headers=auth_headers, params={"period": "30d"})
+
+        assert second.json() == first.json()
+        metrics = client.get("/reports/cache/metrics", headers=auth_headers).json()
+        assert metrics["backend"] == "memory"
+        assert metrics["reports"]["abc"]["hits"] == 1
+        assert metrics["reports"]["abc"]["misses"] == 1
+
+    def test_movement_invalidates_cached_reports(self, client, auth_headers, fresh_cache, sample_product_data):
+        """Uma movimentação muda a versão dos dados e o relatório é recalculado."""
+        payload = {**sample_product_data, "sku": f"CACHE-{uuid.uuid4().hex[:8].upper()}"}
+        product = client.post("/products/", headers=auth_headers, json=payload).json()
+
+        def forecast_item():
+            items = client.get("/reports/forecast", headers=auth_headers, params={"period": "7d"}).json()["items"]
+            return next(item for item in items if item["product_id"] == product["id"])
+
+        assert forecast_item()["daily_usage"] == 0
+        client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "saida", "quantity": 7,
+        })
+
+        assert forecast_item()["daily_usage"] == pytest.approx(1.0)
+        metrics = client.get("/reports/cache/metrics", headers=auth_headers).json()
+        assert metrics["reports"]["forecast"]["hits"] == 0
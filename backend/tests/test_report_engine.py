@@ -0,0 +1,61 @@
+"""
+Testes do motor de análises (ABC, XYZ, giro e previsão) sobre colunas de produtos.
+"""
+import pytest
+
+from app.reports import report_engine
+
+
+def make_frame(rows):
+    """Monta um ProductFrame a partir de (id, preço, quantidade, lead_time)."""
+    ids = [row[0] for row in rows]
+    return report_engine.ProductFrame(
+        ids=ids,
+        names=[f"Produto {product_id}" for product_id in ids],
+        positions={product_id: position for position, product_id in enumerate(ids)},
+        price=report_engine._column([row[1] for row in rows], float),
+        cost=report_engine._column([row[1] / 2 for row in rows], float),
+        quantity=report_engine._column([row[2] for row in rows], int),
+        lead_time=report_engine._column([row[3] for row in rows], int),
+    )
+
+
+class TestReportEngine:
+    """Os cálculos vetorizados devem reproduzir as regras dos relatórios."""
+
+    def test_abc_ranks_by_value_and_accumulates_shares(self):
+        """Produtos são ordenados por valor consumido e classificados pela participação acumulada."""
+        frame = make_frame([(1, 1.0, 0, 0), (2, 10.0, 0, 0), (3, 5.0, 0, 0), (4, 2.0, 0, 0)])
+        consumed = report_engine.align(frame, {1: 50, 2: 70, 3: 10, 99: 1000})
+
+        result = report_engine.abc(frame, consumed)
+
+        assert [frame.ids[position] for position in result.order] == [2, 1, 3, 4]  # empate mantém a ordem de ID
+        assert result.value == [700.0, 50.0, 50.0, 0.0]
+        assert result.cumulative_percentage[1] == pytest.approx(93.75)
+        assert result.classification == ["B", "B", "C", "C"]
+
+    def test_xyz_counts_missing_weeks_as_zero(self):
+        """Semanas sem demanda entram como zero no coeficiente de variação."""
+        frame = make_frame([(1, 1.0, 0, 0), (2, 1.0, 0, 0), (3, 1.0, 0, 0)])
+        demand = {1: {0: 10, 1: 10, 2: 10, 3: 10}, 2: {0: 40}}
+
+        result = report_engine.xyz(frame, demand, periods=4)
+
+        assert result.cv[0] == pytest.approx(0.0)
+        assert result.cv[1] == pytest.approx(2.0)  # [40, 0, 0, 0]: média 10, desvio 20
+        assert result.classification == ["X", "Z", "Z"]
+
+    def test_turnover_and_forecast(self):
+        """Giro evita divisão por zero e o ponto de pedido inclui o estoque de segurança."""
+        frame = make_frame([(1, 1.0, 30, 10), (2, 1.0, 0, 5), (3, 1.0, 50, 4)])
+        used = report_engine.align(frame, {1: 60, 2: 30})
+        average = report_engine.align(frame, {1: 20.0}, default=frame.quantity)
+
+        assert report_engine.turnover(used, average) == [3.0, 0.0, 0.0]
+
+        result = report_engine.forecast(frame, used, days=30)
+        assert result.daily_usage == [2.0, 1.0, 0.0]
+        assert result.reorder_point == [30, 7, 0]
+        assert result.days_until_stockout == [15.0, 0.0, report_engine.NO_STOCKOUT_DAYS]
+        assert result.status == ["WARNING", "CRITICAL", "OK"]
@@ -0,0 +1,137 @@
+"""
+Testes dos relatórios assíncronos (POST/GET /reports/jobs).
+"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.reports import report_job_model, report_job_repository, report_job_service
+
+
+def wait_for_job(client, auth_headers, job_id, timeout=10):
+    """Consulta o job até ele terminar."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/reports/jobs/{job_id}", headers=auth_headers).json()
+        if body["status"] in ("done", "failed"):
+            return body
+        time.sleep(0.05)
+    pytest.fail(f"Job {job_id} não terminou em {timeout}s")
+
+
+def expire_job(db, job_id, when):
+    """Antecipa o prazo de um job."""
+    db.execute(update(report_job_model.ReportJob).where(report_job_model.ReportJob.id == job_id).values(expires_at=when))
+    db.commit()
+
+
+@pytest.fixture
+def paused_jobs(monkeypatch):
+    """Jobs ficam pendentes (sem despacho para o pool) e são removidos no final."""
+    monkeypatch.setattr(report_job_service, "_dispatch", lambda job_id: None)
+    created = []
+    yield created
+    with SessionLocal() as db:
+        for job_id in created:
+            job = db.get(report_job_model.ReportJob, job_id)
+            if job is not None:
+                db.delete(job)
+        db.commit()
+
+
+class TestReportJobs:
+    """Jobs de relatório rodam em segundo plano e guardam o resultado."""
+
+    def test_job_result_matches_synchronous_report(self, client, auth_headers):
+        """O resultado do job é igual ao do endpoint síncrono na mesma janela."""
+        response = client.post("/reports/jobs", headers=auth_headers, json={"report": "abc", "period": "90d"})
+
+        assert response.status_code == 202
+        job = wait_for_job(client, auth_headers, response.json()["id"])
+        assert job["status"] == "done"
+        assert job["progress"] == 100
+        expected = client.get("/reports/abc", headers=auth_headers, params={"period": "90d"}).json()
+        assert job["result"] == expected
+
+    def test_identical_pending_jobs_are_deduplicated(self, client, auth_headers, paused_jobs):
+        """Um pedido idêntico a um job ativo devolve o mesmo job."""
+        payload = {"report": "bundle", "period": "30d", "sections": ["forecast", "abc"]}
+        first = client.post("/reports/jobs", headers=auth_headers, json=payload).json()
+        second = client.post("/reports/jobs", headers=auth_headers, json=payload).json()
+        other = client.post("/reports/jobs", headers=auth_headers, json={**payload, "sections": ["abc"]}).json()
+        paused_jobs.extend([first["id"], other["id"]])
+
+        assert second["id"] == first["id"]
+        assert other["id"] != first["id"]
+        assert first["status"] == "pending"
+        assert first["params"]["sections"] == ["abc", "forecast"]
+
+        report_job_service.run_job(first["id"])
+        done = client.get(f"/reports/jobs/{first['id']}", headers=auth_headers).json()
+        assert done["status"] == "done"
+        assert set(done["result"]) >= {"abc", "forecast"}
+        assert done["result"]["xyz"] is None
+
+    def test_expired_and_abandoned_jobs(self, client, auth_headers, paused_jobs):
+        """Jobs ativos além do prazo falham; resultados expirados deixam de existir."""
+        job = client.post("/reports/jobs", headers=auth_headers, json={"report": "xyz", "period": "7d"}).json()
+        paused_jobs.append(job["id"])
+        past = datetime.utcnow() - timedelta(seconds=1)
+        with SessionLocal() as db:
+            expire_job(db, job["id"], past)
+
+        abandoned = client.get(f"/reports/jobs/{job['id']}", headers=auth_headers).json()
+        assert abandoned["status"] == "failed"
+
+        with SessionLocal() as db:
+            expire_job(db, job["id"], past)
+        assert client.get(f"/reports/jobs/{job['id']}", headers=auth_headers).status_code == 404
+
+    def test_invalid_requests_are_rejected(self, client, auth_headers):
+        """Tipo de relatório ou seção desconhecidos são recusados."""
+        unknown_report = client.post("/reports/jobs", headers=auth_headers, json={"report": "vendas"})
+        unknown_section = client.post(
+            "/reports/jobs", headers=auth_headers, json={"report": "bundle", "sections": ["vendas"]}
+        )
+
+        assert unknown_report.status_code == 422
+        assert unknown_section.status_code == 400
+
+    def test_progress_is_reported_within_a_single_report(self, client, auth_headers, paused_jobs, monkeypatch):
+        """Um relatório isolado informa progresso em etapas e cada etapa renova o prazo do job."""
+        job = client.post("/reports/jobs", headers=auth_headers, json={"report": "turnover", "period": "30d"}).json()
+        paused_jobs.append(job["id"])
+        seen = []
+        original = report_job_repository.set_progress
+
+        def record(db, job_id, progress, expires_at):
+            seen.append((progress, expires_at))
+            return original(db, job_id, progress, expires_at)
+
+        monkeypatch.setattr(report_job_repository, "set_progress", record)
+        report_job_service.run_job(job["id"])
+
+        assert [progress for progress, _ in seen] == [25, 50, 75, 99]
+        assert all(expires_at > datetime.utcnow() + timedelta(minutes=1) for _, expires_at in seen)
+        assert client.get(f"/reports/jobs/{job['id']}", headers=auth_headers).json()["progress"] == 100
+
+    def test_abandoned_job_is_not_overwritten_by_a_late_run(self, client, auth_headers, paused_jobs, monkeypatch):
+        """Um job marcado como abandonado durante a execução continua falho e a execução é interrompida."""
+        job = client.post("/reports/jobs", headers=auth_headers, json={"report": "abc", "period": "7d"}).json()
+        paused_jobs.append(job["id"])
+        original = report_job_repository.set_progress
+
+        def abandon_midway(db, job_id, progress, expires_at):
+            expire_job(db, job_id, datetime.utcnow() - timedelta(seconds=1))
+            client.get(f"/reports/jobs/{job_id}", headers=auth_headers)  # Marks it failed
+            return original(db, job_id, progress, expires_at)
+
+        monkeypatch.setattr(report_job_repository, "set_progress", abandon_midway)
+        report_job_service.run_job(job["id"])
+
+        body = client.get(f"/reports/jobs/{job['id']}", headers=auth_headers).json()
+        assert body["status"] == "failed"
+        assert body["result"] is None
@@ -0,0 +1,126 @@
+"""
+Testes do agendador (eleição por lease no banco) e dos relatórios pré-calculados.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import constants
+from app.database import SessionLocal
+from app.reports import report_precompute_service
+from app.reports.report_precompute_model import PrecomputedReport
+from app.scheduler import scheduler_repository, scheduler_service
+from app.scheduler.scheduler_model import SchedulerLease
+
+
+@pytest.fixture
+def task_name():
+    """Nome de tarefa exclusivo; o lease é removido no final."""
+    name = f"test.{uuid.uuid4().hex[:8]}"
+    yield name
+    with SessionLocal() as db:
+        db.query(SchedulerLease).filter(SchedulerLease.name == name).delete()
+        db.commit()
+
+
+@pytest.fixture
+def precomputed():
+    """Pré-calcula os relatórios da organização 1 e os remove no final."""
+    with SessionLocal() as db:
+        report_precompute_service.precompute_organization(db, 1)
+    yield
+    with SessionLocal() as db:
+        db.query(PrecomputedReport).delete()
+        db.commit()
+
+
+class TestScheduler:
+    """Só um worker executa cada tarefa por dia."""
+
+    def test_lease_is_exclusive_until_it_expires(self, task_name):
+        """Um segundo worker não obtém o lease enquanto ele é válido."""
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            assert scheduler_repository.acquire_lease(db, task_name, "a", now, now + timedelta(minutes=5))
+            assert scheduler_repository.acquire_lease(db, task_name, "b", now, now + timedelta(minutes=5)) is None
+            assert not scheduler_repository.renew_lease(db, task_name, "b", now + timedelta(minutes=5))
+
+            later = now + timedelta(minutes=6)
+            lease = scheduler_repository.acquire_lease(db, task_name, "b", later, later + timedelta(minutes=5))
+            assert lease.holder == "b"
+
+    def test_task_runs_once_per_day_across_workers(self, task_name):
+        """Depois que um worker conclui a tarefa, os outros a pulam até o dia seguinte."""
+        runs = []
+        task = scheduler_service.DailyTask(task_name, 2, lambda db, renew: (runs.append(1), renew()))
+        first = scheduler_service.Scheduler([task], holder="a")
+        second = scheduler_service.Scheduler([task], holder="b")
+        today = datetime.utcnow().replace(hour=3, minute=0)
+
+        assert first.run_pending(today.replace(hour=1)) == []
+        assert first.run_pending(today) == [task_name]
+        assert second.run_pending(today + timedelta(hours=1)) == []
+        assert second.run_pending(today + timedelta(days=1)) == [task_name]
+        assert len(runs) == 2
+
+    def test_failed_task_keeps_the_lease_until_it_expires(self, task_name):
+        """Uma falha não é marcada como concluída e só é retentada após o lease expirar."""
+        def failing(db, renew):
+            raise RuntimeError("falhou")
+
+        task = scheduler_service.DailyTask(task_name, 0, failing)
+        scheduler = scheduler_service.Scheduler([task], holder="a", lease_seconds=60)
+        now = datetime.utcnow()
+
+        assert scheduler.run_pending(now) == []
+        with SessionLocal() as db:
+            lease = db.get(SchedulerLease, task_name)
+            assert lease.holder == "a"
+            assert lease.last_completed_at is None
+            assert scheduler_repository.acquire_lease(db, task_name, "a", now, now + timedelta(minutes=5)) is None
+
+            later = now + timedelta(seconds=61)
+            assert scheduler_repository.acquire_lease(db, task_name, "b", later, later + timedelta(minutes=5))
+
+
+class TestPrecomputedReports:
+    """Pedidos com a mesma janela recebem o resultado pré-calculado."""
+
+    @pytest.mark.parametrize("report", ["abc", "xyz", "turnover", "forecast"])
+    def test_matching_period_is_served_precomputed(self, client, auth_headers, precomputed, report):
+        """O resultado pré-calculado é igual ao calculado na hora e vem com o indicador de atualidade."""
+        served = client.get(f"/reports/{report}", headers=auth_headers, params={"period": "30d"}).json()
+        live = client.get(f"/reports/{report}", headers=auth_headers, params={"period": "30d", "fresh": True}).json()
+
+        assert served["freshness"]["precomputed"] is True
+        assert served["freshness"]["stale"] is False
+        assert live["freshness"] is None
+        assert served["items"] == live["items"]
+
+    def test_other_windows_are_computed_live(self, client, auth_headers, precomputed):
+        """Períodos não pré-calculados e datas explícitas não usam o resultado armazenado."""
+        seven_days = client.get("/reports/abc", headers=auth_headers, params={"period": "7d"}).json()
+        explicit = client.get(
+            "/reports/abc", headers=auth_headers, params={"start_date": "2026-01-01", "end_date": "2026-01-31"}
+        ).json()
+
+        assert seven_days["freshness"] is None
+        assert explicit["freshness"] is None
+
+    def test_data_changes_are_computed_live(self, client, auth_headers, precomputed, sample_product_data):
+        """Depois de uma alteração nos dados o resultado armazenado deixa de ser servido."""
+        payload = {**sample_product_data, "sku": f"PRE-{uuid.uuid4().hex[:8].upper()}"}
+        client.post("/products/", headers=auth_headers, json=payload)
+
+        served = client.get("/reports/forecast", headers=auth_headers, params={"period": "90d"}).json()
+
+        assert served["freshness"] is None
+
+    def test_lease_is_renewed_during_each_bundle(self, precomputed):
+        """O lease é renovado a cada etapa dos relatórios, não só entre organizações."""
+        renewals = []
+        with SessionLocal() as db:
+            report_precompute_service.precompute_organization(db, 1, renew_lease=lambda: renewals.append(True))
+
+        assert len(renewals) > len(constants.REPORT_PRECOMPUTE_DAYS)
@@ -0,0 +1,221 @@
+"""
+Testes dos endpoints de relatórios.
+"""
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app import constants
+
+
+class TestReportBundle:
+    """Testes do endpoint /reports/bundle."""
+
+    @pytest.mark.parametrize("section", ["overview", "abc", "xyz", "turnover", "financial", "forecast"])
+    def test_sections_match_standalone_reports(self, client, auth_headers, section):
+        """Cada seção do pacote deve ser igual ao relatório avulso da mesma janela."""
+        params = {"period": "30d"}
+        bundle = client.get("/reports/bundle", headers=auth_headers, params=params)
+        standalone = client.get(f"/reports/{section}", headers=auth_headers, params=params)
+
+        assert bundle.status_code == 200
+        assert standalone.status_code == 200
+        assert bundle.json()[section] == standalone.json()
+
+    def test_only_requested_sections_are_built(self, client, auth_headers):
+        """Seções não solicitadas voltam nulas."""
+        response = client.get(
+            "/reports/bundle", headers=auth_headers, params={"sections": "abc, forecast", "period": "7d"}
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["abc"] is not None
+        assert body["forecast"] is not None
+        assert body["overview"] is None
+        assert body["xyz"] is None
+
+    def test_unknown_section_is_rejected(self, client, auth_headers):
+        """Uma seção desconhecida retorna 400."""
+        response = client.get("/reports/bundle", headers=auth_headers, params={"sections": "abc,vendas"})
+
+        assert response.status_code == 400
+        assert "vendas" in response.json()["detail"]
+
+
+class TestStockOverview:
+    """Testes do endpoint /reports/overview."""
+
+    @pytest.mark.parametrize("kind", ["low_stock", "out_of_stock"])
+    def test_lists_are_paginated_with_total_counts(self, client, auth_headers, sample_product_data, kind):
+        """As páginas seguem o cursor sem repetir produtos e somam o total informado."""
+        for quantity in (0, 0, 1):
+            payload = {**sample_product_data, "sku": f"OVW-{uuid.uuid4().hex[:8].upper()}", "quantity": quantity}
+            assert client.post("/products/", headers=auth_headers, json=payload).status_code == 201
+
+        ids, cursor, total = [], None, None
+        while True:
+            params = {"limit": 2, f"{kind}_cursor": cursor} if cursor else {"limit": 2}
+            body = client.get("/reports/overview", headers=auth_headers, params=params).json()
+            total = body[f"{kind}_count"]
+            page = body[f"{kind}_products"]
+            assert len(page) <= 2
+            ids.extend(product["id"] for product in page)
+            if kind == "out_of_stock":
+                assert all(product["quantity"] == 0 for product in page)
+            else:
+                assert all(product["quantity"] <= product["alert_level"] for product in page)
+            cursor = body[f"{kind}_next_cursor"]
+            if cursor is None:
+                break
+
+        assert total >= 2
+        assert len(ids) == total
+        assert ids == sorted(set(ids))
+
+
+class TestReportItemSelection:
+    """Ordenação, filtros e paginação dos itens dos relatórios analíticos."""
+
+    def test_top_n_matches_full_sort(self, client, auth_headers):
+        """Os N primeiros da classe A coincidem com a ordenação completa do relatório."""
+        full = client.get("/reports/abc", headers=auth_headers, params={"period": "365d"}).json()
+        expected = sorted(
+            (item for item in full["items"] if item["classification"] == "A"),
+            key=lambda item: (-item["value"], item["product_id"]),
+        )
+
+        top = client.get(
+            "/reports/abc",
+            headers=auth_headers,
+            params={"period": "365d", "classification": "a", "sort": "-value", "limit": 2},
+        ).json()
+
+        assert top["items"] == expected[:2]
+        assert top["total_items"] == len(expected)
+        assert (top["next_cursor"] is not None) == (len(expected) > 2)
+
+    @pytest.mark.parametrize("report,sort", [("turnover", "-turnover_rate"), ("forecast", "days_until_stockout")])
+    def test_cursor_pages_cover_all_items(self, client, auth_headers, report, sort):
+        """Seguindo o cursor, as páginas trazem todos os itens uma única vez e na ordem pedida."""
+        full = client.get(f"/reports/{report}", headers=auth_headers, params={"period": "365d"}).json()
+        field, descending = sort.lstrip("-"), sort.startswith("-")
+
+        items, cursor = [], None
+        while True:
+            params = {"period": "365d", "sort": sort, "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            body = client.get(f"/reports/{report}", headers=auth_headers, params=params).json()
+            items.extend(body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = sorted(
+            full["items"],
+            key=lambda item: (-item[field] if descending else item[field], item["product_id"]),
+        )
+        assert items == expected
+        assert body["total_items"] == len(full["items"])
+
+    def test_without_parameters_report_is_unchanged(self, client, auth_headers):
+        """Sem parâmetros de seleção a resposta mantém todos os itens na ordem original."""
+        body = client.get("/reports/xyz", headers=auth_headers, params={"period": "90d"}).json()
+
+        assert body["total_items"] is None
+        assert body["next_cursor"] is None
+
+    @pytest.mark.parametrize(
+        "report,params",
+        [
+            ("abc", {"sort": "preco"}),
+            ("xyz", {"classification": "A"}),
+            ("turnover", {"status": "OK", "limit": 1, "cursor": "invalido"}),
+            ("forecast", {"status": "URGENTE"}),
+        ],
+    )
+    def test_invalid_selection_is_rejected(self, client, auth_headers, report, params):
+        """Campo de ordenação, filtro ou cursor inválidos resultam em 400."""
+        response = client.get(f"/reports/{report}", headers=auth_headers, params={"period": "30d", **params})
+
+        assert response.status_code == 400
+
+    def test_cursor_of_another_sort_is_rejected(self, client, auth_headers):
+        """Um cursor só vale para a ordenação com que foi gerado."""
+        body = client.get(
+            "/reports/abc", headers=auth_headers, params={"period": "365d", "sort": "-value", "limit": 1}
+        ).json()
+        if body["next_cursor"] is None:
+            pytest.skip("Relatório com menos de dois itens")
+
+        response = client.get(
+            "/reports/abc",
+            headers=auth_headers,
+            params={"period": "365d", "sort": "product_id", "limit": 1, "cursor": body["next_cursor"]},
+        )
+
+        assert response.status_code == 400
+
+
+class TestPeriodComparison:
+    """Testes do endpoint /reports/comparison."""
+
+    def test_rolling_periods_chain_and_keep_summary(self, client, auth_headers):
+        """Períodos móveis são contíguos e o resumo compara os dois últimos."""
+        body = client.get(
+            "/reports/comparison", headers=auth_headers, params={"days": 7, "periods": 4}
+        ).json()
+
+        periods = body["periods"]
+        assert len(periods) == 4
+        for previous, current in zip(periods, periods[1:]):
+            assert date.fromisoformat(current["start"]) == date.fromisoformat(previous["end"]) + timedelta(days=1)
+            assert (date.fromisoformat(current["end"]) - date.fromisoformat(current["start"])).days == 6
+        assert periods[0]["change_percent"] is None
+        assert body["current"] == {"movements": periods[-1]["movements"], "quantity": periods[-1]["quantity"]}
+        assert body["previous"] == {"movements": periods[-2]["movements"], "quantity": periods[-2]["quantity"]}
+        assert body["change_percent"] == periods[-1]["change_percent"]
+        assert body["trend"] in ("up", "down", "stable")
+
+    def test_monthly_periods_start_on_first_day(self, client, auth_headers):
+        """Meses começam no dia 1 e o último termina hoje."""
+        body = client.get(
+            "/reports/comparison", headers=auth_headers, params={"granularity": "month", "periods": 3}
+        ).json()
+
+        assert all(period["start"].endswith("-01") for period in body["periods"])
+        assert body["periods"][-1]["end"] == datetime.utcnow().date().isoformat()
+
+    @pytest.mark.parametrize("breakdown", ["product", "category"])
+    def test_breakdown_adds_up_to_period_totals(self, client, auth_headers, breakdown):
+        """A soma das quantidades por produto ou categoria é igual ao total de cada período."""
+        body = client.get(
+            "/reports/comparison",
+            headers=auth_headers,
+            params={"granularity": "week", "periods": 6, "breakdown": breakdown, "limit": constants.MAX_PAGE_SIZE},
+        ).json()
+
+        rows = body["breakdown"]
+        assert len(rows) < constants.MAX_PAGE_SIZE
+        for index, period in enumerate(body["periods"]):
+            assert sum(row["quantities"][index] for row in rows) == period["quantity"]
+        assert all(row["name"] for row in rows)
+        assert [row["quantities"][-1] for row in rows] == sorted((row["quantities"][-1] for row in rows), reverse=True)
+
+    def test_breakdown_limit_keeps_the_top_of_the_current_period(self, client, auth_headers):
+        """Com limit, o detalhamento traz só os produtos de maior quantidade no período atual."""
+        params = {"granularity": "month", "periods": 3, "breakdown": "product"}
+        full = client.get(
+            "/reports/comparison", headers=auth_headers, params={**params, "limit": constants.MAX_PAGE_SIZE}
+        ).json()["breakdown"]
+        top = client.get("/reports/comparison", headers=auth_headers, params={**params, "limit": 2}).json()["breakdown"]
+
+        assert len(full) > 2
+        assert top == full[:2]
+
+    def test_invalid_parameters_are_rejected(self, client, auth_headers):
+        """Granularidade ou quantidade de períodos fora do permitido resultam em 422."""
+        assert client.get("/reports/comparison", headers=auth_headers, params={"granularity": "ano"}).status_code == 422
+        assert client.get("/reports/comparison", headers=auth_headers, params={"periods": 1}).status_code == 422
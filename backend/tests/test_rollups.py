@@ -0,0 +1,174 @@
+"""
+Testes dos rollups diários de movimentações.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.database import engine
+from app.movements.movement_model import Movement, MovementType
+from app.rollups import rollup_service
+from app.rollups.rollup_model import MovementDailyRollup
+
+
+def rollup_rows(db, organization_id):
+    """Estado completo dos rollups de uma organização."""
+    return sorted(
+        (row.product_id, row.day, row.type.value, row.total_qty, row.count)
+        for row in db.scalars(
+            select(MovementDailyRollup).where(MovementDailyRollup.organization_id == organization_id)
+        )
+    )
+
+
+def today_saida(db, organization_id, product_id):
+    db.expire_all()
+    row = db.get(MovementDailyRollup, (organization_id, product_id, datetime.utcnow().date(), MovementType.SAIDA))
+    return (row.total_qty, row.count) if row else (0, 0)
+
+
+class TestRollupMaintenance:
+    """Rollups devem acompanhar cada caminho de escrita."""
+
+    def test_single_movement_updates_rollup(self, client, auth_headers, db, organization_id):
+        """Uma saída deve somar quantidade e contagem no rollup do dia."""
+        product = next(p for p in client.get("/products/", headers=auth_headers).json() if p["quantity"] >= 2)
+        before = today_saida(db, organization_id, product["id"])
+
+        response = client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "saida", "quantity": 2,
+        })
+
+        assert response.status_code == 201
+        assert today_saida(db, organization_id, product["id"]) == (before[0] + 2, before[1] + 1)
+
+    def test_batch_updates_rollup(self, client, auth_headers, db, organization_id):
+        """Linhas do mesmo produto em um lote devem ser agregadas no rollup."""
+        product = client.get("/products/", headers=auth_headers).json()[0]
+        before = today_saida(db, organization_id, product["id"])
+
+        response = client.post("/movements/batch", headers=auth_headers, json={"lines": [
+            {"product_id": product["id"], "type": "entrada", "quantity": 10},
+            {"product_id": product["id"], "type": "saida", "quantity": 3},
+            {"product_id": product["id"], "type": "saida", "quantity": 4},
+        ]})
+
+        assert response.status_code == 201
+        assert today_saida(db, organization_id, product["id"]) == (before[0] + 7, before[1] + 2)
+
+    def test_rebuild_matches_incremental_state(self, client, auth_headers, db, organization_id):
+        """Recalcular a partir do histórico deve reproduzir os rollups incrementais."""
+        incremental = rollup_rows(db, organization_id)
+
+        rollup_service.rebuild_rollups(db, organization_id=organization_id)
+
+        assert rollup_rows(db, organization_id) == incremental
+
+
+class TestRollupReads:
+    """Leituras híbridas (rollups + bordas do histórico) devem bater com o histórico bruto."""
+
+    @pytest.mark.parametrize(
+        "start_offset, end_offset",
+        [
+            pytest.param(timedelta(days=45, hours=5), None, id="inicio-parcial"),
+            pytest.param(timedelta(days=30), timedelta(days=2, hours=7), id="fim-parcial"),
+            pytest.param(timedelta(hours=6), timedelta(hours=1), id="mesmo-dia"),
+        ],
+    )
+    def test_outbound_by_product_matches_ledger(self, db, organization_id, start_offset, end_offset):
+        """Totais por produto devem ser iguais à soma direta das movimentações."""
+        now = datetime.utcnow()
+        start = now - start_offset
+        end = now - end_offset if end_offset else None
+
+        query = select(Movement.product_id, func.sum(Movement.quantity)).where(
+            Movement.organization_id == organization_id,
+            Movement.type == MovementType.SAIDA,
+            Movement.created_at >= start,
+            Movement.created_at <= (end or now),
+        )
+        expected = dict(db.execute(query.group_by(Movement.product_id)).all())
+
+        assert rollup_service.outbound_by_product(db, organization_id, start, end) == expected
+
+    def test_day_aligned_window_reads_only_rollups(self, db, organization_id):
+        """Janela alinhada ao dia não deve consultar a tabela de movimentações."""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            rollup_service.outbound_by_product(db, organization_id, today - timedelta(days=30), today, end_inclusive=False)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert statements
+        assert not any("FROM movements" in statement for statement in statements)
+
+    def test_weekly_buckets_match_daily_totals(self, db, organization_id):
+        """Semanas agrupadas no banco devem somar os mesmos totais diários."""
+        now = datetime.utcnow()
+        start = now - timedelta(weeks=6, hours=3)
+        # The seed also dates movements ahead of now; an anchor before the
+        # end puts them in negative weeks.
+        end = now + timedelta(days=10)
+        anchor = now.date()
+
+        expected = {}
+        for product_id, days in rollup_service.outbound_by_product_day(db, organization_id, start, end).items():
+            for day, quantity in days.items():
+                week = (anchor - day).days // 7
+                expected.setdefault(product_id, {}).setdefault(week, 0)
+                expected[product_id][week] += quantity
+
+        assert rollup_service.outbound_by_product_week(db, organization_id, start, end, anchor=anchor) == expected
+
+    def test_open_window_stops_at_now(self, db, organization_id):
+        """Sem fim explícito, a janela vai até agora e ignora movimentações datadas no futuro."""
+        now = datetime.utcnow()
+        start = now - timedelta(days=20)
+
+        open_window = rollup_service.outbound_by_product(db, organization_id, start)
+        up_to_now = rollup_service.outbound_by_product(db, organization_id, start, datetime.utcnow())
+
+        assert open_window == up_to_now
+
+    def test_period_buckets_match_daily_totals(self, db, organization_id):
+        """Períodos agrupados em uma única consulta somam os mesmos totais diários, sem ler o histórico."""
+        today = datetime.utcnow().date()
+        starts = [today - timedelta(days=40), today - timedelta(days=25), today - timedelta(days=3)]
+        end = today + timedelta(days=1)
+
+        expected = {}
+        daily = rollup_service.outbound_by_day(
+            db,
+            organization_id,
+            datetime.combine(starts[0], datetime.min.time()),
+            datetime.combine(end, datetime.min.time()),
+            end_inclusive=False,
+        )
+        for day, (quantity, count) in daily.items():
+            period = max(index for index, start in enumerate(starts) if start <= day)
+            total = expected.setdefault((period,), [0, 0])
+            total[0] += quantity
+            total[1] += count
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            totals = rollup_service.outbound_by_period(db, organization_id, starts, end)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert totals == {key: tuple(value) for key, value in expected.items()}
+        assert len(statements) == 1
+        assert "FROM movements" not in statements[0]
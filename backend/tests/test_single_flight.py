@@ -0,0 +1,135 @@
+"""
+Testes da coalescência de chamadas idênticas simultâneas (single-flight).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.exceptions import ValidationException
+from app.utils import single_flight
+
+CALLERS = 8
+
+
+def run_concurrently(flights, key, fn):
+    """Dispara CALLERS chamadas de flights.do(key, fn) ao mesmo tempo e devolve os resultados."""
+    def call():
+        try:
+            return flights.do(key, fn)
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        return list(pool.map(lambda _: call(), range(CALLERS)))
+
+
+def blocking(result_or_error, started, release):
+    """Função que sinaliza o início e só termina quando liberada."""
+    def fn():
+        started.set()
+        assert release.wait(5)
+        if isinstance(result_or_error, Exception):
+            raise result_or_error
+        return result_or_error
+    return fn
+
+
+def release_when_all_waiting(flights, started, release):
+    """Libera a execução em andamento assim que todos os outros chamadores estiverem esperando."""
+    def watch():
+        assert started.wait(5)
+        while flights.shared < CALLERS - 1:
+            time.sleep(0.01)
+        release.set()
+    threading.Thread(target=watch).start()
+
+
+class TestSingleFlight:
+    """Chamadas simultâneas com a mesma chave compartilham uma única execução."""
+
+    def test_concurrent_callers_share_one_execution(self):
+        """Só o primeiro chamador executa; os demais recebem o mesmo objeto."""
+        flights = single_flight.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        result = {"items": [1, 2, 3]}
+        fn = blocking(result, started, release)
+
+        release_when_all_waiting(flights, started, release)
+        results = run_concurrently(flights, "abc", fn)
+
+        assert all(item is result for item in results)
+        assert flights.executed == 1
+        assert flights.shared == CALLERS - 1
+        assert flights.in_flight() == 0
+
+    def test_error_is_raised_to_every_waiter(self):
+        """Uma falha na execução chega a todos os chamadores e a chave é liberada."""
+        flights = single_flight.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        fn = blocking(ValueError("falhou"), started, release)
+
+        release_when_all_waiting(flights, started, release)
+        results = run_concurrently(flights, "abc", fn)
+
+        assert all(isinstance(item, ValueError) for item in results)
+        assert flights.do("abc", lambda: "ok") == "ok"
+
+    def test_each_waiter_gets_its_own_exception(self):
+        """Os que esperam recebem cópias distintas da exceção, com o mesmo tipo e atributos."""
+        flights = single_flight.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        error = ValidationException("falhou")
+        fn = blocking(error, started, release)
+
+        release_when_all_waiting(flights, started, release)
+        results = run_concurrently(flights, "abc", fn)
+
+        assert sum(item is error for item in results) == 1
+        copies = [item for item in results if item is not error]
+        assert len({id(item) for item in copies}) == CALLERS - 1
+        assert all(isinstance(item, ValidationException) for item in copies)
+        assert all(item.detail == "falhou" and item.status_code == 400 for item in copies)
+        assert all(item.__cause__ is error for item in copies)
+
+    def test_waiter_computes_on_its_own_after_the_timeout(self):
+        """Quem espera além do limite calcula o resultado por conta própria."""
+        flights = single_flight.SingleFlight(wait_timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+        leader = threading.Thread(target=flights.do, args=("abc", blocking("lento", started, release)))
+        leader.start()
+        assert started.wait(5)
+
+        try:
+            assert flights.do("abc", lambda: "local") == "local"
+        finally:
+            release.set()
+            leader.join(5)
+
+        assert flights.timed_out == 1
+        assert flights.executed == 1
+        assert flights.in_flight() == 0
+
+    def test_sequential_calls_are_not_shared(self):
+        """Sem chamada em andamento, cada chamada executa de novo (não é um cache)."""
+        flights = single_flight.SingleFlight()
+        calls = []
+
+        for _ in range(3):
+            flights.do("abc", lambda: calls.append(1))
+
+        assert len(calls) == 3
+        assert flights.shared == 0
+
+    @pytest.mark.parametrize("other", [
+        (2, "reports.abc", {"start": "2026-01-01"}),
+        (1, "reports.xyz", {"start": "2026-01-01"}),
+        (1, "reports.abc", {"start": "2026-02-01"}),
+    ])
+    def test_key_separates_organization_endpoint_and_params(self, other):
+        """A chave distingue organização, endpoint e parâmetros, mas não a ordem dos parâmetros."""
+        key = single_flight.flight_key(1, "reports.abc", {"start": "2026-01-01", "end": "2026-01-31"})
+
+        assert key == single_flight.flight_key(1, "reports.abc", {"end": "2026-01-31", "start": "2026-01-01"})
+        assert key != single_flight.flight_key(*other)
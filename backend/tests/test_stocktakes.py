@@ -0,0 +1,131 @@
+"""
+Testes do inventário (contagem em massa e ajustes de estoque).
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def products(client, auth_headers, sample_product_data):
+    """Três produtos novos com 10 unidades cada."""
+    created = []
+    for _ in range(3):
+        payload = {**sample_product_data, "sku": f"INV-{uuid.uuid4().hex[:8].upper()}"}
+        response = client.post("/products/", headers=auth_headers, json=payload)
+        assert response.status_code == 201
+        created.append(response.json())
+    return created
+
+
+def quantity_of(client, auth_headers, product_id):
+    return client.get(f"/products/{product_id}", headers=auth_headers).json()["quantity"]
+
+
+class TestStocktakes:
+    """Testes do endpoint /stocktakes."""
+
+    def test_json_stocktake_posts_adjustments(self, client, auth_headers, products):
+        """A contagem gera uma entrada ou saída apenas para os produtos divergentes."""
+        surplus, shortage, exact = products
+        response = client.post("/stocktakes/", headers=auth_headers, json={"note": "Mensal", "lines": [
+            {"product_id": surplus["id"], "counted_quantity": 13},
+            {"sku": shortage["sku"], "counted_quantity": 6},
+            {"sku": shortage["sku"], "counted_quantity": 2},
+            {"product_id": exact["id"], "counted_quantity": 10},
+        ]})
+
+        assert response.status_code == 201
+        body = response.json()
+        assert body["line_count"] == 3
+        assert body["adjusted_count"] == 2
+        assert body["units_added"] == 3
+        assert body["units_removed"] == 2
+        assert {item["product_id"]: item["variance"] for item in body["variances"]} == {
+            surplus["id"]: 3,
+            shortage["id"]: -2,
+        }
+        assert quantity_of(client, auth_headers, surplus["id"]) == 13
+        assert quantity_of(client, auth_headers, shortage["id"]) == 8
+        assert quantity_of(client, auth_headers, exact["id"]) == 10
+
+        movements = client.get(
+            "/movements/filter", headers=auth_headers, params={"product_id": surplus["id"]}
+        ).json()
+        assert movements[0]["batch_id"] == body["batch_id"]
+        assert movements[0]["reason"] == "stocktake"
+
+        detail = client.get(f"/stocktakes/{body['id']}", headers=auth_headers)
+        assert detail.status_code == 200
+        assert detail.json()["variances"] == body["variances"]
+
+    def test_movements_after_count_are_not_variance(self, client, auth_headers, products):
+        """Movimentações feitas durante a contagem são descontadas, não ajustadas."""
+        product = products[0]
+        counted_at = datetime.utcnow() - timedelta(seconds=1)
+        client.post("/movements/", headers=auth_headers, json={
+            "product_id": product["id"], "type": "saida", "quantity": 4,
+        })
+
+        response = client.post("/stocktakes/", headers=auth_headers, json={
+            "counted_at": counted_at.isoformat(),
+            "lines": [{"product_id": product["id"], "counted_quantity": 10}],
+        })
+
+        assert response.status_code == 201
+        assert response.json()["adjusted_count"] == 0
+        assert quantity_of(client, auth_headers, product["id"]) == 6
+
+    def test_csv_upload(self, client, auth_headers, products):
+        """O inventário também pode ser enviado como CSV."""
+        content = "sku,counted_quantity\n" + "".join(f"{p['sku']},7\n" for p in products)
+
+        response = client.post(
+            "/stocktakes/csv",
+            headers=auth_headers,
+            files={"file": ("contagem.csv", content.encode(), "text/csv")},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["units_removed"] == 9
+        assert all(quantity_of(client, auth_headers, p["id"]) == 7 for p in products)
+
+    def test_csv_retry_with_same_key_is_applied_once(self, client, auth_headers, products):
+        """Reenviar o mesmo CSV com a mesma chave devolve o inventário original sem ajustar de novo."""
+        headers = {**auth_headers, "Idempotency-Key": f"csv-{uuid.uuid4()}"}
+        content = f"sku,counted_quantity\n{products[0]['sku']},4\n".encode()
+
+        first = client.post("/stocktakes/csv", headers=headers, files={"file": ("a.csv", content, "text/csv")})
+        second = client.post("/stocktakes/csv", headers=headers, files={"file": ("b.csv", content, "text/csv")})
+
+        assert first.status_code == second.status_code == 201
+        assert second.json()["id"] == first.json()["id"]
+        latest = client.get("/stocktakes/", headers=auth_headers, params={"limit": 1}).json()
+        assert latest[0]["id"] == first.json()["id"]
+        assert quantity_of(client, auth_headers, products[0]["id"]) == 4
+
+    def test_csv_key_reused_with_other_content_is_rejected(self, client, auth_headers, products):
+        """A mesma chave com outro conteúdo de arquivo é recusada."""
+        headers = {**auth_headers, "Idempotency-Key": f"csv-{uuid.uuid4()}"}
+        sku = products[0]["sku"]
+
+        client.post("/stocktakes/csv", headers=headers, files={
+            "file": ("a.csv", f"sku,counted_quantity\n{sku},4\n".encode(), "text/csv"),
+        })
+        response = client.post("/stocktakes/csv", headers=headers, files={
+            "file": ("a.csv", f"sku,counted_quantity\n{sku},5\n".encode(), "text/csv"),
+        })
+
+        assert response.status_code == 422
+        assert quantity_of(client, auth_headers, products[0]["id"]) == 4
+
+    def test_unknown_product_rejects_whole_stocktake(self, client, auth_headers, products):
+        """Um SKU desconhecido rejeita o inventário inteiro."""
+        response = client.post("/stocktakes/", headers=auth_headers, json={"lines": [
+            {"product_id": products[0]["id"], "counted_quantity": 1},
+            {"sku": "NAO-EXISTE-123", "counted_quantity": 1},
+        ]})
+
+        assert response.status_code == 404
+        assert quantity_of(client, auth_headers, products[0]["id"]) == 10
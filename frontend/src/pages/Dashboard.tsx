@@ -78,7 +78,7 @@ export default function Dashboard() {
         },
         {
             title: 'Produtos em Falta',
-            value: overview?.out_of_stock_products.length || 0,
+            value: overview?.out_of_stock_count || 0,
             icon: TrendingDown,
             color: 'text-red-600',
             bgColor: 'bg-red-100',
@@ -87,7 +87,7 @@ export default function Dashboard() {
         },
         {
             title: 'Estoque Baixo',
-            value: overview?.low_stock_products.length || 0,
+            value: overview?.low_stock_count || 0,
             icon: AlertTriangle,
             color: 'text-amber-600 dark:text-amber-300',
             bgColor: 'bg-amber-100 dark:bg-amber-900/40',
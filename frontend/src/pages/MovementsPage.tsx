@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useCallback, useEffect, useMemo, useState } from 'react';
 import { formatDateTime, formatNumber } from '@/utils/formatters';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -28,7 +28,7 @@ import {
     SelectTrigger,
     SelectValue,
 } from '@/components/ui/select';
-import { movementService, type MovementCreate } from '@/services/movementService';
+import { movementService, type MovementCreate, type MovementFilters } from '@/services/movementService';
 import { productService } from '@/services/productService';
 import type { Movement, Product } from '@/types';
 import { exportToPDF, exportToCSV } from '@/utils/export';
@@ -48,7 +48,6 @@ import {
     Pagination,
     PaginationContent,
     PaginationItem,
-    PaginationLink,
     PaginationNext,
     PaginationPrevious,
 } from '@/components/ui/pagination';
@@ -59,11 +58,14 @@ export default function MovementsPage() {
     const { canCreate, canExport } = usePermissions();
     const [movements, setMovements] = useState<Movement[]>([]);
     const [products, setProducts] = useState<Product[]>([]);
-    const [searchTerm, setSearchTerm] = useState('');
+    const [productFilter, setProductFilter] = useState<string>('all');
     const [typeFilter, setTypeFilter] = useState<string>('all');
-    const [currentPage, setCurrentPage] = useState(1);
     const [itemsPerPage, setItemsPerPage] = useState<number>(10);
+    // Cursor de cada página já visitada (o da primeira é undefined), para voltar
+    const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
+    const [nextCursor, setNextCursor] = useState<string | undefined>();
     const [loading, setLoading] = useState(true);
+    const [pageLoading, setPageLoading] = useState(false);
     const [dialogOpen, setDialogOpen] = useState(false);
     const [isSaving, setIsSaving] = useState(false);
     const [formData, setFormData] = useState<MovementCreate>({
@@ -74,43 +76,47 @@ export default function MovementsPage() {
         note: ''
     });
 
+    const filters = useMemo<MovementFilters>(() => ({
+        type: typeFilter === 'all' ? undefined : (typeFilter as MovementFilters['type']),
+        product_id: productFilter === 'all' ? undefined : parseInt(productFilter),
+    }), [typeFilter, productFilter]);
+    const hasFilters = filters.type !== undefined || filters.product_id !== undefined;
+    const page = cursors.length;
+
     useEffect(() => {
-        loadData();
+        productService.getProducts()
+            .then(setProducts)
+            .catch((error) => console.error('Erro ao carregar produtos:', error));
     }, []);
 
-    const loadData = async () => {
+    const loadPage = useCallback(async (pageCursors: (string | undefined)[]) => {
         try {
-            setLoading(true);
-            const [movementsData, productsData] = await Promise.all([
-                movementService.getMovements(),
-                productService.getProducts()
-            ]);
-            setMovements(movementsData);
-            setProducts(productsData);
-            setCurrentPage(1);
+            setPageLoading(true);
+            const result = await movementService.getPage(filters, itemsPerPage, pageCursors[pageCursors.length - 1]);
+            setMovements(result.items);
+            setNextCursor(result.nextCursor);
+            setCursors(pageCursors);
         } catch (error) {
-            console.error('Erro ao carregar dados:', error);
-            toast.error('Erro ao carregar dados');
+            console.error('Erro ao carregar movimentações:', error);
+            toast.error('Erro ao carregar movimentações');
         } finally {
+            setPageLoading(false);
             setLoading(false);
         }
-    };
+    }, [filters, itemsPerPage]);
 
-    const sortedMovements = [...movements].sort(
-        (a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-    );
+    // Filtros e tamanho da página são aplicados no backend; mudar um deles volta à primeira página.
+    useEffect(() => {
+        loadPage([undefined]);
+    }, [loadPage]);
 
-    const filteredMovements = sortedMovements.filter((m) => {
-        const matchesSearch = m.product.name.toLowerCase().includes(searchTerm.toLowerCase());
-        const matchesType = typeFilter === 'all' || m.type === typeFilter;
-        return matchesSearch && matchesType;
-    });
+    const goToNextPage = () => {
+        if (nextCursor) loadPage([...cursors, nextCursor]);
+    };
 
-    const totalPages = Math.max(1, Math.ceil(filteredMovements.length / itemsPerPage));
-    const page = Math.min(currentPage, totalPages);
-    const startIndex = (page - 1) * itemsPerPage;
-    const endIndex = startIndex + itemsPerPage;
-    const paginatedMovements = filteredMovements.slice(startIndex, endIndex);
+    const goToPreviousPage = () => {
+        if (cursors.length > 1) loadPage(cursors.slice(0, -1));
+    };
 
     const handleSave = async () => {
         try {
@@ -119,7 +125,7 @@ export default function MovementsPage() {
             toast.success('Movimentação registrada com sucesso!');
             setDialogOpen(false);
             resetForm();
-            await loadData();
+            await loadPage([undefined]);
         } catch (error: any) {
             console.error('Erro ao salvar movimentação:', error);
             const message = error?.response?.data?.detail || 'Erro ao salvar movimentação';
@@ -141,7 +147,7 @@ export default function MovementsPage() {
 
     const handleExportPDF = () => {
         const headers = ['Data', 'Produto', 'Tipo', 'Qtd', 'Motivo', 'Usuário'];
-        const data = filteredMovements.map(m => [
+        const toRows = (all: Movement[]) => all.map(m => [
             formatDateTime(m.created_at),
             m.product.name,
             m.type === 'entrada' ? 'Entrada' : 'Saída',
@@ -150,8 +156,11 @@ export default function MovementsPage() {
             m.created_by?.full_name || 'Sistema'
         ]);
 
+        // A exportação cobre todas as movimentações dos filtros atuais, não só a página.
         toast.promise(
-            Promise.resolve(exportToPDF('Relatório de Movimentações', headers, data, 'movimentacoes')),
+            movementService.getAll(filters).then((all) =>
+                exportToPDF('Relatório de Movimentações', headers, toRows(all), 'movimentacoes')
+            ),
             {
                 loading: '📝 Gerando PDF...',
                 success: '📄 movimentacoes.pdf exportado com sucesso!',
@@ -161,7 +170,7 @@ export default function MovementsPage() {
     };
 
     const handleExportCSV = () => {
-        const data = filteredMovements.map(m => ({
+        const toRows = (all: Movement[]) => all.map(m => ({
             'Data': formatDateTime(m.created_at),
             'Produto': m.product.name,
             'Tipo': m.type === 'entrada' ? 'Entrada' : 'Saída',
@@ -171,7 +180,7 @@ export default function MovementsPage() {
         }));
 
         toast.promise(
-            Promise.resolve(exportToCSV(data, 'movimentacoes')),
+            movementService.getAll(filters).then((all) => exportToCSV(toRows(all), 'movimentacoes')),
             {
                 loading: '🗂️ Gerando CSV...',
                 success: '📈 movimentacoes.csv exportado com sucesso!',
@@ -244,15 +253,19 @@ export default function MovementsPage() {
                 <CardHeader>
                     <CardTitle>Histórico de Movimentações</CardTitle>
                     <div className="flex items-center gap-4 mt-4">
-                        <div className="relative flex-1">
-                            <Search className="absolute left-3 top-1/2 -translate-y-1/2 w-4 h-4 text-slate-400" />
-                            <Input
-                                placeholder="Buscar por produto..."
-                                value={searchTerm}
-                                onChange={(e) => setSearchTerm(e.target.value)}
-                                className="pl-9"
-                            />
-                        </div>
+                        <Select value={productFilter} onValueChange={setProductFilter}>
+                            <SelectTrigger className="flex-1">
+                                <SelectValue placeholder="Produto" />
+                            </SelectTrigger>
+                            <SelectContent>
+                                <SelectItem value="all">Todos os produtos</SelectItem>
+                                {products.map((product) => (
+                                    <SelectItem key={product.id} value={product.id.toString()}>
+                                        {product.name}
+                                    </SelectItem>
+                                ))}
+                            </SelectContent>
+                        </Select>
                         <Select value={typeFilter} onValueChange={setTypeFilter}>
                             <SelectTrigger className="w-[180px]">
                                 <SelectValue placeholder="Tipo" />
@@ -265,11 +278,7 @@ export default function MovementsPage() {
                         </Select>
                         <Select
                             value={itemsPerPage.toString()}
-                            onValueChange={(val) => {
-                                const num = val === 'all' ? filteredMovements.length || 10 : parseInt(val);
-                                setItemsPerPage(num);
-                                setCurrentPage(1);
-                            }}
+                            onValueChange={(val) => setItemsPerPage(parseInt(val))}
                         >
                             <SelectTrigger className="w-[140px]">
                                 <SelectValue placeholder="Itens por página" />
@@ -278,7 +287,6 @@ export default function MovementsPage() {
                                 <SelectItem value="10">10 por página</SelectItem>
                                 <SelectItem value="25">25 por página</SelectItem>
                                 <SelectItem value="50">50 por página</SelectItem>
-                                <SelectItem value="all">Todos</SelectItem>
                             </SelectContent>
                         </Select>
                     </div>
@@ -296,10 +304,10 @@ export default function MovementsPage() {
                             </TableRow>
                         </TableHeader>
                         <TableBody>
-                            {paginatedMovements.length === 0 ? (
+                            {movements.length === 0 ? (
                                 <TableRow>
                                     <TableCell colSpan={6} className="p-0">
-                                        {movements.length === 0 ? (
+                                        {!hasFilters && page === 1 ? (
                                             <EmptyState
                                                 icon={TrendingUp}
                                                 title="Nenhuma movimentação registrada"
@@ -320,7 +328,7 @@ export default function MovementsPage() {
                                     </TableCell>
                                 </TableRow>
                             ) : (
-                                paginatedMovements.map((movement) => (
+                                movements.map((movement) => (
                                     <TableRow key={movement.id}>
                                         <TableCell className="font-mono text-sm">
                                             {formatDateTime(movement.created_at)}
@@ -347,41 +355,24 @@ export default function MovementsPage() {
                             )}
                         </TableBody>
                     </Table>
-                    {filteredMovements.length > itemsPerPage && (
+                    {(page > 1 || nextCursor) && (
                         <div className="flex items-center justify-between px-2 py-4">
-                            <div className="text-sm text-muted-foreground">
-                                Mostrando {startIndex + 1} a {Math.min(endIndex, filteredMovements.length)} de {filteredMovements.length} movimentações
+                            <div className="text-sm text-muted-foreground flex items-center gap-2">
+                                {pageLoading && <Loader2 className="w-4 h-4 animate-spin" />}
+                                Página {page}
                             </div>
                             <Pagination>
                                 <PaginationContent>
                                     <PaginationItem>
                                         <PaginationPrevious
-                                            onClick={() => setCurrentPage(prev => Math.max(prev - 1, 1))}
-                                            className={page === 1 ? 'pointer-events-none opacity-50' : 'cursor-pointer'}
+                                            onClick={goToPreviousPage}
+                                            className={page === 1 || pageLoading ? 'pointer-events-none opacity-50' : 'cursor-pointer'}
                                         />
                                     </PaginationItem>
-                                    {Array.from({ length: Math.min(totalPages, 5) }, (_, i) => {
-                                        let pageNum = i + 1;
-                                        if (totalPages > 5) {
-                                            if (page > 3) pageNum = page - 2 + i;
-                                            if (page > totalPages - 2) pageNum = totalPages - 4 + i;
-                                        }
-                                        return (
-                                            <PaginationItem key={pageNum}>
-                                                <PaginationLink
-                                                    onClick={() => setCurrentPage(pageNum)}
-                                                    isActive={page === pageNum}
-                                                    className="cursor-pointer"
-                                                >
-                                                    {pageNum}
-                                                </PaginationLink>
-                                            </PaginationItem>
-                                        );
-                                    })}
                                     <PaginationItem>
                                         <PaginationNext
-                                            onClick={() => setCurrentPage(prev => Math.min(prev + 1, totalPages))}
-                                            className={page === totalPages ? 'pointer-events-none opacity-50' : 'cursor-pointer'}
+                                            onClick={goToNextPage}
+                                            className={!nextCursor || pageLoading ? 'pointer-events-none opacity-50' : 'cursor-pointer'}
                                         />
                                     </PaginationItem>
                                 </PaginationContent>
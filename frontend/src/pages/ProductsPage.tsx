@@ -192,7 +192,7 @@ export default function ProductsPage() {
 
         try {
             if (editingProduct) {
-                await productService.update(editingProduct.id, payload);
+                await productService.update(editingProduct.id, payload, editingProduct.version);
             } else {
                 await productService.create(payload as any);
             }
@@ -57,18 +57,12 @@ export default function ReportsPage() {
     const load = async () => {
       setLoading(true);
       try {
-        const [fin, abcData, xyzData, turnoverData, forecastData] = await Promise.all([
-          reportService.getFinancial(),
-          reportService.getABC(),
-          reportService.getXYZ(),
-          reportService.getTurnover(),
-          reportService.getForecast(),
-        ]);
-        setFinancial(fin);
-        setAbc(abcData.items || []);
-        setXyz(xyzData.items || []);
-        setTurnover(turnoverData.items || []);
-        setForecast(forecastData.items || []);
+        const bundle = await reportService.getBundle(["financial", "abc", "xyz", "turnover", "forecast"]);
+        setFinancial(bundle.financial);
+        setAbc(bundle.abc?.items || []);
+        setXyz(bundle.xyz?.items || []);
+        setTurnover(bundle.turnover?.items || []);
+        setForecast(bundle.forecast?.items || []);
       } catch (error) {
         console.error("Erro ao carregar relatórios", error);
       } finally {
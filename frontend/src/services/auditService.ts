@@ -4,7 +4,7 @@ import type { AuditLog } from '@/types';
 interface AuditFilters {
     user_id?: number;
     action?: 'create' | 'update' | 'delete';
-    entity_type?: 'product' | 'movement' | 'category' | 'user';
+    entity_type?: 'product' | 'movement' | 'category' | 'user' | 'stocktake';
     start_date?: string;
     end_date?: string;
     limit?: number;
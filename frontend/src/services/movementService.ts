@@ -9,20 +9,51 @@ export interface MovementCreate {
     note?: string;
 }
 
+export interface MovementFilters {
+    type?: 'entrada' | 'saida';
+    product_id?: number;
+    start_date?: string;
+    end_date?: string;
+}
+
+export interface MovementPage {
+    items: Movement[];
+    // Valor de X-Next-Cursor; ausente na última página
+    nextCursor?: string;
+}
+
+// Maior página aceita por GET /movements/filter (MOVEMENT_MAX_PAGE_SIZE no backend)
+const MOVEMENT_PAGE_LIMIT = 500;
+
 export const movementService = {
-    async getAll(): Promise<Movement[]> {
+    // Uma página do histórico, mais recentes primeiro; os filtros são aplicados
+    // no backend, então só a página pedida é transferida.
+    async getPage(filters: MovementFilters = {}, limit: number = 50, cursor?: string): Promise<MovementPage> {
         try {
-            const response = await api.get('/movements');
-            return response.data;
+            const response = await api.get('/movements/filter', {
+                params: { ...filters, limit, cursor },
+            });
+            return {
+                items: response.data,
+                nextCursor: response.headers['x-next-cursor'] || undefined,
+            };
         } catch (error) {
             console.error('Error fetching movements:', error);
             throw error;
         }
     },
 
-    // Alias para compatibilidade com páginas
-    async getMovements(): Promise<Movement[]> {
-        return this.getAll();
+    // Todas as movimentações que atendem aos filtros, seguindo o cursor.
+    // Só para ações explícitas, como exportar; a tela usa getPage.
+    async getAll(filters: MovementFilters = {}): Promise<Movement[]> {
+        const movements: Movement[] = [];
+        let cursor: string | undefined;
+        do {
+            const page = await this.getPage(filters, MOVEMENT_PAGE_LIMIT, cursor);
+            movements.push(...page.items);
+            cursor = page.nextCursor;
+        } while (cursor);
+        return movements;
     },
 
     async getRecent(limit: number = 50): Promise<Movement[]> {
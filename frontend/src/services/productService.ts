@@ -27,7 +27,7 @@ export const productService = {
         }
     },
 
-    async create(product: Omit<Product, 'id' | 'category'>): Promise<Product> {
+    async create(product: Omit<Product, 'id' | 'category' | 'version'>): Promise<Product> {
         try {
             const response = await api.post('/products', product);
             return response.data;
@@ -37,9 +37,15 @@ export const productService = {
         }
     },
 
-    async update(id: number, product: Partial<Omit<Product, 'id' | 'category'>>): Promise<Product> {
+    async update(
+        id: number,
+        product: Partial<Omit<Product, 'id' | 'category' | 'version'>>,
+        version?: number,
+    ): Promise<Product> {
         try {
-            const response = await api.put(`/products/${id}`, product);
+            // If-Match makes the API reject the edit (412) when someone else saved first.
+            const headers = version !== undefined ? { 'If-Match': `"${version}"` } : undefined;
+            const response = await api.put(`/products/${id}`, product, { headers });
             return response.data;
         } catch (error) {
             console.error(`Error updating product ${id}:`, error);
@@ -3,8 +3,12 @@ import api from './api';
 export interface StockOverview {
     total_products: number;
     total_stock_value: number;
+    low_stock_count: number;
+    out_of_stock_count: number;
     low_stock_products: any[];
     out_of_stock_products: any[];
+    low_stock_next_cursor: number | null;
+    out_of_stock_next_cursor: number | null;
 }
 
 export interface ABCItem {
@@ -47,6 +51,19 @@ export interface ForecastItem {
     status: 'OK' | 'WARNING' | 'CRITICAL';
 }
 
+export type ReportSection = 'overview' | 'abc' | 'xyz' | 'turnover' | 'financial' | 'forecast';
+
+export interface ReportBundle {
+    start_date: string;
+    end_date: string | null;
+    overview: StockOverview | null;
+    abc: { items: ABCItem[] } | null;
+    xyz: { items: XYZItem[] } | null;
+    turnover: { items: TurnoverItem[] } | null;
+    financial: FinancialReport | null;
+    forecast: { items: ForecastItem[] } | null;
+}
+
 export const reportService = {
     async getOverview(): Promise<StockOverview> {
         const response = await api.get('/reports/overview');
@@ -77,4 +94,11 @@ export const reportService = {
         const response = await api.get('/reports/forecast', { params });
         return response.data;
     },
+
+    async getBundle(sections: ReportSection[], params?: any): Promise<ReportBundle> {
+        const response = await api.get('/reports/bundle', {
+            params: { ...params, sections: sections.join(',') },
+        });
+        return response.data;
+    },
 };
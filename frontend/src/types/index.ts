@@ -23,6 +23,7 @@ export interface Product {
     quantity: number;
     alert_level: number;
     lead_time: number;
+    version: number;
     category: {
         id: number;
         name: string;
@@ -40,8 +41,9 @@ export interface Movement {
     reason?: string;
     note?: string;
     created_at: string;
-    product: Product;
-    created_by?: User;
+    // List endpoints return compact refs; pass ?expand=true for full objects.
+    product: Pick<Product, 'id' | 'name' | 'sku'> & Partial<Product>;
+    created_by?: Pick<User, 'id' | 'full_name'> & Partial<User>;
     organization_id: number;
 }
 
@@ -56,7 +58,7 @@ export interface AuditLog {
     id: number;
     user_id: number | null;
     action: 'create' | 'update' | 'delete';
-    entity_type: 'product' | 'movement' | 'category' | 'user';
+    entity_type: 'product' | 'movement' | 'category' | 'user' | 'stocktake';
     entity_id: number | null;
     details: Record<string, any> | null;
     created_at: string;